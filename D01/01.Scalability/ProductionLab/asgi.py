@@ -0,0 +1,173 @@
+"""
+ASGI Application - Composition root for the asyncio serving path
+
+Same routes and configuration (environment variables of main.py) as the
+Flask app, served by the async services on one event loop per process:
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+
+The routes (Starlette) are in infrastructure/web/asgi_app.py; this module
+only builds the components they use.
+
+Sync components that do no I/O on the request path are shared with
+main.py: the bcrypt process pool and its calibration, the token
+revocation list, and the sync cache those two use. Differences:
+- MySQL is reached through aiomysql, primary only (MYSQL_REPLICAS and
+  read-your-writes are not applied); SQLite through a thread pool.
+- A single Redis is reached through redis.asyncio; the near cache is not
+  used. A Redis ring is called on a thread pool, memory caches inline.
+"""
+import asyncio
+import os
+from typing import Any, Dict
+
+from core.services.async_app_service import AsyncAppService
+from core.services.async_auth_service import AsyncAuthService
+from core.services.async_address_service import AsyncAddressService
+from core.services.session_codec import create_session_codec
+
+from infrastructure.cache.redis_adapter import RedisAdapter
+from infrastructure.cache.async_redis_adapter import AsyncRedisAdapter
+from infrastructure.cache.async_memory_adapter import AsyncMemoryAdapter
+from infrastructure.cache.threaded_async_cache import ThreadedAsyncCache
+from infrastructure.cache.sharded_cache_adapter import ShardedCacheAdapter
+from infrastructure.cache.near_cache_adapter import NearCacheAdapter
+from infrastructure.cache.instrumented_cache import InstrumentedCache
+from infrastructure.database.async_mysql_adapter import AsyncMySQLAdapter
+from infrastructure.database.threaded_async_database import ThreadedAsyncDatabase
+from infrastructure.database.instrumented_database import InstrumentedDatabase
+from infrastructure.web.asgi_app import create_asgi_app
+
+from main import (
+    REDIS_HOST, REDIS_PORT, REDIS_SOCKET, REDIS_POOL_TIMEOUT, REDIS_CONNECT_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT, SESSION_CODEC, SESSION_STORE, SESSION_TTL_REFRESH_FRACTION,
+    ADDRESS_CACHE_TTL, ADDRESS_EMPTY_CACHE_TTL, PROFILE_CACHE_TTL, PROFILE_MISSING_TTL,
+    ADDRESS_INDEX_ENABLED, ADDRESS_INDEX_REFRESH_INTERVAL, PASSWORD_REHASH_ON_LOGIN,
+    DB_BACKEND, MYSQL_HOST, MYSQL_PORT, MYSQL_USER, MYSQL_PASSWORD, MYSQL_DATABASE,
+    MYSQL_POOL_SIZE, MYSQL_POOL_MAX_OVERFLOW, MYSQL_POOL_TIMEOUT, MYSQL_REPLICAS,
+    create_cache_adapter, create_database_adapter, create_password_hasher,
+    create_session_tokens, configure_password_cost
+)
+
+# One event loop multiplexes every in-flight request, so its pools are
+# sized for concurrency rather than for worker threads
+ASYNC_REDIS_MAX_CONNECTIONS = int(os.getenv('ASYNC_REDIS_MAX_CONNECTIONS', '100'))
+# Threads for backends without an asyncio driver (SQLite, Redis ring)
+ASYNC_IO_THREADS = int(os.getenv('ASYNC_IO_THREADS', '16'))
+
+
+def create_async_cache_adapter(cache):
+    """Async view of the sync cache from create_cache_adapter (same backend)"""
+    backend = cache.inner if isinstance(cache, InstrumentedCache) else cache
+    if isinstance(backend, NearCacheAdapter):
+        backend = backend.backing
+    if isinstance(backend, RedisAdapter):
+        return AsyncRedisAdapter(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            unix_socket_path=REDIS_SOCKET,
+            max_connections=ASYNC_REDIS_MAX_CONNECTIONS,
+            pool_timeout=REDIS_POOL_TIMEOUT,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            socket_timeout=REDIS_SOCKET_TIMEOUT
+        )
+    if isinstance(backend, ShardedCacheAdapter):
+        return ThreadedAsyncCache(cache, max_workers=ASYNC_IO_THREADS)
+    # In-process memory caches never block on I/O
+    return AsyncMemoryAdapter(cache)
+
+
+async def create_async_database_adapter():
+    """(async database, InstrumentedDatabase for /debug/queries or None); (None, None) if unreachable"""
+    if DB_BACKEND == 'sqlite':
+        db = create_database_adapter()
+        return (ThreadedAsyncDatabase(db, max_workers=ASYNC_IO_THREADS),
+                db if isinstance(db, InstrumentedDatabase) else None)
+
+    if MYSQL_REPLICAS:
+        print("MYSQL_REPLICAS is not used by the ASGI app: reads go to the primary")
+    db = AsyncMySQLAdapter(
+        host=MYSQL_HOST,
+        port=MYSQL_PORT,
+        user=MYSQL_USER,
+        password=MYSQL_PASSWORD,
+        database=MYSQL_DATABASE,
+        pool_size=MYSQL_POOL_SIZE + MYSQL_POOL_MAX_OVERFLOW,
+        pool_timeout=MYSQL_POOL_TIMEOUT
+    )
+    # The pool connects lazily, so check one connection up front
+    if not await db.ping():
+        print("MySQL connection failed")
+        await db.close()
+        return None, None
+    return db, None
+
+
+async def build_app() -> Dict[str, Any]:
+    """Components of the app (asgi_app.COMPONENTS) - runs at lifespan startup, on the serving event loop"""
+    loop = asyncio.get_running_loop()
+    password_hasher = create_password_hasher()
+    cache = create_cache_adapter()
+    async_cache = create_async_cache_adapter(cache)
+    db, instrumented_db = await create_async_database_adapter()
+    # Calibration measures bcrypt for up to a few seconds: off the loop
+    hash_calibration = await loop.run_in_executor(None, configure_password_cost, password_hasher, cache)
+
+    session_codec = create_session_codec(SESSION_CODEC)
+    app_service = AsyncAppService(
+        async_cache, session_codec,
+        hash_sessions=SESSION_STORE == 'hash',
+        ttl_refresh_fraction=SESSION_TTL_REFRESH_FRACTION
+    )
+    session_tokens, token_revocations = create_session_tokens(cache)
+
+    auth_service = None
+    address_service = None
+    if db:
+        auth_service = AsyncAuthService(
+            db, async_cache, session_codec, hasher=password_hasher,
+            rehash_on_login=PASSWORD_REHASH_ON_LOGIN, hash_calibration=hash_calibration,
+            profile_cache_ttl=PROFILE_CACHE_TTL, profile_missing_ttl=PROFILE_MISSING_TTL,
+            tokens=session_tokens, revocations=token_revocations
+        )
+        address_service = AsyncAddressService(
+            db, async_cache if ADDRESS_CACHE_TTL > 0 else None, cache_ttl=ADDRESS_CACHE_TTL,
+            empty_ttl=ADDRESS_EMPTY_CACHE_TTL,
+            # Cached profiles embed address names
+            on_change=auth_service.invalidate_address_profiles
+        )
+        if ADDRESS_INDEX_ENABLED:
+            try:
+                await address_service.refresh_index(force=True)
+                address_service.start_index_refresh(ADDRESS_INDEX_REFRESH_INTERVAL)
+            except Exception as e:
+                print(f"Address index not loaded, using SQL lookups: {e}")
+
+    return {
+        "app_service": app_service,
+        "auth_service": auth_service,
+        "address_service": address_service,
+        "cache": async_cache,
+        "tokens": session_tokens,
+        "revocations": token_revocations,
+        "database": instrumented_db,
+        "password_hasher": password_hasher,
+    }
+
+
+async def close_app(app) -> None:
+    """Stop background work and release pools, in reverse order of creation"""
+    if app.address_service is not None:
+        await app.address_service.stop_index_refresh()
+    if app.auth_service is not None:
+        await app.auth_service.wait_for_rehashes()
+        await app.auth_service.db.close()
+    if hasattr(app.cache, 'close'):
+        await app.cache.close()
+    if app.revocations is not None:
+        app.revocations.stop_sync()
+    if hasattr(app.password_hasher, 'close'):
+        app.password_hasher.close()
+
+
+app = create_asgi_app(build_app, close_app)
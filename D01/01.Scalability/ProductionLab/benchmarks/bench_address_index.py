@@ -0,0 +1,195 @@
+"""
+Address index benchmark - in-memory tree vs SQL for the dropdown lookups
+
+Loads --countries x --provinces x --districts rows into master_address and
+times:
+
+    startup load     refresh_index(force=True): read the table, build the
+                     tree and every pre-serialized JSON body
+    per lookup       a mix of countries / provinces / districts lookups,
+                     p50 and p99, through
+                       SQL             AddressService, no cache (DISTINCT queries)
+                       read-through    warm MemoryAdapter cache (JSON decode per hit)
+                       index           AddressIndex lists
+                       index JSON      the pre-serialized response bytes
+    per request      the same mix as GET /addresses/... through Flask's test
+                     client, SQL path vs index path
+
+Runs against the embedded SQLiteAdapter (no network, so the SQL numbers are
+a lower bound), and against MySQL when MYSQL_HOST is set (rows go to
+master_address and are deleted afterwards).
+
+Usage:
+    python3 -m benchmarks.bench_address_index [--countries 5] [--provinces 63]
+        [--districts 12] [--lookups 20000]
+    MYSQL_HOST=localhost python3 -m benchmarks.bench_address_index
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from urllib.parse import urlencode
+
+from flask import Flask
+
+from core.services.address_index import AddressIndex
+from core.services.address_service import AddressService, SQL_INSERT_ADDRESS, SQL_EXPORT_ADDRESSES
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.database.sqlite_adapter import SQLiteAdapter
+from infrastructure.web.flask_adapter import FlaskAdapter
+from infrastructure.web.routes import address as address_routes
+
+BENCH_PREFIX = "Bench "
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def make_rows(args):
+    return [(f"{BENCH_PREFIX}{c}", f"Province {c}-{p}", f"District {c}-{p}-{d}")
+            for c in range(args.countries) for p in range(args.provinces) for d in range(args.districts)]
+
+
+def make_lookups(args, count: int):
+    """("countries",) / ("provinces", country) / ("districts", country, province), dropdown-like mix"""
+    rng = random.Random(42)
+    lookups = []
+    for _ in range(count):
+        c, p = rng.randrange(args.countries), rng.randrange(args.provinces)
+        country, province = f"{BENCH_PREFIX}{c}", f"Province {c}-{p}"
+        lookups.append(rng.choice([("countries",), ("provinces", country),
+                                   ("districts", country, province), ("districts", country, province)]))
+    return lookups
+
+
+def time_each(fn, lookups):
+    latencies = []
+    for lookup in lookups:
+        start = time.perf_counter()
+        fn(lookup)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def report(label: str, latencies) -> None:
+    us = [x * 1e6 for x in latencies]
+    print(f"{label:<22} {statistics.median(us):>10.1f} {percentile(us, 0.99):>10.1f} "
+          f"{len(us) / (sum(latencies) or 1e-9):>12,.0f}")
+
+
+def lookup_lists(service):
+    return {
+        "countries": lambda lookup: service.get_countries(),
+        "provinces": lambda lookup: service.get_provinces(lookup[1]),
+        "districts": lambda lookup: service.get_districts(lookup[1], lookup[2]),
+    }
+
+
+def lookup_bodies(service):
+    return {
+        "countries": lambda lookup: service.countries_json(),
+        "provinces": lambda lookup: service.provinces_json(lookup[1]),
+        "districts": lambda lookup: service.districts_json(lookup[1], lookup[2]),
+    }
+
+
+def url_for(lookup) -> str:
+    if lookup[0] == "countries":
+        return "/addresses/countries"
+    if lookup[0] == "provinces":
+        return "/addresses/provinces?" + urlencode({"country": lookup[1]})
+    return "/addresses/districts?" + urlencode({"country": lookup[1], "province": lookup[2]})
+
+
+def run(label: str, db, args) -> None:
+    rows = args.countries * args.provinces * args.districts
+    print(f"\n{label}: {rows:,} rows")
+
+    # Startup load
+    loads = []
+    for _ in range(5):
+        service = AddressService(db)
+        start = time.perf_counter()
+        service.refresh_index(force=True)
+        loads.append(time.perf_counter() - start)
+    tracemalloc.start()
+    index = AddressIndex(db.fetch_iter(SQL_EXPORT_ADDRESSES, as_tuples=True))
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Build time from an untraced run; tracemalloc slows the build several times over
+    print(f"startup load: median {statistics.median(loads) * 1000:.1f} ms "
+          f"(build {service.get_cache_stats()['index']['build_ms']:.1f} ms), index {retained / 2 ** 20:.1f} MB, "
+          f"{len(index.districts_json) + len(index.provinces_json) + 1:,} JSON bodies")
+
+    sql = AddressService(db)
+    cached = AddressService(db, MemoryAdapter())
+    indexed = AddressService(db)
+    indexed.refresh_index(force=True)
+    lookups = make_lookups(args, args.lookups)
+    for lookup in lookups[:2000]:  # warm the read-through cache
+        lookup_lists(cached)[lookup[0]](lookup)
+
+    print(f"{'lookup':<22} {'p50 us':>10} {'p99 us':>10} {'lookups/s':>12}")
+    sql_lookups = lookups[:max(1, args.lookups // 10)]  # the SQL path is slow
+    for name, funcs, sample in [
+        ("SQL", lookup_lists(sql), sql_lookups),
+        ("read-through cache", lookup_lists(cached), lookups),
+        ("index", lookup_lists(indexed), lookups),
+        ("index JSON", lookup_bodies(indexed), lookups),
+    ]:
+        report(name, time_each(lambda lookup: funcs[lookup[0]](lookup), sample))
+
+    print(f"{'GET /addresses/...':<22} {'p50 us':>10} {'p99 us':>10} {'req/s':>12}")
+    requests = [url_for(lookup) for lookup in lookups[:max(1, args.lookups // 5)]]
+    app = Flask(__name__)
+    app.register_blueprint(address_routes.address_bp)
+    client = app.test_client()
+    for name, service in [("SQL", sql), ("index", indexed)]:
+        address_routes.init_address_routes(service, FlaskAdapter())
+        report(name, time_each(client.get, requests))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--countries", type=int, default=5)
+    parser.add_argument("--provinces", type=int, default=63)
+    parser.add_argument("--districts", type=int, default=12)
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        init_sql = os.path.join(os.path.dirname(__file__), "..", "infrastructure", "database", "init.sql")
+        with open(init_sql) as f:
+            db = SQLiteAdapter(os.path.join(tmp, "bench.sqlite3"), f.read())
+        db.execute("DELETE FROM master_address")
+        db.insert_many(SQL_INSERT_ADDRESS, make_rows(args), chunk_size=5000)
+        run("SQLiteAdapter (WAL file)", db, args)
+        db.close()
+
+    mysql_host = os.getenv("MYSQL_HOST")
+    if mysql_host:
+        from infrastructure.database.mysql_adapter import MySQLAdapter
+        db = MySQLAdapter(
+            host=mysql_host, port=int(os.getenv("MYSQL_PORT", "3306")),
+            user=os.getenv("MYSQL_USER", "app_user"), password=os.getenv("MYSQL_PASSWORD", "app_password"),
+            database=os.getenv("MYSQL_DATABASE", "app_db"), registry=None
+        )
+        if not db.ping():
+            print(f"\nMySQL at {mysql_host} unreachable, skipped")
+            return
+        cleanup = "DELETE FROM master_address WHERE country LIKE %s"
+        db.execute(cleanup, (f"{BENCH_PREFIX}%",))
+        try:
+            db.insert_many(SQL_INSERT_ADDRESS, make_rows(args), chunk_size=5000)
+            run(f"MySQLAdapter @ {mysql_host} (plus the seed rows)", db, args)
+        finally:
+            db.execute(cleanup, (f"{BENCH_PREFIX}%",))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Async vs sync benchmark - same simulated I/O latency, two serving models
+
+Each "request" does what the real endpoints do: a session read + write
+(AppService.handle_request) and a districts lookup (AddressService). The
+sync services run on a thread pool (like gunicorn threads); the async
+services run as coroutines on one event loop with --concurrency in flight.
+
+Usage:
+    python3 -m benchmarks.bench_async_vs_sync [--requests 5000] [--threads 32]
+        [--concurrency 32 256 1024] [--cache-rtt 0.0005] [--db-rtt 0.002]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.services.app_service import AppService
+from core.services.address_service import AddressService
+from core.services.async_app_service import AsyncAppService
+from core.services.async_address_service import AsyncAddressService
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from benchmarks.stand_ins import (
+    LatencyCache, AsyncLatencyCache, LatencyDatabase, AsyncLatencyDatabase,
+    AddressTable, StubWeb, sample_addresses
+)
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def report(label: str, elapsed: float, latencies) -> None:
+    ms = [x * 1000 for x in latencies]
+    print(f"{label:<22} {len(ms) / elapsed:>10.0f} {statistics.median(ms):>9.2f} "
+          f"{percentile(ms, 0.99):>9.2f}")
+
+
+def run_sync(args, table, threads: int) -> None:
+    app = AppService(LatencyCache(MemoryAdapter(), rtt=args.cache_rtt))
+    addresses = AddressService(LatencyDatabase(table, rtt=args.db_rtt))
+    sessions = [None] * args.sessions
+
+    def one(i: int) -> float:
+        start = time.perf_counter()
+        slot = i % args.sessions
+        sessions[slot] = app.handle_request(StubWeb(sessions[slot]))["session_id"]
+        addresses.get_districts("Country 0", "Province 0-1")
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, range(args.requests)))
+    report(f"sync  threads={threads}", time.perf_counter() - start, latencies)
+
+
+async def run_async(args, table, concurrency: int) -> None:
+    app = AsyncAppService(AsyncLatencyCache(MemoryAdapter(), rtt=args.cache_rtt))
+    addresses = AsyncAddressService(AsyncLatencyDatabase(table, rtt=args.db_rtt))
+    sessions = [None] * args.sessions
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> float:
+        async with limit:
+            start = time.perf_counter()
+            slot = i % args.sessions
+            sessions[slot] = (await app.handle_request(sessions[slot]))["session_id"]
+            await addresses.get_districts("Country 0", "Province 0-1")
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(args.requests)))
+    report(f"async inflight={concurrency}", time.perf_counter() - start, latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[32, 256, 1024])
+    parser.add_argument("--cache-rtt", type=float, default=0.0005)
+    parser.add_argument("--db-rtt", type=float, default=0.002)
+    args = parser.parse_args()
+
+    table = AddressTable(sample_addresses())
+    print(f"{args.requests} requests, cache rtt {args.cache_rtt * 1000:.1f}ms, "
+          f"db rtt {args.db_rtt * 1000:.1f}ms (3 I/O waits per request)")
+    print(f"{'mode':<22} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+    for threads in args.threads:
+        run_sync(args, table, threads)
+    for concurrency in args.concurrency:
+        asyncio.run(run_async(args, table, concurrency))
+
+
+if __name__ == "__main__":
+    main()
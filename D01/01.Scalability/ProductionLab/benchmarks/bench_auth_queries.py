@@ -0,0 +1,219 @@
+"""
+Auth query benchmark - round trips per login / registration, before and after
+
+    previous   login: SELECT auth_user, verify, SELECT profile LEFT JOIN address
+               register: SELECT id (exists?), then the INSERT transaction
+    current    login: one SELECT joining auth_user, user_profile, master_address
+               register: the INSERT transaction; UNIQUE(username) rejects taken names
+
+Every DatabasePort call goes through a counter that records round trips
+(statements, plus BEGIN and COMMIT for a transaction) and pool checkouts
+(top-level calls), and can add --rtt-ms of simulated network per round
+trip: the embedded SQLite database has no network, a MySQL server on the
+LAN costs ~0.2-1 ms per round trip. bcrypt runs at cost 4 so the database
+part dominates.
+
+Runs against SQLiteAdapter, and against MySQL when MYSQL_HOST is set (users
+named bench_* are deleted afterwards; --rtt-ms is not added there).
+
+Usage:
+    python3 -m benchmarks.bench_auth_queries [--users 300] [--rtt-ms 0.5]
+    MYSQL_HOST=localhost python3 -m benchmarks.bench_auth_queries
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+
+from core.interfaces.database_port import DatabasePort
+from core.services.auth_service import (
+    AuthService, InlinePasswordHasher, SQL_INSERT_USER, SQL_INSERT_PROFILE, INVALID_CREDENTIALS,
+    session_key, legacy_session_index_key, parse_session_index, session_payload
+)
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.database.sqlite_adapter import SQLiteAdapter
+
+BENCH_PREFIX = "bench_"
+PASSWORD = "correct horse"
+
+# Queries as they were before the joined login query
+SQL_USER_EXISTS = "SELECT id FROM auth_user WHERE username = %s"
+SQL_USER_BY_USERNAME = "SELECT id, username, password_hash FROM auth_user WHERE username = %s"
+
+
+class RoundTripCounter(DatabasePort):
+    """Counts round trips and pool checkouts; sleeps rtt seconds per round trip"""
+
+    def __init__(self, inner: DatabasePort, rtt: float = 0.0):
+        self.inner = inner
+        self.rtt = rtt
+        self.round_trips = 0
+        self.checkouts = 0
+
+    def trip(self) -> None:
+        self.round_trips += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def call(self, method: str, *args):
+        self.checkouts += 1
+        self.trip()
+        return getattr(self.inner, method)(*args)
+
+    def execute(self, query, params=None):
+        return self.call("execute", query, params)
+
+    def fetch_one(self, query, params=None, read_only=False):
+        return self.call("fetch_one", query, params)
+
+    def fetch_all(self, query, params=None, read_only=False):
+        return self.call("fetch_all", query, params)
+
+    def insert(self, query, params=None):
+        return self.call("insert", query, params)
+
+    def ping(self):
+        return self.inner.ping()
+
+    @contextmanager
+    def transaction(self):
+        self.checkouts += 1
+        self.trip()  # BEGIN
+        with self.inner.transaction() as tx:
+            try:
+                yield CountedTransaction(tx, self)
+            finally:
+                self.trip()  # COMMIT or ROLLBACK
+
+
+class CountedTransaction:
+    def __init__(self, tx, counter: RoundTripCounter):
+        self.tx = tx
+        self.counter = counter
+
+    def insert(self, query, params=None):
+        self.counter.trip()
+        return self.tx.insert(query, params)
+
+    def execute(self, query, params=None):
+        self.counter.trip()
+        return self.tx.execute(query, params)
+
+
+class PreviousAuthService(AuthService):
+    """login and register as they were: a query for the user, then one for the profile / insert"""
+
+    def register(self, username, password, full_name=None, email=None,
+                 address_id=None, address_detail=None):
+        if self.db.fetch_one(SQL_USER_EXISTS, (username,)):
+            return {"success": False, "error": "Username already exists"}
+        password_hash = self.hasher.hash(password)
+        with self.db.transaction() as tx:
+            user_id = tx.insert(SQL_INSERT_USER, (username, password_hash))
+            tx.insert(SQL_INSERT_PROFILE, (user_id, full_name, email, address_id, address_detail))
+        return {"success": True, "user_id": user_id, "message": "User registered successfully"}
+
+    def login(self, username, password):
+        user_row = self.db.fetch_one(SQL_USER_BY_USERNAME, (username,))
+        if not user_row or not self.hasher.verify(password, user_row['password_hash']):
+            return dict(INVALID_CREDENTIALS)
+        session_id = str(uuid.uuid4())
+        index_key = legacy_session_index_key(user_row['id'])
+        session_ids = parse_session_index(self.cache.get(index_key))
+        self.cache.set_many({
+            session_key(session_id): session_payload(user_row, self.codec),
+            index_key: json.dumps((session_ids + [session_id])[-20:])
+        }, ttl=self.SESSION_TTL)
+        profile = self._get_user_profile(user_row['id'])
+        return {"success": True, "session_id": session_id,
+                "user": {"id": user_row['id'], "username": user_row['username'], **profile}}
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def measure(counter: RoundTripCounter, calls):
+    """Run each call; (round trips per call, checkouts per call, latencies)"""
+    trips, checkouts, latencies = counter.round_trips, counter.checkouts, []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    return ((counter.round_trips - trips) / len(calls), (counter.checkouts - checkouts) / len(calls),
+            latencies)
+
+
+def run(label: str, db, rtt: float, args) -> None:
+    print(f"\n{label}" + (f", +{rtt * 1000:.2f} ms per round trip" if rtt else ""))
+    print(f"{'operation':<16} {'version':<9} {'round trips':>11} {'checkouts':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8}")
+    hasher = InlinePasswordHasher(rounds=4)
+    for version, service_class in (("previous", PreviousAuthService), ("current", AuthService)):
+        counter = RoundTripCounter(db, rtt)
+        service = service_class(counter, MemoryAdapter(), hasher=hasher, rehash_on_login=False)
+        names = [f"{BENCH_PREFIX}{version}_{uuid.uuid4().hex[:8]}_{i}" for i in range(args.users)]
+        results = {
+            "register": measure(counter, [
+                lambda name=name: service.register(name, PASSWORD, full_name="Bench", address_id=1,
+                                                   address_detail="1 Main St")
+                for name in names
+            ]),
+            "register taken": measure(counter, [lambda name=name: service.register(name, PASSWORD)
+                                                for name in names[:max(1, args.users // 5)]]),
+            "login": measure(counter, [lambda name=name: service.login(name, PASSWORD) for name in names]),
+        }
+        for operation, (trips, checkouts, latencies) in results.items():
+            ms = [x * 1000 for x in latencies]
+            print(f"{operation:<16} {version:<9} {trips:>11.1f} {checkouts:>9.1f} "
+                  f"{statistics.median(ms):>8.2f} {percentile(ms, 0.99):>8.2f}")
+
+
+def cleanup(db) -> None:
+    # user_profile rows go with ON DELETE CASCADE
+    db.execute("DELETE FROM auth_user WHERE username LIKE %s", (f"{BENCH_PREFIX}%",))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    InlinePasswordHasher(rounds=4).hash(PASSWORD)
+    print(f"bcrypt cost 4: {(time.perf_counter() - start) * 1000:.1f} ms per hash; {args.users} users")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        init_sql = os.path.join(os.path.dirname(__file__), "..", "infrastructure", "database", "init.sql")
+        with open(init_sql) as f:
+            db = SQLiteAdapter(os.path.join(tmp, "bench.sqlite3"), f.read())
+        run("SQLiteAdapter (WAL file)", db, 0.0, args)
+        if args.rtt_ms:
+            run("SQLiteAdapter (WAL file)", db, args.rtt_ms / 1000, args)
+        db.close()
+
+    mysql_host = os.getenv("MYSQL_HOST")
+    if mysql_host:
+        from infrastructure.database.mysql_adapter import MySQLAdapter
+        db = MySQLAdapter(
+            host=mysql_host, port=int(os.getenv("MYSQL_PORT", "3306")),
+            user=os.getenv("MYSQL_USER", "app_user"), password=os.getenv("MYSQL_PASSWORD", "app_password"),
+            database=os.getenv("MYSQL_DATABASE", "app_db"), registry=None
+        )
+        if not db.ping():
+            print(f"\nMySQL at {mysql_host} unreachable, skipped")
+            return
+        try:
+            run(f"MySQLAdapter @ {mysql_host}", db, 0.0, args)
+        finally:
+            cleanup(db)
+
+
+if __name__ == "__main__":
+    main()
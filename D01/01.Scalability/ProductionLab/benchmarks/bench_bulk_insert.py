@@ -0,0 +1,91 @@
+"""
+Bulk insert benchmark - load N master_address rows one by one vs in batches
+
+Row by row is one INSERT (one round trip, one autocommit) per row;
+insert_many sends one multi-row INSERT per --chunk rows in one transaction.
+Runs against an in-memory SQLite stand-in charging --rtt per statement,
+and against MySQL when MYSQL_HOST is set (rows go to a scratch
+bench_address table that is dropped afterwards).
+
+Row by row is timed on the first --row-sample rows and extrapolated to
+--rows, so the run stays short.
+
+Usage:
+    python3 -m benchmarks.bench_bulk_insert [--rows 100000] [--chunks 100 1000 5000]
+    MYSQL_HOST=localhost python3 -m benchmarks.bench_bulk_insert
+"""
+import argparse
+import os
+import time
+
+from core.services.address_service import SQL_INSERT_ADDRESS
+from benchmarks.stand_ins import SQLiteLatencyDatabase
+
+MYSQL_SCRATCH = """CREATE TABLE IF NOT EXISTS bench_address (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    country VARCHAR(100) NOT NULL, province VARCHAR(100) NOT NULL, district VARCHAR(100) NOT NULL)"""
+
+
+def make_rows(count: int):
+    return [("Vietnam", f"Province {i // 1000}", f"District {i}") for i in range(count)]
+
+
+def report(label: str, make_db, query: str, args) -> None:
+    rows = make_rows(args.rows)
+    print(f"\n{label}: {args.rows:,} rows")
+    print(f"{'mode':<22} {'seconds':>9} {'rows/s':>12} {'statements':>11}")
+
+    db = make_db()
+    sample = rows[:args.row_sample]
+    start = time.perf_counter()
+    for row in sample:
+        db.insert(query, row)
+    per_row = (time.perf_counter() - start) / len(sample)
+    print(f"{'row by row (extrap.)':<22} {per_row * args.rows:>9.2f} {1 / per_row:>12,.0f} {args.rows:>11,}")
+
+    for chunk in args.chunks:
+        db = make_db()
+        start = time.perf_counter()
+        result = db.insert_many(query, rows, chunk_size=chunk)
+        elapsed = time.perf_counter() - start
+        assert result.rowcount == args.rows, result
+        print(f"{f'insert_many chunk={chunk}':<22} {elapsed:>9.2f} {args.rows / elapsed:>12,.0f} "
+              f"{result.chunks:>11,}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--chunks", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--row-sample", type=int, default=5000, help="rows timed one by one")
+    parser.add_argument("--rtt", type=float, default=0.0002, help="simulated round trip (s)")
+    args = parser.parse_args()
+
+    report(f"SQLite stand-in + {args.rtt * 1000:.2f}ms simulated RTT",
+           lambda: SQLiteLatencyDatabase(rtt=args.rtt), SQL_INSERT_ADDRESS, args)
+
+    mysql_host = os.getenv("MYSQL_HOST")
+    if mysql_host:
+        from infrastructure.database.mysql_adapter import MySQLAdapter
+        db = MySQLAdapter(
+            host=mysql_host, port=int(os.getenv("MYSQL_PORT", "3306")),
+            user=os.getenv("MYSQL_USER", "app_user"), password=os.getenv("MYSQL_PASSWORD", "app_password"),
+            database=os.getenv("MYSQL_DATABASE", "app_db"), registry=None
+        )
+        if not db.ping():
+            print(f"\nMySQL at {mysql_host} unreachable, skipped")
+            return
+
+        def fresh():
+            db.execute("DROP TABLE IF EXISTS bench_address")
+            db.execute(MYSQL_SCRATCH)
+            return db
+        try:
+            report(f"MySQLAdapter @ {mysql_host}", fresh,
+                   SQL_INSERT_ADDRESS.replace("master_address", "bench_address"), args)
+        finally:
+            db.execute("DROP TABLE IF EXISTS bench_address")
+
+
+if __name__ == "__main__":
+    main()
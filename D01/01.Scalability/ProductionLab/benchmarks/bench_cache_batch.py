@@ -0,0 +1,84 @@
+"""
+Batch benchmark - N single-key calls vs one batched call
+
+Uses a real Redis when REDIS_HOST is reachable, and always runs against
+an in-memory stand-in that charges --rtt seconds per round trip.
+
+Usage:
+    python3 -m benchmarks.bench_cache_batch [--keys 10 50 100] [--rtt 0.0002]
+    REDIS_HOST=localhost python3 -m benchmarks.bench_cache_batch
+"""
+import argparse
+import os
+import time
+
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from benchmarks.stand_ins import LatencyCache
+
+
+def timed(fn, repeat: int) -> float:
+    """Average milliseconds per call of fn()"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def bench(cache, n: int, repeat: int):
+    keys = [f"auth_session:bench-{i}" for i in range(n)]
+    mapping = {key: '{"user_id": 1, "username": "bench"}' for key in keys}
+
+    results = {
+        "set": (timed(lambda: [cache.set(k, v, ttl=60) for k, v in mapping.items()], repeat),
+                timed(lambda: cache.set_many(mapping, ttl=60), repeat)),
+        "get": (timed(lambda: [cache.get(k) for k in keys], repeat),
+                timed(lambda: cache.get_many(keys), repeat)),
+    }
+    results["delete"] = (
+        timed_delete(cache, mapping, lambda: [cache.delete(k) for k in keys], repeat),
+        timed_delete(cache, mapping, lambda: cache.delete_many(keys), repeat),
+    )
+    return results
+
+
+def timed_delete(cache, mapping, fn, repeat: int) -> float:
+    """Like timed() but re-creates the keys (untimed) before each delete"""
+    total = 0.0
+    for _ in range(repeat):
+        cache.set_many(mapping, ttl=60)
+        start = time.perf_counter()
+        fn()
+        total += time.perf_counter() - start
+    return total / repeat * 1000
+
+
+def report(name: str, cache, key_counts, repeat: int):
+    print(f"\n--- {name} ---")
+    print(f"{'keys':>6} {'op':>7} {'N single (ms)':>15} {'1 batch (ms)':>14} {'speedup':>8}")
+    for n in key_counts:
+        for op, (single, batch) in bench(cache, n, repeat).items():
+            print(f"{n:>6} {op:>7} {single:>15.3f} {batch:>14.3f} {single / batch if batch else 0:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keys", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--rtt", type=float, default=0.0002, help="stand-in round trip seconds")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    report(f"MemoryAdapter + {args.rtt * 1000:.2f}ms simulated RTT",
+           LatencyCache(MemoryAdapter(), rtt=args.rtt), args.keys, args.repeat)
+
+    redis_host = os.getenv("REDIS_HOST")
+    if redis_host:
+        from infrastructure.cache.redis_adapter import RedisAdapter
+        redis_cache = RedisAdapter(host=redis_host)
+        if redis_cache.ping():
+            report(f"RedisAdapter @ {redis_host}", redis_cache, args.keys, args.repeat)
+        else:
+            print(f"\nRedis at {redis_host} unreachable, skipped")
+
+
+if __name__ == "__main__":
+    main()
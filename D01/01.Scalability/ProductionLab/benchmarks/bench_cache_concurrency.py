@@ -0,0 +1,80 @@
+"""
+Concurrency benchmark - MemoryAdapter (one lock) vs ShardedMemoryAdapter
+
+Runs a 90% get / 10% set session workload from 1..32 threads and prints
+throughput for each adapter.
+
+Usage:
+    python3 -m benchmarks.bench_cache_concurrency [--duration 1.0] [--shards 16]
+"""
+import argparse
+import random
+import threading
+import time
+
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.cache.sharded_memory_adapter import ShardedMemoryAdapter
+
+THREAD_COUNTS = [1, 2, 4, 8, 16, 32]
+
+
+def run_workload(cache, threads: int, duration: float, keys: int) -> float:
+    """Return total ops/sec achieved by `threads` workers in `duration` seconds"""
+    stop = threading.Event()
+    counts = [0] * threads
+    start_barrier = threading.Barrier(threads + 1)
+
+    def worker(idx: int):
+        rnd = random.Random(idx)
+        key_names = [f"session:{i}" for i in range(keys)]
+        ops = 0
+        start_barrier.wait()
+        while not stop.is_set():
+            # Batch of ops between stop checks to keep the loop cheap
+            for _ in range(100):
+                key = key_names[rnd.randrange(keys)]
+                if rnd.random() < 0.1:
+                    cache.set(key, '{"visits": 1}', ttl=3600)
+                else:
+                    cache.get(key)
+            ops += 100
+        counts[idx] = ops
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    start_barrier.wait()
+    started = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for w in workers:
+        w.join()
+    return sum(counts) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds per run")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--keys", type=int, default=10000)
+    args = parser.parse_args()
+
+    adapters = {
+        "single-lock": lambda: MemoryAdapter(max_entries=args.keys * 2),
+        f"sharded-{args.shards}": lambda: ShardedMemoryAdapter(shards=args.shards, max_entries=args.keys * 2),
+    }
+
+    print(f"--- Cache concurrency benchmark ({args.duration}s per run, {args.keys} keys) ---")
+    print(f"{'threads':>8} " + " ".join(f"{name:>16}" for name in adapters))
+    for threads in THREAD_COUNTS:
+        row = []
+        for factory in adapters.values():
+            cache = factory()
+            for i in range(args.keys):
+                cache.set(f"session:{i}", '{"visits": 1}', ttl=3600)
+            row.append(run_workload(cache, threads, args.duration, args.keys))
+        print(f"{threads:>8} " + " ".join(f"{ops:>12,.0f} op/s" for ops in row))
+
+
+if __name__ == "__main__":
+    main()
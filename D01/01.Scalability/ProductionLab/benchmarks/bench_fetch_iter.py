@@ -0,0 +1,106 @@
+"""
+Streaming benchmark - peak Python memory of fetch_all vs fetch_iter
+
+Reads --rows master_address rows through each API and reports the peak
+traced allocation (tracemalloc) and the wall time of an untraced run:
+
+    fetch_all             list of dicts, whole result at once
+    fetch_iter            dicts, --batch-size rows held at a time
+    fetch_iter tuples     tuples, no per-row dict
+    NDJSON export         AddressService.export_addresses (the /addresses/export body)
+
+Runs against an in-memory SQLite stand-in (the table itself lives in
+SQLite's C heap, which tracemalloc does not count), and against MySQL when
+MYSQL_HOST is set (rows go to a scratch bench_address table, dropped after).
+
+Usage:
+    python3 -m benchmarks.bench_fetch_iter [--rows 200000] [--batch-size 1000]
+    MYSQL_HOST=localhost python3 -m benchmarks.bench_fetch_iter
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+from core.services import address_service
+from core.services.address_service import AddressService, SQL_INSERT_ADDRESS
+from benchmarks.stand_ins import SQLiteLatencyDatabase
+
+MYSQL_SCRATCH = """CREATE TABLE IF NOT EXISTS bench_address (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    country VARCHAR(100) NOT NULL, province VARCHAR(100) NOT NULL, district VARCHAR(100) NOT NULL)"""
+
+
+def measure(fn):
+    """(rows, seconds, peak bytes) - timed in a separate untraced run"""
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    count = fn()
+    return count, time.perf_counter() - start, peak
+
+
+def report(label: str, db, table: str, args) -> None:
+    query = f"SELECT id, country, province, district FROM {table} ORDER BY id"
+    service = AddressService(db)
+    address_service.SQL_EXPORT_ADDRESSES = query
+
+    def drain(rows):
+        count = 0
+        for _ in rows:
+            count += 1
+        return count
+
+    cases = [
+        ("fetch_all", lambda: len(db.fetch_all(query))),
+        ("fetch_iter", lambda: drain(db.fetch_iter(query, batch_size=args.batch_size))),
+        ("fetch_iter tuples", lambda: drain(db.fetch_iter(query, batch_size=args.batch_size, as_tuples=True))),
+        ("NDJSON export", lambda: drain(service.export_addresses(args.batch_size))),
+    ]
+    print(f"\n{label}: {args.rows:,} rows, batch_size={args.batch_size}")
+    print(f"{'mode':<20} {'peak MB':>9} {'seconds':>9} {'rows/s':>12}")
+    for name, fn in cases:
+        count, elapsed, peak = measure(fn)
+        assert count == args.rows, (name, count)
+        print(f"{name:<20} {peak / 2 ** 20:>9.1f} {elapsed:>9.2f} {count / elapsed:>12,.0f}")
+
+
+def make_rows(count: int):
+    return [("Vietnam", f"Province {i // 1000}", f"District {i}") for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    sqlite_db = SQLiteLatencyDatabase(rtt=0)
+    sqlite_db.insert_many(SQL_INSERT_ADDRESS, make_rows(args.rows), chunk_size=5000)
+    report("SQLite stand-in", sqlite_db, "master_address", args)
+
+    mysql_host = os.getenv("MYSQL_HOST")
+    if mysql_host:
+        from infrastructure.database.mysql_adapter import MySQLAdapter
+        db = MySQLAdapter(
+            host=mysql_host, port=int(os.getenv("MYSQL_PORT", "3306")),
+            user=os.getenv("MYSQL_USER", "app_user"), password=os.getenv("MYSQL_PASSWORD", "app_password"),
+            database=os.getenv("MYSQL_DATABASE", "app_db"), registry=None
+        )
+        if not db.ping():
+            print(f"\nMySQL at {mysql_host} unreachable, skipped")
+            return
+        db.execute("DROP TABLE IF EXISTS bench_address")
+        db.execute(MYSQL_SCRATCH)
+        try:
+            db.insert_many(SQL_INSERT_ADDRESS.replace("master_address", "bench_address"),
+                           make_rows(args.rows), chunk_size=5000)
+            report(f"MySQLAdapter @ {mysql_host}", db, "bench_address", args)
+        finally:
+            db.execute("DROP TABLE IF EXISTS bench_address")
+
+
+if __name__ == "__main__":
+    main()
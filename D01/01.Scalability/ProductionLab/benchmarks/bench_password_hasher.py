@@ -0,0 +1,142 @@
+"""
+Password hashing benchmark - login bursts next to cheap address lookups
+
+Open-loop traffic (requests arrive on schedule whether or not earlier ones
+finished) into one pool of --threads request threads, like a gunicorn
+worker: --login-rate logins/s (bcrypt verify at --rounds) mixed with
+--address-rate address lookups/s (in-memory index, microseconds of work).
+
+    inline   bcrypt on the request thread (AuthService default)
+    pool     ProcessPoolHasher: --workers processes, --max-queue waiting,
+             logins beyond that rejected at once (HasherBusy -> 503)
+
+Latency is measured from each request's scheduled arrival, so time spent
+waiting for a free request thread counts. When logins arrive faster than
+the cores can hash them, inline hashing ties up every thread and address
+p99 grows with the backlog; the pool sheds the excess logins instead.
+
+Usage:
+    python3 -m benchmarks.bench_password_hasher [--seconds 5] [--threads 8]
+        [--login-rate 30] [--address-rate 200] [--rounds 10] [--workers N] [--max-queue M]
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from core.interfaces.password_hasher_port import HasherBusy
+from core.services.address_service import AddressService
+from core.services.auth_service import AuthService, SQL_LOGIN_BY_USERNAME
+from infrastructure.security.process_pool_hasher import ProcessPoolHasher
+from benchmarks.stand_ins import sample_addresses
+
+PASSWORD = "correct horse"
+
+
+class UserDB:
+    """One user for login, master_address rows for the index"""
+
+    def __init__(self, password_hash: str, addresses):
+        self.user = {"id": 1, "username": "alice", "password_hash": password_hash}
+        self.addresses = [(r["id"], r["country"], r["province"], r["district"]) for r in addresses]
+
+    def fetch_one(self, query, params=None, read_only=False):
+        return dict(self.user) if query == SQL_LOGIN_BY_USERNAME else None
+
+    def fetch_iter(self, query, params=None, batch_size=1000, as_tuples=False, read_only=False):
+        return iter(self.addresses)
+
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def schedule(args):
+    """[(offset seconds, kind)], Poisson arrivals per kind"""
+    rng = random.Random(7)
+    arrivals = []
+    for kind, rate in (("login", args.login_rate), ("address", args.address_rate)):
+        at = rng.expovariate(rate)
+        while at < args.seconds:
+            arrivals.append((at, kind))
+            at += rng.expovariate(rate)
+    return sorted(arrivals)
+
+
+def run(label: str, hasher, db, args) -> None:
+    auth = AuthService(db, None, hasher=hasher)
+    addresses = AddressService(db)
+    addresses.refresh_index(force=True)
+
+    def one(kind: str, due: float):
+        try:
+            if kind == "login":
+                status = "ok" if auth.login("alice", PASSWORD)["success"] else "failed"
+            else:
+                addresses.get_districts("Country 0", "Province 0-1")
+                status = "ok"
+        except HasherBusy:
+            status = "rejected"
+        return kind, status, time.perf_counter() - due
+
+    arrivals = schedule(args)
+    futures = []
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        start = time.perf_counter()
+        for offset, kind in arrivals:
+            due = start + offset
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(one, kind, due))
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - start
+
+    print(f"\n{label} (drained in {elapsed:.1f}s)")
+    print(f"{'requests':<10} {'sent':>6} {'ok':>6} {'rejected':>9} {'ok p50 ms':>10} {'ok p99 ms':>10} "
+          f"{'rejected p99 ms':>16}")
+    for kind in ("address", "login"):
+        ok = [latency * 1000 for k, s, latency in results if k == kind and s != "rejected"]
+        rejected = [latency * 1000 for k, s, latency in results if k == kind and s == "rejected"]
+        print(f"{kind:<10} {len(ok) + len(rejected):>6} {len(ok):>6} {len(rejected):>9} "
+              f"{statistics.median(ok) if ok else 0:>10.1f} {percentile(ok, 0.99) if ok else 0:>10.1f} "
+              f"{percentile(rejected, 0.99) if rejected else 0:>16.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--login-rate", type=float, default=30)
+    parser.add_argument("--address-rate", type=float, default=200)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-queue", type=int, default=None)
+    args = parser.parse_args()
+
+    password_hash = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(args.rounds)).decode()
+    start = time.perf_counter()
+    bcrypt.checkpw(PASSWORD.encode(), password_hash.encode())
+    verify_ms = (time.perf_counter() - start) * 1000
+    db = UserDB(password_hash, sample_addresses(countries=5, provinces=20, districts=10))
+    print(f"bcrypt cost {args.rounds}: {verify_ms:.0f} ms per verify, {os.cpu_count()} CPU(s) -> "
+          f"~{(os.cpu_count() or 1) * 1000 / verify_ms:.0f} logins/s capacity; offered {args.login_rate:.0f}/s "
+          f"logins + {args.address_rate:.0f}/s lookups on {args.threads} threads")
+
+    run("inline bcrypt", None, db, args)
+
+    hasher = ProcessPoolHasher(workers=args.workers, max_queue=args.max_queue, rounds=args.rounds, registry=None)
+    hasher.start()
+    try:
+        run(f"process pool: {hasher.workers} workers, queue {hasher.max_queue}", hasher, db, args)
+    finally:
+        hasher.close()
+
+
+if __name__ == "__main__":
+    main()
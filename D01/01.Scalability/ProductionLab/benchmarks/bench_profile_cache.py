@@ -0,0 +1,128 @@
+"""
+Profile cache load test - DB queries per second for profile-heavy traffic
+
+--threads request threads send --requests calls, mostly GET /profile
+(AuthService.get_profile) for users picked with a Zipf-like skew, plus
+--write-ratio profile updates and --missing-ratio reads of ids that do
+not exist:
+
+    no cache     profile_cache_ttl=0: two queries per read
+    cached       read-through MemoryAdapter cache, write-through updates,
+                 "not found" cached for PROFILE_MISSING_TTL
+
+Every query goes through the round-trip counter of bench_auth_queries,
+which adds --rtt-ms of simulated network per query. Reported: DB
+queries (total, per request, per second), requests/s, p50/p99 latency
+and the cache hit ratio. DB q/s is at each run's own request rate, so
+compare queries per request. Afterwards every cached profile is compared
+with the database (stale entries).
+
+Usage:
+    python3 -m benchmarks.bench_profile_cache [--users 2000] [--requests 20000]
+        [--threads 8] [--write-ratio 0.01] [--missing-ratio 0.02] [--rtt-ms 0.5]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.services.auth_service import (
+    AuthService, SQL_INSERT_USER, SQL_INSERT_PROFILE, profile_key
+)
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.database.sqlite_adapter import SQLiteAdapter
+from benchmarks.bench_auth_queries import RoundTripCounter, percentile
+
+
+def seed(db, users: int) -> list:
+    first = db.insert_many(SQL_INSERT_USER, [(f"user{i}", "x") for i in range(users)]).first_id
+    user_ids = list(range(first, first + users))
+    db.insert_many(SQL_INSERT_PROFILE, [(user_id, f"User {user_id}", f"u{user_id}@example.com",
+                                         1 + user_id % 9, None) for user_id in user_ids])
+    return user_ids
+
+
+def workload(user_ids, args):
+    """[(kind, user_id, fields)] with Zipf-like popularity (weight 1/rank)"""
+    rng = random.Random(11)
+    weights = [1 / rank for rank in range(1, len(user_ids) + 1)]
+    picks = rng.choices(user_ids, weights=weights, k=args.requests)
+    missing = max(user_ids) + 1
+    calls = []
+    for user_id in picks:
+        roll = rng.random()
+        if roll < args.write_ratio:
+            calls.append(("write", user_id, {"address_id": rng.randint(1, 9)}))
+        elif roll < args.write_ratio + args.missing_ratio:
+            calls.append(("read", missing + rng.randrange(1000), None))
+        else:
+            calls.append(("read", user_id, None))
+    return calls
+
+
+def run(label: str, db, cache, user_ids, calls, args) -> int:
+    counter = RoundTripCounter(db, args.rtt_ms / 1000)
+    service = AuthService(counter, cache, profile_cache_ttl=300 if cache is not None else 0)
+
+    def one(call):
+        kind, user_id, fields = call
+        start = time.perf_counter()
+        if kind == "write":
+            service.update_profile(user_id, fields)
+        else:
+            service.get_profile(user_id)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        latencies = list(pool.map(one, calls))
+    elapsed = time.perf_counter() - start
+    queries = counter.checkouts
+
+    ms = [x * 1000 for x in latencies]
+    stats = service.get_profile_cache_stats()
+    stale = 0
+    if cache is not None:
+        for user_id in user_ids:
+            cached = cache.get(profile_key(user_id))
+            if cached is not None and json.loads(cached) != service._load_profile(user_id):
+                stale += 1
+    print(f"{label:<10} {queries:>8,} {queries / len(calls):>9.2f} {queries / elapsed:>8,.0f} "
+          f"{len(calls) / elapsed:>8,.0f} {statistics.median(ms):>7.2f} {percentile(ms, 0.99):>7.2f} "
+          f"{stats['hit_ratio'] if cache is not None else 0:>6.1%} {stale:>6}")
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--write-ratio", type=float, default=0.01)
+    parser.add_argument("--missing-ratio", type=float, default=0.02)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        init_sql = os.path.join(os.path.dirname(__file__), "..", "infrastructure", "database", "init.sql")
+        with open(init_sql) as f:
+            db = SQLiteAdapter(os.path.join(tmp, "bench.sqlite3"), f.read())
+        user_ids = seed(db, args.users)
+        calls = workload(user_ids, args)
+        print(f"{args.users} users, {args.requests} requests ({args.write_ratio:.0%} writes, "
+              f"{args.missing_ratio:.0%} unknown ids) on {args.threads} threads, "
+              f"+{args.rtt_ms} ms per query")
+        print(f"{'':<10} {'queries':>8} {'q/request':>9} {'DB q/s':>8} {'req/s':>8} {'p50 ms':>7} "
+              f"{'p99 ms':>7} {'hits':>6} {'stale':>6}")
+        uncached = run("no cache", db, None, user_ids, calls, args)
+        cached = run("cached", db, MemoryAdapter(), user_ids, calls, args)
+        print(f"DB queries for the same traffic: -{1 - cached / uncached:.0%}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Session codec benchmark - encode/decode cost and size per session
+
+Encodes and decodes --sessions app sessions and auth sessions with each
+codec, in chunks so a million sessions fit in memory, and reports ns per
+op and bytes per session (payload only, excluding Redis key/overhead).
+
+Usage:
+    python3 -m benchmarks.bench_session_codec [--sessions 1000000]
+"""
+import argparse
+import time
+
+from core.domain import SessionData
+from core.services.session_codec import SESSION_CODECS, msgpack, decode_session, decode_auth_session
+
+
+def sessions_chunk(start: int, size: int):
+    return [SessionData.create({"visits": (start + i) % 500 + 1}) for i in range(size)]
+
+
+def bench(codec, total: int, chunk: int):
+    timings = {"encode": 0.0, "decode": 0.0, "auth encode": 0.0, "auth decode": 0.0}
+    sizes = {"app": 0, "auth": 0}
+    for start in range(0, total, chunk):
+        batch = sessions_chunk(start, min(chunk, total - start))
+        users = [(start + i, f"user{start + i}") for i in range(len(batch))]
+
+        t0 = time.perf_counter()
+        encoded = [codec.encode_session(s) for s in batch]
+        t1 = time.perf_counter()
+        for data in encoded:
+            decode_session(data)
+        t2 = time.perf_counter()
+        auth = [codec.encode_auth(uid, name) for uid, name in users]
+        t3 = time.perf_counter()
+        for data in auth:
+            decode_auth_session(data)
+        t4 = time.perf_counter()
+
+        timings["encode"] += t1 - t0
+        timings["decode"] += t2 - t1
+        timings["auth encode"] += t3 - t2
+        timings["auth decode"] += t4 - t3
+        sizes["app"] += sum(len(x.encode()) for x in encoded)
+        sizes["auth"] += sum(len(x.encode()) for x in auth)
+    return {k: v / total * 1e9 for k, v in timings.items()}, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=50_000)
+    args = parser.parse_args()
+
+    names = [name for name in SESSION_CODECS if name != "msgpack" or msgpack is not None]
+    print(f"{args.sessions:,} sessions per codec")
+    print(f"{'codec':<9} {'enc ns':>8} {'dec ns':>8} {'bytes':>6} {'total MB':>9} | "
+          f"{'auth enc':>8} {'auth dec':>8} {'bytes':>6} {'total MB':>9}")
+    for name in names:
+        ns, sizes = bench(SESSION_CODECS[name](), args.sessions, args.chunk)
+        print(f"{name:<9} {ns['encode']:>8.0f} {ns['decode']:>8.0f} "
+              f"{sizes['app'] / args.sessions:>6.1f} {sizes['app'] / 1e6:>9.1f} | "
+              f"{ns['auth encode']:>8.0f} {ns['auth decode']:>8.0f} "
+              f"{sizes['auth'] / args.sessions:>6.1f} {sizes['auth'] / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Session round trips - blob sessions vs in-place hash counters
+
+Replays the same visit traffic through AppService with SESSION_STORE=blob
+(GET + SETEX of the whole session) and =hash (one HINCRBY script call)
+and reports cache round trips and bytes written per request. With
+REDIS_HOST set it also runs against Redis and reports the commands Redis
+actually executed (INFO commandstats), including how many EXPIREs the
+fractional TTL refresh skipped.
+
+Usage:
+    python3 -m benchmarks.bench_session_round_trips [--sessions 200] [--visits 20]
+    REDIS_HOST=localhost python3 -m benchmarks.bench_session_round_trips
+"""
+import argparse
+import os
+import time
+
+from core.services.app_service import AppService
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from benchmarks.stand_ins import LatencyCache, StubWeb
+
+
+class WriteCounter(LatencyCache):
+    """LatencyCache that also counts bytes sent by write calls"""
+
+    def __init__(self, inner, rtt):
+        super().__init__(inner, rtt)
+        self.bytes_written = 0
+
+    def set(self, key, value, ttl=None):
+        self.bytes_written += len(key) + len(value)
+        return super().set(key, value, ttl)
+
+    def hash_set(self, key, mapping, ttl=None):
+        self.bytes_written += len(key) + sum(len(f) + len(str(v)) for f, v in mapping.items())
+        return super().hash_set(key, mapping, ttl)
+
+    def hash_incr(self, key, field, amount=1, ttl=None, refresh_below=None):
+        self.bytes_written += len(key) + len(field) + len(str(amount))
+        return super().hash_incr(key, field, amount, ttl, refresh_below)
+
+
+def run(label: str, inner, hash_sessions: bool, args) -> None:
+    cache = WriteCounter(inner, rtt=args.rtt)
+    service = AppService(cache, hash_sessions=hash_sessions,
+                         ttl_refresh_fraction=args.refresh_fraction)
+    webs = [StubWeb() for _ in range(args.sessions)]
+    before = command_counts(inner)
+
+    start = time.perf_counter()
+    requests = 0
+    for _ in range(args.visits):
+        for web in webs:
+            service.handle_request(web)
+            requests += 1
+    elapsed = time.perf_counter() - start
+
+    line = (f"{label:<26} {cache.round_trips / requests:>9.2f} "
+            f"{cache.bytes_written / requests:>8.0f} {elapsed / requests * 1000:>8.3f}")
+    after = command_counts(inner)
+    if after:
+        executed = {cmd: after.get(cmd, 0) - before.get(cmd, 0) for cmd in after}
+        executed = {cmd: n for cmd, n in executed.items() if n and cmd not in ("info", "script", "ping")}
+        line += "  " + ", ".join(f"{cmd}={n / requests:.2f}" for cmd, n in sorted(executed.items()))
+    print(line)
+
+
+def command_counts(cache):
+    client = getattr(cache, "client", None)
+    if client is None:
+        return {}
+    try:
+        stats = client.info("commandstats")
+    except Exception:
+        return {}
+    return {name[len("cmdstat_"):]: value["calls"] for name, value in stats.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--visits", type=int, default=20, help="requests per session")
+    parser.add_argument("--rtt", type=float, default=0.0002, help="stand-in round trip seconds")
+    parser.add_argument("--refresh-fraction", type=float, default=0.5)
+    args = parser.parse_args()
+
+    print(f"{args.sessions} sessions x {args.visits} visits")
+    print(f"{'store':<26} {'trips/req':>9} {'B/req':>8} {'ms/req':>8}  redis commands/req")
+    for hash_sessions in (False, True):
+        run(f"{'hash' if hash_sessions else 'blob'} (memory + {args.rtt * 1000:.1f}ms)",
+            MemoryAdapter(), hash_sessions, args)
+
+    redis_host = os.getenv("REDIS_HOST")
+    if redis_host:
+        from infrastructure.cache.redis_adapter import RedisAdapter
+        redis_cache = RedisAdapter(host=redis_host)
+        if not redis_cache.ping():
+            print(f"Redis at {redis_host} unreachable, skipped")
+            return
+        for hash_sessions in (False, True):
+            run(f"{'hash' if hash_sessions else 'blob'} (redis)", redis_cache, hash_sessions,
+                argparse.Namespace(**{**vars(args), "rtt": 0.0}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Session token benchmark - auth check latency and cache calls, cache vs token sessions
+
+--users users log in, then login_required runs --checks times on their
+cookies (uniformly picked), with --revoked-ratio of the users logged out:
+
+    cache    session id; one cache GET of auth_session:<id> per check
+    token    signed token verified in process; the revocation Bloom filter
+             sends only logged-out tokens (and false positives) to the cache
+
+Each check runs the real decorator in a Flask request context. Cache calls
+go through a counter that adds --rtt-ms of simulated network per call
+(MemoryAdapter), or hit a real Redis when REDIS_HOST is set (--rtt-ms not
+added). Token mode also pays for the revocation sync in the background:
+two HGETALLs per TOKEN_REVOCATION_SYNC_INTERVAL per worker, whatever the
+traffic, reported as "sync calls/s".
+
+Usage:
+    python3 -m benchmarks.bench_session_tokens [--users 1000] [--checks 20000]
+        [--revoked-ratio 0.05] [--rtt-ms 0.3] [--sync-interval 1.0]
+    REDIS_HOST=localhost python3 -m benchmarks.bench_session_tokens
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+import uuid
+
+from flask import Flask
+
+from core.interfaces.cache_port import CachePort
+from core.services.auth_service import session_key, session_payload
+from core.services.session_codec import JsonSessionCodec
+from core.services.session_token import SessionTokenSigner
+from core.services.token_revocation import TokenRevocationList
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.web.flask_adapter import FlaskAdapter
+from infrastructure.web.middleware import init_auth_middleware, login_required
+from benchmarks.bench_auth_queries import percentile
+
+SECRET = os.urandom(32)
+
+
+class CallCounter(CachePort):
+    """Counts cache calls; sleeps rtt seconds per call"""
+
+    def __init__(self, inner: CachePort, rtt: float = 0.0):
+        self.inner = inner
+        self.rtt = rtt
+        self.calls = 0
+
+    def call(self, method: str, *args, **kwargs):
+        self.calls += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+        return getattr(self.inner, method)(*args, **kwargs)
+
+    def get(self, key):
+        return self.call("get", key)
+
+    def set(self, key, value, ttl=None):
+        return self.call("set", key, value, ttl)
+
+    def delete(self, key):
+        return self.call("delete", key)
+
+    def exists(self, key):
+        return self.call("exists", key)
+
+    def ping(self):
+        return self.inner.ping()
+
+    def hash_get_all(self, key):
+        return self.call("hash_get_all", key)
+
+    def hash_set(self, key, mapping, ttl=None):
+        return self.call("hash_set", key, mapping, ttl=ttl)
+
+
+def cache_sessions(cache, users: int):
+    """Cookie per user, stored the way AuthService.login stores it"""
+    codec = JsonSessionCodec()
+    cookies = []
+    for user_id in range(1, users + 1):
+        session_id = f"bench-{uuid.uuid4()}"
+        cache.set(session_key(session_id), session_payload({"id": user_id, "username": f"user{user_id}"}, codec),
+                  ttl=600)
+        cookies.append(session_id)
+    return cookies
+
+
+def token_sessions(tokens, revocations, users: int, revoked: int):
+    cookies = [tokens.issue(user_id, f"user{user_id}") for user_id in range(1, users + 1)]
+    for cookie in cookies[:revoked]:
+        revocations.revoke_token(tokens.verify(cookie))
+    return cookies
+
+
+def measure(app, counter: CallCounter, cookies, checks: int):
+    """(latencies, status counts, cache calls) of `checks` login_required calls"""
+    protected = login_required(lambda: "ok")
+    rng = random.Random(5)
+    picks = [rng.choice(cookies) for _ in range(checks)]
+    calls, latencies, statuses = counter.calls, [], {}
+    for cookie in picks:
+        with app.test_request_context(headers={"Cookie": f"session_id={cookie}"}):
+            start = time.perf_counter()
+            result = protected()
+            latencies.append(time.perf_counter() - start)
+        status = 200 if result == "ok" else result.status_code
+        statuses[status] = statuses.get(status, 0) + 1
+    return latencies, statuses, counter.calls - calls
+
+
+def report(label: str, latencies, statuses, calls: int, sync_qps: float) -> None:
+    us = [x * 1e6 for x in latencies]
+    elapsed = sum(latencies)
+    print(f"{label:<8} {statistics.median(us):>8.1f} {percentile(us, 0.99):>8.1f} "
+          f"{len(latencies) / elapsed:>10,.0f} {calls / len(latencies):>12.3f} "
+          f"{calls / elapsed:>10,.0f} {sync_qps:>12.1f} {statuses.get(200, 0):>6} {statuses.get(401, 0):>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--checks", type=int, default=20000)
+    parser.add_argument("--revoked-ratio", type=float, default=0.05)
+    parser.add_argument("--rtt-ms", type=float, default=0.3)
+    parser.add_argument("--sync-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    redis_host = os.getenv("REDIS_HOST")
+    if redis_host:
+        from infrastructure.cache.redis_adapter import RedisAdapter
+        inner, rtt, backend = RedisAdapter(host=redis_host), 0.0, f"Redis @ {redis_host}"
+    else:
+        inner, rtt, backend = MemoryAdapter(), args.rtt_ms / 1000, f"MemoryAdapter +{args.rtt_ms} ms per call"
+    revoked = int(args.users * args.revoked_ratio)
+    print(f"{args.users} users ({revoked} logged out in token mode), {args.checks} auth checks, {backend}")
+    print(f"{'mode':<8} {'p50 us':>8} {'p99 us':>8} {'checks/s':>10} {'calls/check':>12} "
+          f"{'cache q/s':>10} {'sync calls/s':>12} {'200':>6} {'401':>6}")
+
+    app = Flask(__name__)
+    web_adapter = FlaskAdapter()
+
+    counter = CallCounter(inner, rtt)
+    cookies = cache_sessions(counter, args.users)
+    init_auth_middleware(counter, web_adapter)
+    report("cache", *measure(app, counter, cookies, args.checks), 0.0)
+
+    counter = CallCounter(inner, rtt)
+    tokens = SessionTokenSigner(SECRET)
+    revocations = TokenRevocationList(counter, ttl=tokens.ttl)
+    revocations.sync(full=True)
+    cookies = token_sessions(tokens, revocations, args.users, revoked)
+    before = counter.calls
+    revocations.sync()  # one incremental background sync
+    sync_qps = (counter.calls - before) / args.sync_interval
+    init_auth_middleware(counter, web_adapter, tokens, revocations)
+    report("token", *measure(app, counter, cookies, args.checks), sync_qps)
+    stats = revocations.stats()
+    print(f"revocation filter: {stats['filter_entries']} entries, {stats['filter_bits'] // 8 // 1024} KiB, "
+          f"{stats['filter_hits']} hits -> {stats['revoked']} revoked, {stats['false_positives']} false positives")
+
+
+if __name__ == "__main__":
+    main()
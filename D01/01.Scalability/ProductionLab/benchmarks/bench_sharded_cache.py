@@ -0,0 +1,125 @@
+"""
+Sharded cache benchmark - consistent-hash ring distribution and throughput
+
+1. Skew: how evenly --keys keys spread over --nodes nodes for several
+   virtual-node counts (max/mean load and stddev; 1.00 is perfectly even).
+2. Movement: fraction of keys that change node when one node is added or
+   removed, against the ideal 1/(N+1) (and ~100% for hash(key) % N).
+3. Throughput: --threads threads doing mixed get/set through
+   ShardedCacheAdapter over in-memory stand-in nodes with --rtt simulated
+   round trip, or over real Redis nodes when REDIS_NODES is set.
+
+Usage:
+    python3 -m benchmarks.bench_sharded_cache [--nodes 4] [--keys 100000]
+    REDIS_NODES=localhost:6379,localhost:6380 python3 -m benchmarks.bench_sharded_cache
+"""
+import argparse
+import hashlib
+import os
+import random
+import statistics
+import threading
+import time
+
+from infrastructure.cache.hash_ring import HashRing
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.cache.sharded_cache_adapter import ShardedCacheAdapter
+from benchmarks.stand_ins import LatencyCache
+
+
+def skew_report(nodes, keys, vnode_counts) -> None:
+    print(f"Distribution of {len(keys):,} keys over {len(nodes)} nodes")
+    print(f"{'vnodes':>7} {'max/mean':>9} {'min/mean':>9} {'stddev %':>9}")
+    for vnodes in vnode_counts:
+        ring = HashRing(nodes, vnodes=vnodes)
+        counts = {node: 0 for node in nodes}
+        for key in keys:
+            counts[ring.get_node(key)] += 1
+        mean = len(keys) / len(nodes)
+        loads = list(counts.values())
+        print(f"{vnodes:>7} {max(loads) / mean:>9.2f} {min(loads) / mean:>9.2f} "
+              f"{statistics.pstdev(loads) / mean * 100:>9.1f}")
+
+
+def movement_report(nodes, keys, vnodes) -> None:
+    ring = HashRing(nodes, vnodes=vnodes)
+    before = [ring.get_node(key) for key in keys]
+    ring.add_node("node-new")
+    added = sum(a != ring.get_node(key) for a, key in zip(before, keys)) / len(keys)
+    ring.remove_node("node-new")
+    ring.remove_node(nodes[0])
+    removed = sum(a != ring.get_node(key) for a, key in zip(before, keys)) / len(keys)
+
+    def modulo(key, n):
+        return int(hashlib.md5(key.encode()).hexdigest(), 16) % n
+    naive = sum(modulo(key, len(nodes)) != modulo(key, len(nodes) + 1) for key in keys) / len(keys)
+
+    print(f"\nKeys moved ({vnodes} vnodes)")
+    print(f"  add 1 node:    {added:6.1%}  (ideal {1 / (len(nodes) + 1):.1%})")
+    print(f"  remove 1 node: {removed:6.1%}  (ideal {1 / len(nodes):.1%})")
+    print(f"  hash % N, add: {naive:6.1%}")
+
+
+def throughput(label, cache, keys, threads, ops, read_ratio) -> None:
+    value = '{"user_id": 1, "username": "bench"}'
+    cache.set_many({key: value for key in keys}, ttl=3600)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(ops):
+            key = keys[rng.randrange(len(keys))]
+            if rng.random() < read_ratio:
+                cache.get(key)
+            else:
+                cache.set(key, value, ttl=3600)
+
+    pool = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    wall = time.perf_counter() - start
+    print(f"{label:<28} {threads * ops / wall:>12,.0f} ops/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=4)
+    parser.add_argument("--keys", type=int, default=100000)
+    parser.add_argument("--vnodes", type=int, nargs="+", default=[1, 10, 40, 160, 500])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=5000, help="operations per thread")
+    parser.add_argument("--read-ratio", type=float, default=0.9)
+    parser.add_argument("--rtt", type=float, default=0.0002, help="simulated round trip (s)")
+    args = parser.parse_args()
+
+    nodes = [f"node-{i}" for i in range(args.nodes)]
+    keys = [f"session:{i}" for i in range(args.keys)]
+    skew_report(nodes, keys, args.vnodes)
+    movement_report(nodes, keys, 160)
+
+    print(f"\nThroughput: {args.threads} threads x {args.ops:,} ops, {args.read_ratio:.0%} reads, "
+          f"{os.cpu_count()} CPU(s)")
+    hot = keys[:10000]
+    redis_nodes = [n.strip() for n in os.getenv("REDIS_NODES", "").split(",") if n.strip()]
+    if redis_nodes:
+        from infrastructure.cache.redis_adapter import RedisAdapter
+        backends = {}
+        for node in redis_nodes:
+            host, _, port = node.rpartition(":")
+            backends[node] = RedisAdapter(host=host, port=int(port), pooled=True,
+                                          max_connections=args.threads, raise_on_error=True)
+        throughput(f"redis x{len(backends)} (ring)", ShardedCacheAdapter(backends), hot,
+                   args.threads, args.ops, args.read_ratio)
+        throughput("redis x1", backends[redis_nodes[0]], hot, args.threads, args.ops, args.read_ratio)
+    else:
+        print(f"(in-memory stand-in nodes, {args.rtt * 1e6:.0f}us simulated round trip)")
+        throughput("single node", LatencyCache(MemoryAdapter(), args.rtt), hot,
+                   args.threads, args.ops, args.read_ratio)
+        ring = ShardedCacheAdapter({name: LatencyCache(MemoryAdapter(), args.rtt) for name in nodes})
+        throughput(f"ring of {len(nodes)} nodes", ring, hot, args.threads, args.ops, args.read_ratio)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Cross-process cache benchmark - shared-memory table vs Redis on a Unix socket
+
+Starts --workers processes (like gunicorn workers) that each run a mixed
+get/set workload (--read-ratio reads) against one cache shared by all of
+them, and reports aggregate ops/s and per-op latency. Every backend must
+show the same data to every worker, so a private MemoryAdapter is not a
+candidate here.
+
+Usage:
+    python3 -m benchmarks.bench_shared_cache [--workers 1 2 4] [--ops 20000]
+    REDIS_SOCKET=/var/run/redis/redis.sock python3 -m benchmarks.bench_shared_cache
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from infrastructure.cache.shared_memory_adapter import SharedMemoryAdapter
+
+SHM_GEOMETRY = dict(capacity=65536, slot_size=256, stripes=256)
+
+
+def open_cache(backend: str, target: str):
+    if backend == "shared-memory":
+        return SharedMemoryAdapter(target, **SHM_GEOMETRY)
+    from infrastructure.cache.redis_adapter import RedisAdapter
+    return RedisAdapter(unix_socket_path=target, max_connections=4)
+
+
+def worker(backend: str, target: str, ops: int, keys: int, read_ratio: float, seed: int, out) -> None:
+    cache = open_cache(backend, target)
+    rng = random.Random(seed)
+    value = '{"user_id": 1, "username": "bench"}'
+    start = time.perf_counter()
+    for _ in range(ops):
+        key = f"auth_session:{rng.randrange(keys)}"
+        if rng.random() < read_ratio:
+            cache.get(key)
+        else:
+            cache.set(key, value, ttl=3600)
+    out.put(time.perf_counter() - start)
+
+
+def run(backend: str, target: str, workers: int, args) -> None:
+    # Pre-fill so reads mostly hit
+    cache = open_cache(backend, target)
+    for i in range(args.keys):
+        cache.set(f"auth_session:{i}", '{"user_id": 1, "username": "bench"}', ttl=3600)
+
+    out = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=worker, args=(backend, target, args.ops, args.keys,
+                                                          args.read_ratio, seed, out))
+             for seed in range(workers)]
+    start = time.perf_counter()
+    for p in procs:
+        p.start()
+    elapsed_per_worker = [out.get() for _ in procs]
+    for p in procs:
+        p.join()
+    wall = time.perf_counter() - start
+
+    total_ops = args.ops * workers
+    mean_us = sum(elapsed_per_worker) / total_ops * 1e6
+    print(f"{backend:<14} {workers:>7} {total_ops / wall:>12,.0f} {mean_us:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--ops", type=int, default=20000, help="operations per worker")
+    parser.add_argument("--keys", type=int, default=10000)
+    parser.add_argument("--read-ratio", type=float, default=0.9)
+    args = parser.parse_args()
+
+    backends = []
+    tmp = tempfile.TemporaryDirectory(dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+    backends.append(("shared-memory", os.path.join(tmp.name, "bench.shm")))
+
+    redis_socket = os.getenv("REDIS_SOCKET")
+    if redis_socket:
+        if open_cache("redis-unix", redis_socket).ping():
+            backends.append(("redis-unix", redis_socket))
+        else:
+            print(f"Redis at {redis_socket} unreachable, skipped")
+
+    print(f"{args.ops:,} ops per worker, {args.read_ratio:.0%} reads, {args.keys:,} keys, "
+          f"{os.cpu_count()} CPU(s)")
+    print(f"{'backend':<14} {'workers':>7} {'ops/s':>12} {'us/op':>10}")
+    for backend, target in backends:
+        for workers in args.workers:
+            run(backend, target, workers, args)
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
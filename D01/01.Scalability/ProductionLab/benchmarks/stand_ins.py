@@ -0,0 +1,351 @@
+"""
+Stand-ins - Latency-injecting wrappers so benchmarks can run without
+Redis/MySQL while still paying a realistic cost per network round trip.
+"""
+import asyncio
+import sqlite3
+import time
+from contextlib import contextmanager, asynccontextmanager
+from typing import Optional, Dict, Iterable, Any, List, Sequence
+from core.interfaces.cache_port import CachePort
+from core.interfaces.database_port import DatabasePort, BulkResult
+from core.interfaces.web_port import WebPort
+from core.interfaces.async_cache_port import AsyncCachePort
+from core.interfaces.async_database_port import AsyncDatabasePort
+
+
+class LatencyCache(CachePort):
+    """
+    Wraps any CachePort and sleeps `rtt` seconds per call, i.e. per network
+    round trip. Batch calls sleep once, like MGET or a pipeline would.
+    """
+
+    def __init__(self, inner: CachePort, rtt: float = 0.0002):
+        self.inner = inner
+        self.rtt = rtt
+        self.round_trips = 0
+
+    def _trip(self) -> None:
+        self.round_trips += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def get(self, key: str) -> Optional[str]:
+        self._trip()
+        return self.inner.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        self._trip()
+        return self.inner.set(key, value, ttl)
+
+    def delete(self, key: str) -> bool:
+        self._trip()
+        return self.inner.delete(key)
+
+    def exists(self, key: str) -> bool:
+        self._trip()
+        return self.inner.exists(key)
+
+    def ping(self) -> bool:
+        self._trip()
+        return self.inner.ping()
+
+    def flush(self) -> bool:
+        self._trip()
+        return self.inner.flush()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        self._trip()
+        return self.inner.get_many(keys)
+
+    def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        self._trip()
+        return self.inner.set_many(mapping, ttl)
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        self._trip()
+        return self.inner.delete_many(keys)
+
+    def hash_get_all(self, key: str) -> Dict[str, str]:
+        self._trip()
+        return self.inner.hash_get_all(key)
+
+    def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                 prune_below: Optional[float] = None) -> bool:
+        self._trip()
+        return self.inner.hash_set(key, mapping, ttl, prune_below)
+
+    def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        self._trip()
+        return self.inner.hash_delete(key, fields)
+
+    def set_with_hash(self, key: str, value: str, hash_key: str, mapping: Dict[str, Any],
+                      ttl: Optional[int] = None, prune_below: Optional[float] = None) -> bool:
+        self._trip()  # one script call on Redis
+        return self.inner.set_with_hash(key, value, hash_key, mapping, ttl, prune_below)
+
+    def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                  refresh_below: Optional[float] = None) -> Optional[int]:
+        self._trip()
+        return self.inner.hash_incr(key, field, amount, ttl, refresh_below)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.inner.stats(), "round_trips": self.round_trips}
+
+
+class AsyncLatencyCache(AsyncCachePort):
+    """LatencyCache for the async path: awaits `rtt` instead of sleeping"""
+
+    def __init__(self, inner: CachePort, rtt: float = 0.0002):
+        self.inner = inner
+        self.rtt = rtt
+        self.round_trips = 0
+
+    async def _trip(self) -> None:
+        self.round_trips += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+    async def get(self, key: str) -> Optional[str]:
+        await self._trip()
+        return self.inner.get(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        await self._trip()
+        return self.inner.set(key, value, ttl)
+
+    async def delete(self, key: str) -> bool:
+        await self._trip()
+        return self.inner.delete(key)
+
+    async def exists(self, key: str) -> bool:
+        await self._trip()
+        return self.inner.exists(key)
+
+    async def ping(self) -> bool:
+        await self._trip()
+        return self.inner.ping()
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        await self._trip()
+        return self.inner.get_many(keys)
+
+    async def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        await self._trip()
+        return self.inner.set_many(mapping, ttl)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        await self._trip()
+        return self.inner.delete_many(keys)
+
+
+def sample_addresses(countries: int = 3, provinces: int = 5, districts: int = 10) -> List[Dict[str, Any]]:
+    """Synthetic master_address rows"""
+    rows = []
+    for c in range(countries):
+        for p in range(provinces):
+            for d in range(districts):
+                rows.append({"id": len(rows) + 1, "country": f"Country {c}",
+                             "province": f"Province {c}-{p}", "district": f"District {c}-{p}-{d}"})
+    return rows
+
+
+class AddressTable:
+    """Answers the AddressService queries from in-memory rows"""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.by_id = {row["id"]: row for row in rows}
+        self.queries = 0
+
+    def fetch_all(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        self.queries += 1
+        params = params or ()
+        if "DISTINCT country" in query:
+            return [{"country": c} for c in sorted({r["country"] for r in self.rows})]
+        if "DISTINCT province" in query:
+            return [{"province": p} for p in sorted({r["province"] for r in self.rows
+                                                     if r["country"] == params[0]})]
+        if "district" in query:
+            return sorted(({"id": r["id"], "district": r["district"]} for r in self.rows
+                           if r["country"] == params[0] and r["province"] == params[1]),
+                          key=lambda r: r["district"])
+        raise ValueError(f"unsupported query: {query}")
+
+    def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        self.queries += 1
+        return self.by_id.get(params[0]) if params else None
+
+
+class LatencyDatabase(DatabasePort):
+    """
+    Read-only DatabasePort over an AddressTable that sleeps `rtt` seconds
+    per query, standing in for a MySQL round trip.
+    """
+
+    def __init__(self, table: AddressTable, rtt: float = 0.001):
+        self.table = table
+        self.rtt = rtt
+
+    def _trip(self) -> None:
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        self._trip()
+
+    def fetch_one(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> Optional[Dict[str, Any]]:
+        self._trip()
+        return self.table.fetch_one(query, params)
+
+    def fetch_all(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> List[Dict[str, Any]]:
+        self._trip()
+        return self.table.fetch_all(query, params)
+
+    def insert(self, query: str, params: tuple = None) -> int:
+        self._trip()
+        return 0
+
+    @contextmanager
+    def transaction(self):
+        yield self
+
+    def ping(self) -> bool:
+        return True
+
+
+class SQLiteLatencyDatabase(DatabasePort):
+    """
+    Writable DatabasePort over an in-memory SQLite master_address table that
+    sleeps `rtt` seconds per statement (and per commit, like autocommit
+    MySQL). insert_many sends one multi-row INSERT per chunk.
+    """
+
+    def __init__(self, rtt: float = 0.0002):
+        self.rtt = rtt
+        self.statements = 0
+        self.conn = sqlite3.connect(":memory:", isolation_level=None, check_same_thread=False)
+        self.conn.execute("""CREATE TABLE master_address (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            country TEXT NOT NULL, province TEXT NOT NULL, district TEXT NOT NULL)""")
+
+    def _trip(self) -> None:
+        self.statements += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    def _run(self, query: str, params: Sequence = ()) -> sqlite3.Cursor:
+        self._trip()
+        return self.conn.execute(query.replace("%s", "?"), tuple(params))
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        self._run(query, params or ())
+
+    def fetch_one(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> Optional[Dict[str, Any]]:
+        cursor = self._run(query, params or ())
+        row = cursor.fetchone()
+        return dict(zip([c[0] for c in cursor.description], row)) if row else None
+
+    def fetch_all(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> List[Dict[str, Any]]:
+        cursor = self._run(query, params or ())
+        names = [c[0] for c in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def fetch_iter(self, query: str, params: tuple = None, batch_size: int = 1000,
+                   as_tuples: bool = False, read_only: bool = False):
+        cursor = self._run(query, params or ())
+        names = [c[0] for c in cursor.description]
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row if as_tuples else dict(zip(names, row))
+
+    def insert(self, query: str, params: tuple = None) -> int:
+        return self._run(query, params or ()).lastrowid
+
+    def insert_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000,
+                    transaction_per_chunk: bool = False) -> BulkResult:
+        from infrastructure.database.bulk import chunked, flatten, multi_row_query
+        result = BulkResult()
+        self._run("BEGIN")
+        for chunk in chunked(rows, chunk_size):
+            cursor = self._run(multi_row_query(query, len(chunk)), flatten(chunk))
+            result.rowcount += cursor.rowcount
+            result.chunks += 1
+            if result.first_id is None:
+                # SQLite reports the last id of a multi-row INSERT
+                result.first_id = cursor.lastrowid - len(chunk) + 1
+        self._run("COMMIT")
+        return result
+
+    @contextmanager
+    def transaction(self):
+        self._run("BEGIN")
+        try:
+            yield self
+            self._run("COMMIT")
+        except Exception:
+            self._run("ROLLBACK")
+            raise
+
+    def ping(self) -> bool:
+        return True
+
+
+class AsyncLatencyDatabase(AsyncDatabasePort):
+    """LatencyDatabase for the async path: awaits `rtt` per query"""
+
+    def __init__(self, table: AddressTable, rtt: float = 0.001):
+        self.table = table
+        self.rtt = rtt
+
+    async def _trip(self) -> None:
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+    async def execute(self, query: str, params: tuple = None) -> None:
+        await self._trip()
+
+    async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        await self._trip()
+        return self.table.fetch_one(query, params)
+
+    async def fetch_all(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        await self._trip()
+        return self.table.fetch_all(query, params)
+
+    async def insert(self, query: str, params: tuple = None) -> int:
+        await self._trip()
+        return 0
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield self
+
+    async def ping(self) -> bool:
+        return True
+
+
+class StubWeb(WebPort):
+    """WebPort carrying just a session id, for driving services directly"""
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id
+
+    def get_request_data(self) -> Dict[str, Any]:
+        return {}
+
+    def get_session_id(self) -> Optional[str]:
+        return self.session_id
+
+    def set_session_id(self, session_id: str) -> None:
+        self.session_id = session_id
+
+    def create_response(self, data: Dict[str, Any], status_code: int = 200) -> Any:
+        return data, status_code
@@ -0,0 +1,99 @@
+"""
+Async Cache Port - asyncio interface for cache operations
+Mirrors CachePort for the async serving path.
+"""
+import json
+from abc import ABC, abstractmethod
+from typing import Optional, Any, Dict, Iterable
+from .cache_port import prune_fields
+
+class AsyncCachePort(ABC):
+    
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Get value by key"""
+        pass
+    
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        """Set key-value with optional TTL"""
+        pass
+    
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Delete key"""
+        pass
+    
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Check if key exists"""
+        pass
+    
+    @abstractmethod
+    async def ping(self) -> bool:
+        """Health check"""
+        pass
+    
+    # --- Batch operations (default: one call per key) ---
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Get several keys, missing keys map to None"""
+        return {key: await self.get(key) for key in keys}
+    
+    async def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        """Set several key-values with the same optional TTL"""
+        results = [await self.set(key, value, ttl) for key, value in mapping.items()]
+        return all(results)
+    
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys, return how many existed"""
+        deleted = 0
+        for key in keys:
+            if await self.delete(key):
+                deleted += 1
+        return deleted
+    
+    # --- Hash operations (default: a JSON blob, not atomic; see CachePort) ---
+    
+    async def hash_get_all(self, key: str) -> Dict[str, str]:
+        """All fields of a hash, {} if missing"""
+        data = await self.get(key)
+        return json.loads(data) if data else {}
+    
+    async def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                       prune_below: Optional[float] = None) -> bool:
+        """Set several fields of a hash, dropping those below prune_below (see CachePort.hash_set)"""
+        fields = await self.hash_get_all(key)
+        fields.update({field: str(value) for field, value in mapping.items()})
+        prune_fields(fields, prune_below)
+        return await self.set(key, json.dumps(fields), ttl)
+    
+    async def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        """Remove fields of a hash, return how many existed"""
+        current = await self.hash_get_all(key)
+        removed = [field for field in set(fields) if current.pop(field, None) is not None]
+        if removed:
+            if current:
+                await self.set(key, json.dumps(current))
+            else:
+                await self.delete(key)
+        return len(removed)
+    
+    async def set_with_hash(self, key: str, value: str, hash_key: str, mapping: Dict[str, Any],
+                            ttl: Optional[int] = None, prune_below: Optional[float] = None) -> bool:
+        """A set and a hash_set together (see CachePort.set_with_hash)"""
+        stored = await self.set(key, value, ttl)
+        return await self.hash_set(hash_key, mapping, ttl, prune_below) and stored
+    
+    async def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                        refresh_below: Optional[float] = None) -> Optional[int]:
+        """Increment an integer field and return the new value (see CachePort.hash_incr)"""
+        fields = await self.hash_get_all(key)
+        value = int(fields.get(field, 0)) + amount
+        fields[field] = str(value)
+        await self.set(key, json.dumps(fields), ttl)
+        return value
+    
+    def stats(self) -> Dict[str, Any]:
+        """Adapter statistics (optional, empty if not supported)"""
+        return {}
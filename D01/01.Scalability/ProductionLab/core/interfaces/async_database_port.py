@@ -0,0 +1,64 @@
+"""
+Async Database Port - asyncio interface for database operations
+Mirrors DatabasePort for the async serving path.
+"""
+from abc import ABC, abstractmethod
+from typing import Optional, List, Dict, Any, AsyncContextManager
+
+
+class AsyncTransaction(ABC):
+    """Operations available inside AsyncDatabasePort.transaction()"""
+    
+    @abstractmethod
+    async def execute(self, query: str, params: tuple = None) -> None:
+        pass
+    
+    @abstractmethod
+    async def insert(self, query: str, params: tuple = None) -> int:
+        pass
+    
+    @abstractmethod
+    async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        pass
+
+
+class AsyncDatabasePort(ABC):
+    
+    @abstractmethod
+    async def execute(self, query: str, params: tuple = None) -> None:
+        """Execute a query without returning results"""
+        pass
+    
+    @abstractmethod
+    async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        """Fetch a single row"""
+        pass
+    
+    @abstractmethod
+    async def fetch_all(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        """Fetch all rows"""
+        pass
+    
+    @abstractmethod
+    async def insert(self, query: str, params: tuple = None) -> int:
+        """Insert and return last insert id"""
+        pass
+    
+    @abstractmethod
+    def transaction(self) -> AsyncContextManager[AsyncTransaction]:
+        """
+        Async context manager for a transaction.
+        Usage:
+            async with db.transaction() as tx:
+                await tx.insert(...)
+        """
+        pass
+    
+    @abstractmethod
+    async def ping(self) -> bool:
+        """Health check"""
+        pass
+    
+    async def close(self) -> None:
+        """Release pooled connections (optional)"""
+        pass
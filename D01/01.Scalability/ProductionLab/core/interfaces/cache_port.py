@@ -1,8 +1,26 @@
 """
 Cache Port - Interface for cache operations
 """
+import json
 from abc import ABC, abstractmethod
-from typing import Optional, Any
+from typing import Optional, Any, Dict, Iterable, List
+
+
+def prune_fields(fields: Dict[str, str], below: Optional[float]) -> List[str]:
+    """Remove (and return) the fields whose value is a number below `below`"""
+    if below is None:
+        return []
+    stale = []
+    for field, value in fields.items():
+        try:
+            if float(value) < below:
+                stale.append(field)
+        except ValueError:
+            pass
+    for field in stale:
+        del fields[field]
+    return stale
+
 
 class CachePort(ABC):
     
@@ -30,3 +48,89 @@ class CachePort(ABC):
     def ping(self) -> bool:
         """Health check"""
         pass
+    
+    # --- Batch operations ---
+    # Default implementations loop over single-key calls so every adapter
+    # works; network adapters override them to use one round trip.
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Get several keys, missing keys map to None"""
+        return {key: self.get(key) for key in keys}
+    
+    def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        """Set several key-values with the same optional TTL"""
+        results: List[bool] = [self.set(key, value, ttl) for key, value in mapping.items()]
+        return all(results)
+    
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """Delete several keys, return how many existed"""
+        return sum(1 for key in keys if self.delete(key))
+    
+    # --- Hash operations ---
+    # Field/value maps updated in place (Redis HSET/HINCRBY). The defaults
+    # emulate a hash with a JSON blob via get/set - correct for a single
+    # client but not atomic; adapters override them with atomic versions.
+    
+    def hash_get_all(self, key: str) -> Dict[str, str]:
+        """All fields of a hash, {} if missing"""
+        data = self.get(key)
+        return json.loads(data) if data else {}
+    
+    def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                 prune_below: Optional[float] = None) -> bool:
+        """
+        Set several fields of a hash; ttl (if given) is applied to the key.
+        Fields holding a number below prune_below (e.g. timestamps that
+        are too old) are removed in the same operation.
+        """
+        fields = self.hash_get_all(key)
+        fields.update({field: str(value) for field, value in mapping.items()})
+        prune_fields(fields, prune_below)
+        return self.set(key, json.dumps(fields), ttl)
+    
+    def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        """Remove fields of a hash (the key goes with its last field), return how many existed"""
+        current = self.hash_get_all(key)
+        removed = [field for field in set(fields) if current.pop(field, None) is not None]
+        if removed:
+            if current:
+                self.set(key, json.dumps(current))
+            else:
+                self.delete(key)
+        return len(removed)
+    
+    def set_with_hash(self, key: str, value: str, hash_key: str, mapping: Dict[str, Any],
+                      ttl: Optional[int] = None, prune_below: Optional[float] = None) -> bool:
+        """
+        set(key, value, ttl) and hash_set(hash_key, mapping, ttl, prune_below)
+        together, e.g. a record and its entry in an index. Network adapters
+        send both in one round trip; neither is rolled back if the other fails.
+        """
+        stored = self.set(key, value, ttl)
+        return self.hash_set(hash_key, mapping, ttl, prune_below) and stored
+    
+    def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                  refresh_below: Optional[float] = None) -> Optional[int]:
+        """
+        Increment an integer field (created at 0) and return the new value.
+        With ttl, the key's expiry is reset to ttl only when it has none or
+        at most refresh_below seconds remain (None = always reset).
+        Returns None if the cache is unavailable.
+        """
+        fields = self.hash_get_all(key)
+        value = int(fields.get(field, 0)) + amount
+        fields[field] = str(value)
+        self.set(key, json.dumps(fields), ttl)
+        return value
+    
+    def raising(self) -> "CachePort":
+        """
+        This cache with backend errors raised instead of degraded to a miss,
+        for callers that must not mistake an outage for a missing key.
+        Adapters that never swallow errors return themselves.
+        """
+        return self
+    
+    def stats(self) -> Dict[str, Any]:
+        """Adapter statistics (optional, empty if not supported)"""
+        return {}
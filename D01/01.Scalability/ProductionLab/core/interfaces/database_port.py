@@ -2,7 +2,39 @@
 Database Port - Interface for database operations
 """
 from abc import ABC, abstractmethod
-from typing import Optional, List, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Iterator, Sequence
+
+
+@dataclass
+class BulkResult:
+    """Outcome of insert_many / execute_many"""
+    rowcount: int = 0                # affected rows
+    first_id: Optional[int] = None   # auto-increment id of the first inserted row
+    chunks: int = 0                  # statements (or chunk transactions) sent
+
+
+class BulkWriteError(Exception):
+    """A bulk write failed; `committed` describes what was already committed"""
+    
+    def __init__(self, message: str, committed: BulkResult):
+        super().__init__(message)
+        self.committed = committed
+
+
+class DuplicateKeyError(Exception):
+    """
+    A write hit a UNIQUE / PRIMARY KEY constraint. Adapters raise it from
+    execute/insert (and inside transactions), so callers can rely on the
+    constraint instead of checking for the row first.
+    """
+
+
+class PoolTimeout(Exception):
+    """
+    No connection became free within the pool timeout. Services let it
+    through to the web layer, which answers 503 with Retry-After.
+    """
 
 
 class DatabasePort(ABC):
@@ -13,15 +45,31 @@ class DatabasePort(ABC):
         pass
     
     @abstractmethod
-    def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
-        """Fetch a single row"""
+    def fetch_one(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a single row.
+        read_only=True: the caller accepts slightly stale data, so the read
+        may be served by a replica.
+        """
         pass
     
     @abstractmethod
-    def fetch_all(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
-        """Fetch all rows"""
+    def fetch_all(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> List[Dict[str, Any]]:
+        """Fetch all rows (read_only as for fetch_one)"""
         pass
     
+    def fetch_iter(self, query: str, params: tuple = None, batch_size: int = 1000,
+                   as_tuples: bool = False, read_only: bool = False) -> Iterator[Any]:
+        """
+        Yield rows one at a time (tuples in column order if as_tuples).
+        The default buffers fetch_all; adapters override it to stream so
+        memory stays at about batch_size rows whatever the result size.
+        """
+        for row in self.fetch_all(query, params, read_only=read_only):
+            yield tuple(row.values()) if as_tuples else row
+    
     @abstractmethod
     def insert(self, query: str, params: tuple = None) -> int:
         """Insert and return last insert id"""
@@ -31,3 +79,60 @@ class DatabasePort(ABC):
     def ping(self) -> bool:
         """Health check"""
         pass
+    
+    @abstractmethod
+    def transaction(self):
+        """
+        Context manager yielding a transaction with execute/insert/fetch_one/
+        fetch_all; commits on exit, rolls back if the block raises.
+        """
+        pass
+    
+    # --- Bulk operations ---
+    # Defaults run single-row calls inside transaction(), so every adapter
+    # with transactions works; the MySQL and SQLite adapters override them
+    # with chunked multi-row statements.
+    
+    def insert_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000,
+                    transaction_per_chunk: bool = False) -> BulkResult:
+        """
+        Insert rows with a single-row INSERT ... VALUES (%s, ...) query.
+        All rows commit together unless transaction_per_chunk, which commits
+        every chunk_size rows (a failure keeps the earlier chunks).
+        Raises BulkWriteError, whose `committed` tells what was kept.
+        """
+        return self._write_rows("insert_many", rows, chunk_size, transaction_per_chunk,
+                                lambda tx, params: tx.insert(query, params))
+    
+    def execute_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000,
+                     transaction_per_chunk: bool = False) -> int:
+        """Run query once per params tuple; returns affected rows (rows sent, if unknown)"""
+        return self._write_rows("execute_many", rows, chunk_size, transaction_per_chunk,
+                                lambda tx, params: tx.execute(query, params)).rowcount
+    
+    def _write_rows(self, name: str, rows: Sequence[tuple], chunk_size: int,
+                    transaction_per_chunk: bool, write) -> BulkResult:
+        """write(tx, params) for every row: one transaction, or one per chunk"""
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be >= 1")
+        result, committed = BulkResult(), BulkResult()
+        step = chunk_size if transaction_per_chunk else max(len(rows), 1)
+        try:
+            for start in range(0, len(rows), step):
+                with self.transaction() as tx:
+                    for params in rows[start:start + step]:
+                        row_id = write(tx, params)
+                        if result.first_id is None:
+                            result.first_id = row_id
+                        result.rowcount += 1
+                        result.chunks += 1
+                committed = BulkResult(result.rowcount, result.first_id, result.chunks)
+        except Exception as e:
+            raise BulkWriteError(
+                f"{name} failed after {committed.rowcount} committed rows: {e}", committed
+            ) from e
+        return result
+    
+    def replication_lag(self) -> Optional[float]:
+        """Seconds this database trails its primary (0 if it is not a replica, None if unknown)"""
+        return 0.0
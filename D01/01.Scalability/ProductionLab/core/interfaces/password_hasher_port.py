@@ -0,0 +1,42 @@
+"""
+Password Hasher Port - Interface for password hashing and verification
+"""
+import re
+from abc import ABC, abstractmethod
+from typing import Optional
+
+DEFAULT_BCRYPT_COST = 12  # bcrypt.gensalt() default
+
+_BCRYPT_PREFIX = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+def bcrypt_cost(password_hash: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash ("$2b$12$..." -> 12), None if not bcrypt"""
+    match = _BCRYPT_PREFIX.match(password_hash or "")
+    return int(match.group(1)) if match else None
+
+
+class HasherBusy(Exception):
+    """No hashing capacity free right now; the caller should retry later"""
+    
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class PasswordHasherPort(ABC):
+    rounds: int = DEFAULT_BCRYPT_COST  # cost factor of new hashes
+    
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        """Hash a new password (raises HasherBusy when overloaded)"""
+        pass
+    
+    @abstractmethod
+    def verify(self, password: str, password_hash: str) -> bool:
+        """Check a password against a stored hash (raises HasherBusy when overloaded)"""
+        pass
+    
+    def needs_rehash(self, password_hash: str) -> bool:
+        """True if the hash was made with another cost than new hashes get"""
+        return bcrypt_cost(password_hash) != self.rounds
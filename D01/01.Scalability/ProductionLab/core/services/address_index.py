@@ -0,0 +1,112 @@
+"""
+Address Index - In-memory country -> province -> district tree
+
+An AddressIndex is a snapshot of master_address built once and never
+modified: AddressService swaps in a whole new one when the table changes,
+so readers need no lock. Every dropdown list is a dict lookup, and its
+response body is serialized to JSON bytes up front, so serving it
+costs no per-request serialization either.
+"""
+import json
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def collate(value: str) -> str:
+    """Case-insensitive order, close to MySQL's default *_ci collations"""
+    return value.casefold()
+
+
+def _dump(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+EMPTY_PROVINCES = _dump({"provinces": []})
+EMPTY_DISTRICTS = _dump({"districts": []})
+
+
+class AddressIndex:
+    def __init__(self, rows: Iterable[Tuple[int, str, str, str]]):
+        """rows: (id, country, province, district), ordered by id"""
+        started = time.perf_counter()
+        # Keyed by collate(name), as the database compares them: "vietnam"
+        # finds "Vietnam". names keeps each one as first stored, for display
+        tree: Dict[str, Dict[str, List[Tuple[str, int]]]] = {}
+        names: Dict[Any, str] = {}
+        by_id: Dict[int, Dict[str, Any]] = {}
+        checksum = 0
+        for address_id, country, province, district in rows:
+            country_key, province_key = collate(country), collate(province)
+            names.setdefault(country_key, country)
+            names.setdefault((country_key, province_key), province)
+            tree.setdefault(country_key, {}).setdefault(province_key, []).append((district, address_id))
+            by_id[address_id] = {"id": address_id, "country": country,
+                                 "province": province, "district": district}
+            checksum = zlib.crc32(
+                f"{address_id}\x1f{country}\x1f{province}\x1f{district}\x1e".encode("utf-8"), checksum
+            )
+
+        self.row_count = len(by_id)
+        self.max_id = max(by_id) if by_id else None
+        self.checksum = f"{checksum:08x}"
+        self.by_id = by_id
+        self.countries: Tuple[str, ...] = tuple(sorted((names[c] for c in tree), key=collate))
+        self.provinces: Dict[str, Tuple[str, ...]] = {}
+        self.districts: Dict[Tuple[str, str], Tuple[Dict[str, Any], ...]] = {}
+        # (country, province) pairs as displayed, e.g. to name cache keys
+        self.pairs: Tuple[Tuple[str, str], ...] = tuple(
+            (names[country_key], names[(country_key, province_key)])
+            for country_key, provinces in tree.items() for province_key in provinces
+        )
+        for country_key, provinces in tree.items():
+            self.provinces[country_key] = tuple(
+                sorted((names[(country_key, p)] for p in provinces), key=collate)
+            )
+            for province_key, districts in provinces.items():
+                self.districts[(country_key, province_key)] = tuple(
+                    {"id": address_id, "district": district}
+                    for district, address_id in sorted(districts, key=lambda d: (collate(d[0]), d[1]))
+                )
+
+        # Response bodies, exactly as the /addresses routes return them
+        self.countries_json = _dump({"countries": self.countries})
+        self.provinces_json = {key: _dump({"provinces": provinces})
+                               for key, provinces in self.provinces.items()}
+        self.districts_json = {key: _dump({"districts": districts})
+                               for key, districts in self.districts.items()}
+        self.loaded_at = time.time()
+        self.build_seconds = time.perf_counter() - started
+
+    # Lookups compare names case-insensitively, like the SQL they replace
+
+    def get_provinces(self, country: str) -> Tuple[str, ...]:
+        return self.provinces.get(collate(country), ())
+
+    def get_districts(self, country: str, province: str) -> Tuple[Dict[str, Any], ...]:
+        return self.districts.get((collate(country), collate(province)), ())
+
+    def provinces_body(self, country: str) -> bytes:
+        return self.provinces_json.get(collate(country), EMPTY_PROVINCES)
+
+    def districts_body(self, country: str, province: str) -> bytes:
+        return self.districts_json.get((collate(country), collate(province)), EMPTY_DISTRICTS)
+
+    def get_address(self, address_id: int) -> Optional[Dict[str, Any]]:
+        row = self.by_id.get(address_id)
+        return dict(row) if row is not None else None
+
+    def changed_ids(self, newer: "AddressIndex") -> List[int]:
+        """Ids of rows updated or deleted in `newer` (added rows are not listed)"""
+        return [address_id for address_id, row in self.by_id.items() if newer.by_id.get(address_id) != row]
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "rows": self.row_count,
+            "max_id": self.max_id,
+            "checksum": self.checksum,
+            "countries": len(self.countries),
+            "provinces": len(self.districts),
+            "loaded_at": self.loaded_at,
+            "build_ms": round(self.build_seconds * 1000, 3),
+        }
@@ -1,39 +1,318 @@
 """
 Address Service - Address lookup operations
+
+master_address is reference data, so the dropdown lists are cached
+read-through (TTL + explicit invalidate()). Concurrent misses for one key
+share a single database query. Keys hash the collated parameters, so any
+input maps to one fixed-size key, and names that the database compares
+as equal share an entry. Empty lists (usually a typo or a probe) are kept
+only empty_ttl seconds.
+
+With refresh_index(), the whole table is instead held in memory as an
+AddressIndex (see address_index.py) and lookups never reach the cache or
+the database. A background check compares row count and MAX(id) with the
+loaded version and swaps in a rebuilt index when they change.
+
+Cached user profiles embed address names: on_change gets the ids of rows
+updated or deleted (found by diffing index versions, or passed to
+invalidate()) so their owners' profiles can be dropped.
 """
-from typing import List, Dict, Any
-from ..interfaces.database_port import DatabasePort
+import hashlib
+import json
+import threading
+from typing import List, Dict, Any, Callable, Iterator, Optional, Sequence, Tuple
+from ..interfaces.database_port import DatabasePort, BulkResult
+from ..interfaces.cache_port import CachePort
+from .singleflight import SingleFlight
+from .address_index import AddressIndex, collate
+
+
+# Shared with AsyncAddressService
+SQL_COUNTRIES = "SELECT DISTINCT country FROM master_address ORDER BY country"
+SQL_PROVINCES = "SELECT DISTINCT province FROM master_address WHERE country = %s ORDER BY province"
+SQL_DISTRICTS = """SELECT id, district FROM master_address 
+               WHERE country = %s AND province = %s 
+               ORDER BY district"""
+SQL_ADDRESS_BY_ID = "SELECT * FROM master_address WHERE id = %s"
+SQL_COUNTRY_PROVINCES = "SELECT DISTINCT country, province FROM master_address"
+SQL_EXPORT_ADDRESSES = "SELECT id, country, province, district FROM master_address ORDER BY id"
+# Keyset page of the export, for drivers without a streaming cursor
+SQL_EXPORT_ADDRESSES_AFTER = """SELECT id, country, province, district FROM master_address
+               WHERE id > %s ORDER BY id LIMIT %s"""
+EXPORT_COLUMNS = ("id", "country", "province", "district")
+SQL_INSERT_ADDRESS = "INSERT INTO master_address (country, province, district) VALUES (%s, %s, %s)"
+SQL_ADDRESS_VERSION = "SELECT COUNT(*) AS row_count, MAX(id) AS max_id FROM master_address"
+
+ADDRESS_CACHE_PREFIX = "address:"
+
+
+def countries_key() -> str:
+    return f"{ADDRESS_CACHE_PREFIX}countries"
+
+
+def _params_digest(*params: str) -> str:
+    # JSON keeps the parameters apart: ("a:b", "c") and ("a", "b:c") differ
+    encoded = json.dumps([collate(param) for param in params], ensure_ascii=False)
+    return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def provinces_key(country: str) -> str:
+    return f"{ADDRESS_CACHE_PREFIX}provinces:{_params_digest(country)}"
+
+
+def districts_key(country: str, province: str) -> str:
+    return f"{ADDRESS_CACHE_PREFIX}districts:{_params_digest(country, province)}"
 
 
 class AddressService:
-    def __init__(self, db: DatabasePort):
+    CACHE_TTL = 3600  # 1 hour
+    EMPTY_CACHE_TTL = 60
+    
+    def __init__(self, db: DatabasePort, cache: Optional[CachePort] = None,
+                 cache_ttl: int = CACHE_TTL, empty_ttl: int = EMPTY_CACHE_TTL,
+                 on_change: Optional[Callable[[List[int]], Any]] = None):
         self.db = db
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.empty_ttl = min(empty_ttl, cache_ttl)
+        # e.g. AuthService.invalidate_address_profiles
+        self.on_change = on_change
+        self._flight = SingleFlight()
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._db_loads = 0
+        # In-memory index: None until refresh_index() loads one
+        self._index: Optional[AddressIndex] = None
+        self._index_lock = threading.Lock()  # one rebuild at a time
+        self._index_checks = 0
+        self._index_reloads = 0
+        self._refresher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
     
     def get_countries(self) -> List[str]:
         """Get list of unique countries"""
-        rows = self.db.fetch_all("SELECT DISTINCT country FROM master_address ORDER BY country")
-        return [row['country'] for row in rows]
+        index = self._index
+        if index is not None:
+            return list(index.countries)
+        return self._read_through(countries_key(), lambda: [
+            row['country'] for row in self.db.fetch_all(SQL_COUNTRIES, read_only=True)
+        ])
     
     def get_provinces(self, country: str) -> List[str]:
         """Get list of provinces for a country"""
-        rows = self.db.fetch_all(
-            "SELECT DISTINCT province FROM master_address WHERE country = %s ORDER BY province",
-            (country,)
-        )
-        return [row['province'] for row in rows]
+        index = self._index
+        if index is not None:
+            return list(index.get_provinces(country))
+        return self._read_through(provinces_key(country), lambda: [
+            row['province'] for row in self.db.fetch_all(SQL_PROVINCES, (country,), read_only=True)
+        ])
     
     def get_districts(self, country: str, province: str) -> List[Dict[str, Any]]:
         """Get list of districts (with id) for country + province"""
-        rows = self.db.fetch_all(
-            """SELECT id, district FROM master_address 
-               WHERE country = %s AND province = %s 
-               ORDER BY district""",
-            (country, province)
-        )
-        return [{"id": row['id'], "district": row['district']} for row in rows]
+        index = self._index
+        if index is not None:
+            return [dict(d) for d in index.get_districts(country, province)]
+        return self._read_through(districts_key(country, province), lambda: [
+            {"id": row['id'], "district": row['district']}
+            for row in self.db.fetch_all(SQL_DISTRICTS, (country, province), read_only=True)
+        ])
     
     def get_address_by_id(self, address_id: int) -> Dict[str, Any]:
         """Get full address by ID"""
-        return self.db.fetch_one(
-            "SELECT * FROM master_address WHERE id = %s", (address_id,)
-        )
+        index = self._index
+        if index is not None:
+            address = index.get_address(address_id)
+            if address is not None:
+                return address
+            # Not in the index: maybe added since the last refresh
+        return self.db.fetch_one(SQL_ADDRESS_BY_ID, (address_id,), read_only=True)
+    
+    # Pre-serialized response bodies: None when no index is loaded
+    
+    def countries_json(self) -> Optional[bytes]:
+        index = self._index
+        return index.countries_json if index is not None else None
+    
+    def provinces_json(self, country: str) -> Optional[bytes]:
+        index = self._index
+        return index.provinces_body(country) if index is not None else None
+    
+    def districts_json(self, country: str, province: str) -> Optional[bytes]:
+        index = self._index
+        if index is None:
+            return None
+        return index.districts_body(country, province)
+    
+    def refresh_index(self, force: bool = False) -> bool:
+        """
+        Load the index, or reload it if master_address changed.
+        Without force, a cheap COUNT(*) / MAX(id) query is compared with
+        the loaded version first; with force, the table is always re-read
+        (this also catches in-place UPDATEs). A rebuilt index with the same
+        checksum is dropped. Returns True if a new version was swapped in.
+        """
+        changed = self._reload_index(force)
+        if changed is None:
+            return False
+        self._changed(changed)
+        return True
+    
+    def start_index_refresh(self, interval: float = 30.0, full_every: int = 10) -> None:
+        """
+        Daemon thread running refresh_index() every `interval` seconds;
+        every `full_every`-th run re-reads the whole table (force=True).
+        """
+        if self._refresher is not None:
+            return
+        self._stop.clear()
+        
+        def run():
+            runs = 0
+            while not self._stop.wait(interval):
+                runs += 1
+                try:
+                    self.refresh_index(force=full_every > 0 and runs % full_every == 0)
+                except Exception:
+                    pass  # keep serving the loaded version; retried next interval
+        
+        self._refresher = threading.Thread(target=run, name="address-index", daemon=True)
+        self._refresher.start()
+    
+    def stop_index_refresh(self) -> None:
+        if self._refresher is not None:
+            self._stop.set()
+            self._refresher.join()
+            self._refresher = None
+    
+    def export_addresses(self, batch_size: int = 1000) -> Iterator[str]:
+        """
+        Every address as one NDJSON line, streamed: memory stays at about
+        batch_size rows however large master_address is.
+        """
+        for row in self.db.fetch_iter(SQL_EXPORT_ADDRESSES, batch_size=batch_size,
+                                      as_tuples=True, read_only=True):
+            yield json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n"
+    
+    def import_addresses(self, rows: Sequence[Tuple[str, str, str]],
+                         chunk_size: int = 1000) -> BulkResult:
+        """
+        Bulk-load (country, province, district) rows, chunk_size per INSERT,
+        then drop the cached lists (and reload the index) so the new rows show up.
+        """
+        result = self.db.insert_many(SQL_INSERT_ADDRESS, rows, chunk_size=chunk_size)
+        self.invalidate()
+        return result
+    
+    def invalidate(self, address_ids: Sequence[int] = ()) -> int:
+        """
+        Drop every cached address list and reload the index, if loaded
+        (call after changing master_address). on_change gets address_ids
+        (the rows changed, needed when no index is loaded to diff) plus
+        those the reload found changed. Returns the number of cache keys removed.
+        """
+        changed = set(address_ids)
+        previous = self._index
+        if previous is not None:
+            changed.update(self._reload_index(force=True) or ())
+        self._changed(sorted(changed))
+        if not self.cache:
+            return 0
+        if previous is not None:
+            # Both index versions already list every (country, province)
+            pairs = set(previous.pairs) | set(self._index.pairs)
+        else:
+            pairs = {(row['country'], row['province'])
+                     for row in self.db.fetch_all(SQL_COUNTRY_PROVINCES)}
+        keys = {countries_key()}
+        for country, province in pairs:
+            keys.add(provinces_key(country))
+            keys.add(districts_key(country, province))
+        try:
+            return self.cache.delete_many(sorted(keys))
+        except Exception:
+            return 0
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Read-through cache counters, and the loaded index version"""
+        index = self._index
+        with self._stats_lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.cache is not None,
+                "ttl": self.cache_ttl,
+                "empty_ttl": self.empty_ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "coalesced": self._coalesced,
+                "db_loads": self._db_loads,
+                "in_flight": self._flight.in_flight(),
+                "index": {
+                    **index.info(),
+                    "checks": self._index_checks,
+                    "reloads": self._index_reloads,
+                } if index is not None else None,
+            }
+    
+    def _reload_index(self, force: bool) -> Optional[List[int]]:
+        """None if the index was kept, else the ids updated or deleted since the previous version"""
+        with self._index_lock:
+            current = self._index
+            self._count(index_checks=1)
+            if not force and current is not None:
+                version = self.db.fetch_one(SQL_ADDRESS_VERSION, read_only=True) or {}
+                if (version.get('row_count'), version.get('max_id')) == (current.row_count, current.max_id):
+                    return None
+            index = AddressIndex(self.db.fetch_iter(SQL_EXPORT_ADDRESSES, as_tuples=True, read_only=True))
+            if current is not None and index.checksum == current.checksum:
+                return None
+            self._index = index
+            self._count(index_reloads=1)
+            return current.changed_ids(index) if current is not None else []
+    
+    def _changed(self, address_ids: List[int]) -> None:
+        if not address_ids or self.on_change is None:
+            return
+        try:
+            self.on_change(address_ids)
+        except Exception:
+            pass  # the stale entries still expire with their TTL
+    
+    def _read_through(self, key: str, load: Callable[[], Any]) -> Any:
+        if not self.cache:
+            return load()
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._count(hits=1)
+            return cached
+        value, shared = self._flight.do(key, lambda: self._load_and_store(key, load))
+        self._count(misses=1, coalesced=1 if shared else 0)
+        return value
+    
+    def _load_and_store(self, key: str, load: Callable[[], Any]) -> Any:
+        value = load()
+        self._count(db_loads=1)
+        try:
+            self.cache.set(key, json.dumps(value), ttl=self.cache_ttl if value else self.empty_ttl)
+        except Exception:
+            pass
+        return value
+    
+    def _cache_get(self, key: str) -> Any:
+        try:
+            data = self.cache.get(key)
+            return json.loads(data) if data is not None else None
+        except Exception:
+            return None
+    
+    def _count(self, hits: int = 0, misses: int = 0, coalesced: int = 0, db_loads: int = 0,
+               index_checks: int = 0, index_reloads: int = 0) -> None:
+        with self._stats_lock:
+            self._index_checks += index_checks
+            self._index_reloads += index_reloads
+            self._hits += hits
+            self._misses += misses
+            self._coalesced += coalesced
+            self._db_loads += db_loads
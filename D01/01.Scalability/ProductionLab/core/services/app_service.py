@@ -1,52 +1,131 @@
 """
 Application Service - Core business logic
+
+Sessions are stored either as one encoded blob per session (read, count,
+rewrite: 2 round trips) or as a cache hash whose visit counter is bumped
+in place (1 round trip, atomic across servers, TTL only refreshed once a
+fraction of it has elapsed).
 """
-import json
 import socket
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional
 from ..domain import ServerInfo, SessionData, HealthStatus
 from ..interfaces.cache_port import CachePort
 from ..interfaces.web_port import WebPort
+from .session_codec import SessionCodec, JsonSessionCodec, decode_session
+
+
+# Pure helpers below are shared with AsyncAppService
+SESSION_TTL = 3600
+
+
+def session_cache_key(session_id: str) -> str:
+    return f"session:{session_id}"
+
+
+def session_hash_key(session_id: str) -> str:
+    return f"session_hash:{session_id}"
+
+
+def record_visit(session_data: Optional[SessionData]) -> SessionData:
+    """Count one more visit, starting a fresh session if none was found"""
+    if session_data:
+        session_data.user_data["visits"] += 1
+        return session_data
+    return SessionData.create({"visits": 1})
+
+
+def server_info_dict(server_info: ServerInfo) -> Dict[str, Any]:
+    return {
+        "server_id": server_info.server_id,
+        "hostname": server_info.hostname,
+        "start_time": server_info.start_time
+    }
+
+
+def visit_response(server_info: ServerInfo, session_id: str, visits: int) -> Dict[str, Any]:
+    return {
+        "message": f"Hello from {server_info.server_id}",
+        "session_id": session_id,
+        "visits": visits,
+        "server_info": server_info_dict(server_info)
+    }
+
 
 class AppService:
-    def __init__(self, cache: CachePort):
+    def __init__(self, cache: CachePort, codec: Optional[SessionCodec] = None,
+                 hash_sessions: bool = False, ttl_refresh_fraction: float = 0.5):
         self.cache = cache
+        # Writes use this codec; reads accept any codec's format
+        self.codec = codec or JsonSessionCodec()
+        self.hash_sessions = hash_sessions
+        # Hash sessions: re-EXPIRE only after this fraction of the TTL elapsed
+        self.refresh_below = SESSION_TTL * (1 - ttl_refresh_fraction)
         self.server_info = ServerInfo.create(socket.gethostname())
     
     def get_server_info(self) -> Dict[str, Any]:
         """Get server information"""
-        return {
-            "server_id": self.server_info.server_id,
-            "hostname": self.server_info.hostname,
-            "start_time": self.server_info.start_time
-        }
+        return server_info_dict(self.server_info)
     
     def handle_request(self, web: WebPort) -> Dict[str, Any]:
         """Handle incoming request with session management"""
         session_id = web.get_session_id()
+        if self.hash_sessions:
+            return self._handle_hash_session(web, session_id)
         
         if not session_id:
             # Create new session
-            session_data = SessionData.create({"visits": 1})
+            session_data = record_visit(None)
             session_id = session_data.session_id
             web.set_session_id(session_id)
         else:
             # Update existing session
-            session_data = self._get_session(session_id)
-            if session_data:
-                session_data.user_data["visits"] += 1
-            else:
-                session_data = SessionData.create({"visits": 1})
+            session_data = record_visit(self._get_session(session_id))
         
         # Store session in cache
         self._store_session(session_id, session_data)
         
-        return {
-            "message": f"Hello from {self.server_info.server_id}",
-            "session_id": session_id,
-            "visits": session_data.user_data["visits"],
-            "server_info": self.get_server_info()
-        }
+        return visit_response(self.server_info, session_id, session_data.user_data["visits"])
+    
+    def _handle_hash_session(self, web: WebPort, session_id: Optional[str]) -> Dict[str, Any]:
+        """Count the visit in place: one HSET (new) or HINCRBY (existing)"""
+        if not session_id:
+            session_data = record_visit(None)
+            session_id = session_data.session_id
+            web.set_session_id(session_id)
+            self._create_hash_session(session_id, {"visits": 1, "created_at": session_data.created_at})
+            return visit_response(self.server_info, session_id, 1)
+        
+        key = session_hash_key(session_id)
+        try:
+            visits = self.cache.hash_incr(key, "visits", 1, ttl=SESSION_TTL,
+                                          refresh_below=self.refresh_below)
+        except Exception:
+            visits = None
+        if visits == 1:
+            # No hash yet: expired, or a blob session written before the switch
+            visits = self._migrate_blob_session(session_id) or 1
+        return visit_response(self.server_info, session_id, visits or 1)
+    
+    def _create_hash_session(self, session_id: str, fields: Dict[str, Any]) -> None:
+        try:
+            self.cache.hash_set(session_hash_key(session_id), fields, ttl=SESSION_TTL)
+        except Exception:
+            pass
+    
+    def _migrate_blob_session(self, session_id: str) -> Optional[int]:
+        """Carry the visit count over from a blob session (once per session)"""
+        legacy = self._get_session(session_id)
+        if legacy is None:
+            self._create_hash_session(session_id, {"created_at": time.time()})
+            return None
+        visits = legacy.user_data.get("visits", 0) + 1
+        self._create_hash_session(session_id, {"visits": visits, "created_at": legacy.created_at})
+        try:
+            self.cache.delete(session_cache_key(session_id))
+        except Exception:
+            pass
+        return visits
     
     def check_health(self) -> HealthStatus:
         """Check application and dependencies health"""
@@ -58,13 +137,14 @@ class AppService:
         except Exception as e:
             return HealthStatus.unhealthy(f"Health check failed: {str(e)}")
     
-    def _get_session(self, session_id: str) -> SessionData:
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cache adapter statistics (hits, misses, evictions...)"""
+        return self.cache.stats()
+    
+    def _get_session(self, session_id: str) -> Optional[SessionData]:
         """Get session from cache"""
         try:
-            data = self.cache.get(f"session:{session_id}")
-            if data:
-                session_dict = json.loads(data)
-                return SessionData(**session_dict)
+            return decode_session(self.cache.get(session_cache_key(session_id)))
         except Exception:
             pass
         return None
@@ -72,11 +152,6 @@ class AppService:
     def _store_session(self, session_id: str, session_data: SessionData) -> None:
         """Store session in cache"""
         try:
-            data = json.dumps({
-                "session_id": session_data.session_id,
-                "user_data": session_data.user_data,
-                "created_at": session_data.created_at
-            })
-            self.cache.set(f"session:{session_id}", data, ttl=3600)
+            self.cache.set(session_cache_key(session_id), self.codec.encode_session(session_data), ttl=SESSION_TTL)
         except Exception:
             pass
@@ -0,0 +1,244 @@
+"""
+Async Address Service - AddressService for the asyncio serving path
+
+Same cache keys, TTLs and in-memory AddressIndex as AddressService.
+Concurrent misses for one key await a single database query; the index
+is checked for changes by a task on the event loop, and rebuilt in the
+default executor so a large table does not stall other requests.
+"""
+import asyncio
+import json
+from typing import List, Dict, Any, AsyncIterator, Awaitable, Callable, Optional, Sequence
+from ..interfaces.async_database_port import AsyncDatabasePort
+from ..interfaces.async_cache_port import AsyncCachePort
+from .address_index import AddressIndex
+from .address_service import (
+    AddressService, SQL_COUNTRIES, SQL_PROVINCES, SQL_DISTRICTS, SQL_ADDRESS_BY_ID,
+    SQL_COUNTRY_PROVINCES, SQL_EXPORT_ADDRESSES, SQL_EXPORT_ADDRESSES_AFTER, SQL_ADDRESS_VERSION,
+    EXPORT_COLUMNS, countries_key, provinces_key, districts_key
+)
+
+
+class AsyncAddressService:
+    CACHE_TTL = AddressService.CACHE_TTL
+    EMPTY_CACHE_TTL = AddressService.EMPTY_CACHE_TTL
+
+    def __init__(self, db: AsyncDatabasePort, cache: Optional[AsyncCachePort] = None,
+                 cache_ttl: int = CACHE_TTL, empty_ttl: int = EMPTY_CACHE_TTL,
+                 on_change: Optional[Callable[[List[int]], Awaitable[Any]]] = None):
+        self.db = db
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.empty_ttl = min(empty_ttl, cache_ttl)
+        # Awaited with updated/deleted address ids, e.g. AsyncAuthService.invalidate_address_profiles
+        self.on_change = on_change
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._counts = {"hits": 0, "misses": 0, "coalesced": 0, "db_loads": 0,
+                        "index_checks": 0, "index_reloads": 0}
+        self._index: Optional[AddressIndex] = None
+        self._index_lock: Optional[asyncio.Lock] = None  # created on the running loop
+        self._refresher: Optional[asyncio.Task] = None
+
+    async def get_countries(self) -> List[str]:
+        """Get list of unique countries"""
+        index = self._index
+        if index is not None:
+            return list(index.countries)
+
+        async def load():
+            return [row['country'] for row in await self.db.fetch_all(SQL_COUNTRIES)]
+        return await self._read_through(countries_key(), load)
+
+    async def get_provinces(self, country: str) -> List[str]:
+        """Get list of provinces for a country"""
+        index = self._index
+        if index is not None:
+            return list(index.get_provinces(country))
+
+        async def load():
+            return [row['province'] for row in await self.db.fetch_all(SQL_PROVINCES, (country,))]
+        return await self._read_through(provinces_key(country), load)
+
+    async def get_districts(self, country: str, province: str) -> List[Dict[str, Any]]:
+        """Get list of districts (with id) for country + province"""
+        index = self._index
+        if index is not None:
+            return [dict(d) for d in index.get_districts(country, province)]
+
+        async def load():
+            rows = await self.db.fetch_all(SQL_DISTRICTS, (country, province))
+            return [{"id": row['id'], "district": row['district']} for row in rows]
+        return await self._read_through(districts_key(country, province), load)
+
+    async def get_address_by_id(self, address_id: int) -> Dict[str, Any]:
+        """Get full address by ID"""
+        index = self._index
+        if index is not None:
+            address = index.get_address(address_id)
+            if address is not None:
+                return address
+        return await self.db.fetch_one(SQL_ADDRESS_BY_ID, (address_id,))
+
+    # Pre-serialized response bodies: None when no index is loaded
+
+    def countries_json(self) -> Optional[bytes]:
+        index = self._index
+        return index.countries_json if index is not None else None
+
+    def provinces_json(self, country: str) -> Optional[bytes]:
+        index = self._index
+        return index.provinces_body(country) if index is not None else None
+
+    def districts_json(self, country: str, province: str) -> Optional[bytes]:
+        index = self._index
+        return index.districts_body(country, province) if index is not None else None
+
+    async def refresh_index(self, force: bool = False) -> bool:
+        """Load the index, or reload it if master_address changed (see AddressService.refresh_index)"""
+        changed = await self._reload_index(force)
+        if changed is None:
+            return False
+        await self._changed(changed)
+        return True
+
+    def start_index_refresh(self, interval: float = 30.0, full_every: int = 10) -> None:
+        """Task running refresh_index() every `interval` seconds (call on the running loop)"""
+        if self._refresher is not None:
+            return
+
+        async def run():
+            runs = 0
+            while True:
+                await asyncio.sleep(interval)
+                runs += 1
+                try:
+                    await self.refresh_index(force=full_every > 0 and runs % full_every == 0)
+                except Exception:
+                    pass  # keep serving the loaded version; retried next interval
+
+        self._refresher = asyncio.ensure_future(run())
+
+    async def stop_index_refresh(self) -> None:
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    async def export_addresses(self, batch_size: int = 1000) -> AsyncIterator[str]:
+        """Every address as one NDJSON line, read batch_size rows at a time by id"""
+        last_id = 0
+        while True:
+            rows = await self.db.fetch_all(SQL_EXPORT_ADDRESSES_AFTER, (last_id, batch_size))
+            for row in rows:
+                yield json.dumps({column: row[column] for column in EXPORT_COLUMNS}, ensure_ascii=False) + "\n"
+            if len(rows) < batch_size:
+                return
+            last_id = rows[-1]['id']
+
+    async def invalidate(self, address_ids: Sequence[int] = ()) -> int:
+        """Drop every cached address list and reload the index, if loaded (see AddressService.invalidate)"""
+        changed = set(address_ids)
+        previous = self._index
+        if previous is not None:
+            changed.update(await self._reload_index(force=True) or ())
+        await self._changed(sorted(changed))
+        if not self.cache:
+            return 0
+        if previous is not None:
+            pairs = set(previous.pairs) | set(self._index.pairs)
+        else:
+            pairs = {(row['country'], row['province'])
+                     for row in await self.db.fetch_all(SQL_COUNTRY_PROVINCES)}
+        keys = {countries_key()}
+        for country, province in pairs:
+            keys.add(provinces_key(country))
+            keys.add(districts_key(country, province))
+        try:
+            return await self.cache.delete_many(sorted(keys))
+        except Exception:
+            return 0
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Read-through cache counters, and the loaded index version"""
+        index = self._index
+        counts = self._counts
+        lookups = counts["hits"] + counts["misses"]
+        return {
+            "enabled": self.cache is not None,
+            "ttl": self.cache_ttl,
+            "empty_ttl": self.empty_ttl,
+            "hits": counts["hits"],
+            "misses": counts["misses"],
+            "hit_ratio": round(counts["hits"] / lookups, 4) if lookups else 0.0,
+            "coalesced": counts["coalesced"],
+            "db_loads": counts["db_loads"],
+            "in_flight": len(self._in_flight),
+            "index": {
+                **index.info(),
+                "checks": counts["index_checks"],
+                "reloads": counts["index_reloads"],
+            } if index is not None else None,
+        }
+
+    async def _reload_index(self, force: bool) -> Optional[List[int]]:
+        if self._index_lock is None:
+            self._index_lock = asyncio.Lock()
+        async with self._index_lock:
+            current = self._index
+            self._counts["index_checks"] += 1
+            if not force and current is not None:
+                version = await self.db.fetch_one(SQL_ADDRESS_VERSION) or {}
+                if (version.get('row_count'), version.get('max_id')) == (current.row_count, current.max_id):
+                    return None
+            rows = [tuple(row[column] for column in EXPORT_COLUMNS)
+                    for row in await self.db.fetch_all(SQL_EXPORT_ADDRESSES)]
+            index = await asyncio.get_running_loop().run_in_executor(None, AddressIndex, rows)
+            if current is not None and index.checksum == current.checksum:
+                return None
+            self._index = index
+            self._counts["index_reloads"] += 1
+            return current.changed_ids(index) if current is not None else []
+
+    async def _changed(self, address_ids: List[int]) -> None:
+        if not address_ids or self.on_change is None:
+            return
+        try:
+            await self.on_change(address_ids)
+        except Exception:
+            pass  # the stale entries still expire with their TTL
+
+    async def _read_through(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.cache:
+            return await load()
+        try:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                self._counts["hits"] += 1
+                return json.loads(cached)
+        except Exception:
+            pass
+        self._counts["misses"] += 1
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            # Same key already being loaded: share its result
+            self._counts["coalesced"] += 1
+            return await asyncio.shield(pending)
+        pending = asyncio.ensure_future(self._load_and_store(key, load))
+        self._in_flight[key] = pending  # removed by _load_and_store when done
+        return await asyncio.shield(pending)
+
+    async def _load_and_store(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await load()
+            self._counts["db_loads"] += 1
+            try:
+                await self.cache.set(key, json.dumps(value), ttl=self.cache_ttl if value else self.empty_ttl)
+            except Exception:
+                pass
+            return value
+        finally:
+            self._in_flight.pop(key, None)
@@ -0,0 +1,108 @@
+"""
+Async Application Service - AppService for the asyncio serving path
+Domain logic (session shape, visit counting, blob or hash sessions) is
+shared with AppService.
+"""
+import socket
+import time
+from typing import Dict, Any, Optional
+from ..domain import ServerInfo, SessionData, HealthStatus
+from ..interfaces.async_cache_port import AsyncCachePort
+from .app_service import (
+    SESSION_TTL, session_cache_key, session_hash_key, record_visit, server_info_dict, visit_response
+)
+from .session_codec import SessionCodec, JsonSessionCodec, decode_session
+
+
+class AsyncAppService:
+    def __init__(self, cache: AsyncCachePort, codec: Optional[SessionCodec] = None,
+                 hash_sessions: bool = False, ttl_refresh_fraction: float = 0.5):
+        self.cache = cache
+        self.codec = codec or JsonSessionCodec()
+        self.hash_sessions = hash_sessions
+        self.refresh_below = SESSION_TTL * (1 - ttl_refresh_fraction)
+        self.server_info = ServerInfo.create(socket.gethostname())
+
+    def get_server_info(self) -> Dict[str, Any]:
+        """Get server information"""
+        return server_info_dict(self.server_info)
+
+    async def handle_request(self, session_id: Optional[str]) -> Dict[str, Any]:
+        """
+        Handle incoming request with session management.
+        The caller sets the session cookie when the returned session_id is new.
+        """
+        if self.hash_sessions:
+            return await self._handle_hash_session(session_id)
+
+        if not session_id:
+            session_data = record_visit(None)
+            session_id = session_data.session_id
+        else:
+            session_data = record_visit(await self._get_session(session_id))
+
+        await self._store_session(session_id, session_data)
+
+        return visit_response(self.server_info, session_id, session_data.user_data["visits"])
+
+    async def _handle_hash_session(self, session_id: Optional[str]) -> Dict[str, Any]:
+        """Count the visit in place: one HSET (new) or HINCRBY (existing); see AppService"""
+        if not session_id:
+            session_data = record_visit(None)
+            session_id = session_data.session_id
+            await self._create_hash_session(session_id, {"visits": 1, "created_at": session_data.created_at})
+            return visit_response(self.server_info, session_id, 1)
+
+        try:
+            visits = await self.cache.hash_incr(session_hash_key(session_id), "visits", 1,
+                                                ttl=SESSION_TTL, refresh_below=self.refresh_below)
+        except Exception:
+            visits = None
+        if visits == 1:
+            visits = await self._migrate_blob_session(session_id) or 1
+        return visit_response(self.server_info, session_id, visits or 1)
+
+    async def _create_hash_session(self, session_id: str, fields: Dict[str, Any]) -> None:
+        try:
+            await self.cache.hash_set(session_hash_key(session_id), fields, ttl=SESSION_TTL)
+        except Exception:
+            pass
+
+    async def _migrate_blob_session(self, session_id: str) -> Optional[int]:
+        legacy = await self._get_session(session_id)
+        if legacy is None:
+            await self._create_hash_session(session_id, {"created_at": time.time()})
+            return None
+        visits = legacy.user_data.get("visits", 0) + 1
+        await self._create_hash_session(session_id, {"visits": visits, "created_at": legacy.created_at})
+        try:
+            await self.cache.delete(session_cache_key(session_id))
+        except Exception:
+            pass
+        return visits
+
+    async def check_health(self) -> HealthStatus:
+        """Check application and dependencies health"""
+        try:
+            if await self.cache.ping():
+                return HealthStatus.healthy("Application and Cache healthy.")
+            else:
+                return HealthStatus.unhealthy("Cache connection failed.")
+        except Exception as e:
+            return HealthStatus.unhealthy(f"Health check failed: {str(e)}")
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get cache adapter statistics (hits, misses, evictions...)"""
+        return self.cache.stats()
+
+    async def _get_session(self, session_id: str) -> Optional[SessionData]:
+        try:
+            return decode_session(await self.cache.get(session_cache_key(session_id)))
+        except Exception:
+            return None
+
+    async def _store_session(self, session_id: str, session_data: SessionData) -> None:
+        try:
+            await self.cache.set(session_cache_key(session_id), self.codec.encode_session(session_data), ttl=SESSION_TTL)
+        except Exception:
+            pass
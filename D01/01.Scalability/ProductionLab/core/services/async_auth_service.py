@@ -0,0 +1,270 @@
+"""
+Async Auth Service - AuthService for the asyncio serving path
+
+SQL, session format, profile shaping and the cache layout (sessions,
+session index, profile cache, token revocations) are shared with
+AuthService, so sync and async workers can serve the same users.
+The password hasher and the revocation list are sync components: bcrypt
+and their cache calls run in the default executor instead of blocking
+the event loop (the revocation filter itself is checked inline).
+"""
+import asyncio
+import time
+import uuid
+from typing import Optional, Dict, Any, List, Set, Tuple
+from ..interfaces.async_database_port import AsyncDatabasePort
+from ..interfaces.async_cache_port import AsyncCachePort
+from ..interfaces.database_port import DuplicateKeyError, PoolTimeout
+from ..interfaces.password_hasher_port import PasswordHasherPort
+from .session_codec import SessionCodec, JsonSessionCodec
+from .session_token import SessionTokenSigner, is_session_token
+from .token_revocation import TokenRevocationList
+from .auth_service import (
+    AuthService, InlinePasswordHasher, RehashTracker, SQL_INSERT_USER, SQL_INSERT_PROFILE,
+    SQL_LOGIN_BY_USERNAME, SQL_UPDATE_PASSWORD_HASH, SQL_USER_BY_ID, SQL_PROFILE_BY_USER,
+    INVALID_CREDENTIALS, USERNAME_TAKEN, NOTHING_TO_UPDATE, LOGGED_OUT, NO_SESSIONS, LOGOUT_FAILED,
+    session_key, session_index_key, session_index_keys, session_index_entry, session_owner, session_payload, merge_session_index,
+    logout_all_result, profile_key, profile_update, read_cached_profile, profile_cache_entry,
+    profile_cache_stats, new_profile_counts, address_user_queries, hashing_stats, format_profile, format_user,
+    registered, login_result, failure
+)
+
+
+class AsyncAuthService:
+    SESSION_TTL = AuthService.SESSION_TTL
+    PROFILE_CACHE_TTL = AuthService.PROFILE_CACHE_TTL
+    PROFILE_MISSING_TTL = AuthService.PROFILE_MISSING_TTL
+
+    def __init__(self, db: AsyncDatabasePort, cache: AsyncCachePort = None,
+                 codec: SessionCodec = None, hasher: PasswordHasherPort = None,
+                 rehash_on_login: bool = True,
+                 hash_calibration: Optional[Dict[str, Any]] = None,
+                 profile_cache_ttl: int = PROFILE_CACHE_TTL,
+                 profile_missing_ttl: int = PROFILE_MISSING_TTL,
+                 tokens: Optional[SessionTokenSigner] = None,
+                 revocations: Optional[TokenRevocationList] = None):
+        self.db = db
+        self.cache = cache
+        self.codec = codec or JsonSessionCodec()
+        self.tokens = tokens
+        self.revocations = revocations
+        self.profile_cache_ttl = profile_cache_ttl if cache is not None else 0
+        self.profile_missing_ttl = profile_missing_ttl
+        self._profile_counts = new_profile_counts()
+        self.hasher = hasher or InlinePasswordHasher()
+        self.rehash_on_login = rehash_on_login
+        self.hash_calibration = hash_calibration
+        self._rehashes = RehashTracker()
+        self._rehash_tasks: Set[asyncio.Task] = set()  # kept so they are not garbage-collected mid-run
+
+    async def register(self, username: str, password: str,
+                       full_name: str = None, email: str = None,
+                       address_id: int = None, address_detail: str = None) -> Dict[str, Any]:
+        """Register a new user (one transaction; a taken username fails on UNIQUE(username))"""
+        # HasherBusy propagates: the app answers 503
+        password_hash = await self._in_executor(self.hasher.hash, password)
+
+        try:
+            async with self.db.transaction() as tx:
+                user_id = await tx.insert(SQL_INSERT_USER, (username, password_hash))
+                await tx.insert(
+                    SQL_INSERT_PROFILE,
+                    (user_id, full_name, email, address_id, address_detail)
+                )
+            await self.invalidate_profiles([user_id])
+
+            return registered(user_id)
+        except DuplicateKeyError:
+            return dict(USERNAME_TAKEN)
+        except PoolTimeout:
+            raise  # overload, not a bad request: answered with 503
+        except Exception as e:
+            return failure("Registration", e)
+
+    async def login(self, username: str, password: str) -> Dict[str, Any]:
+        """Authenticate user, create session, and return user info"""
+        user_row = await self.db.fetch_one(SQL_LOGIN_BY_USERNAME, (username,))
+        if not user_row:
+            return dict(INVALID_CREDENTIALS)
+
+        if not await self._in_executor(self.hasher.verify, password, user_row['password_hash']):
+            return dict(INVALID_CREDENTIALS)
+
+        if self.rehash_on_login and self.hasher.needs_rehash(user_row['password_hash']):
+            self._schedule_rehash(user_row['id'], password, user_row['password_hash'])
+
+        if self.tokens is not None:
+            session_id = self.tokens.issue(user_row['id'], user_row['username'])
+        else:
+            session_id = await self._create_cached_session(user_row)
+
+        return login_result(user_row, session_id)
+
+    async def logout(self, session_id: str) -> Dict[str, Any]:
+        """Logout user by removing session from cache (or revoking its token)"""
+        if self.tokens is not None and is_session_token(session_id):
+            claims = self.tokens.verify(session_id)
+            if claims and self.revocations is not None and \
+                    not await self._in_executor(self.revocations.revoke_token, claims):
+                return dict(LOGOUT_FAILED)
+        elif self.cache:
+            key = session_key(session_id)
+            user_id = session_owner(await self.cache.get(key))
+            await self.cache.delete(key)
+            if user_id is not None:
+                await self.cache.hash_delete(session_index_key(user_id), [session_id])
+        return dict(LOGGED_OUT)
+
+    async def logout_all(self, user_id: int) -> Dict[str, Any]:
+        """Logout every session of a user: revoke their tokens, batch-delete cached sessions"""
+        if self.revocations is not None:
+            if not await self._in_executor(self.revocations.revoke_user, user_id):
+                return dict(LOGOUT_FAILED)
+        if not self.cache:
+            return dict(NO_SESSIONS)
+
+        index_keys = session_index_keys(user_id)
+        session_ids, index_count = await self._load_session_index(*index_keys)
+        if not session_ids:
+            return dict(NO_SESSIONS)
+
+        deleted = await self.cache.delete_many([session_key(sid) for sid in session_ids] + index_keys)
+        return logout_all_result(deleted, index_count)
+
+    async def get_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get full user profile by ID (read-through cached, None if not found)"""
+        if not self.profile_cache_ttl:
+            return await self._load_profile(user_id)
+
+        try:
+            cached = await self.cache.get(profile_key(user_id))
+        except Exception:
+            cached = None
+        outcome, profile = read_cached_profile(cached)
+        self._profile_counts[outcome] += 1
+        if outcome != "misses":
+            return profile
+
+        profile = await self._load_profile(user_id)
+        await self._store_profile(user_id, profile)
+        return profile
+
+    async def update_profile(self, user_id: int, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """Update some of full_name / email / address_id / address_detail (write-through)"""
+        statement = profile_update(user_id, fields)
+        if statement is None:
+            return dict(NOTHING_TO_UPDATE)
+
+        try:
+            await self.db.execute(*statement)
+        except PoolTimeout:
+            raise  # 503, as in register
+        except Exception as e:
+            return failure("Update", e)
+
+        profile = await self._load_profile(user_id)
+        if self.profile_cache_ttl:
+            await self._store_profile(user_id, profile)
+            self._profile_counts["writes"] += 1
+        return {"success": True, "profile": profile}
+
+    async def invalidate_profiles(self, user_ids: List[int]) -> int:
+        """Drop cached profiles (call after changing them outside this service)"""
+        if not self.profile_cache_ttl or not user_ids:
+            return 0
+        try:
+            removed = await self.cache.delete_many([profile_key(user_id) for user_id in user_ids])
+        except Exception:
+            return 0
+        self._profile_counts["invalidations"] += removed
+        return removed
+
+    async def invalidate_address_profiles(self, address_ids: List[int]) -> int:
+        """Drop cached profiles of users at updated or deleted addresses (AsyncAddressService.on_change)"""
+        if not self.profile_cache_ttl:
+            return 0
+        user_ids = [row['user_id'] for statement in address_user_queries(address_ids)
+                    for row in await self.db.fetch_all(*statement)]
+        return await self.invalidate_profiles(user_ids)
+
+    def get_profile_cache_stats(self) -> Dict[str, Any]:
+        """Profile cache counters; hit_ratio counts cached "not found" as hits"""
+        return profile_cache_stats(dict(self._profile_counts), self.profile_cache_ttl,
+                                   self.profile_missing_ttl)
+
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Session mode and, in token mode, revocation filter counters"""
+        return {
+            "mode": "token" if self.tokens is not None else "cache",
+            "token_ttl": self.tokens.ttl if self.tokens is not None else None,
+            "revocations": self.revocations.stats() if self.revocations is not None else None,
+        }
+
+    def get_hashing_stats(self) -> Dict[str, Any]:
+        """Cost of new hashes, startup calibration and rehash-on-login counts"""
+        return hashing_stats(self.hasher, self.hash_calibration, self.rehash_on_login, self._rehashes)
+
+    async def wait_for_rehashes(self) -> None:
+        """Let scheduled rehashes finish (shutdown, tests)"""
+        while self._rehash_tasks:
+            await asyncio.gather(*self._rehash_tasks, return_exceptions=True)
+
+    # --- Internal helpers ---
+
+    @staticmethod
+    async def _in_executor(fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+    def _schedule_rehash(self, user_id: int, password: str, old_hash: str) -> None:
+        if self._rehashes.start(user_id):
+            task = asyncio.ensure_future(self._rehash(user_id, password, old_hash))
+            self._rehash_tasks.add(task)
+            task.add_done_callback(self._rehash_tasks.discard)
+
+    async def _rehash(self, user_id: int, password: str, old_hash: str) -> None:
+        error = None
+        try:
+            new_hash = await self._in_executor(self.hasher.hash, password)
+            # Compare-and-set on the old hash: 0 rows if the password changed meanwhile
+            await self.db.execute(SQL_UPDATE_PASSWORD_HASH, (new_hash, user_id, old_hash))
+        except Exception as e:
+            error = e
+        self._rehashes.finish(user_id, error)
+
+    async def _create_cached_session(self, user_row: Dict[str, Any]) -> str:
+        """Session id of a new auth session stored in the cache (see AuthService)"""
+        session_id = str(uuid.uuid4())
+        if self.cache:
+            fields, prune_below = session_index_entry(session_id, time.time(), self.SESSION_TTL)
+            await self.cache.set_with_hash(session_key(session_id), session_payload(user_row, self.codec),
+                                           session_index_key(user_row['id']), fields,
+                                           ttl=self.SESSION_TTL, prune_below=prune_below)
+        return session_id
+
+    async def _load_session_index(self, index_key: str, legacy_key: str) -> Tuple[List[str], int]:
+        try:
+            indexed = await self.cache.hash_get_all(index_key)
+        except Exception:
+            indexed = {}
+        try:
+            legacy_data = await self.cache.get(legacy_key)
+        except Exception:
+            legacy_data = None
+        return merge_session_index(indexed, legacy_data)
+
+    async def _load_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """User and profile rows queried concurrently"""
+        user_row, profile_row = await asyncio.gather(
+            self.db.fetch_one(SQL_USER_BY_ID, (user_id,)),
+            self.db.fetch_one(SQL_PROFILE_BY_USER, (user_id,))
+        )
+        if not user_row:
+            return None
+        return format_user(user_row, format_profile(profile_row))
+
+    async def _store_profile(self, user_id: int, profile: Optional[Dict[str, Any]]) -> None:
+        value, ttl = profile_cache_entry(profile, self.profile_cache_ttl, self.profile_missing_ttl)
+        try:
+            await self.cache.set(profile_key(user_id), value, ttl=ttl)
+        except Exception:
+            pass  # served from the DB until the cache is back
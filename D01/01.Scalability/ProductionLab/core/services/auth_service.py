@@ -2,20 +2,358 @@
 Auth Service - User registration and login logic
 """
 import bcrypt
+import logging
+import threading
+import time
 import uuid
 import json
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 from ..domain import User, UserProfile
-from ..interfaces.database_port import DatabasePort
+from ..interfaces.database_port import DatabasePort, DuplicateKeyError, PoolTimeout
 from ..interfaces.cache_port import CachePort
+from ..interfaces.password_hasher_port import PasswordHasherPort, HasherBusy, DEFAULT_BCRYPT_COST
+from .session_codec import SessionCodec, JsonSessionCodec, decode_auth_session
+from .session_token import SessionTokenSigner, is_session_token
+from .token_revocation import TokenRevocationList
+
+logger = logging.getLogger(__name__)
+
+
+# SQL and pure helpers below are shared with AsyncAuthService
+SQL_INSERT_USER = "INSERT INTO auth_user (username, password_hash) VALUES (%s, %s)"
+SQL_INSERT_PROFILE = """INSERT INTO user_profile 
+                       (user_id, full_name, email, address_id, address_detail) 
+                       VALUES (%s, %s, %s, %s, %s)"""
+# Credentials and profile in one round trip (profile columns NULL if there is no profile row)
+SQL_LOGIN_BY_USERNAME = """SELECT au.id, au.username, au.password_hash,
+                      up.full_name, up.email, up.address_id, up.address_detail,
+                      ma.country, ma.province, ma.district
+               FROM auth_user au
+               LEFT JOIN user_profile up ON up.user_id = au.id
+               LEFT JOIN master_address ma ON up.address_id = ma.id
+               WHERE au.username = %s"""
+# Compare-and-set: a password changed meanwhile is not overwritten
+SQL_UPDATE_PASSWORD_HASH = "UPDATE auth_user SET password_hash = %s WHERE id = %s AND password_hash = %s"
+SQL_USER_BY_ID = "SELECT id, username, created_at FROM auth_user WHERE id = %s"
+SQL_PROFILE_BY_USER = """SELECT up.*, ma.country, ma.province, ma.district
+               FROM user_profile up
+               LEFT JOIN master_address ma ON up.address_id = ma.id
+               WHERE up.user_id = %s"""
+SQL_USER_IDS_BY_ADDRESSES = "SELECT DISTINCT user_id FROM user_profile WHERE address_id IN ({})"
+ADDRESS_IDS_PER_QUERY = 1000  # bounds the statement size of an IN (...) list
+PROFILE_FIELDS = ("full_name", "email", "address_id", "address_detail")
+
+INVALID_CREDENTIALS = {"success": False, "error": "Invalid username or password"}
+USERNAME_TAKEN = {"success": False, "error": "Username already exists"}
+NOTHING_TO_UPDATE = {"success": False, "error": "Nothing to update"}
+LOGGED_OUT = {"success": True, "message": "Logged out successfully"}
+NO_SESSIONS = {"success": True, "sessions_removed": 0}
+# The revocation could not be stored: the token would stay valid, so say so
+LOGOUT_FAILED = {"success": False, "error": "Logout failed, please retry"}
+
+# Bump when the cached profile shape changes: entries written by older code
+# are then never read again and simply expire
+PROFILE_CACHE_VERSION = 1
+PROFILE_MISSING = "null"  # cached "user not found"
+
+
+def hash_password(password: str, rounds: int = DEFAULT_BCRYPT_COST) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+def calibrate_bcrypt_cost(target_seconds: float, min_cost: int = 10,
+                          max_cost: int = 15) -> Dict[str, Any]:
+    """
+    Highest bcrypt cost whose hash takes at most target_seconds on this host.
+    Each cost step doubles the work, so a cheap probe at cost 6 (best of 3)
+    predicts every cost; the pick is then measured and stepped down if it
+    overshoots. Never goes below min_cost (a security floor, even if slow).
+    """
+    def measure(cost: int) -> float:
+        start = time.perf_counter()
+        bcrypt.hashpw(b"calibration", bcrypt.gensalt(cost))
+        return time.perf_counter() - start
+    
+    probe = min(measure(6) for _ in range(3))
+    cost = min_cost
+    for candidate in range(min_cost, max_cost + 1):
+        if probe * 2 ** (candidate - 6) <= target_seconds:
+            cost = candidate
+    seconds = measure(cost)
+    while cost > min_cost and seconds > target_seconds * 1.25:
+        cost -= 1
+        seconds = measure(cost)
+    return {
+        "cost": cost,
+        "hash_seconds": round(seconds, 4),
+        "target_seconds": target_seconds,
+        "min_cost": min_cost,
+        "max_cost": max_cost,
+    }
+
+
+class InlinePasswordHasher(PasswordHasherPort):
+    """bcrypt on the calling thread"""
+    
+    def __init__(self, rounds: int = DEFAULT_BCRYPT_COST):
+        self.rounds = rounds
+    
+    def hash(self, password: str) -> str:
+        return hash_password(password, self.rounds)
+    
+    def verify(self, password: str, password_hash: str) -> bool:
+        return check_password(password, password_hash)
+
+
+def session_payload(user_row: Dict[str, Any], codec: SessionCodec) -> str:
+    """Serialized auth session stored under auth_session:<id>"""
+    return codec.encode_auth(user_row['id'], user_row['username'])
+
+
+def session_key(session_id: str) -> str:
+    return f"auth_session:{session_id}"
+
+
+def session_index_key(user_id: int) -> str:
+    """Per-user hash of session id -> login time, used by logout_all"""
+    return f"user_session_index:{user_id}"
+
+
+def session_index_entry(session_id: str, now: float, ttl: int) -> Tuple[Dict[str, str], float]:
+    """(index fields for a new session, prune_below): sessions logged in before now - ttl have expired"""
+    return {session_id: repr(now)}, now - ttl
+
+
+def session_owner(data: Optional[str]) -> Optional[int]:
+    """User id of a stored auth session, None if missing or unreadable"""
+    try:
+        session = decode_auth_session(data)
+    except Exception:
+        return None
+    return session['user_id'] if session else None
+
+
+def legacy_session_index_key(user_id: int) -> str:
+    """JSON list of session ids written by older releases; read until it expires"""
+    return f"user_sessions:{user_id}"
+
+
+def parse_session_index(data: Optional[str]) -> List[str]:
+    try:
+        return json.loads(data) if data else []
+    except Exception:
+        return []
+
+
+def profile_key(user_id: int) -> str:
+    return f"profile:v{PROFILE_CACHE_VERSION}:{user_id}"
+
+
+def format_profile(profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Shape a user_profile + master_address row for API responses"""
+    if not profile:
+        return {"full_name": None, "email": None, "address": None}
+    
+    return {
+        "full_name": profile.get('full_name'),
+        "email": profile.get('email'),
+        "address": {
+            "country": profile.get('country'),
+            "province": profile.get('province'),
+            "district": profile.get('district'),
+            "detail": profile.get('address_detail')
+        } if profile.get('address_id') else None
+    }
+
+
+def format_user(user_row: Dict[str, Any], profile: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": user_row['id'],
+        "username": user_row['username'],
+        "created_at": str(user_row['created_at']) if user_row.get('created_at') else None,
+        **profile
+    }
+
+
+def failure(action: str, error: Exception) -> Dict[str, Any]:
+    return {"success": False, "error": f"{action} failed: {str(error)}"}
+
+
+def registered(user_id: int) -> Dict[str, Any]:
+    return {"success": True, "user_id": user_id, "message": "User registered successfully"}
+
+
+def login_result(user_row: Dict[str, Any], session_id: str) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "session_id": session_id,
+        "user": {
+            "id": user_row['id'],
+            "username": user_row['username'],
+            **format_profile(user_row)
+        }
+    }
+
+
+def profile_update(user_id: int, fields: Dict[str, Any]) -> Optional[Tuple[str, Tuple[Any, ...]]]:
+    """(UPDATE statement, params) for the PROFILE_FIELDS present in fields; None if there are none"""
+    columns = [name for name in PROFILE_FIELDS if name in fields]
+    if not columns:
+        return None
+    return (f"UPDATE user_profile SET {', '.join(f'{name} = %s' for name in columns)} WHERE user_id = %s",
+            tuple(fields[name] for name in columns) + (user_id,))
+
+
+def address_user_queries(address_ids: List[int]) -> List[Tuple[str, Tuple[int, ...]]]:
+    """(statement, params) listing the users at these addresses: one IN (...) query per chunk"""
+    ids = list(dict.fromkeys(address_ids))
+    return [(SQL_USER_IDS_BY_ADDRESSES.format(", ".join(["%s"] * len(chunk))), tuple(chunk))
+            for chunk in (ids[i:i + ADDRESS_IDS_PER_QUERY] for i in range(0, len(ids), ADDRESS_IDS_PER_QUERY))]
+
+
+def session_index_keys(user_id: int) -> List[str]:
+    """Index keys read by logout_all: the hash, then the legacy JSON list"""
+    return [session_index_key(user_id), legacy_session_index_key(user_id)]
+
+
+def merge_session_index(indexed: Iterable[str], legacy_data: Optional[str]) -> Tuple[List[str], int]:
+    """(session ids from both index keys, how many of the keys held any)"""
+    session_ids = list(indexed)
+    legacy_ids = parse_session_index(legacy_data)
+    return list(dict.fromkeys(session_ids + legacy_ids)), bool(session_ids) + bool(legacy_ids)
+
+
+def logout_all_result(deleted: int, index_count: int) -> Dict[str, Any]:
+    """Result of deleting the sessions and index keys; the index keys themselves are not sessions"""
+    return {
+        "success": True,
+        "sessions_removed": max(0, deleted - index_count),
+        "message": "Logged out from all sessions"
+    }
+
+
+def read_cached_profile(cached: Optional[str]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """(counter to bump, profile) for a profile cache lookup; a "misses" result needs the DB"""
+    if cached is None:
+        return "misses", None
+    if cached == PROFILE_MISSING:
+        return "missing_hits", None
+    return "hits", json.loads(cached)
+
+
+def profile_cache_entry(profile: Optional[Dict[str, Any]], ttl: int,
+                        missing_ttl: int) -> Tuple[str, int]:
+    """(value, ttl) to cache for a loaded profile; None (not found) is cached briefly"""
+    if profile is None:
+        return PROFILE_MISSING, missing_ttl
+    return json.dumps(profile), ttl
+
+
+def profile_cache_stats(counts: Dict[str, int], ttl: int, missing_ttl: int) -> Dict[str, Any]:
+    """Profile cache counters; hit_ratio counts cached "not found" as hits"""
+    hits = counts["hits"] + counts["missing_hits"]
+    lookups = hits + counts["misses"]
+    return {
+        "enabled": bool(ttl),
+        "ttl": ttl,
+        "missing_ttl": missing_ttl,
+        **counts,
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+def new_profile_counts() -> Dict[str, int]:
+    return {"hits": 0, "missing_hits": 0, "misses": 0, "writes": 0, "invalidations": 0}
+
+
+class RehashTracker:
+    """
+    Rehash-on-login bookkeeping: at most one rehash per user in flight, and
+    how they ended. The services only decide where the work runs.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = set()  # user ids queued or in progress
+        self._counts = {"rehashed": 0, "busy": 0, "failed": 0}
+    
+    def start(self, user_id: int) -> bool:
+        """False if this user's hash is already being redone"""
+        with self._lock:
+            if user_id in self._pending:
+                return False
+            self._pending.add(user_id)
+            return True
+    
+    def finish(self, user_id: int, error: Optional[BaseException] = None) -> None:
+        if error is None:
+            outcome = "rehashed"
+        elif isinstance(error, HasherBusy):
+            outcome = "busy"  # logins come first; retried on the next login
+        else:
+            outcome = "failed"
+            logger.error("rehash of user %s failed", user_id, exc_info=error)
+        with self._lock:
+            self._pending.discard(user_id)
+            self._counts[outcome] += 1
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"rehash_pending": len(self._pending), **self._counts}
+
+
+def hashing_stats(hasher: PasswordHasherPort, calibration: Optional[Dict[str, Any]],
+                  rehash_on_login: bool, rehashes: RehashTracker) -> Dict[str, Any]:
+    """Cost of new hashes, startup calibration and rehash-on-login counts"""
+    return {
+        "cost": hasher.rounds,
+        "calibration": calibration,
+        "rehash_on_login": rehash_on_login,
+        **rehashes.stats(),
+    }
 
 
 class AuthService:
     SESSION_TTL = 3600  # 1 hour
+    PROFILE_CACHE_TTL = 300
+    PROFILE_MISSING_TTL = 30
     
-    def __init__(self, db: DatabasePort, cache: CachePort = None):
+    def __init__(self, db: DatabasePort, cache: CachePort = None, codec: SessionCodec = None,
+                 hasher: PasswordHasherPort = None, rehash_on_login: bool = True,
+                 hash_calibration: Optional[Dict[str, Any]] = None,
+                 profile_cache_ttl: int = PROFILE_CACHE_TTL,
+                 profile_missing_ttl: int = PROFILE_MISSING_TTL,
+                 tokens: Optional[SessionTokenSigner] = None,
+                 revocations: Optional[TokenRevocationList] = None):
         self.db = db
         self.cache = cache
+        self.codec = codec or JsonSessionCodec()
+        # Token mode: login returns a signed token as session_id and writes
+        # nothing to the cache; logout records the token in `revocations`
+        self.tokens = tokens
+        self.revocations = revocations
+        # get_profile is read-through cached under profile_key(user_id) (0 = off).
+        # Writes through this service refresh the entry; profile_missing_ttl
+        # caches "user not found" briefly so unknown ids do not hit the DB each time
+        self.profile_cache_ttl = profile_cache_ttl if cache is not None else 0
+        self.profile_missing_ttl = profile_missing_ttl
+        self._profile_lock = threading.Lock()
+        self._profile_counts = new_profile_counts()
+        # bcrypt costs 100+ ms of CPU: main.py passes a ProcessPoolHasher that
+        # bounds how many requests hash at once and rejects the rest (HasherBusy)
+        self.hasher = hasher or InlinePasswordHasher()
+        # Hashes with another cost than hasher.rounds are redone after a
+        # successful login, off the request path (one background thread)
+        self.rehash_on_login = rehash_on_login
+        self.hash_calibration = hash_calibration
+        self._rehashes = RehashTracker()
+        self._rehash_lock = threading.Lock()
+        self._rehash_executor: Optional[ThreadPoolExecutor] = None
     
     def register(self, username: str, password: str, 
                  full_name: str = None, email: str = None,
@@ -24,126 +362,237 @@ class AuthService:
         Register a new user.
         Uses transaction to ensure consistency:
         - If user_profile insert fails, auth_user is rolled back
+        A taken username is caught by UNIQUE(username) on insert rather than
+        checked first: one round trip less, and no race between check and insert.
         """
-        # Check if username exists
-        existing = self.db.fetch_one(
-            "SELECT id FROM auth_user WHERE username = %s", (username,)
-        )
-        if existing:
-            return {"success": False, "error": "Username already exists"}
-        
-        # Hash password
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        # Hash password (HasherBusy propagates: the route answers 503)
+        password_hash = self.hasher.hash(password)
         
         try:
             # Use transaction for atomicity
             with self.db.transaction() as tx:
                 # Create auth_user
-                user_id = tx.insert(
-                    "INSERT INTO auth_user (username, password_hash) VALUES (%s, %s)",
-                    (username, password_hash)
-                )
+                user_id = tx.insert(SQL_INSERT_USER, (username, password_hash))
                 
                 # Create user_profile
                 tx.insert(
-                    """INSERT INTO user_profile 
-                       (user_id, full_name, email, address_id, address_detail) 
-                       VALUES (%s, %s, %s, %s, %s)""",
+                    SQL_INSERT_PROFILE,
                     (user_id, full_name, email, address_id, address_detail)
                 )
+            # Drop a cached "not found" for this id
+            self.invalidate_profiles([user_id])
             
-            return {
-                "success": True,
-                "user_id": user_id,
-                "message": "User registered successfully"
-            }
+            return registered(user_id)
+        except DuplicateKeyError:
+            return dict(USERNAME_TAKEN)
+        except PoolTimeout:
+            raise  # overload, not a bad request: the app answers 503
         except Exception as e:
-            return {
-                "success": False,
-                "error": f"Registration failed: {str(e)}"
-            }
+            return failure("Registration", e)
     
     def login(self, username: str, password: str) -> Dict[str, Any]:
         """Authenticate user, create session, and return user info"""
-        # Get user
-        user_row = self.db.fetch_one(
-            "SELECT id, username, password_hash FROM auth_user WHERE username = %s",
-            (username,)
-        )
+        # Get user and profile (one query)
+        user_row = self.db.fetch_one(SQL_LOGIN_BY_USERNAME, (username,))
         
         if not user_row:
-            return {"success": False, "error": "Invalid username or password"}
+            return dict(INVALID_CREDENTIALS)
         
         # Verify password
-        if not bcrypt.checkpw(password.encode('utf-8'), user_row['password_hash'].encode('utf-8')):
-            return {"success": False, "error": "Invalid username or password"}
+        if not self.hasher.verify(password, user_row['password_hash']):
+            return dict(INVALID_CREDENTIALS)
         
-        # Create session in cache
-        session_id = str(uuid.uuid4())
-        if self.cache:
-            session_data = json.dumps({
-                "user_id": user_row['id'],
-                "username": user_row['username']
-            })
-            self.cache.set(f"auth_session:{session_id}", session_data, ttl=self.SESSION_TTL)
+        if self.rehash_on_login and self.hasher.needs_rehash(user_row['password_hash']):
+            self._schedule_rehash(user_row['id'], password, user_row['password_hash'])
         
-        # Get profile
-        profile = self._get_user_profile(user_row['id'])
+        if self.tokens is not None:
+            # Stateless: login_required verifies the signature, no cache write
+            session_id = self.tokens.issue(user_row['id'], user_row['username'])
+        else:
+            session_id = self._create_cached_session(user_row)
         
-        return {
-            "success": True,
-            "session_id": session_id,
-            "user": {
-                "id": user_row['id'],
-                "username": user_row['username'],
-                **profile
-            }
-        }
+        return login_result(user_row, session_id)
     
     def logout(self, session_id: str) -> Dict[str, Any]:
-        """Logout user by removing session from cache"""
-        if self.cache:
-            self.cache.delete(f"auth_session:{session_id}")
-        return {"success": True, "message": "Logged out successfully"}
+        """Logout user by removing session from cache (or revoking its token)"""
+        if self.tokens is not None and is_session_token(session_id):
+            claims = self.tokens.verify(session_id)
+            if claims and self.revocations is not None and not self.revocations.revoke_token(claims):
+                return dict(LOGOUT_FAILED)
+        elif self.cache:
+            key = session_key(session_id)
+            user_id = session_owner(self.cache.get(key))
+            self.cache.delete(key)
+            if user_id is not None:
+                self.cache.hash_delete(session_index_key(user_id), [session_id])
+        return dict(LOGGED_OUT)
+    
+    def logout_all(self, user_id: int) -> Dict[str, Any]:
+        """Logout every session of a user (all devices): revoke their tokens, batch-delete cached sessions"""
+        if self.revocations is not None:
+            # Every token issued until now; cached sessions from before token mode below
+            if not self.revocations.revoke_user(user_id):
+                return dict(LOGOUT_FAILED)
+        if not self.cache:
+            return dict(NO_SESSIONS)
+        
+        index_keys = session_index_keys(user_id)
+        session_ids, index_count = self._load_session_index(*index_keys)
+        if not session_ids:
+            return dict(NO_SESSIONS)
+        
+        deleted = self.cache.delete_many([session_key(sid) for sid in session_ids] + index_keys)
+        return logout_all_result(deleted, index_count)
     
     def get_profile(self, user_id: int) -> Optional[Dict[str, Any]]:
-        """Get full user profile by ID"""
-        user_row = self.db.fetch_one(
-            "SELECT id, username, created_at FROM auth_user WHERE id = %s", (user_id,)
-        )
-        if not user_row:
-            return None
+        """Get full user profile by ID (read-through cached, None if not found)"""
+        if not self.profile_cache_ttl:
+            return self._load_profile(user_id, read_only=True)
         
-        profile = self._get_user_profile(user_id)
+        key = profile_key(user_id)
+        try:
+            cached = self.cache.get(key)
+        except Exception:
+            cached = None
+        outcome, profile = read_cached_profile(cached)
+        self._count_profile(outcome)
+        if outcome != "misses":
+            return profile
         
-        return {
-            "id": user_row['id'],
-            "username": user_row['username'],
-            "created_at": str(user_row['created_at']) if user_row.get('created_at') else None,
-            **profile
-        }
+        # Profile reads may come from a replica (read-your-writes pins them after a write).
+        # A miss racing update_profile can store the older row; the TTL bounds that
+        profile = self._load_profile(user_id, read_only=True)
+        self._store_profile(user_id, profile)
+        return profile
     
-    def _get_user_profile(self, user_id: int) -> Dict[str, Any]:
-        """Internal helper to get user profile with address"""
-        profile = self.db.fetch_one(
-            """SELECT up.*, ma.country, ma.province, ma.district
-               FROM user_profile up
-               LEFT JOIN master_address ma ON up.address_id = ma.id
-               WHERE up.user_id = %s""",
-            (user_id,)
-        )
+    def update_profile(self, user_id: int, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Update some of full_name / email / address_id / address_detail.
+        Write-through: the cached profile is replaced with the row as
+        committed (read back from the primary), not just dropped.
+        """
+        statement = profile_update(user_id, fields)
+        if statement is None:
+            return dict(NOTHING_TO_UPDATE)
         
-        if not profile:
-            return {"full_name": None, "email": None, "address": None}
+        try:
+            self.db.execute(*statement)
+        except PoolTimeout:
+            raise  # 503, as in register
+        except Exception as e:
+            return failure("Update", e)
         
+        profile = self._load_profile(user_id)
+        if self.profile_cache_ttl:
+            self._store_profile(user_id, profile)
+            self._count_profile("writes")
+        return {"success": True, "profile": profile}
+    
+    def invalidate_profiles(self, user_ids: List[int]) -> int:
+        """Drop cached profiles (call after changing them outside this service)"""
+        if not self.profile_cache_ttl or not user_ids:
+            return 0
+        try:
+            removed = self.cache.delete_many([profile_key(user_id) for user_id in user_ids])
+        except Exception:
+            return 0
+        self._count_profile("invalidations", removed)
+        return removed
+    
+    def invalidate_address_profiles(self, address_ids: List[int]) -> int:
+        """
+        Drop cached profiles of users living at these addresses (call after
+        updating or deleting master_address rows; new rows affect nobody).
+        AddressService calls it through on_change.
+        """
+        if not self.profile_cache_ttl:
+            return 0
+        user_ids = [row['user_id'] for statement in address_user_queries(address_ids)
+                    for row in self.db.fetch_all(*statement)]
+        return self.invalidate_profiles(user_ids)
+    
+    def get_profile_cache_stats(self) -> Dict[str, Any]:
+        """Profile cache counters; hit_ratio counts cached "not found" as hits"""
+        with self._profile_lock:
+            counts = dict(self._profile_counts)
+        return profile_cache_stats(counts, self.profile_cache_ttl, self.profile_missing_ttl)
+    
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Session mode and, in token mode, revocation filter counters"""
         return {
-            "full_name": profile.get('full_name'),
-            "email": profile.get('email'),
-            "address": {
-                "country": profile.get('country'),
-                "province": profile.get('province'),
-                "district": profile.get('district'),
-                "detail": profile.get('address_detail')
-            } if profile.get('address_id') else None
+            "mode": "token" if self.tokens is not None else "cache",
+            "token_ttl": self.tokens.ttl if self.tokens is not None else None,
+            "revocations": self.revocations.stats() if self.revocations is not None else None,
         }
-
+    
+    def get_hashing_stats(self) -> Dict[str, Any]:
+        """Cost of new hashes, startup calibration and rehash-on-login counts"""
+        return hashing_stats(self.hasher, self.hash_calibration, self.rehash_on_login, self._rehashes)
+    
+    def _schedule_rehash(self, user_id: int, password: str, old_hash: str) -> None:
+        if not self._rehashes.start(user_id):
+            return
+        with self._rehash_lock:
+            if self._rehash_executor is None:
+                self._rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rehash")
+            executor = self._rehash_executor
+        executor.submit(self._rehash, user_id, password, old_hash)
+    
+    def _rehash(self, user_id: int, password: str, old_hash: str) -> None:
+        error = None
+        try:
+            new_hash = self.hasher.hash(password)
+            # Compare-and-set on the old hash: 0 rows if the password changed meanwhile
+            self.db.execute(SQL_UPDATE_PASSWORD_HASH, (new_hash, user_id, old_hash))
+        except Exception as e:
+            error = e
+        self._rehashes.finish(user_id, error)
+    
+    def _create_cached_session(self, user_row: Dict[str, Any]) -> str:
+        """Session id of a new auth session stored in the cache"""
+        session_id = str(uuid.uuid4())
+        if self.cache:
+            # One field per session (its login time): no read first, and concurrent
+            # logins cannot overwrite each other's entries. The same write drops the
+            # fields of sessions that have expired, and logout removes its own, so
+            # the index only lists sessions that may still exist. Session and index
+            # are written together (one round trip on Redis)
+            fields, prune_below = session_index_entry(session_id, time.time(), self.SESSION_TTL)
+            self.cache.set_with_hash(session_key(session_id), session_payload(user_row, self.codec),
+                                     session_index_key(user_row['id']), fields,
+                                     ttl=self.SESSION_TTL, prune_below=prune_below)
+        return session_id
+    
+    def _load_session_index(self, index_key: str, legacy_key: str) -> Tuple[List[str], int]:
+        """(session ids tracked for a user, how many index keys held any)"""
+        try:
+            indexed = self.cache.hash_get_all(index_key)
+        except Exception:
+            indexed = {}
+        try:
+            legacy_data = self.cache.get(legacy_key)
+        except Exception:
+            legacy_data = None
+        return merge_session_index(indexed, legacy_data)
+    
+    def _get_user_profile(self, user_id: int, read_only: bool = False) -> Dict[str, Any]:
+        """Internal helper to get user profile with address"""
+        profile = self.db.fetch_one(SQL_PROFILE_BY_USER, (user_id,), read_only=read_only)
+        return format_profile(profile)
+    
+    def _load_profile(self, user_id: int, read_only: bool = False) -> Optional[Dict[str, Any]]:
+        user_row = self.db.fetch_one(SQL_USER_BY_ID, (user_id,), read_only=read_only)
+        if not user_row:
+            return None
+        return format_user(user_row, self._get_user_profile(user_id, read_only=read_only))
+    
+    def _store_profile(self, user_id: int, profile: Optional[Dict[str, Any]]) -> None:
+        value, ttl = profile_cache_entry(profile, self.profile_cache_ttl, self.profile_missing_ttl)
+        try:
+            self.cache.set(profile_key(user_id), value, ttl=ttl)
+        except Exception:
+            pass  # served from the DB until the cache is back
+    
+    def _count_profile(self, name: str, amount: int = 1) -> None:
+        with self._profile_lock:
+            self._profile_counts[name] += amount
@@ -0,0 +1,205 @@
+"""
+Session Codec - Serialization of app and auth sessions stored in the cache
+
+Every encoded value starts with a marker character that names its codec,
+so any codec can be selected for writing while values written by another
+codec (e.g. JSON sessions from before a switch) still decode:
+
+    '{'  JSON (the original format)
+    '~'  compact: versioned struct layout, base64 text
+    '^'  msgpack (optional dependency), base64 text
+
+Binary layouts are carried as base64 because CachePort values are str
+(Redis is used with decode_responses=True).
+"""
+import base64
+import json
+import struct
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+from ..domain import SessionData
+
+try:
+    import msgpack
+except ImportError:  # optional: only needed for SESSION_CODEC=msgpack
+    msgpack = None
+
+
+class SessionCodec(ABC):
+    name = "base"
+    marker = ""
+
+    @abstractmethod
+    def encode_session(self, session_data: SessionData) -> str:
+        """Encode an app session (session:<id>)"""
+        pass
+
+    @abstractmethod
+    def decode_session(self, data: str) -> SessionData:
+        pass
+
+    @abstractmethod
+    def encode_auth(self, user_id: int, username: str) -> str:
+        """Encode an auth session (auth_session:<id>)"""
+        pass
+
+    @abstractmethod
+    def decode_auth(self, data: str) -> Dict[str, Any]:
+        """Returns {"user_id": ..., "username": ...}"""
+        pass
+
+
+class JsonSessionCodec(SessionCodec):
+    name = "json"
+    marker = "{"
+
+    def encode_session(self, session_data: SessionData) -> str:
+        return json.dumps({
+            "session_id": session_data.session_id,
+            "user_data": session_data.user_data,
+            "created_at": session_data.created_at
+        })
+
+    def decode_session(self, data: str) -> SessionData:
+        return SessionData(**json.loads(data))
+
+    def encode_auth(self, user_id: int, username: str) -> str:
+        return json.dumps({"user_id": user_id, "username": username})
+
+    def decode_auth(self, data: str) -> Dict[str, Any]:
+        return json.loads(data)
+
+
+class CompactSessionCodec(SessionCodec):
+    """
+    Fixed struct layouts, tagged by a layout byte:
+        0x01 app session:  tag, created_at (f64), visits (u32), session uuid (16 bytes)
+        0x02 auth session: tag, user_id (u64), username (utf-8, rest of buffer)
+    App sessions that do not fit the layout (extra user_data, non-uuid id)
+    are written as JSON instead.
+    """
+    name = "compact"
+    marker = "~"
+    APP_V1 = 0x01
+    AUTH_V1 = 0x02
+    _APP = struct.Struct("<BdI16s")
+    _AUTH = struct.Struct("<BQ")
+    _JSON = JsonSessionCodec()
+
+    def encode_session(self, session_data: SessionData) -> str:
+        user_data = session_data.user_data
+        visits = user_data.get("visits")
+        sid = self._uuid_bytes(session_data.session_id)
+        if sid is None or len(user_data) != 1 or type(visits) is not int or not 0 <= visits < 2 ** 32:
+            return self._JSON.encode_session(session_data)
+        return self._wrap(self._APP.pack(self.APP_V1, session_data.created_at, visits, sid))
+
+    def decode_session(self, data: str) -> SessionData:
+        tag, created_at, visits, sid = self._APP.unpack(self._unwrap(data))
+        if tag != self.APP_V1:
+            raise ValueError(f"unexpected layout {tag}")
+        h = sid.hex()
+        return SessionData(f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}",
+                           {"visits": visits}, created_at)
+
+    def encode_auth(self, user_id: int, username: str) -> str:
+        return self._wrap(self._AUTH.pack(self.AUTH_V1, user_id) + username.encode("utf-8"))
+
+    def decode_auth(self, data: str) -> Dict[str, Any]:
+        raw = self._unwrap(data)
+        tag, user_id = self._AUTH.unpack_from(raw)
+        if tag != self.AUTH_V1:
+            raise ValueError(f"unexpected layout {tag}")
+        return {"user_id": user_id, "username": raw[self._AUTH.size:].decode("utf-8")}
+
+    def _wrap(self, raw: bytes) -> str:
+        return self.marker + base64.b64encode(raw).decode("ascii")
+
+    def _unwrap(self, data: str) -> bytes:
+        return base64.b64decode(data[1:])
+
+    @staticmethod
+    def _uuid_bytes(session_id: str) -> Optional[bytes]:
+        """16 raw bytes of a canonical lowercase uuid string, else None"""
+        if len(session_id) != 36 or session_id.count("-") != 4 or session_id != session_id.lower():
+            return None
+        try:
+            raw = bytes.fromhex(session_id.replace("-", ""))
+        except ValueError:
+            return None
+        h = raw.hex()
+        if session_id != f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}":
+            return None
+        return raw
+
+
+class MsgpackSessionCodec(SessionCodec):
+    """msgpack arrays: [1, session_id, user_data, created_at] / [2, user_id, username]"""
+    name = "msgpack"
+    marker = "^"
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError("msgpack is required for SESSION_CODEC=msgpack")
+
+    def encode_session(self, session_data: SessionData) -> str:
+        return self._wrap([1, session_data.session_id, session_data.user_data, session_data.created_at])
+
+    def decode_session(self, data: str) -> SessionData:
+        _, session_id, user_data, created_at = self._unwrap(data)
+        return SessionData(session_id, user_data, created_at)
+
+    def encode_auth(self, user_id: int, username: str) -> str:
+        return self._wrap([2, user_id, username])
+
+    def decode_auth(self, data: str) -> Dict[str, Any]:
+        _, user_id, username = self._unwrap(data)
+        return {"user_id": user_id, "username": username}
+
+    def _wrap(self, value) -> str:
+        return self.marker + base64.b64encode(msgpack.packb(value)).decode("ascii")
+
+    def _unwrap(self, data: str):
+        return msgpack.unpackb(base64.b64decode(data[1:]))
+
+
+SESSION_CODECS = {
+    JsonSessionCodec.name: JsonSessionCodec,
+    CompactSessionCodec.name: CompactSessionCodec,
+    MsgpackSessionCodec.name: MsgpackSessionCodec,
+}
+
+_decoders: Dict[str, SessionCodec] = {}
+
+
+def create_session_codec(name: str) -> SessionCodec:
+    try:
+        return SESSION_CODECS[name.lower()]()
+    except KeyError:
+        raise ValueError(f"Unknown session codec: {name!r} (expected one of {sorted(SESSION_CODECS)})")
+
+
+def _decoder_for(data: str) -> SessionCodec:
+    codec = _decoders.get(data[0])
+    if codec is None:
+        for cls in SESSION_CODECS.values():
+            if cls.marker == data[0]:
+                codec = _decoders[data[0]] = cls()
+                break
+        else:
+            raise ValueError("unknown session encoding")
+    return codec
+
+
+def decode_session(data: Optional[str]) -> Optional[SessionData]:
+    """Decode an app session written by any codec"""
+    if not data:
+        return None
+    return _decoder_for(data).decode_session(data)
+
+
+def decode_auth_session(data: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Decode an auth session written by any codec"""
+    if not data:
+        return None
+    return _decoder_for(data).decode_auth(data)
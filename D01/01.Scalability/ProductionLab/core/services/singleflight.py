@@ -0,0 +1,55 @@
+"""
+Single Flight - Coalesce concurrent calls for the same key
+
+While a call for a key is in flight, other callers for that key wait for
+its result instead of running their own copy. Used to stop a cold cache
+from turning one popular miss into N identical database queries.
+"""
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn() once per key at a time.
+        Returns (value, shared); shared is True when this caller waited on
+        another caller's result. Errors are re-raised in every waiter.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
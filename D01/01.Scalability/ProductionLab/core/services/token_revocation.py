@@ -0,0 +1,241 @@
+"""
+Token Revocation - Logged-out session tokens, checked without a cache round trip
+
+A signed session token stays valid until it expires, so logout has to
+record it somewhere every worker can see. Each revocation is written to
+the cache twice:
+
+    revoked_token:<token id>   exact record, until the token would expire
+    revoked_user:<user id>     logout_all: tokens issued up to this time
+    revocations:<bucket>       hash of entries revoked in that bucket_seconds window
+
+Every worker keeps a Bloom filter of the recent buckets in memory and
+re-reads the newest ones every sync interval. A token missing from the
+filter is certainly not revoked (no cache call, the common case); a hit is
+confirmed against the exact record, which also rules out false positives.
+Revocations made in this worker apply at once, those of other workers after
+their next sync. The filter is rebuilt from the buckets every ttl / 4 so
+expired entries drop out and the false positive rate stays near error_rate.
+
+The cache is used through cache.raising(), so an outage is never read as
+"not revoked": a failed lookup treats the token as revoked (fails closed),
+and a revocation that could not be written is reported to the caller.
+"""
+import hashlib
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from ..interfaces.cache_port import CachePort
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for `capacity` entries at `error_rate` false positives"""
+    
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+    
+    def add(self, entry: str) -> None:
+        for position in self._positions(entry):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def __contains__(self, entry: str) -> bool:
+        # Most lookups are misses: stop at the first clear bit
+        for position in self._positions(entry):
+            if not self._bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+    
+    def _positions(self, entry: str):
+        # Double hashing: k positions from one 128-bit digest
+        digest = hashlib.blake2b(entry.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+
+def revoked_token_key(token_id: str) -> str:
+    return f"revoked_token:{token_id}"
+
+
+def revoked_user_key(user_id: int) -> str:
+    return f"revoked_user:{user_id}"
+
+
+def revocation_bucket_key(bucket: int) -> str:
+    return f"revocations:{bucket}"
+
+
+class TokenRevocationList:
+    def __init__(self, cache: CachePort, ttl: int = 3600, bucket_seconds: int = 60,
+                 capacity: int = 100_000, error_rate: float = 0.01):
+        self.cache = cache.raising()
+        self.ttl = ttl  # lifetime of the tokens (SessionTokenSigner.ttl)
+        self.bucket_seconds = bucket_seconds
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rebuild_interval = ttl / 4
+        self._lock = threading.Lock()
+        self._filter = BloomFilter(capacity, error_rate)
+        self._rebuilt_at = 0.0
+        self._synced_bucket: Optional[int] = None
+        self._since_rebuild: Optional[List[str]] = None  # local entries while a rebuild runs
+        self._counts = {"checks": 0, "filter_hits": 0, "revoked": 0, "false_positives": 0,
+                        "errors": 0, "syncs": 0, "rebuilds": 0, "sync_errors": 0,
+                        "revoke_errors": 0}
+        self._stop = threading.Event()
+        self._syncer: Optional[threading.Thread] = None
+    
+    def revoke_token(self, claims: Dict[str, Any]) -> bool:
+        """Revoke one token (logout) until it would have expired; False if not recorded"""
+        remaining = max(1, int(claims["expires_at"] - time.time()))
+        return self._revoke(revoked_token_key(claims["token_id"]), "1", remaining,
+                            f"t:{claims['token_id']}")
+    
+    def revoke_user(self, user_id: int) -> bool:
+        """Revoke every token of a user issued until now (logout_all); False if not recorded"""
+        return self._revoke(revoked_user_key(user_id), repr(time.time()), self.ttl, f"u:{user_id}")
+    
+    def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        """Filter first; only a filter hit costs a cache lookup. Fails closed if that lookup errors"""
+        hits = self.filter_hits(claims)
+        return any(hits) and self.confirm(claims, hits)
+    
+    def filter_hits(self, claims: Dict[str, Any]) -> Tuple[bool, bool]:
+        """(token entry, user entry) matched by the filter; memory only, so safe on an event loop"""
+        with self._lock:
+            self._counts["checks"] += 1
+            bloom = self._filter
+        return f"t:{claims['token_id']}" in bloom, f"u:{claims['user_id']}" in bloom
+    
+    def confirm(self, claims: Dict[str, Any], hits: Tuple[bool, bool]) -> bool:
+        """Check filter hits against the exact records in the cache (fails closed)"""
+        token_hit, user_hit = hits
+        try:
+            revoked = token_hit and self.cache.exists(revoked_token_key(claims["token_id"]))
+            if not revoked and user_hit:
+                revoked_at = self.cache.get(revoked_user_key(claims["user_id"]))
+                revoked = revoked_at is not None and claims["issued_at"] <= float(revoked_at)
+            outcome = "revoked" if revoked else "false_positives"
+        except Exception:
+            revoked, outcome = True, "errors"  # fail closed
+        with self._lock:
+            self._counts["filter_hits"] += 1
+            self._counts[outcome] += 1
+        return revoked
+    
+    def sync(self, full: bool = False) -> int:
+        """
+        Load revocations of other workers from the cache; number of entries read.
+        Re-reads from the last synced bucket (entries may have landed after it
+        was read); every rebuild_interval, or with full=True, rebuilds the
+        filter from all buckets young enough to hold an unexpired token.
+        """
+        now = time.time()
+        current = self._bucket(now)
+        with self._lock:
+            full = full or self._synced_bucket is None or now - self._rebuilt_at >= self.rebuild_interval
+            first = self._bucket(now - self.ttl) - 1 if full else self._synced_bucket - 1
+            if full:
+                self._since_rebuild = []
+        
+        try:
+            entries = self._read_buckets(range(first, current + 1))
+        except Exception:
+            with self._lock:
+                self._since_rebuild = None
+                self._counts["sync_errors"] += 1
+            raise
+        
+        with self._lock:
+            if full:
+                bloom = BloomFilter(self.capacity, self.error_rate)
+                for entry in entries + self._since_rebuild:
+                    bloom.add(entry)
+                self._filter, self._since_rebuild, self._rebuilt_at = bloom, None, now
+                self._counts["rebuilds"] += 1
+            else:
+                for entry in entries:
+                    if entry not in self._filter:
+                        self._filter.add(entry)
+            self._synced_bucket = current
+            self._counts["syncs"] += 1
+        return len(entries)
+    
+    def start_sync(self, interval: float = 1.0) -> None:
+        """Daemon thread running sync() every `interval` seconds"""
+        if self._syncer is not None:
+            return
+        self._stop.clear()
+        
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    self.sync()
+                except Exception:
+                    pass  # keep the current filter; retried next interval
+        
+        self._syncer = threading.Thread(target=run, name="token-revocations", daemon=True)
+        self._syncer.start()
+    
+    def stop_sync(self) -> None:
+        if self._syncer is not None:
+            self._stop.set()
+            self._syncer.join()
+            self._syncer = None
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            bloom = self._filter
+            return {
+                "filter_entries": bloom.count,
+                "filter_bits": bloom.size,
+                "filter_hashes": bloom.hashes,
+                "capacity": self.capacity,
+                "error_rate": self.error_rate,
+                "synced_bucket": self._synced_bucket,
+                "rebuilt_at": self._rebuilt_at,
+                **self._counts,
+            }
+    
+    # --- Internal helpers ---
+    
+    def _bucket(self, at: float) -> int:
+        return int(at // self.bucket_seconds)
+    
+    def _revoke(self, key: str, value: str, ttl: int, entry: str) -> bool:
+        """Write the exact record, then announce it; False if either write failed"""
+        try:
+            recorded = self.cache.set(key, value, ttl=ttl) is not False
+            # Without the record a filter hit would not confirm: only announce what was stored
+            published = recorded and self._publish(entry)
+        except Exception:
+            recorded = published = False
+        if recorded:
+            # The exact record is enough for this worker, even if others miss the announcement
+            self._add_local(entry)
+        if not published:
+            with self._lock:
+                self._counts["revoke_errors"] += 1
+        return recorded and published
+    
+    def _publish(self, entry: str) -> bool:
+        """Record an entry in the current bucket for other workers"""
+        return self.cache.hash_set(revocation_bucket_key(self._bucket(time.time())), {entry: "1"},
+                                   ttl=self.ttl + self.bucket_seconds) is not False
+    
+    def _add_local(self, entry: str) -> None:
+        with self._lock:
+            self._filter.add(entry)
+            if self._since_rebuild is not None:
+                self._since_rebuild.append(entry)
+    
+    def _read_buckets(self, buckets: Iterable[int]) -> List[str]:
+        entries: List[str] = []
+        for bucket in buckets:
+            entries.extend(self.cache.hash_get_all(revocation_bucket_key(bucket)))
+        return entries
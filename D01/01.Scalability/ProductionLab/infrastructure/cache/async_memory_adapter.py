@@ -0,0 +1,59 @@
+"""
+Async Memory Adapter - AsyncCachePort over an in-process cache
+(MemoryAdapter by default; tests/fallback). Operations never block on I/O,
+so they run inline.
+"""
+from typing import Optional, Dict, Iterable, Any
+from core.interfaces.async_cache_port import AsyncCachePort
+from core.interfaces.cache_port import CachePort
+from .memory_adapter import MemoryAdapter
+
+
+class AsyncMemoryAdapter(AsyncCachePort):
+    def __init__(self, inner: Optional[CachePort] = None):
+        self.inner = inner or MemoryAdapter()
+    
+    async def get(self, key: str) -> Optional[str]:
+        return self.inner.get(key)
+    
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        return self.inner.set(key, value, ttl)
+    
+    async def delete(self, key: str) -> bool:
+        return self.inner.delete(key)
+    
+    async def exists(self, key: str) -> bool:
+        return self.inner.exists(key)
+    
+    async def ping(self) -> bool:
+        return True
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        return self.inner.get_many(keys)
+    
+    async def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        return self.inner.set_many(mapping, ttl)
+    
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        return self.inner.delete_many(keys)
+    
+    async def hash_get_all(self, key: str) -> Dict[str, str]:
+        return self.inner.hash_get_all(key)
+    
+    async def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                       prune_below: Optional[float] = None) -> bool:
+        return self.inner.hash_set(key, mapping, ttl, prune_below)
+    
+    async def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        return self.inner.hash_delete(key, fields)
+    
+    async def set_with_hash(self, key: str, value: str, hash_key: str, mapping: Dict[str, Any],
+                            ttl: Optional[int] = None, prune_below: Optional[float] = None) -> bool:
+        return self.inner.set_with_hash(key, value, hash_key, mapping, ttl, prune_below)
+    
+    async def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                        refresh_below: Optional[float] = None) -> Optional[int]:
+        return self.inner.hash_incr(key, field, amount, ttl=ttl, refresh_below=refresh_below)
+    
+    def stats(self) -> Dict[str, Any]:
+        return self.inner.stats()
@@ -0,0 +1,162 @@
+"""
+Async Redis Adapter - Implementation of AsyncCachePort with redis.asyncio
+"""
+from typing import Optional, Dict, Iterable, Any
+import redis.asyncio as aioredis
+from core.interfaces.async_cache_port import AsyncCachePort
+from .redis_adapter import _HASH_INCR_SCRIPT, _HASH_SET_SCRIPT, _hash_set_args
+
+
+class AsyncRedisAdapter(AsyncCachePort):
+    def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0,
+                 max_connections: int = 100, pool_timeout: float = 0.5,
+                 socket_connect_timeout: Optional[float] = 0.5,
+                 socket_timeout: Optional[float] = 0.5,
+                 unix_socket_path: Optional[str] = None):
+        connection_kwargs = dict(db=db, decode_responses=True,
+                                 socket_connect_timeout=socket_connect_timeout,
+                                 socket_timeout=socket_timeout)
+        if unix_socket_path:
+            connection_kwargs.update(path=unix_socket_path,
+                                     connection_class=aioredis.UnixDomainSocketConnection)
+        else:
+            connection_kwargs.update(host=host, port=port)
+        # One connection serves one in-flight command, so the pool bounds
+        # concurrency towards Redis; waiters queue on the event loop.
+        self.pool = aioredis.BlockingConnectionPool(
+            max_connections=max_connections, timeout=pool_timeout, **connection_kwargs
+        )
+        self.client = aioredis.Redis(connection_pool=self.pool)
+        self._hash_incr = self.client.register_script(_HASH_INCR_SCRIPT)
+        self._hash_set = self.client.register_script(_HASH_SET_SCRIPT)
+        self._errors = 0
+    
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            return await self.client.get(key)
+        except Exception:
+            self._errors += 1
+            return None
+    
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        try:
+            if ttl:
+                return bool(await self.client.setex(key, ttl, value))
+            return bool(await self.client.set(key, value))
+        except Exception:
+            self._errors += 1
+            return False
+    
+    async def delete(self, key: str) -> bool:
+        try:
+            return bool(await self.client.delete(key))
+        except Exception:
+            self._errors += 1
+            return False
+    
+    async def exists(self, key: str) -> bool:
+        try:
+            return bool(await self.client.exists(key))
+        except Exception:
+            self._errors += 1
+            return False
+    
+    async def ping(self) -> bool:
+        try:
+            return bool(await self.client.ping())
+        except Exception:
+            self._errors += 1
+            return False
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            return dict(zip(keys, await self.client.mget(keys)))
+        except Exception:
+            self._errors += 1
+            return {key: None for key in keys}
+    
+    async def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        if not mapping:
+            return True
+        try:
+            if not ttl:
+                return bool(await self.client.mset(mapping))
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.setex(key, ttl, value)
+            return all(await pipe.execute())
+        except Exception:
+            self._errors += 1
+            return False
+    
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        try:
+            return int(await self.client.delete(*keys))
+        except Exception:
+            self._errors += 1
+            return 0
+    
+    async def hash_get_all(self, key: str) -> Dict[str, str]:
+        try:
+            return await self.client.hgetall(key)
+        except Exception:
+            self._errors += 1
+            return {}
+    
+    async def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                       prune_below: Optional[float] = None) -> bool:
+        try:
+            if prune_below is not None:
+                return bool(await self._hash_set(keys=[key], args=_hash_set_args(mapping, ttl, prune_below)))
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hset(key, mapping=mapping)
+            if ttl:
+                pipe.expire(key, ttl)
+            await pipe.execute()
+            return True
+        except Exception:
+            self._errors += 1
+            return False
+    
+    async def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        fields = list(fields)
+        if not fields:
+            return 0
+        try:
+            return int(await self.client.hdel(key, *fields))
+        except Exception:
+            self._errors += 1
+            return 0
+    
+    async def set_with_hash(self, key: str, value: str, hash_key: str, mapping: Dict[str, Any],
+                            ttl: Optional[int] = None, prune_below: Optional[float] = None) -> bool:
+        try:
+            # Same script as RedisAdapter: SET, HSET, pruning and EXPIRE in one round trip
+            return bool(await self._hash_set(keys=[key, hash_key],
+                                             args=_hash_set_args(mapping, ttl, prune_below, value)))
+        except Exception:
+            self._errors += 1
+            return False
+    
+    async def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                        refresh_below: Optional[float] = None) -> Optional[int]:
+        try:
+            # Same script as RedisAdapter: HINCRBY and the conditional EXPIRE in one round trip
+            threshold = ttl if refresh_below is None else int(refresh_below)
+            return int(await self._hash_incr(keys=[key], args=[field, amount, ttl or 0, threshold or 0]))
+        except Exception:
+            self._errors += 1
+            return None
+    
+    async def close(self) -> None:
+        await self.pool.disconnect()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis-async", "errors": self._errors,
+                "max_connections": self.pool.max_connections}
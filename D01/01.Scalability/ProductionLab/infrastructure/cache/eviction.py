@@ -0,0 +1,176 @@
+"""
+Eviction Policies - Pluggable victim selection for bounded in-memory caches
+
+The cache adapter owns the budget (entries / bytes) and asks the policy
+which key to drop when it is over budget. Policies only track keys.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+import zlib
+
+
+class EvictionPolicy(ABC):
+    name = "base"
+
+    @abstractmethod
+    def on_insert(self, key: str) -> None:
+        """Track a newly stored key"""
+        pass
+
+    @abstractmethod
+    def on_access(self, key: str) -> None:
+        """Record a hit (or overwrite) of an existing key"""
+        pass
+
+    @abstractmethod
+    def on_remove(self, key: str) -> None:
+        """Forget a key removed by delete/expiry"""
+        pass
+
+    @abstractmethod
+    def evict(self) -> Optional[str]:
+        """Pick a victim, forget it and return it (None if empty)"""
+        pass
+
+
+class LRUPolicy(EvictionPolicy):
+    """Least Recently Used - OrderedDict, O(1) for every operation"""
+    name = "lru"
+
+    def __init__(self):
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def on_insert(self, key: str) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def on_access(self, key: str) -> None:
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def on_remove(self, key: str) -> None:
+        self._order.pop(key, None)
+
+    def evict(self) -> Optional[str]:
+        if not self._order:
+            return None
+        key, _ = self._order.popitem(last=False)
+        return key
+
+
+class CountMinSketch:
+    """
+    Approximate frequency counter (4 rows, 4-bit saturating counters).
+    Counters are halved every `sample_size` increments so that old
+    popularity fades out (TinyLFU "reset" aging).
+    """
+    DEPTH = 4
+    MAX_COUNT = 15
+    SEEDS = (0x9E3779B9, 0x85EBCA6B, 0xC2B2AE35, 0x27D4EB2F)
+
+    def __init__(self, width: int = 1024, sample_size: Optional[int] = None):
+        # Round width up to a power of two so we can mask instead of modulo
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self._mask = self.width - 1
+        self._rows = [bytearray(self.width) for _ in range(self.DEPTH)]
+        self.sample_size = sample_size or self.width * 10
+        self._additions = 0
+
+    def _indexes(self, key: str):
+        h = zlib.crc32(key.encode('utf-8'))
+        return [((h ^ seed) * 0x01000193 >> 7) & self._mask for seed in self.SEEDS]
+
+    def increment(self, key: str) -> None:
+        for row, idx in zip(self._rows, self._indexes(key)):
+            if row[idx] < self.MAX_COUNT:
+                row[idx] += 1
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._reset()
+
+    def estimate(self, key: str) -> int:
+        return min(row[idx] for row, idx in zip(self._rows, self._indexes(key)))
+
+    def _reset(self) -> None:
+        for row in self._rows:
+            for i in range(self.width):
+                row[i] >>= 1
+        self._additions //= 2
+
+
+class TinyLFUPolicy(EvictionPolicy):
+    """
+    W-TinyLFU: a small LRU admission window in front of a main LRU.
+
+    New keys always enter the window (so fresh sessions are never refused).
+    The key pushed out of the window is the admission candidate: if the
+    cache is over budget at that point, it competes with the main LRU
+    victim and only survives if the sketch says it is used more often.
+    This keeps one-hit-wonder keys from flushing the hot set.
+    """
+    name = "tinylfu"
+
+    def __init__(self, window_ratio: float = 0.01, sketch_width: int = 1024):
+        self.window_ratio = window_ratio
+        self._window: "OrderedDict[str, None]" = OrderedDict()
+        self._main: "OrderedDict[str, None]" = OrderedDict()
+        self._candidate: Optional[str] = None
+        self.sketch = CountMinSketch(width=sketch_width)
+
+    def _window_limit(self) -> int:
+        return max(1, int((len(self._window) + len(self._main)) * self.window_ratio))
+
+    def on_insert(self, key: str) -> None:
+        self.sketch.increment(key)
+        self._main.pop(key, None)
+        self._window[key] = None
+        self._window.move_to_end(key)
+        self._candidate = None
+        if len(self._window) > self._window_limit():
+            candidate, _ = self._window.popitem(last=False)
+            # Admitted for now; evict() decides if the cache is over budget
+            self._main[candidate] = None
+            self._candidate = candidate
+
+    def on_access(self, key: str) -> None:
+        self.sketch.increment(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._main:
+            self._main.move_to_end(key)
+
+    def on_remove(self, key: str) -> None:
+        self._window.pop(key, None)
+        self._main.pop(key, None)
+        if self._candidate == key:
+            self._candidate = None
+
+    def evict(self) -> Optional[str]:
+        candidate, self._candidate = self._candidate, None
+        if self._main:
+            victim = next(iter(self._main))
+            if candidate is not None and candidate != victim and candidate in self._main:
+                # Admission filter: the candidate must beat the main victim
+                if self.sketch.estimate(candidate) <= self.sketch.estimate(victim):
+                    victim = candidate
+            del self._main[victim]
+            return victim
+        if self._window:
+            key, _ = self._window.popitem(last=False)
+            return key
+        return None
+
+
+POLICIES = {
+    LRUPolicy.name: LRUPolicy,
+    TinyLFUPolicy.name: TinyLFUPolicy,
+}
+
+
+def create_eviction_policy(name: str = "lru", **kwargs) -> EvictionPolicy:
+    """Build an eviction policy by name ('lru' or 'tinylfu')"""
+    try:
+        return POLICIES[name.lower()](**kwargs)
+    except KeyError:
+        raise ValueError(f"Unknown eviction policy: {name}")
@@ -0,0 +1,76 @@
+"""
+Consistent Hash Ring - Map keys to nodes with minimal movement
+
+Each node is placed on the ring at `vnodes` points (virtual nodes), so
+load evens out and adding/removing a node only moves the keys between it
+and its ring neighbours (~1/N of all keys), not a full reshuffle.
+"""
+import bisect
+import hashlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+def ring_hash(value: str) -> int:
+    """64-bit position on the ring (stable across processes and hosts)"""
+    return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    def __init__(self, nodes: Optional[List[str]] = None, vnodes: int = 160):
+        if vnodes < 1:
+            raise ValueError("vnodes must be >= 1")
+        self.vnodes = vnodes
+        self._nodes: List[str] = []
+        # (sorted points, owner of each point); replaced, never mutated,
+        # so lookups need no lock while the ring changes
+        self._ring: Tuple[List[int], List[str]] = ([], [])
+        for node in nodes or []:
+            self.add_node(node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return list(self._nodes)
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def add_node(self, node: str) -> None:
+        if node not in self._nodes:
+            self._nodes.append(node)
+            self._rebuild()
+
+    def remove_node(self, node: str) -> None:
+        if node in self._nodes:
+            self._nodes.remove(node)
+            self._rebuild()
+
+    def get_node(self, key: str) -> Optional[str]:
+        """Node owning key, or None if the ring is empty"""
+        points, owners = self._ring
+        if not points:
+            return None
+        index = bisect.bisect(points, ring_hash(key))
+        return owners[index % len(points)]
+
+    def iter_nodes(self, key: str) -> Iterator[str]:
+        """Distinct nodes in ring order starting at key's owner (for fallthrough)"""
+        points, owners = self._ring
+        if not points:
+            return
+        start = bisect.bisect(points, ring_hash(key))
+        seen = set()
+        for step in range(len(points)):
+            node = owners[(start + step) % len(points)]
+            if node not in seen:
+                seen.add(node)
+                yield node
+                if len(seen) == len(self._nodes):
+                    return
+
+    def _rebuild(self) -> None:
+        entries: Dict[int, str] = {}
+        for node in self._nodes:
+            for replica in range(self.vnodes):
+                entries[ring_hash(f"{node}#{replica}")] = node
+        points = sorted(entries)
+        self._ring = (points, [entries[p] for p in points])
@@ -0,0 +1,307 @@
+"""
+Instrumented Cache - Prometheus metrics decorator for any CachePort
+
+Records calls by key prefix ("session:", "auth_session:", ...), operation
+and result (hit / miss / ok / error), plus a latency histogram per prefix
+and operation. Exceptions from the wrapped adapter are counted as errors
+and degrade to the usual miss/False result, so wrap a RedisAdapter created
+with raise_on_error=True to tell an outage apart from a miss. raising()
+returns a view sharing the same counters that re-raises them instead.
+
+Counts are kept in plain per-series slots under one lock and turned into
+Prometheus counter/histogram families only at scrape time; updating
+prometheus_client Counter/Histogram children on every call cost ~2us.
+One collector per registry sums every live InstrumentedCache, so several
+apps (or tests) in one process can each wrap a cache.
+"""
+import bisect
+import copy
+import threading
+import time
+import weakref
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+from prometheus_client import REGISTRY
+from prometheus_client.core import CounterMetricFamily, HistogramMetricFamily
+from core.interfaces.cache_port import CachePort
+from infrastructure.metrics import collector_for, cumulative_buckets
+
+# Cache calls are sub-millisecond when healthy; the tail shows timeouts
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+perf_counter = time.perf_counter
+
+
+class _Series:
+    """Result counts and latency histogram slots for one (prefix, op)"""
+    __slots__ = ("results", "buckets", "total")
+
+    def __init__(self):
+        self.results: Dict[str, int] = {}
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+
+
+class InstrumentedCache(CachePort):
+    def __init__(self, inner: CachePort, registry=REGISTRY, max_prefixes: int = 32):
+        self.inner = inner
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        # Bounded label cardinality: later unseen prefixes report as "other"
+        self.max_prefixes = max_prefixes
+        self._prefixes: Dict[str, str] = {}
+        self.raise_on_error = False
+        if registry is not None:
+            collector_for(registry, _CacheCollector).caches.add(self)
+
+    def get(self, key: str) -> Optional[str]:
+        start = perf_counter()
+        try:
+            value = self.inner.get(key)
+        except Exception:
+            self._observe(key, "get", "error", start)
+            if self.raise_on_error:
+                raise
+            return None
+        self._observe(key, "get", "miss" if value is None else "hit", start)
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        start = perf_counter()
+        try:
+            result = self.inner.set(key, value, ttl)
+        except Exception:
+            self._observe(key, "set", "error", start)
+            if self.raise_on_error:
+                raise
+            return False
+        self._observe(key, "set", "ok", start)
+        return result
+
+    def delete(self, key: str) -> bool:
+        start = perf_counter()
+        try:
+            result = self.inner.delete(key)
+        except Exception:
+            self._observe(key, "delete", "error", start)
+            if self.raise_on_error:
+                raise
+            return False
+        self._observe(key, "delete", "ok", start)
+        return result
+
+    def exists(self, key: str) -> bool:
+        start = perf_counter()
+        try:
+            result = self.inner.exists(key)
+        except Exception:
+            self._observe(key, "exists", "error", start)
+            if self.raise_on_error:
+                raise
+            return False
+        self._observe(key, "exists", "hit" if result else "miss", start)
+        return result
+
+    def ping(self) -> bool:
+        try:
+            return self.inner.ping()
+        except Exception:
+            self._record("(none)", "ping", "error", None)
+            if self.raise_on_error:
+                raise
+            return False
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        keys = list(keys)
+        start = perf_counter()
+        try:
+            values = self.inner.get_many(keys)
+        except Exception:
+            self._observe_batch(keys, "get_many", start, error=True)
+            if self.raise_on_error:
+                raise
+            return {key: None for key in keys}
+        elapsed = perf_counter() - start
+        for key, value in values.items():
+            self._record(self._prefix(key), "get_many", "miss" if value is None else "hit", None)
+        self._record(self._batch_prefix(keys), "get_many", None, elapsed)
+        return values
+
+    def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        start = perf_counter()
+        try:
+            result = self.inner.set_many(mapping, ttl)
+        except Exception:
+            self._observe_batch(mapping, "set_many", start, error=True)
+            if self.raise_on_error:
+                raise
+            return False
+        self._observe_batch(mapping, "set_many", start)
+        return result
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        start = perf_counter()
+        try:
+            result = self.inner.delete_many(keys)
+        except Exception:
+            self._observe_batch(keys, "delete_many", start, error=True)
+            if self.raise_on_error:
+                raise
+            return 0
+        self._observe_batch(keys, "delete_many", start)
+        return result
+
+    def hash_get_all(self, key: str) -> Dict[str, str]:
+        start = perf_counter()
+        try:
+            fields = self.inner.hash_get_all(key)
+        except Exception:
+            self._observe(key, "hash_get_all", "error", start)
+            if self.raise_on_error:
+                raise
+            return {}
+        self._observe(key, "hash_get_all", "hit" if fields else "miss", start)
+        return fields
+
+    def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                 prune_below: Optional[float] = None) -> bool:
+        start = perf_counter()
+        try:
+            result = self.inner.hash_set(key, mapping, ttl, prune_below)
+        except Exception:
+            self._observe(key, "hash_set", "error", start)
+            if self.raise_on_error:
+                raise
+            return False
+        self._observe(key, "hash_set", "ok", start)
+        return result
+
+    def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        start = perf_counter()
+        try:
+            removed = self.inner.hash_delete(key, fields)
+        except Exception:
+            self._observe(key, "hash_delete", "error", start)
+            if self.raise_on_error:
+                raise
+            return 0
+        self._observe(key, "hash_delete", "ok", start)
+        return removed
+
+    def set_with_hash(self, key: str, value: str, hash_key: str, mapping: Dict[str, Any],
+                      ttl: Optional[int] = None, prune_below: Optional[float] = None) -> bool:
+        # One series, under the record's prefix: it is one round trip
+        start = perf_counter()
+        try:
+            result = self.inner.set_with_hash(key, value, hash_key, mapping, ttl, prune_below)
+        except Exception:
+            self._observe(key, "set_with_hash", "error", start)
+            if self.raise_on_error:
+                raise
+            return False
+        self._observe(key, "set_with_hash", "ok" if result else "error", start)
+        return result
+
+    def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                  refresh_below: Optional[float] = None) -> Optional[int]:
+        start = perf_counter()
+        try:
+            value = self.inner.hash_incr(key, field, amount, ttl, refresh_below)
+        except Exception:
+            self._observe(key, "hash_incr", "error", start)
+            if self.raise_on_error:
+                raise
+            return None
+        self._observe(key, "hash_incr", "ok" if value is not None else "error", start)
+        return value
+
+    def raising(self) -> CachePort:
+        view = copy.copy(self)  # same lock and series: calls are counted once, here
+        view.inner = self.inner.raising()
+        view.raise_on_error = True
+        return view
+
+    def stats(self) -> Dict[str, Any]:
+        return self.inner.stats()
+
+    def close(self) -> None:
+        close = getattr(self.inner, "close", None)
+        if close is not None:
+            close()
+
+    # --- Metric helpers ---
+
+    def _prefix(self, key: str) -> str:
+        cut = key.find(":")
+        raw = key[:cut + 1] if cut > 0 else "(none)"
+        prefix = self._prefixes.get(raw)
+        if prefix is None:
+            # Insert under the lock so concurrent new prefixes cannot overrun max_prefixes
+            with self._lock:
+                prefix = self._prefixes.get(raw)
+                if prefix is None:
+                    prefix = raw if len(self._prefixes) < self.max_prefixes else "other"
+                    self._prefixes[raw] = prefix
+        return prefix
+
+    def _batch_prefix(self, keys) -> str:
+        prefixes = {self._prefix(key) for key in keys}
+        return prefixes.pop() if len(prefixes) == 1 else "mixed"
+
+    def _observe(self, key: str, op: str, result: str, start: float) -> None:
+        self._record(self._prefix(key), op, result, perf_counter() - start)
+
+    def _observe_batch(self, keys, op: str, start: float, error: bool = False) -> None:
+        elapsed = perf_counter() - start
+        self._record(self._batch_prefix(keys), op, "error" if error else "ok", elapsed)
+
+    def _record(self, prefix: str, op: str, result: Optional[str], elapsed: Optional[float]) -> None:
+        """Count a result and/or a latency sample - one lock, one lookup"""
+        slot = bisect.bisect_left(LATENCY_BUCKETS, elapsed) if elapsed is not None else None
+        with self._lock:
+            series = self._series.get((prefix, op))
+            if series is None:
+                series = self._series[(prefix, op)] = _Series()
+            if result is not None:
+                series.results[result] = series.results.get(result, 0) + 1
+            if slot is not None:
+                series.buckets[slot] += 1
+                series.total += elapsed
+
+    def _snapshot(self) -> Dict[Tuple[str, str], Tuple[Dict[str, int], List[int], float]]:
+        with self._lock:
+            return {key: (dict(s.results), list(s.buckets), s.total)
+                    for key, s in self._series.items()}
+
+
+class _CacheCollector:
+    """One Prometheus collector per registry, summing every live InstrumentedCache"""
+
+    def __init__(self):
+        self.caches = weakref.WeakSet()
+
+    def describe(self):
+        return [CounterMetricFamily('cache_requests', 'Cache calls by key prefix, operation and result',
+                                    labels=['prefix', 'op', 'result']),
+                HistogramMetricFamily('cache_latency_seconds', 'Cache call latency by key prefix and operation',
+                                      labels=['prefix', 'op'])]
+
+    def collect(self):
+        requests, latency = self.describe()
+        merged: Dict[Tuple[str, str], list] = {}
+        for cache in list(self.caches):
+            for key, (results, buckets, total) in cache._snapshot().items():
+                entry = merged.setdefault(key, [{}, [0] * len(buckets), 0.0])
+                for result, value in results.items():
+                    entry[0][result] = entry[0].get(result, 0) + value
+                entry[1] = [a + b for a, b in zip(entry[1], buckets)]
+                entry[2] += total
+        for (prefix, op), (results, buckets, total) in sorted(merged.items()):
+            for result, value in sorted(results.items()):
+                requests.add_metric([prefix, op, result], value)
+            if not any(buckets):
+                continue
+            latency.add_metric([prefix, op], cumulative_buckets(LATENCY_BUCKETS, buckets), total)
+        yield requests
+        yield latency
@@ -0,0 +1,172 @@
+"""
+Invalidation Bus - Fan-out of "these keys changed" messages between workers
+
+Used by NearCacheAdapter so a write on one worker drops the stale local
+copy on every other worker. Delivery is best effort (Redis pub/sub is
+at-most-once); the near cache's local TTL bounds staleness if a message
+is lost.
+"""
+import json
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional
+
+# Callback receives the changed keys, or None meaning "messages may have
+# been lost: flush everything"
+InvalidationCallback = Callable[[Optional[List[str]]], None]
+# Called once a lost subscription is back (after callback(None) reported the loss)
+ResubscribedCallback = Callable[[], None]
+
+
+class InvalidationBus(ABC):
+
+    @abstractmethod
+    def publish(self, keys: List[str]) -> None:
+        """Tell other subscribers that keys changed"""
+        pass
+
+    @abstractmethod
+    def subscribe(self, callback: InvalidationCallback,
+                  on_resubscribed: Optional[ResubscribedCallback] = None) -> None:
+        """Register the callback for invalidations from other publishers"""
+        pass
+
+    def close(self) -> None:
+        """Stop listening (optional)"""
+        pass
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """
+    In-process bus. Each NearCacheAdapter gets its own endpoint via
+    connect(); messages reach every endpoint except the sender.
+    Useful for tests and for several near caches inside one process.
+    """
+
+    def __init__(self):
+        self._callbacks: List[tuple] = []
+        self._lock = threading.Lock()
+
+    def connect(self) -> "LocalInvalidationBus":
+        return _LocalEndpoint(self)
+
+    def publish(self, keys: List[str]) -> None:
+        self._deliver(None, keys)
+
+    def subscribe(self, callback: InvalidationCallback,
+                  on_resubscribed: Optional[ResubscribedCallback] = None) -> None:
+        with self._lock:
+            self._callbacks.append((None, callback))
+
+    def _deliver(self, sender, keys: List[str]) -> None:
+        with self._lock:
+            callbacks = list(self._callbacks)
+        for owner, callback in callbacks:
+            if owner is not sender or sender is None:
+                callback(keys)
+
+
+class _LocalEndpoint(InvalidationBus):
+    def __init__(self, hub: LocalInvalidationBus):
+        self._hub = hub
+
+    def publish(self, keys: List[str]) -> None:
+        self._hub._deliver(self, keys)
+
+    def subscribe(self, callback: InvalidationCallback,
+                  on_resubscribed: Optional[ResubscribedCallback] = None) -> None:
+        with self._hub._lock:
+            self._hub._callbacks.append((self, callback))
+
+
+class RedisInvalidationBus(InvalidationBus):
+    """
+    Redis pub/sub bus. Every worker publishes changed keys on one channel
+    and listens in a daemon thread; its own messages are ignored.
+    If the subscriber connection fails the callback gets None so the
+    local cache is flushed instead of silently going stale. The bus then
+    resubscribes, waiting retry_min doubling up to retry_max seconds
+    between attempts, and calls on_resubscribed once it listens again.
+    """
+    CHANNEL = "near_cache:invalidate"
+
+    def __init__(self, client, channel: str = CHANNEL, poll_interval: float = 0.01,
+                 retry_min: float = 0.1, retry_max: float = 30.0):
+        self.client = client
+        self.channel = channel
+        self.poll_interval = poll_interval
+        self.retry_min = retry_min
+        self.retry_max = retry_max
+        self.origin = uuid.uuid4().hex
+        self.resubscribes = 0
+        self._callback: Optional[InvalidationCallback] = None
+        self._on_resubscribed: Optional[ResubscribedCallback] = None
+        self._pubsub = None
+        self._thread = None
+        self._closed = threading.Event()
+
+    def publish(self, keys: List[str]) -> None:
+        try:
+            self.client.publish(self.channel, json.dumps({"origin": self.origin, "keys": keys}))
+        except Exception:
+            pass
+
+    def subscribe(self, callback: InvalidationCallback,
+                  on_resubscribed: Optional[ResubscribedCallback] = None) -> None:
+        self._callback = callback
+        self._on_resubscribed = on_resubscribed
+        self._closed.clear()
+        self._listen()
+
+    def close(self) -> None:
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+
+    def _listen(self) -> None:
+        """Subscribe on a new connection; raises if Redis cannot be reached"""
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(**{self.channel: self._handle})
+        except Exception:
+            pubsub.close()
+            raise
+        self._pubsub = pubsub
+        self._thread = pubsub.run_in_thread(
+            sleep_time=self.poll_interval, daemon=True, exception_handler=self._on_error
+        )
+
+    def _handle(self, message) -> None:
+        try:
+            payload = json.loads(message["data"])
+        except (TypeError, ValueError):
+            return
+        if payload.get("origin") != self.origin:
+            self._callback(payload.get("keys") or [])
+
+    def _on_error(self, exc, pubsub, thread) -> None:
+        # Lost the subscription: we may have missed messages. The failed
+        # worker thread exits (closing its pubsub) and retries from here
+        thread.stop()
+        self._callback(None)
+        delay = self.retry_min
+        while not self._closed.wait(delay):
+            try:
+                self._listen()
+            except Exception:
+                delay = min(delay * 2, self.retry_max)
+                continue
+            if self._closed.is_set():  # close() ran meanwhile
+                self.close()
+                return
+            self.resubscribes += 1
+            # Messages published while down are gone: flush again first
+            self._callback(None)
+            if self._on_resubscribed is not None:
+                self._on_resubscribed()
+            return
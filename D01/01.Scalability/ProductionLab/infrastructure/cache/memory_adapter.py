@@ -1,36 +1,262 @@
 """
 Memory Adapter - In-memory implementation of CachePort (for testing/fallback)
+
+Optionally bounded by entry count and/or approximate byte size. When over
+budget, the configured eviction policy (LRU / TinyLFU) picks the victims.
+
+TTL keys are also tracked in a timing wheel, so keys that are never read
+again still get reclaimed: every write drains whatever the wheel says is
+due (see expire_tick), no full scan of the store.
+
+Every public operation holds the adapter's own lock, so a single instance
+is safe under threaded workers. ShardedMemoryAdapter stripes keys over
+several instances to avoid one global lock.
 """
+import json
+import sys
+import threading
 import time
-from typing import Optional, Dict, Tuple
-from core.interfaces.cache_port import CachePort
+from collections import deque
+from typing import Optional, Dict, Tuple, Any, Union, Iterable
+from core.interfaces.cache_port import CachePort, prune_fields
+from .eviction import EvictionPolicy, create_eviction_policy
+from .timing_wheel import TimingWheel
+
 
 class MemoryAdapter(CachePort):
-    def __init__(self):
-        self._store: Dict[str, Tuple[str, Optional[float]]] = {}
-    
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 policy: Union[str, EvictionPolicy] = "lru",
+                 tick_seconds: float = 1.0, expire_batch: int = 1000):
+        # key -> (value, expiry, size in bytes)
+        self._store: Dict[str, Tuple[str, Optional[float], int]] = {}
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._policy = create_eviction_policy(policy) if isinstance(policy, str) else policy
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._rejections = 0
+        # Proactive expiry: wheel of TTL keys, drained at most expire_batch per tick
+        self._wheel = TimingWheel(tick_seconds=tick_seconds, now=time.time())
+        self._due: deque = deque()
+        self.expire_batch = expire_batch
+        self._expiry_ticks = 0
+        self._last_tick_reclaimed = 0
+        self._lock = threading.Lock()
+
     def get(self, key: str) -> Optional[str]:
-        if key in self._store:
-            value, expiry = self._store[key]
-            if expiry is None or time.time() < expiry:
-                return value
-            else:
-                del self._store[key]
-        return None
-    
+        with self._lock:
+            return self._get(key)
+
     def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
-        expiry = time.time() + ttl if ttl else None
-        self._store[key] = (value, expiry)
-        return True
-    
+        size = self._entry_size(key, value)
+        with self._lock:
+            return self._set(key, value, ttl, size)
+
     def delete(self, key: str) -> bool:
-        if key in self._store:
-            del self._store[key]
-            return True
-        return False
-    
+        with self._lock:
+            if key in self._store:
+                self._remove(key)
+                return True
+            return False
+
     def exists(self, key: str) -> bool:
         return self.get(key) is not None
-    
+
+    def flush(self) -> bool:
+        with self._lock:
+            for key in list(self._store):
+                self._remove(key)
+        return True
+
     def ping(self) -> bool:
         return True
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        with self._lock:
+            return {key: self._get(key) for key in keys}
+
+    def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        sized = [(key, value, self._entry_size(key, value)) for key, value in mapping.items()]
+        with self._lock:
+            results = [self._set(key, value, ttl, size) for key, value, size in sized]
+        return all(results)
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        deleted = 0
+        with self._lock:
+            for key in keys:
+                if key in self._store:
+                    self._remove(key)
+                    deleted += 1
+        return deleted
+
+    # Hashes are stored as JSON blobs; read-modify-write under the lock
+    # makes the CachePort hash operations atomic here.
+    
+    def hash_get_all(self, key: str) -> Dict[str, str]:
+        with self._lock:
+            return self._hash_fields(key)
+    
+    def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                 prune_below: Optional[float] = None) -> bool:
+        with self._lock:
+            fields = self._hash_fields(key)
+            fields.update({field: str(value) for field, value in mapping.items()})
+            prune_fields(fields, prune_below)
+            return self._hash_write(key, fields, ttl, None)
+    
+    def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        with self._lock:
+            current = self._hash_fields(key)
+            removed = [field for field in set(fields) if current.pop(field, None) is not None]
+            if not removed:
+                return 0
+            if current:
+                self._hash_write(key, current, None, None)
+            else:
+                self._remove(key)
+            return len(removed)
+    
+    def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                  refresh_below: Optional[float] = None) -> Optional[int]:
+        with self._lock:
+            fields = self._hash_fields(key)
+            value = int(fields.get(field, 0)) + amount
+            fields[field] = str(value)
+            self._hash_write(key, fields, ttl, refresh_below)
+            return value
+    
+    def expire_tick(self, now: Optional[float] = None) -> int:
+        """
+        Reclaim expired keys the wheel reports as due.
+        Work is O(due keys), capped at expire_batch per call.
+        Returns the number of entries reclaimed by this tick.
+        """
+        with self._lock:
+            return self._expire_due(time.time() if now is None else now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "backend": "memory",
+                "policy": self._policy.name,
+                "entries": len(self._store),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "rejections": self._rejections,
+                "scheduled_expiries": len(self._wheel),
+                "expiry_ticks": self._expiry_ticks,
+                "last_tick_reclaimed": self._last_tick_reclaimed,
+            }
+
+    # --- Internal helpers: caller must hold self._lock ---
+
+    def _get(self, key: str) -> Optional[str]:
+        entry = self._store.get(key)
+        if entry is not None:
+            value, expiry, _ = entry
+            if expiry is None or time.time() < expiry:
+                self._hits += 1
+                self._policy.on_access(key)
+                return value
+            self._remove(key)
+            self._expirations += 1
+        self._misses += 1
+        return None
+
+    def _set(self, key: str, value: str, ttl: Optional[int], size: int,
+             expiry: Optional[float] = None) -> bool:
+        """Store value expiring after ttl seconds, or at `expiry` if given"""
+        if self.max_bytes is not None and size > self.max_bytes:
+            # A single value larger than the whole budget can never fit
+            self._rejections += 1
+            return False
+
+        now = time.time()
+        self._expire_due(now)
+
+        if expiry is None:
+            expiry = now + ttl if ttl else None
+        old = self._store.get(key)
+        if old is not None:
+            self._bytes -= old[2]
+            self._policy.on_access(key)
+        else:
+            self._policy.on_insert(key)
+        self._store[key] = (value, expiry, size)
+        self._bytes += size
+        if expiry is not None:
+            self._wheel.schedule(key, expiry)
+        elif old is not None:
+            self._wheel.cancel(key)
+
+        self._enforce_budget()
+        return True
+
+    def _expire_due(self, now: float) -> int:
+        self._due.extend(self._wheel.advance(now))
+        reclaimed = 0
+        while self._due and reclaimed < self.expire_batch:
+            key = self._due.popleft()
+            entry = self._store.get(key)
+            # The key may have been deleted or rewritten since it was scheduled
+            if entry is not None and entry[1] is not None and entry[1] <= now:
+                self._remove(key)
+                self._expirations += 1
+                reclaimed += 1
+        if reclaimed:
+            self._expiry_ticks += 1
+            self._last_tick_reclaimed = reclaimed
+        return reclaimed
+
+    def _hash_fields(self, key: str) -> Dict[str, str]:
+        data = self._get(key)
+        return json.loads(data) if data else {}
+    
+    def _hash_write(self, key: str, fields: Dict[str, str], ttl: Optional[int],
+                    refresh_below: Optional[float]) -> bool:
+        """Write a hash, keeping the current expiry unless it is due a refresh"""
+        entry = self._store.get(key)
+        expiry = entry[1] if entry is not None else None
+        keep = expiry is not None and (
+            not ttl or (refresh_below is not None and expiry - time.time() > refresh_below)
+        )
+        data = json.dumps(fields)
+        return self._set(key, data, ttl, self._entry_size(key, data), expiry if keep else None)
+    
+    def _over_budget(self) -> bool:
+        if self.max_entries is not None and len(self._store) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self._bytes > self.max_bytes
+
+    def _enforce_budget(self) -> None:
+        while self._over_budget():
+            victim = self._policy.evict()
+            if victim is None:
+                break
+            entry = self._store.pop(victim, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+                self._wheel.cancel(victim)
+                self._evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._store.pop(key)
+        self._bytes -= entry[2]
+        self._policy.on_remove(key)
+        self._wheel.cancel(key)
+
+    @staticmethod
+    def _entry_size(key: str, value: str) -> int:
+        # Approximate resident size: both string objects plus the tuple/dict slot
+        return sys.getsizeof(key) + sys.getsizeof(value) + 72
@@ -0,0 +1,186 @@
+"""
+Near Cache Adapter - In-process L1 in front of any CachePort (usually Redis)
+
+Reads are served from a small bounded local cache whose entries live at
+most `local_ttl` seconds. Writes go to the backing cache first, then the
+key is dropped locally and announced on the invalidation bus so other
+workers drop their copy too. Worst-case staleness (e.g. a logout seen by
+another worker) is the bus latency, or `local_ttl` if a message is lost.
+While the bus is down L1 is flushed and bypassed; it is used again once
+the bus has resubscribed.
+"""
+import threading
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+from core.interfaces.cache_port import CachePort
+from .memory_adapter import MemoryAdapter
+from .invalidation_bus import InvalidationBus
+
+
+class NearCacheAdapter(CachePort):
+    def __init__(self, backing: CachePort, bus: Optional[InvalidationBus] = None,
+                 max_entries: int = 10000, local_ttl: int = 5,
+                 local_prefixes: Optional[Tuple[str, ...]] = None):
+        self.backing = backing
+        self.bus = bus
+        self.local_ttl = local_ttl
+        # Only keys with these prefixes are kept locally (None = all keys)
+        self.local_prefixes = tuple(local_prefixes) if local_prefixes else None
+        self._local = MemoryAdapter(max_entries=max_entries, policy="lru")
+        # Bumped on every invalidation; a read only fills L1 if no
+        # invalidation raced with its backing lookup
+        self._generation = 0
+        self._gen_lock = threading.Lock()
+        self._bus_healthy = True
+        self._bus_recoveries = 0
+        self._invalidations_received = 0
+        if bus is not None:
+            bus.subscribe(self._on_invalidation, self._on_resubscribed)
+
+    def get(self, key: str) -> Optional[str]:
+        if not self._is_local(key):
+            return self.backing.get(key)
+        value = self._local.get(key)
+        if value is not None:
+            return value
+        generation = self._generation
+        value = self.backing.get(key)
+        if value is not None:
+            self._fill(key, value, generation)
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        result = self.backing.set(key, value, ttl)
+        self._invalidate([key])
+        return result
+
+    def delete(self, key: str) -> bool:
+        result = self.backing.delete(key)
+        self._invalidate([key])
+        return result
+
+    def exists(self, key: str) -> bool:
+        if self._is_local(key) and self._local.get(key) is not None:
+            return True
+        return self.backing.exists(key)
+
+    def ping(self) -> bool:
+        return self.backing.ping()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        keys = list(keys)
+        result: Dict[str, Optional[str]] = {}
+        missing: List[str] = []
+        for key in keys:
+            value = self._local.get(key) if self._is_local(key) else None
+            if value is None:
+                missing.append(key)
+            result[key] = value
+        if missing:
+            generation = self._generation
+            fetched = self.backing.get_many(missing)
+            for key, value in fetched.items():
+                result[key] = value
+                if value is not None and self._is_local(key):
+                    self._fill(key, value, generation)
+        return result
+
+    def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        result = self.backing.set_many(mapping, ttl)
+        self._invalidate(list(mapping))
+        return result
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        result = self.backing.delete_many(keys)
+        self._invalidate(keys)
+        return result
+
+    # Hashes are read-modify-write on the backing cache; never kept locally
+
+    def hash_get_all(self, key: str) -> Dict[str, str]:
+        return self.backing.hash_get_all(key)
+
+    def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                 prune_below: Optional[float] = None) -> bool:
+        result = self.backing.hash_set(key, mapping, ttl, prune_below)
+        self._invalidate([key])
+        return result
+
+    def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        result = self.backing.hash_delete(key, fields)
+        self._invalidate([key])
+        return result
+
+    def set_with_hash(self, key: str, value: str, hash_key: str, mapping: Dict[str, Any],
+                      ttl: Optional[int] = None, prune_below: Optional[float] = None) -> bool:
+        result = self.backing.set_with_hash(key, value, hash_key, mapping, ttl, prune_below)
+        self._invalidate([key, hash_key])
+        return result
+
+    def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                  refresh_below: Optional[float] = None) -> Optional[int]:
+        return self.backing.hash_incr(key, field, amount, ttl, refresh_below)
+
+    def raising(self) -> CachePort:
+        # Straight to the backing cache: local copies may be stale
+        return self.backing.raising()
+
+    def stats(self) -> Dict[str, Any]:
+        local = self._local.stats()
+        return {
+            "backend": "near",
+            "local_ttl": self.local_ttl,
+            "local_entries": local["entries"],
+            "local_hits": local["hits"],
+            "local_misses": local["misses"],
+            "local_hit_ratio": local["hit_ratio"],
+            "local_evictions": local["evictions"],
+            "invalidations_received": self._invalidations_received,
+            "bus_healthy": self._bus_healthy,
+            "bus_recoveries": self._bus_recoveries,
+            "backing": self.backing.stats(),
+        }
+
+    def close(self) -> None:
+        if self.bus is not None:
+            self.bus.close()
+
+    def _is_local(self, key: str) -> bool:
+        if not self._bus_healthy:
+            return False
+        return self.local_prefixes is None or key.startswith(self.local_prefixes)
+
+    def _fill(self, key: str, value: str, generation: int) -> None:
+        with self._gen_lock:
+            if generation == self._generation:
+                self._local.set(key, value, ttl=self.local_ttl)
+
+    def _invalidate(self, keys: List[str]) -> None:
+        local_keys = [key for key in keys if self.local_prefixes is None
+                      or key.startswith(self.local_prefixes)]
+        if not local_keys:
+            return
+        self._drop(local_keys)
+        if self.bus is not None:
+            self.bus.publish(local_keys)
+
+    def _drop(self, keys: List[str]) -> None:
+        with self._gen_lock:
+            self._generation += 1
+            self._local.delete_many(keys)
+
+    def _on_invalidation(self, keys: Optional[List[str]]) -> None:
+        self._invalidations_received += 1
+        if keys is None:
+            # Bus lost: flush and stop serving from L1 rather than go stale
+            self._bus_healthy = False
+            with self._gen_lock:
+                self._generation += 1
+                self._local = MemoryAdapter(max_entries=self._local.max_entries, policy="lru")
+            return
+        self._drop(keys)
+
+    def _on_resubscribed(self) -> None:
+        # The bus flushed L1 (callback None) after resubscribing: safe to fill again
+        self._bus_healthy = True
+        self._bus_recoveries += 1
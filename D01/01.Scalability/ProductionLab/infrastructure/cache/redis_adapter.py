@@ -1,18 +1,148 @@
 """
 Redis Adapter - Implementation of CachePort for Redis
+
+Pooled mode uses a bounded, blocking connection pool with connect/read
+timeouts, TCP keepalive and periodic health checks, so a stalled Redis
+costs at most `socket_timeout` per call instead of the OS TCP timeout.
+Failures still degrade to a cache miss, but are counted in stats().
+With raise_on_error=True they are re-raised instead, for a wrapper such as
+InstrumentedCache that must tell an outage apart from a miss; raising()
+gives such a view of an adapter without it, on the same pool.
 """
+import copy
+import socket
+import threading
 import redis
-from typing import Optional
+from typing import Optional, Dict, Iterable, Any
 from core.interfaces.cache_port import CachePort
+from .redis_pool import InstrumentedBlockingConnectionPool
+
+
+# HINCRBY, then refresh the TTL only if the key has none or it is running
+# low - one round trip, and no EXPIRE write on most requests
+_HASH_INCR_SCRIPT = """
+local value = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+local ttl = tonumber(ARGV[3])
+if ttl > 0 then
+    local remaining = redis.call('TTL', KEYS[1])
+    if remaining < 0 or remaining <= tonumber(ARGV[4]) then
+        redis.call('EXPIRE', KEYS[1], ttl)
+    end
+end
+return value
+"""
+
+# [SET KEYS[1] to ARGV[3] when given two keys], HSET the fields on the last
+# key, drop its fields holding a number below ARGV[2] ('' = keep all) and
+# EXPIRE it: a record and its index entry in one round trip
+_HASH_SET_SCRIPT = """
+local ttl = tonumber(ARGV[1])
+local cutoff = tonumber(ARGV[2])
+local first = 3
+if #KEYS == 2 then
+    if ttl > 0 then
+        redis.call('SET', KEYS[1], ARGV[3], 'EX', ttl)
+    else
+        redis.call('SET', KEYS[1], ARGV[3])
+    end
+    first = 4
+end
+local hash = KEYS[#KEYS]
+if #ARGV >= first then
+    redis.call('HSET', hash, unpack(ARGV, first))
+end
+if cutoff then
+    local fields = redis.call('HGETALL', hash)
+    for i = 1, #fields, 2 do
+        local score = tonumber(fields[i + 1])
+        if score and score < cutoff then
+            redis.call('HDEL', hash, fields[i])
+        end
+    end
+end
+if ttl > 0 then
+    redis.call('EXPIRE', hash, ttl)
+end
+return 1
+"""
+
+
+def _hash_set_args(mapping: Dict[str, Any], ttl: Optional[int], prune_below: Optional[float],
+                   *value: str) -> list:
+    """ARGV of _HASH_SET_SCRIPT"""
+    args = [ttl or 0, "" if prune_below is None else repr(float(prune_below)), *value]
+    for field, field_value in mapping.items():
+        args += [field, field_value]
+    return args
+
+
+def _keepalive_options() -> Dict[int, int]:
+    """Probe idle connections after 30s, every 10s, give up after 3 misses"""
+    options = {}
+    for name, value in (('TCP_KEEPIDLE', 30), ('TCP_KEEPINTVL', 10), ('TCP_KEEPCNT', 3)):
+        if hasattr(socket, name):
+            options[getattr(socket, name)] = value
+    return options
+
 
 class RedisAdapter(CachePort):
-    def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0):
-        self.client = redis.Redis(host=host, port=port, db=db, decode_responses=True)
+    def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0,
+                 pooled: bool = False, max_connections: int = 20, pool_timeout: float = 0.5,
+                 socket_connect_timeout: Optional[float] = None,
+                 socket_timeout: Optional[float] = None,
+                 socket_keepalive: bool = False, health_check_interval: int = 0,
+                 raise_on_error: bool = False, unix_socket_path: Optional[str] = None):
+        connection_kwargs = dict(
+            db=db, decode_responses=True,
+            socket_connect_timeout=socket_connect_timeout,
+            socket_timeout=socket_timeout,
+            health_check_interval=health_check_interval
+        )
+        if unix_socket_path:
+            # Same-host Redis: no TCP stack, no keepalive needed
+            connection_kwargs.update(path=unix_socket_path,
+                                     connection_class=redis.UnixDomainSocketConnection)
+        else:
+            connection_kwargs.update(
+                host=host, port=port, socket_keepalive=socket_keepalive,
+                socket_keepalive_options=_keepalive_options() if socket_keepalive else None
+            )
+        if pooled or unix_socket_path:
+            self.pool = InstrumentedBlockingConnectionPool(
+                max_connections=max_connections, timeout=pool_timeout, **connection_kwargs
+            )
+            self.client = redis.Redis(connection_pool=self.pool)
+        else:
+            self.pool = None
+            self.client = redis.Redis(**connection_kwargs)
+        self.raise_on_error = raise_on_error
+        self._errors = 0
+        self._last_error: Optional[str] = None
+        self._errors_lock = threading.Lock()
+        self._counted_by = self  # raising() views count their errors here
+        self._hash_incr = self.client.register_script(_HASH_INCR_SCRIPT)
+        self._hash_set = self.client.register_script(_HASH_SET_SCRIPT)
+    
+    def _record_error(self, error: Exception) -> None:
+        counter = self._counted_by
+        with counter._errors_lock:
+            counter._errors += 1
+            counter._last_error = f"{type(error).__name__}: {error}"
+        if self.raise_on_error:
+            raise error
+    
+    def raising(self) -> CachePort:
+        if self.raise_on_error:
+            return self
+        view = copy.copy(self)  # same client and pool
+        view.raise_on_error = True
+        return view
     
     def get(self, key: str) -> Optional[str]:
         try:
             return self.client.get(key)
-        except Exception:
+        except Exception as e:
+            self._record_error(e)
             return None
     
     def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
@@ -21,23 +151,132 @@ class RedisAdapter(CachePort):
                 return self.client.setex(key, ttl, value)
             else:
                 return self.client.set(key, value)
-        except Exception:
+        except Exception as e:
+            self._record_error(e)
             return False
     
     def delete(self, key: str) -> bool:
         try:
             return bool(self.client.delete(key))
-        except Exception:
+        except Exception as e:
+            self._record_error(e)
             return False
     
     def exists(self, key: str) -> bool:
         try:
             return bool(self.client.exists(key))
-        except Exception:
+        except Exception as e:
+            self._record_error(e)
+            return False
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            return dict(zip(keys, self.client.mget(keys)))
+        except Exception as e:
+            self._record_error(e)
+            return {key: None for key in keys}
+    
+    def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        if not mapping:
+            return True
+        try:
+            if not ttl:
+                return bool(self.client.mset(mapping))
+            # SETEX for each key, sent as one pipelined round trip
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.setex(key, ttl, value)
+            return all(pipe.execute())
+        except Exception as e:
+            self._record_error(e)
+            return False
+    
+    def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        if not keys:
+            return 0
+        try:
+            return int(self.client.delete(*keys))
+        except Exception as e:
+            self._record_error(e)
+            return 0
+    
+    def hash_get_all(self, key: str) -> Dict[str, str]:
+        try:
+            return self.client.hgetall(key)
+        except Exception as e:
+            self._record_error(e)
+            return {}
+    
+    def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                 prune_below: Optional[float] = None) -> bool:
+        try:
+            if prune_below is not None:
+                return bool(self._hash_set(keys=[key], args=_hash_set_args(mapping, ttl, prune_below)))
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hset(key, mapping=mapping)
+            if ttl:
+                pipe.expire(key, ttl)
+            pipe.execute()
+            return True
+        except Exception as e:
+            self._record_error(e)
+            return False
+    
+    def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        fields = list(fields)
+        if not fields:
+            return 0
+        try:
+            return int(self.client.hdel(key, *fields))
+        except Exception as e:
+            self._record_error(e)
+            return 0
+    
+    def set_with_hash(self, key: str, value: str, hash_key: str, mapping: Dict[str, Any],
+                      ttl: Optional[int] = None, prune_below: Optional[float] = None) -> bool:
+        try:
+            return bool(self._hash_set(keys=[key, hash_key],
+                                       args=_hash_set_args(mapping, ttl, prune_below, value)))
+        except Exception as e:
+            self._record_error(e)
+            return False
+    
+    def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                  refresh_below: Optional[float] = None) -> Optional[int]:
+        try:
+            # refresh_below=None means always refresh: any remaining TTL qualifies
+            threshold = ttl if refresh_below is None else int(refresh_below)
+            return int(self._hash_incr(keys=[key], args=[field, amount, ttl or 0, threshold or 0]))
+        except Exception as e:
+            self._record_error(e)
+            return None
+    
+    def flush(self) -> bool:
+        """FLUSHDB: give sharded cache nodes a database of their own"""
+        try:
+            return bool(self.client.flushdb())
+        except Exception as e:
+            self._record_error(e)
             return False
     
     def ping(self) -> bool:
         try:
             return self.client.ping()
-        except Exception:
+        except Exception as e:
+            self._record_error(e)
             return False
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._errors_lock:
+            result = {
+                "backend": "redis",
+                "errors": self._errors,
+                "last_error": self._last_error,
+            }
+        if self.pool is not None:
+            result["pool"] = self.pool.stats()
+        return result
@@ -0,0 +1,64 @@
+"""
+Redis Pool - BlockingConnectionPool with wait/timeout telemetry
+
+When every connection is busy, callers wait up to `timeout` seconds for
+one to be released instead of opening unbounded new sockets. We count
+how often that happens so max_connections can be tuned under load.
+"""
+import threading
+import time
+from typing import Dict, Any
+import redis
+from redis.exceptions import ConnectionError
+
+
+class InstrumentedBlockingConnectionPool(redis.BlockingConnectionPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.wait_seconds_total = 0.0
+
+    def get_connection(self, command_name, *keys, **options):
+        # Empty queue means no idle connection and no free slot: we will block
+        must_wait = self.pool.empty()
+        if must_wait:
+            with self._stats_lock:
+                self.waits += 1
+                self.waiting += 1
+        started = time.perf_counter()
+        try:
+            connection = super().get_connection(command_name, *keys, **options)
+            with self._stats_lock:
+                self.checkouts += 1
+            return connection
+        except ConnectionError as e:
+            if str(e) == "No connection available.":
+                with self._stats_lock:
+                    self.timeouts += 1
+            raise
+        finally:
+            if must_wait:
+                with self._stats_lock:
+                    self.waiting -= 1
+                    self.wait_seconds_total += time.perf_counter() - started
+
+    def stats(self) -> Dict[str, Any]:
+        with self.pool.mutex:
+            slots = list(self.pool.queue)
+        idle = sum(1 for conn in slots if conn is not None)
+        with self._stats_lock:
+            return {
+                "max_connections": self.max_connections,
+                "created": len(self._connections),
+                "in_use": self.max_connections - len(slots),
+                "idle": idle,
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+            }
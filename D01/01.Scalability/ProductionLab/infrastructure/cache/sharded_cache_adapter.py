@@ -0,0 +1,359 @@
+"""
+Sharded Cache Adapter - Spread keys over several cache nodes (e.g. Redis)
+
+Keys are placed with a consistent-hash ring (virtual nodes), so adding or
+removing a node only moves ~1/N of the keys. A node is ejected from the
+ring after failure_threshold consecutive connection errors or timeouts
+(calls and health-check pings alike); its keys then fall through to the
+next node on the ring (a cold miss, not an error) until a later health
+check sees it answer again. Failures below the threshold, and command
+errors such as WRONGTYPE (a problem of the key, not of the node), only
+make that call return its miss/False default.
+
+Writes and deletes made during the outage went to the fall-through node,
+so the node's own copies of those keys are stale when it comes back (a
+logged-out session would be valid again). Those keys are tracked while
+the node is out and deleted from it before it rejoins - and from the
+fall-through node, so its copies cannot resurface later; the node stays
+ejected if that fails. Only past max_dirty_keys is the node flushed
+instead. The tracking is per process: with several workers, each cleans
+up the keys it wrote.
+
+Node adapters must raise on failure for calls to fall through - build
+RedisAdapter nodes with raise_on_error=True - and have a flush() method
+(MemoryAdapter and RedisAdapter do; it is not part of CachePort), which
+is checked when a node is added.
+"""
+import threading
+from typing import Optional, Dict, Any, Iterable, List, Callable, Set
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+from core.interfaces.cache_port import CachePort
+from .hash_ring import HashRing
+
+# Errors that mean "the node is unreachable" (OSError covers the builtin
+# ConnectionError/TimeoutError and socket errors); anything else is a
+# command error and never ejects a node
+NODE_ERRORS = (OSError, RedisConnectionError, RedisTimeoutError)
+
+
+def _check_node(name: str, cache: CachePort) -> None:
+    if not callable(getattr(cache, "flush", None)):
+        raise TypeError(f"node {name!r} ({type(cache).__name__}) has no flush() method")
+
+
+class ShardedCacheAdapter(CachePort):
+    def __init__(self, nodes: Dict[str, CachePort], vnodes: int = 160,
+                 failure_threshold: int = 3, max_dirty_keys: int = 100_000):
+        if not nodes:
+            raise ValueError("at least one node is required")
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be >= 1")
+        for name, cache in nodes.items():
+            _check_node(name, cache)
+        self._nodes: Dict[str, CachePort] = dict(nodes)
+        self._ring = HashRing(list(nodes), vnodes=vnodes)
+        # Every node, ejected or not: who owns a key once everyone is back
+        self._members = HashRing(list(nodes), vnodes=vnodes)
+        self.failure_threshold = failure_threshold
+        self.max_dirty_keys = max_dirty_keys
+        self._ejected: Dict[str, str] = {}  # node -> reason
+        self._failures: Dict[str, int] = {}  # node -> consecutive connection errors
+        # Ejected node -> keys written elsewhere meanwhile (None: too many, flush it)
+        self._dirty: Dict[str, Optional[Set[str]]] = {}
+        self._lock = threading.Lock()
+        self._ejections = 0
+        self._fallthroughs = 0
+        self._command_errors = 0
+        self._checker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # --- Topology ---
+
+    def add_node(self, name: str, cache: CachePort) -> None:
+        _check_node(name, cache)
+        with self._lock:
+            self._nodes[name] = cache
+            self._forget(name)
+            self._ring.add_node(name)
+            self._members.add_node(name)
+
+    def remove_node(self, name: str) -> None:
+        with self._lock:
+            self._nodes.pop(name, None)
+            self._forget(name)
+            self._ring.remove_node(name)
+            self._members.remove_node(name)
+
+    def node_for(self, key: str) -> Optional[str]:
+        """Name of the healthy node currently owning key"""
+        return self._ring.get_node(key)
+
+    # --- CachePort ---
+
+    def get(self, key: str) -> Optional[str]:
+        return self._call(key, lambda node: node.get(key), None)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        return self._call(key, lambda node: node.set(key, value, ttl), False, write=True)
+
+    def delete(self, key: str) -> bool:
+        return self._call(key, lambda node: node.delete(key), False, write=True)
+
+    def exists(self, key: str) -> bool:
+        return self._call(key, lambda node: node.exists(key), False)
+
+    def ping(self) -> bool:
+        """Healthy while at least one node is in the ring"""
+        self.check_health()
+        return len(self._ring) > 0
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        keys = list(keys)
+        found: Dict[str, Optional[str]] = {}
+        for name, node_keys in self._group(keys).items():
+            found.update(self._call_batch(name, node_keys,
+                                          lambda node, ks: node.get_many(ks),
+                                          lambda ks: self.get_many(ks), {}))
+        return {key: found.get(key) for key in keys}
+
+    def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        results = []
+        for name, node_keys in self._group(mapping).items():
+            results.append(self._call_batch(
+                name, node_keys,
+                lambda node, ks: node.set_many({k: mapping[k] for k in ks}, ttl),
+                lambda ks: self.set_many({k: mapping[k] for k in ks}, ttl), False, write=True))
+        return all(results)
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        keys = list(keys)
+        return sum(self._call_batch(name, node_keys,
+                                    lambda node, ks: node.delete_many(ks),
+                                    lambda ks: self.delete_many(ks), 0, write=True)
+                   for name, node_keys in self._group(keys).items())
+
+    def hash_get_all(self, key: str) -> Dict[str, str]:
+        return self._call(key, lambda node: node.hash_get_all(key), {})
+
+    def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                 prune_below: Optional[float] = None) -> bool:
+        return self._call(key, lambda node: node.hash_set(key, mapping, ttl, prune_below), False, write=True)
+
+    def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        fields = list(fields)
+        return self._call(key, lambda node: node.hash_delete(key, fields), 0, write=True)
+
+    # set_with_hash: the CachePort default, as the two keys usually live on different nodes
+
+    def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                  refresh_below: Optional[float] = None) -> Optional[int]:
+        return self._call(key, lambda node: node.hash_incr(key, field, amount, ttl, refresh_below),
+                          None, write=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            nodes = dict(self._nodes)
+            ejected = dict(self._ejected)
+            failures = dict(self._failures)
+            dirty = {name: len(keys) if keys is not None else None for name, keys in self._dirty.items()}
+        return {
+            "backend": "sharded",
+            "vnodes": self._ring.vnodes,
+            "failure_threshold": self.failure_threshold,
+            "nodes": {
+                name: {"healthy": name not in ejected, "ejected_reason": ejected.get(name),
+                       "failures": failures.get(name, 0), "dirty_keys": dirty.get(name, 0)}
+                for name in nodes
+            },
+            "healthy_nodes": len(self._ring),
+            "ejections": self._ejections,
+            "fallthroughs": self._fallthroughs,
+            "command_errors": self._command_errors,
+        }
+
+    # --- Health ---
+
+    def check_health(self) -> Dict[str, bool]:
+        """Ping every node; eject repeatedly failing ones and restore (cleaned) recovered ones"""
+        results = {}
+        for name, node in list(self._nodes.items()):
+            try:
+                healthy = bool(node.ping())
+                error = "ping failed"
+            except Exception as e:
+                healthy = False
+                error = f"ping failed: {type(e).__name__}: {e}"
+            results[name] = healthy
+            if healthy:
+                self._succeeded(name)
+                results[name] = self._restore(name)
+            else:
+                self._failed(name, error)
+        return results
+
+    def start_health_checks(self, interval: float = 2.0) -> None:
+        """Daemon thread running check_health() every `interval` seconds"""
+        if self._checker is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self.check_health()
+
+        self._checker = threading.Thread(target=run, name="cache-health", daemon=True)
+        self._checker.start()
+
+    def stop_health_checks(self) -> None:
+        if self._checker is not None:
+            self._stop.set()
+            self._checker.join()
+            self._checker = None
+
+    # --- Internal helpers ---
+
+    def _failed(self, name: str, reason: str) -> bool:
+        """Count a connection failure; True once the node is out of the ring"""
+        with self._lock:
+            if name not in self._nodes or name in self._ejected:
+                return True
+            self._failures[name] = self._failures.get(name, 0) + 1
+            if self._failures[name] < self.failure_threshold:
+                return False
+            self._eject_locked(name, reason)
+            return True
+
+    def _succeeded(self, name: str) -> None:
+        if self._failures.get(name):
+            with self._lock:
+                self._failures.pop(name, None)
+
+    def _eject(self, name: str, reason: str) -> None:
+        with self._lock:
+            if name in self._nodes and name not in self._ejected:
+                self._eject_locked(name, reason)
+
+    def _eject_locked(self, name: str, reason: str) -> None:
+        self._ejected[name] = reason
+        self._failures.pop(name, None)
+        self._dirty.setdefault(name, set())
+        self._ring.remove_node(name)
+        self._ejections += 1
+
+    def _forget(self, name: str) -> None:
+        self._ejected.pop(name, None)
+        self._failures.pop(name, None)
+        self._dirty.pop(name, None)
+
+    def _mark_dirty(self, keys: Iterable[str]) -> None:
+        """Remember keys written while their owner is out (no-op while every node is in)"""
+        if not self._dirty:
+            return
+        with self._lock:
+            for key in keys:
+                owner = self._members.get_node(key)
+                if owner not in self._dirty or self._dirty[owner] is None:
+                    continue  # owner is in the ring, or will be flushed anyway
+                dirty = self._dirty[owner]
+                dirty.add(key)
+                if len(dirty) > self.max_dirty_keys:
+                    self._dirty[owner] = None
+
+    def _restore(self, name: str) -> bool:
+        """Put an ejected node back once its stale keys are gone; False if it stays out"""
+        node = self._nodes[name]
+        while True:
+            with self._lock:
+                if name not in self._ejected:
+                    return True
+                dirty = self._dirty.get(name)
+                if dirty is not None and not dirty:
+                    # Nothing left to clean: back in, under the lock _mark_dirty takes
+                    self._forget(name)
+                    self._ring.add_node(name)
+                    return True
+                # Keys written from here on are collected afresh for the next pass
+                self._dirty[name] = set()
+            if dirty is None:
+                ok, reason = self._clean(lambda: bool(node.flush()), "flush failed")
+            else:
+                ok, reason = self._clean(lambda: self._delete_stale(node, sorted(dirty)), "cleanup failed")
+            if not ok:
+                with self._lock:
+                    if name in self._ejected:
+                        self._ejected[name] = reason
+                        pending = self._dirty.get(name)
+                        # Retry the same keys (or the flush) on the next health check
+                        if dirty is None or pending is None:
+                            self._dirty[name] = None
+                        else:
+                            pending.update(dirty)
+                return False
+
+    @staticmethod
+    def _clean(fn: Callable[[], bool], reason: str):
+        try:
+            return fn(), reason
+        except Exception as e:
+            return False, f"{reason}: {type(e).__name__}: {e}"
+
+    def _delete_stale(self, node: CachePort, keys: List[str]) -> bool:
+        """Delete keys from the returning node, then their copies where they fell through"""
+        node.delete_many(keys)
+        for name, node_keys in self._group(keys).items():
+            try:
+                self._nodes[name].delete_many(node_keys)
+            except Exception:
+                pass  # best effort: such a copy only resurfaces if the owner drops out again
+        return True
+
+    def _call(self, key: str, fn: Callable[[CachePort], Any], default: Any, write: bool = False) -> Any:
+        """Run fn on key's node; fall through once a failing node has been ejected"""
+        for attempt in range(len(self._nodes)):
+            name = self._ring.get_node(key)
+            if name is None:
+                return default
+            try:
+                result = fn(self._nodes[name])
+            except NODE_ERRORS as e:
+                if not self._failed(name, f"{type(e).__name__}: {e}"):
+                    return default
+                self._fallthroughs += 1
+                continue
+            except Exception:
+                self._command_errors += 1
+                return default
+            self._succeeded(name)
+            if write:
+                self._mark_dirty((key,))
+            return result
+        return default
+
+    def _call_batch(self, name: str, keys: List[str], fn: Callable[[CachePort, List[str]], Any],
+                    retry: Callable[[List[str]], Any], default: Any, write: bool = False) -> Any:
+        try:
+            result = fn(self._nodes[name], keys)
+        except NODE_ERRORS as e:
+            if not self._failed(name, f"{type(e).__name__}: {e}"):
+                return default
+            # Re-route this node's keys over the reduced ring
+            self._fallthroughs += 1
+            if len(self._ring) == 0:
+                return default  # every node out: a miss, like _call
+            return retry(keys)
+        except Exception:
+            self._command_errors += 1
+            return default
+        self._succeeded(name)
+        if write:
+            self._mark_dirty(keys)
+        return result
+
+    def _group(self, keys: Iterable[str]) -> Dict[str, List[str]]:
+        """Group keys by owning node so each node gets one batch call"""
+        groups: Dict[str, List[str]] = {}
+        for key in keys:
+            name = self._ring.get_node(key)
+            if name is not None:
+                groups.setdefault(name, []).append(key)
+        return groups
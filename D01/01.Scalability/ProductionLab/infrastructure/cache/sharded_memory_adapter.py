@@ -0,0 +1,139 @@
+"""
+Sharded Memory Adapter - Lock-striped in-memory CachePort for threaded workers
+
+Keys are spread over N independent MemoryAdapter segments by hash. Each
+segment has its own lock, budget, eviction policy and timing wheel, so
+threads touching different keys rarely wait on each other.
+"""
+import threading
+from typing import Optional, Dict, Any, List, Iterable
+from core.interfaces.cache_port import CachePort
+from .memory_adapter import MemoryAdapter
+
+
+class ShardedMemoryAdapter(CachePort):
+    def __init__(self, shards: int = 16, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, policy: str = "lru",
+                 tick_seconds: float = 1.0, expire_batch: int = 1000):
+        if shards < 1:
+            raise ValueError("shards must be >= 1")
+        # Budgets are split so the shares add up to the budget exactly; each
+        # segment enforces its own share, so a hot segment evicts while a
+        # cold one still has room (shares differ by at most 1)
+        per_entries = self._split("max_entries", max_entries, shards)
+        per_bytes = self._split("max_bytes", max_bytes, shards)
+        self._shards: List[MemoryAdapter] = [
+            MemoryAdapter(max_entries=per_entries[i], max_bytes=per_bytes[i], policy=policy,
+                          tick_seconds=tick_seconds, expire_batch=expire_batch)
+            for i in range(shards)
+        ]
+        self._expirer: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _split(name: str, budget: Optional[int], shards: int) -> List[Optional[int]]:
+        if not budget:
+            return [None] * shards
+        if budget < shards:
+            raise ValueError(f"{name} ({budget}) must be >= shards ({shards})")
+        share, remainder = divmod(budget, shards)
+        return [share + 1 if i < remainder else share for i in range(shards)]
+
+    def _shard(self, key: str) -> MemoryAdapter:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: str) -> Optional[str]:
+        return self._shard(key).get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        return self._shard(key).set(key, value, ttl)
+
+    def delete(self, key: str) -> bool:
+        return self._shard(key).delete(key)
+
+    def exists(self, key: str) -> bool:
+        return self._shard(key).exists(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        keys = list(keys)
+        found: Dict[str, Optional[str]] = {}
+        for shard, shard_keys in self._group(keys).items():
+            found.update(self._shards[shard].get_many(shard_keys))
+        # Preserve the caller's key order
+        return {key: found[key] for key in keys}
+
+    def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        results = []
+        for shard, shard_keys in self._group(mapping).items():
+            results.append(self._shards[shard].set_many({k: mapping[k] for k in shard_keys}, ttl))
+        return all(results)
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        return sum(self._shards[shard].delete_many(shard_keys)
+                   for shard, shard_keys in self._group(keys).items())
+
+    def hash_get_all(self, key: str) -> Dict[str, str]:
+        return self._shard(key).hash_get_all(key)
+
+    def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                 prune_below: Optional[float] = None) -> bool:
+        return self._shard(key).hash_set(key, mapping, ttl, prune_below)
+
+    def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        return self._shard(key).hash_delete(key, fields)
+
+    def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                  refresh_below: Optional[float] = None) -> Optional[int]:
+        return self._shard(key).hash_incr(key, field, amount, ttl, refresh_below)
+
+    def _group(self, keys: Iterable[str]) -> Dict[int, List[str]]:
+        """Group keys by segment so each segment lock is taken once"""
+        groups: Dict[int, List[str]] = {}
+        n = len(self._shards)
+        for key in keys:
+            groups.setdefault(hash(key) % n, []).append(key)
+        return groups
+
+    def ping(self) -> bool:
+        return True
+
+    def expire_tick(self, now: Optional[float] = None) -> int:
+        """Run one expiry tick on every segment (one lock at a time)"""
+        return sum(shard.expire_tick(now) for shard in self._shards)
+
+    def start_expirer(self, interval: float = 1.0) -> None:
+        """
+        Start a daemon thread that ticks all segments every `interval`
+        seconds, so idle segments (no writes) are reclaimed too.
+        """
+        if self._expirer is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self.expire_tick()
+
+        self._expirer = threading.Thread(target=run, name="cache-expirer", daemon=True)
+        self._expirer.start()
+
+    def stop_expirer(self) -> None:
+        if self._expirer is not None:
+            self._stop.set()
+            self._expirer.join()
+            self._expirer = None
+
+    def stats(self) -> Dict[str, Any]:
+        shard_stats = [shard.stats() for shard in self._shards]
+        totals: Dict[str, Any] = {"backend": "memory-sharded", "shards": len(self._shards),
+                                  "policy": shard_stats[0]["policy"]}
+        for name in ("entries", "bytes", "hits", "misses", "evictions", "expirations",
+                     "rejections", "scheduled_expiries", "expiry_ticks", "last_tick_reclaimed"):
+            totals[name] = sum(s[name] for s in shard_stats)
+        for name in ("max_entries", "max_bytes"):
+            limits = [s[name] for s in shard_stats]
+            totals[name] = sum(limits) if all(limits) else None
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_ratio"] = round(totals["hits"] / lookups, 4) if lookups else 0.0
+        totals["entries_per_shard"] = [s["entries"] for s in shard_stats]
+        return totals
@@ -0,0 +1,298 @@
+"""
+Shared Memory Adapter - Cross-process CachePort on a memory-mapped file
+
+All gunicorn workers on one host open the same file (e.g. under /dev/shm)
+and see one cache, instead of one private MemoryAdapter per worker.
+
+Layout: a 4 KB header, then `capacity` fixed-size slots. The table is
+split into stripes; a key hashes (crc32, stable across processes) to a
+stripe and is linearly probed only within it, so one stripe lock covers
+every slot an operation can touch. Stripe locks are a threading.Lock
+(threads of this process) plus an fcntl byte-range lock (other processes).
+
+Each slot holds: state, key hash, expiry, key and value lengths, then the
+key and value bytes. Entries that do not fit in a slot are rejected.
+Expired entries are dropped when read or probed over; when a stripe is
+full, the key's home slot is overwritten (counted as an eviction).
+
+A deleted slot becomes a tombstone so probes for keys stored after it
+keep going. Tombstones directly before an empty slot end no probe chain
+and are turned back into empty slots, so deletes do not leave a stripe
+that every miss has to probe to the end.
+"""
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterable, Tuple
+from core.interfaces.cache_port import CachePort, prune_fields
+
+_MAGIC = b"PLSHMC01"
+_HEADER = struct.Struct("<8sIII")  # magic, capacity, slot_size, stripes
+_HEADER_SIZE = 4096
+# state, (pad), key hash, expiry (0 = none), key length, value length
+_SLOT = struct.Struct("<BxxxIdHI")
+
+_EMPTY, _USED, _DELETED = 0, 1, 2
+
+
+class SharedMemoryAdapter(CachePort):
+    def __init__(self, path: str, capacity: int = 65536, slot_size: int = 512,
+                 stripes: int = 256):
+        if capacity % stripes:
+            raise ValueError("capacity must be a multiple of stripes")
+        if stripes >= _HEADER_SIZE:
+            raise ValueError(f"stripes must be < {_HEADER_SIZE}")
+        if slot_size <= _SLOT.size:
+            raise ValueError(f"slot_size must be > {_SLOT.size}")
+        self.path = path
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self.stripes = stripes
+        self.slots_per_stripe = capacity // stripes
+        self.max_item_bytes = slot_size - _SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._init_file()
+        self._mm = mmap.mmap(self._fd, _HEADER_SIZE + capacity * slot_size)
+        self._thread_locks = [threading.Lock() for _ in range(stripes)]
+        # Per-process counters
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejections = 0
+
+    def _init_file(self) -> None:
+        """Create the table, or check an existing one has the same geometry"""
+        size = _HEADER_SIZE + self.capacity * self.slot_size
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+        try:
+            header = os.pread(self._fd, _HEADER.size, 0)
+            if len(header) < _HEADER.size or header[:8] != _MAGIC:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)  # zero-filled: every slot empty
+                os.pwrite(self._fd, _HEADER.pack(_MAGIC, self.capacity, self.slot_size, self.stripes), 0)
+                return
+            _, capacity, slot_size, stripes = _HEADER.unpack(header)
+            if (capacity, slot_size, stripes) != (self.capacity, self.slot_size, self.stripes):
+                raise ValueError(
+                    f"{self.path} holds a table with capacity={capacity}, "
+                    f"slot_size={slot_size}, stripes={stripes}"
+                )
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
+
+    @contextmanager
+    def _locked(self, stripe: int):
+        with self._thread_locks[stripe]:
+            # Byte `stripe + 1` of the header is this stripe's process lock
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, stripe + 1)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, stripe + 1)
+
+    def get(self, key: str) -> Optional[str]:
+        raw_key = key.encode("utf-8")
+        key_hash = zlib.crc32(raw_key)
+        stripe = key_hash % self.stripes
+        with self._locked(stripe):
+            offset, _ = self._find(stripe, raw_key, key_hash, time.time())
+            if offset is None:
+                self._misses += 1
+                return None
+            _, _, _, key_len, value_len = _SLOT.unpack_from(self._mm, offset)
+            start = offset + _SLOT.size + key_len
+            value = self._mm[start:start + value_len].decode("utf-8")
+        self._hits += 1
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        raw_key = key.encode("utf-8")
+        raw_value = value.encode("utf-8")
+        if len(raw_key) + len(raw_value) > self.max_item_bytes or len(raw_key) > 0xFFFF:
+            self._rejections += 1
+            return False
+        key_hash = zlib.crc32(raw_key)
+        stripe = key_hash % self.stripes
+        now = time.time()
+        with self._locked(stripe):
+            self._put(stripe, raw_key, key_hash, raw_value, now + ttl if ttl else 0.0, now)
+        return True
+
+    def delete(self, key: str) -> bool:
+        raw_key = key.encode("utf-8")
+        key_hash = zlib.crc32(raw_key)
+        stripe = key_hash % self.stripes
+        with self._locked(stripe):
+            offset, _ = self._find(stripe, raw_key, key_hash, time.time())
+            if offset is None:
+                return False
+            self._release(offset)
+            return True
+
+    def exists(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def ping(self) -> bool:
+        return not self._mm.closed
+
+    # Hashes are JSON blobs updated under the stripe lock (atomic across workers)
+
+    def hash_get_all(self, key: str) -> Dict[str, str]:
+        data = self.get(key)
+        return json.loads(data) if data else {}
+
+    def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                 prune_below: Optional[float] = None) -> bool:
+        def update(fields):
+            fields.update({field: str(value) for field, value in mapping.items()})
+            prune_fields(fields, prune_below)
+        return self._update_hash(key, update, ttl, None) is not None
+
+    def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        # An emptied hash stays as "{}" until it expires (reads see no fields)
+        def update(current):
+            return len([field for field in set(fields) if current.pop(field, None) is not None])
+        return self._update_hash(key, update, None, None) or 0
+
+    def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                  refresh_below: Optional[float] = None) -> Optional[int]:
+        def update(fields):
+            fields[field] = str(int(fields.get(field, 0)) + amount)
+            return int(fields[field])
+        return self._update_hash(key, update, ttl, refresh_below)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        entries = tombstones = 0
+        for stripe in range(self.stripes):
+            # One stripe at a time: writers elsewhere in the table are not held up
+            with self._locked(stripe):
+                base = stripe * self.slots_per_stripe
+                for index in range(base, base + self.slots_per_stripe):
+                    state, _, expiry, _, _ = _SLOT.unpack_from(self._mm, self._offset(index))
+                    if state == _USED and (not expiry or expiry > now):
+                        entries += 1
+                    elif state == _DELETED:
+                        tombstones += 1
+        lookups = self._hits + self._misses
+        return {
+            "backend": "shared-memory",
+            "path": self.path,
+            "entries": entries,
+            "tombstones": tombstones,
+            "capacity": self.capacity,
+            "slot_size": self.slot_size,
+            "stripes": self.stripes,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+            "evictions": self._evictions,
+            "rejections": self._rejections,
+        }
+
+    def close(self) -> None:
+        if not self._mm.closed:
+            self._mm.close()
+            os.close(self._fd)
+
+    # --- Internal helpers: caller must hold the stripe lock ---
+
+    def _offset(self, index: int) -> int:
+        return _HEADER_SIZE + index * self.slot_size
+
+    def _find(self, stripe: int, raw_key: bytes, key_hash: int,
+              now: float) -> Tuple[Optional[int], Optional[int]]:
+        """
+        Probe the stripe for raw_key.
+        Returns (offset of the live entry or None, offset of the first
+        reusable slot seen or None). Expired entries probed over are deleted.
+        """
+        base = stripe * self.slots_per_stripe
+        home = (key_hash // self.stripes) % self.slots_per_stripe
+        free = None
+        mm = self._mm
+        for step in range(self.slots_per_stripe):
+            offset = self._offset(base + (home + step) % self.slots_per_stripe)
+            state, slot_hash, expiry, key_len, _ = _SLOT.unpack_from(mm, offset)
+            if state == _EMPTY:
+                # `free` stays the first reusable slot even if reclaimed here
+                self._reclaim_before(offset)
+                return None, free if free is not None else offset
+            if state == _USED and expiry and expiry <= now:
+                mm[offset] = _DELETED
+                state = _DELETED
+            if state == _DELETED:
+                if free is None:
+                    free = offset
+                continue
+            if slot_hash == key_hash and key_len == len(raw_key):
+                start = offset + _SLOT.size
+                if mm[start:start + key_len] == raw_key:
+                    return offset, free
+        return None, free
+
+    def _release(self, offset: int) -> None:
+        """Delete the entry at offset: a tombstone, or empty if no probe chain runs past it"""
+        self._mm[offset] = _DELETED
+        index = (offset - _HEADER_SIZE) // self.slot_size
+        base = index - index % self.slots_per_stripe
+        following = self._offset(base + (index - base + 1) % self.slots_per_stripe)
+        if self._mm[following] == _EMPTY:
+            self._reclaim_before(following)
+
+    def _reclaim_before(self, offset: int) -> None:
+        """Turn the run of tombstones just before the empty slot at offset into empty slots"""
+        index = (offset - _HEADER_SIZE) // self.slot_size
+        base = index - index % self.slots_per_stripe
+        for step in range(1, self.slots_per_stripe):
+            previous = self._offset(base + (index - base - step) % self.slots_per_stripe)
+            if self._mm[previous] != _DELETED:
+                break
+            self._mm[previous] = _EMPTY
+
+    def _put(self, stripe: int, raw_key: bytes, key_hash: int, raw_value: bytes,
+             expiry: float, now: float) -> None:
+        offset, free = self._find(stripe, raw_key, key_hash, now)
+        if offset is None:
+            offset = free
+        if offset is None:
+            # Stripe full of live entries: overwrite the key's home slot
+            home = (key_hash // self.stripes) % self.slots_per_stripe
+            offset = self._offset(stripe * self.slots_per_stripe + home)
+            self._evictions += 1
+        start = offset + _SLOT.size
+        self._mm[start:start + len(raw_key)] = raw_key
+        self._mm[start + len(raw_key):start + len(raw_key) + len(raw_value)] = raw_value
+        # Header last, so the slot only turns USED once its bytes are written
+        _SLOT.pack_into(self._mm, offset, _USED, key_hash, expiry, len(raw_key), len(raw_value))
+
+    def _update_hash(self, key: str, update, ttl: Optional[int], refresh_below: Optional[float]):
+        raw_key = key.encode("utf-8")
+        key_hash = zlib.crc32(raw_key)
+        stripe = key_hash % self.stripes
+        now = time.time()
+        with self._locked(stripe):
+            offset, _ = self._find(stripe, raw_key, key_hash, now)
+            fields, expiry = {}, 0.0
+            if offset is not None:
+                _, _, expiry, key_len, value_len = _SLOT.unpack_from(self._mm, offset)
+                start = offset + _SLOT.size + key_len
+                fields = json.loads(self._mm[start:start + value_len])
+            result = update(fields)
+            if offset is None and not fields:
+                # Nothing to store: no empty hash left without an expiry
+                return result if result is not None else True
+            if ttl and (not expiry or refresh_below is None or expiry - now <= refresh_below):
+                expiry = now + ttl
+            raw_value = json.dumps(fields).encode("utf-8")
+            if len(raw_key) + len(raw_value) > self.max_item_bytes:
+                self._rejections += 1
+                return None
+            self._put(stripe, raw_key, key_hash, raw_value, expiry, now)
+        return result if result is not None else True
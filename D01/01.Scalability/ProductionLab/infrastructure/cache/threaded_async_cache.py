@@ -0,0 +1,73 @@
+"""
+Threaded Async Cache - AsyncCachePort over a sync CachePort that does I/O
+
+For backends without a redis.asyncio counterpart (the consistent-hashing
+ShardedCacheAdapter): each call runs on a bounded thread pool, so a slow
+node blocks a pool thread, never the event loop.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Optional, Dict, Iterable, Any
+from core.interfaces.async_cache_port import AsyncCachePort
+from core.interfaces.cache_port import CachePort
+
+
+class ThreadedAsyncCache(AsyncCachePort):
+    def __init__(self, inner: CachePort, max_workers: int = 16):
+        self.inner = inner
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cache")
+
+    async def _run(self, method, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(method, *args, **kwargs)
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self._run(self.inner.get, key)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None) -> bool:
+        return await self._run(self.inner.set, key, value, ttl)
+
+    async def delete(self, key: str) -> bool:
+        return await self._run(self.inner.delete, key)
+
+    async def exists(self, key: str) -> bool:
+        return await self._run(self.inner.exists, key)
+
+    async def ping(self) -> bool:
+        return await self._run(self.inner.ping)
+
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        return await self._run(self.inner.get_many, list(keys))
+
+    async def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        return await self._run(self.inner.set_many, mapping, ttl)
+
+    async def delete_many(self, keys: Iterable[str]) -> int:
+        return await self._run(self.inner.delete_many, list(keys))
+
+    async def hash_get_all(self, key: str) -> Dict[str, str]:
+        return await self._run(self.inner.hash_get_all, key)
+
+    async def hash_set(self, key: str, mapping: Dict[str, Any], ttl: Optional[int] = None,
+                       prune_below: Optional[float] = None) -> bool:
+        return await self._run(self.inner.hash_set, key, mapping, ttl, prune_below)
+
+    async def hash_delete(self, key: str, fields: Iterable[str]) -> int:
+        return await self._run(self.inner.hash_delete, key, list(fields))
+
+    async def set_with_hash(self, key: str, value: str, hash_key: str, mapping: Dict[str, Any],
+                            ttl: Optional[int] = None, prune_below: Optional[float] = None) -> bool:
+        return await self._run(self.inner.set_with_hash, key, value, hash_key, mapping, ttl, prune_below)
+
+    async def hash_incr(self, key: str, field: str, amount: int = 1, ttl: Optional[int] = None,
+                        refresh_below: Optional[float] = None) -> Optional[int]:
+        return await self._run(self.inner.hash_incr, key, field, amount, ttl=ttl,
+                               refresh_below=refresh_below)
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.inner.stats()
@@ -0,0 +1,136 @@
+"""
+Hierarchical Timing Wheel - O(1) scheduling of key expiry
+
+Level 0 has one slot per tick, level 1 one slot per 64 ticks, and so on
+(5 levels x 64 slots covers ~34 years at 1s ticks). Keys sit in a coarse
+slot until the wheel reaches it and are then cascaded into finer levels,
+so advancing only touches keys that are (nearly) due - never the whole
+keyspace - and jumps straight over ticks where no slot fires.
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+
+
+class TimingWheel:
+    SLOT_BITS = 6
+    SLOTS = 1 << SLOT_BITS
+    LEVELS = 5
+
+    def __init__(self, tick_seconds: float = 1.0, now: float = 0.0):
+        self.tick_seconds = tick_seconds
+        self.current_tick = self._to_tick(now)
+        self._wheels: List[List[Dict[str, int]]] = [
+            [{} for _ in range(self.SLOTS)] for _ in range(self.LEVELS)
+        ]
+        self._overflow: Dict[str, int] = {}
+        # key -> (level, slot); level -1 means overflow
+        self._location: Dict[str, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._location)
+
+    def schedule(self, key: str, expiry: float) -> None:
+        """(Re)schedule key to expire at `expiry` (epoch seconds)"""
+        self.cancel(key)
+        # Round up: the wheel may fire late by < 1 tick, never early
+        expiry_tick = max(math.ceil(expiry / self.tick_seconds), self.current_tick + 1)
+        self._place(key, expiry_tick)
+
+    def cancel(self, key: str) -> None:
+        location = self._location.pop(key, None)
+        if location is None:
+            return
+        level, slot = location
+        if level < 0:
+            self._overflow.pop(key, None)
+        else:
+            self._wheels[level][slot].pop(key, None)
+
+    def advance(self, now: float, max_ticks: Optional[int] = None) -> List[str]:
+        """
+        Move the wheel forward to `now` and return keys whose expiry passed.
+        Idle ticks are skipped; `max_ticks` bounds the slots fired or
+        cascaded in one call (the rest is picked up by the next call).
+        """
+        target = self._to_tick(now)
+        due: List[str] = []
+        if not self._location:
+            # Nothing scheduled: jump straight to now
+            self.current_tick = max(self.current_tick, target)
+            return due
+        steps = 0
+        while self.current_tick < target:
+            if max_ticks is not None and steps >= max_ticks:
+                break
+            next_tick = self._next_event()
+            if next_tick is None or next_tick > target:
+                # Nothing fires or cascades before now
+                self.current_tick = target
+                break
+            self.current_tick = next_tick
+            steps += 1
+            self._cascade(due)
+            bucket = self._wheels[0][self.current_tick & (self.SLOTS - 1)]
+            if bucket:
+                for key in bucket:
+                    del self._location[key]
+                    due.append(key)
+                bucket.clear()
+        return due
+
+    def _next_event(self) -> Optional[int]:
+        """
+        First tick after current_tick that fires a level-0 slot or enters a
+        non-empty coarse slot (None if nothing is scheduled). Ticks in
+        between change nothing, so advance jumps over them: an idle gap
+        costs at most LEVELS x SLOTS slot checks, not one step per tick.
+        """
+        tick = self.current_tick
+        for level in range(self.LEVELS):
+            shift = self.SLOT_BITS * level
+            block_start = (tick >> (shift + self.SLOT_BITS)) << (shift + self.SLOT_BITS)
+            for slot in range(((tick >> shift) & (self.SLOTS - 1)) + 1, self.SLOTS):
+                if self._wheels[level][slot]:
+                    return block_start + (slot << shift)
+        if self._overflow:
+            span = self.SLOT_BITS * self.LEVELS
+            return ((tick >> span) + 1) << span
+        return None
+
+    def _to_tick(self, timestamp: float) -> int:
+        return int(timestamp // self.tick_seconds)
+
+    def _place(self, key: str, expiry_tick: int) -> None:
+        for level in range(self.LEVELS):
+            shift = self.SLOT_BITS * (level + 1)
+            # Same block at the next level up -> slot is reached this rotation
+            if (expiry_tick >> shift) == (self.current_tick >> shift):
+                slot = (expiry_tick >> (self.SLOT_BITS * level)) & (self.SLOTS - 1)
+                self._wheels[level][slot][key] = expiry_tick
+                self._location[key] = (level, slot)
+                return
+        self._overflow[key] = expiry_tick
+        self._location[key] = (-1, 0)
+
+    def _cascade(self, due: List[str]) -> None:
+        """Redistribute coarse slots that the wheel just entered"""
+        tick = self.current_tick
+        if tick & ((1 << (self.SLOT_BITS * self.LEVELS)) - 1) == 0 and self._overflow:
+            self._redistribute(self._overflow, due)
+        for level in range(self.LEVELS - 1, 0, -1):
+            if tick & ((1 << (self.SLOT_BITS * level)) - 1):
+                continue
+            slot = (tick >> (self.SLOT_BITS * level)) & (self.SLOTS - 1)
+            bucket = self._wheels[level][slot]
+            if bucket:
+                self._redistribute(bucket, due)
+
+    def _redistribute(self, bucket: Dict[str, int], due: List[str]) -> None:
+        entries = list(bucket.items())
+        bucket.clear()
+        for key, expiry_tick in entries:
+            del self._location[key]
+            if expiry_tick <= self.current_tick:
+                due.append(key)
+            else:
+                self._place(key, expiry_tick)
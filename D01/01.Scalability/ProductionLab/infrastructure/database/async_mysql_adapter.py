@@ -0,0 +1,147 @@
+"""
+Async MySQL Adapter - Implementation of AsyncDatabasePort with aiomysql
+
+The pool is created lazily on first use, because aiomysql pools belong to
+the running event loop (the constructor may be called before it starts).
+Connections run in autocommit mode like MySQLAdapter: a read leaves no
+transaction open (aiomysql closes connections released mid-transaction),
+and transaction() issues BEGIN itself. A request waits at most
+pool_timeout seconds for a free connection, then gets PoolTimeout like
+the sync pool (the app answers 503).
+"""
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, List, Dict, Any
+from core.interfaces.async_database_port import AsyncDatabasePort, AsyncTransaction
+from core.interfaces.database_port import DuplicateKeyError, PoolTimeout
+
+try:
+    import aiomysql
+except ImportError:  # optional: only needed for the async serving path
+    aiomysql = None
+
+ER_DUP_ENTRY = 1062
+
+
+@contextmanager
+def _duplicate_key_errors():
+    """Raise ER_DUP_ENTRY as DuplicateKeyError (as MySQLAdapter does)"""
+    try:
+        yield
+    except aiomysql.IntegrityError as e:
+        if e.args and e.args[0] == ER_DUP_ENTRY:
+            raise DuplicateKeyError(str(e)) from e
+        raise
+
+
+class AsyncMySQLAdapter(AsyncDatabasePort):
+    def __init__(self, host: str, port: int, user: str, password: str, database: str,
+                 min_size: int = 1, pool_size: int = 20, pool_timeout: Optional[float] = None):
+        if aiomysql is None:
+            raise RuntimeError("aiomysql is required for AsyncMySQLAdapter")
+        self._config = dict(host=host, port=port, user=user, password=password,
+                            db=database, minsize=min_size, maxsize=pool_size,
+                            autocommit=True)
+        self.pool_timeout = pool_timeout  # None = wait for a connection indefinitely
+        self.pool = None
+        self._pool_lock = asyncio.Lock()
+    
+    async def _get_pool(self):
+        if self.pool is None:
+            async with self._pool_lock:
+                if self.pool is None:
+                    self.pool = await aiomysql.create_pool(**self._config)
+        return self.pool
+    
+    @asynccontextmanager
+    async def _connection(self):
+        """A pooled connection, released on exit; PoolTimeout if none frees up in time"""
+        pool = await self._get_pool()
+        try:
+            conn = await asyncio.wait_for(pool.acquire(), self.pool_timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeout(f"no MySQL connection free within {self.pool_timeout}s") from None
+        try:
+            yield conn
+        finally:
+            await pool.release(conn)
+    
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Async context manager for a transaction.
+        Usage:
+            async with db.transaction() as tx:
+                await tx.insert(...)
+        Commits when the block exits normally, rolls back if it raises.
+        """
+        async with self._connection() as conn:
+            await conn.begin()
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                try:
+                    yield AsyncTransactionContext(cursor)
+                    await conn.commit()
+                except Exception:
+                    await conn.rollback()
+                    raise
+    
+    async def execute(self, query: str, params: tuple = None) -> None:
+        async with self._connection() as conn:
+            async with conn.cursor() as cursor:
+                with _duplicate_key_errors():
+                    await cursor.execute(query, params or ())
+    
+    async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        async with self._connection() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params or ())
+                return await cursor.fetchone()
+    
+    async def fetch_all(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        async with self._connection() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params or ())
+                return list(await cursor.fetchall())
+    
+    async def insert(self, query: str, params: tuple = None) -> int:
+        async with self._connection() as conn:
+            async with conn.cursor() as cursor:
+                with _duplicate_key_errors():
+                    await cursor.execute(query, params or ())
+                return cursor.lastrowid
+    
+    async def ping(self) -> bool:
+        try:
+            async with self._connection() as conn:
+                await conn.ping(reconnect=True)
+            return True
+        except Exception:
+            return False
+    
+    async def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+
+
+class AsyncTransactionContext(AsyncTransaction):
+    """Helper class for async transaction operations"""
+    
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.last_insert_id = None
+    
+    async def execute(self, query: str, params: tuple = None) -> None:
+        with _duplicate_key_errors():
+            await self.cursor.execute(query, params or ())
+    
+    async def insert(self, query: str, params: tuple = None) -> int:
+        with _duplicate_key_errors():
+            await self.cursor.execute(query, params or ())
+        self.last_insert_id = self.cursor.lastrowid
+        return self.last_insert_id
+    
+    async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        await self.cursor.execute(query, params or ())
+        return await self.cursor.fetchone()
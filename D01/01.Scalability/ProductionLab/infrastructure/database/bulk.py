@@ -0,0 +1,47 @@
+"""
+Bulk helpers - Turn a single-row INSERT into chunked multi-row statements
+
+    INSERT INTO t (a, b) VALUES (%s, %s) ON DUPLICATE KEY UPDATE b = VALUES(b)
+    -> INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), ... ON DUPLICATE KEY UPDATE ...
+
+One statement per chunk means one round trip and one parse per chunk
+instead of per row. Chunks keep each statement well under max_allowed_packet.
+"""
+import re
+from typing import Iterator, List, Sequence, Tuple
+
+_VALUES = re.compile(r"\bVALUES\s*\(", re.IGNORECASE)
+
+
+def split_values(query: str) -> Tuple[str, str, str]:
+    """Split an INSERT into (head up to VALUES, row placeholder group, tail)"""
+    match = _VALUES.search(query)
+    if match is None:
+        raise ValueError("insert_many needs an INSERT ... VALUES (...) query")
+    start = match.end() - 1
+    depth = 0
+    for index in range(start, len(query)):
+        if query[index] == "(":
+            depth += 1
+        elif query[index] == ")":
+            depth -= 1
+            if depth == 0:
+                return query[:start], query[start:index + 1], query[index + 1:]
+    raise ValueError("unbalanced parentheses in VALUES (...)")
+
+
+def multi_row_query(query: str, count: int) -> str:
+    """The single-row INSERT rewritten to insert `count` rows"""
+    head, group, tail = split_values(query)
+    return head + ", ".join([group] * count) + tail
+
+
+def chunked(rows: Sequence[tuple], size: int) -> Iterator[Sequence[tuple]]:
+    if size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def flatten(rows: Sequence[tuple]) -> List:
+    return [value for row in rows for value in row]
@@ -0,0 +1,274 @@
+"""
+Connection Pool - Bounded DB connection pool with overflow and a wait queue
+
+    size          connections kept open for reuse
+    max_overflow  extra connections opened under burst, closed on return
+    timeout       how long a borrower waits for a free connection before
+                  PoolTimeout (instead of failing at once when all are busy)
+    max_lifetime  connections older than this are closed and replaced
+                  (stay below MySQL wait_timeout / proxy idle cutoffs)
+    idle_timeout  idle connections unused this long are closed
+    validate_after  only connections idle at least this long are pinged on
+                  borrow; recently used ones are trusted (no extra round trip)
+
+Idle connections are reused LIFO so the hot ones stay warm and the rest age
+out from the other end. Gauges for in-use / idle / waiters and a borrow
+wait histogram are exported to Prometheus (label pool=<name>).
+"""
+import bisect
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+from prometheus_client import REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+from core.interfaces.database_port import PoolTimeout  # raised here; defined on the port for services
+from infrastructure.metrics import collector_for, cumulative_buckets
+
+# Borrow waits: ~0 when the pool is large enough, up to `timeout` when not
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Entry:
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    def __init__(self, factory: Callable[[], Any], size: int = 5, max_overflow: int = 10,
+                 timeout: float = 5.0, max_lifetime: Optional[float] = 1800.0,
+                 idle_timeout: Optional[float] = 300.0, validate_after: Optional[float] = 30.0,
+                 validate: Optional[Callable[[Any], bool]] = None,
+                 close: Optional[Callable[[Any], None]] = None,
+                 is_disconnect: Optional[Callable[[Exception], bool]] = None,
+                 name: str = "default", registry=REGISTRY):
+        if size < 1 or max_overflow < 0:
+            raise ValueError("size must be >= 1 and max_overflow >= 0")
+        self.name = name
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.validate_after = validate_after
+        self._factory = factory
+        self._validate = validate or (lambda conn: True)
+        self._close = close or (lambda conn: conn.close())
+        self._is_disconnect = is_disconnect or (lambda exc: False)
+
+        self._cond = threading.Condition(threading.Lock())
+        self._idle: deque = deque()
+        self._open = 0       # idle + in use + being opened
+        self._waiters = 0
+        self._closed = False
+        # Telemetry
+        self._events: Dict[str, int] = {}
+        self._wait_buckets: List[int] = [0] * (len(WAIT_BUCKETS) + 1)
+        self._wait_total = 0.0
+        if registry is not None:
+            collector_for(registry, _PoolCollector).pools.add(self)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """
+        Borrow a connection for the block.
+        Connections that hit a disconnect error, or whose block was abandoned
+        (GeneratorExit from a half-read stream, KeyboardInterrupt), are
+        discarded, not reused.
+        """
+        entry = self._acquire(self.timeout if timeout is None else timeout)
+        try:
+            yield entry.conn
+        except BaseException as e:
+            self._release(entry, discard=not isinstance(e, Exception) or self._is_disconnect(e))
+            raise
+        else:
+            self._release(entry, discard=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "pool": self.name,
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "in_use": self._open - idle,
+                "idle": idle,
+                "waiters": self._waiters,
+                "borrows": sum(self._wait_buckets),
+                **self._events,
+            }
+
+    def close(self) -> None:
+        """Close idle connections; borrowed ones are closed when returned"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._close_quietly(entry)
+
+    # --- Internal helpers ---
+
+    def _acquire(self, timeout: float) -> _Entry:
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            entry, create, stale = self._checkout(deadline)
+            for old in stale:
+                self._close_quietly(old)
+            if create:
+                entry = self._open_entry()
+            elif not self._usable(entry):
+                self._discard(entry)
+                continue
+            self._record_wait(time.monotonic() - start)
+            return entry
+
+    def _checkout(self, deadline: float):
+        """Returns (idle entry or None, open a new one?, stale entries to close)"""
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout(f"pool {self.name!r} is closed")
+                stale = self._take_stale(time.monotonic())
+                if self._idle:
+                    return self._idle.pop(), False, stale
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    if self._open > self.size:
+                        self._count("overflow")
+                    return None, True, stale
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._count("timeouts")
+                    raise PoolTimeout(
+                        f"no connection free in pool {self.name!r} "
+                        f"({self.size}+{self.max_overflow} in use)"
+                    )
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+
+    def _open_entry(self) -> _Entry:
+        try:
+            conn = self._factory()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+        self._bump("created")
+        return _Entry(conn)
+
+    def _usable(self, entry: _Entry) -> bool:
+        now = time.monotonic()
+        if self.max_lifetime is not None and now - entry.created_at >= self.max_lifetime:
+            self._bump("recycled")
+            return False
+        if self.validate_after is not None and now - entry.last_used >= self.validate_after:
+            try:
+                valid = self._validate(entry.conn)
+            except Exception:
+                valid = False
+            if not valid:
+                self._bump("invalidated")
+                return False
+        return True
+
+    def _release(self, entry: _Entry, discard: bool) -> None:
+        entry.last_used = time.monotonic()
+        with self._cond:
+            keep = (not discard and not self._closed and len(self._idle) < self.size
+                    and (self.max_lifetime is None
+                         or entry.last_used - entry.created_at < self.max_lifetime))
+            if keep:
+                self._idle.append(entry)
+            else:
+                self._open -= 1
+                if discard:
+                    self._count("invalidated")
+            self._cond.notify()
+        if not keep:
+            self._close_quietly(entry)
+
+    def _discard(self, entry: _Entry) -> None:
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+        self._close_quietly(entry)
+
+    def _take_stale(self, now: float) -> List[_Entry]:
+        """Pop connections idle past idle_timeout (oldest are at the left). Caller holds the lock."""
+        stale = []
+        if self.idle_timeout is not None:
+            while self._idle and now - self._idle[0].last_used >= self.idle_timeout:
+                stale.append(self._idle.popleft())
+            if stale:
+                self._open -= len(stale)
+                self._count("idle_closed", len(stale))
+        return stale
+
+    def _close_quietly(self, entry: _Entry) -> None:
+        try:
+            self._close(entry.conn)
+        except Exception:
+            pass
+
+    def _count(self, event: str, amount: int = 1) -> None:
+        """Caller holds the lock"""
+        self._events[event] = self._events.get(event, 0) + amount
+
+    def _bump(self, event: str) -> None:
+        with self._cond:
+            self._count(event)
+
+    def _record_wait(self, elapsed: float) -> None:
+        slot = bisect.bisect_left(WAIT_BUCKETS, elapsed)
+        with self._cond:
+            self._wait_buckets[slot] += 1
+            self._wait_total += elapsed
+
+
+class _PoolCollector:
+    """One Prometheus collector per registry, reporting every live pool"""
+
+    def __init__(self):
+        self.pools = weakref.WeakSet()
+
+    def describe(self):
+        return [GaugeMetricFamily('db_pool_connections', 'Pooled DB connections by state',
+                                  labels=['pool', 'state']),
+                GaugeMetricFamily('db_pool_waiters', 'Threads waiting for a DB connection',
+                                  labels=['pool']),
+                CounterMetricFamily('db_pool_events', 'DB pool connection lifecycle events',
+                                    labels=['pool', 'event']),
+                HistogramMetricFamily('db_pool_borrow_wait_seconds', 'Time to borrow a DB connection',
+                                      labels=['pool'])]
+
+    def collect(self):
+        connections, waiters, events, wait = self.describe()
+        for pool in sorted(self.pools, key=lambda p: p.name):
+            stats = pool.stats()
+            connections.add_metric([pool.name, 'in_use'], stats["in_use"])
+            connections.add_metric([pool.name, 'idle'], stats["idle"])
+            waiters.add_metric([pool.name], stats["waiters"])
+            with pool._cond:
+                pool_events = dict(pool._events)
+                buckets, total = list(pool._wait_buckets), pool._wait_total
+            for event, value in sorted(pool_events.items()):
+                events.add_metric([pool.name, event], value)
+            wait.add_metric([pool.name], cumulative_buckets(WAIT_BUCKETS, buckets), total)
+        yield connections
+        yield waiters
+        yield events
+        yield wait
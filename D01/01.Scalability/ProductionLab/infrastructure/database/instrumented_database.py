@@ -0,0 +1,336 @@
+"""
+Instrumented Database - Per-query timing and slow-query log for any DatabasePort
+
+Each SQL string is normalized to a fingerprint (literals and placeholders
+become ?, IN lists and multi-row VALUES collapse, whitespace folds), so
+"the same query with different values" is one row of statistics:
+count, errors, total time, p50/p99 (over the last `samples` calls).
+
+Calls slower than `slow_threshold` are logged to the "slow_query" logger
+with the shapes of their bound parameters (type and length, never the
+values) and kept in a short in-memory list. With explain=True the first
+slow call of each SELECT fingerprint also captures its EXPLAIN plan, on a
+background thread so the slow request is not made slower.
+
+Like InstrumentedCache, one collector per registry reports every live wrapper
+(summed): db_queries_total{query_id,op,result}, db_query_duration_seconds{query_id,op}
+and db_slow_queries_total{query_id,op}; query_id is a short hash of the
+fingerprint, mapped back to the text by query_report() (GET /debug/queries).
+"""
+import bisect
+import hashlib
+import logging
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterator, Sequence
+from prometheus_client import REGISTRY
+from prometheus_client.core import CounterMetricFamily, HistogramMetricFamily
+from core.interfaces.database_port import DatabasePort, BulkResult
+from infrastructure.metrics import collector_for, cumulative_buckets
+
+logger = logging.getLogger("slow_query")
+
+# Queries range from sub-millisecond lookups to multi-second exports
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+perf_counter = time.perf_counter
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s|\?")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_ROW_LIST = re.compile(r"(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(query: str) -> str:
+    """Normalized query text: values and placeholders replaced by ?"""
+    text = _STRING.sub("?", query)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _SPACE.sub(" ", text).strip()
+    text = _IN_LIST.sub("IN (?+)", text)
+    return _ROW_LIST.sub(r"\1+", text)
+
+
+def query_id(fingerprint_text: str) -> str:
+    return hashlib.sha1(fingerprint_text.encode("utf-8")).hexdigest()[:12]
+
+
+def param_shapes(params) -> Any:
+    """Type (and length for str/bytes) of each bound parameter - never the values"""
+    if params is None:
+        return []
+    if isinstance(params, dict):
+        return {key: param_shapes([value])[0] for key, value in params.items()}
+    shapes = []
+    for value in params:
+        if isinstance(value, (str, bytes)):
+            shapes.append(f"{type(value).__name__}({len(value)})")
+        else:
+            shapes.append(type(value).__name__)
+    return shapes
+
+
+class _QueryStats:
+    """Counters, latency histogram and recent samples for one (fingerprint, op)"""
+    __slots__ = ("results", "buckets", "total", "samples", "slow")
+
+    def __init__(self, samples: int):
+        self.results: Dict[str, int] = {}
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.samples: deque = deque(maxlen=samples)
+        self.slow = 0
+
+
+class InstrumentedDatabase(DatabasePort):
+    def __init__(self, inner: DatabasePort, slow_threshold: float = 0.1, explain: bool = False,
+                 registry=REGISTRY, max_fingerprints: int = 200, samples: int = 1024,
+                 slow_log_size: int = 100):
+        self.inner = inner
+        self.slow_threshold = slow_threshold
+        self.explain = explain
+        self.max_fingerprints = max_fingerprints
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._stats: Dict[tuple, _QueryStats] = {}
+        # query text -> (query_id, fingerprint); bounded like the label set
+        self._fingerprints: Dict[str, tuple] = {}
+        self._texts: Dict[str, str] = {}
+        self._slow_log: deque = deque(maxlen=slow_log_size)
+        self._plans: Dict[str, Any] = {}
+        if registry is not None:
+            collector_for(registry, _DatabaseCollector).databases.add(self)
+
+    # --- DatabasePort ---
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        return self._timed("execute", query, params, lambda: self.inner.execute(query, params))
+
+    def fetch_one(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> Optional[Dict[str, Any]]:
+        return self._timed("fetch_one", query, params,
+                           lambda: self.inner.fetch_one(query, params, read_only=read_only))
+
+    def fetch_all(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> List[Dict[str, Any]]:
+        return self._timed("fetch_all", query, params,
+                           lambda: self.inner.fetch_all(query, params, read_only=read_only))
+
+    def fetch_iter(self, query: str, params: tuple = None, batch_size: int = 1000,
+                   as_tuples: bool = False, read_only: bool = False) -> Iterator[Any]:
+        """Timed from the first row requested until the stream ends (or is closed)"""
+        start = perf_counter()
+        result = "ok"
+        try:
+            yield from self.inner.fetch_iter(query, params, batch_size, as_tuples, read_only)
+        except Exception:
+            result = "error"
+            raise
+        finally:
+            self._observe("fetch_iter", query, params, result, perf_counter() - start)
+
+    def insert(self, query: str, params: tuple = None) -> int:
+        return self._timed("insert", query, params, lambda: self.inner.insert(query, params))
+
+    def insert_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000,
+                    transaction_per_chunk: bool = False) -> BulkResult:
+        return self._timed("insert_many", query, rows[0] if rows else None,
+                           lambda: self.inner.insert_many(query, rows, chunk_size, transaction_per_chunk))
+
+    def execute_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000,
+                     transaction_per_chunk: bool = False) -> int:
+        return self._timed("execute_many", query, rows[0] if rows else None,
+                           lambda: self.inner.execute_many(query, rows, chunk_size, transaction_per_chunk))
+
+    @contextmanager
+    def transaction(self):
+        with self.inner.transaction() as tx:
+            yield _InstrumentedTransaction(self, tx)
+
+    def ping(self) -> bool:
+        return self.inner.ping()
+
+    def replication_lag(self) -> Optional[float]:
+        return self.inner.replication_lag()
+
+    def __getattr__(self, name):
+        # Adapter extras (pool_stats, stats, check_replicas, ...) pass through
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    # --- Reports ---
+
+    def query_report(self, limit: int = 20) -> Dict[str, Any]:
+        """Fingerprints by total time, with p50/p99, plus recent slow queries"""
+        with self._lock:
+            rows = [(key, s.total, dict(s.results), s.slow, sorted(s.samples))
+                    for key, s in self._stats.items()]
+            slow_log = list(self._slow_log)
+            plans = dict(self._plans)
+            texts = dict(self._texts)
+        rows.sort(key=lambda row: row[1], reverse=True)
+        queries = []
+        for (qid, op), total, results, slow, samples in rows[:limit]:
+            count = sum(results.values())
+            queries.append({
+                "query_id": qid,
+                "op": op,
+                "fingerprint": texts.get(qid),
+                "count": count,
+                "errors": results.get("error", 0),
+                "total_ms": round(total * 1000, 3),
+                "mean_ms": round(total / count * 1000, 3) if count else 0.0,
+                "p50_ms": _percentile_ms(samples, 0.50),
+                "p99_ms": _percentile_ms(samples, 0.99),
+                "slow": slow,
+                "explain": plans.get(qid),
+            })
+        return {
+            "slow_threshold_ms": self.slow_threshold * 1000,
+            "queries": queries,
+            "slow_queries": slow_log[::-1],
+        }
+
+    # --- Internal helpers ---
+
+    def _timed(self, op: str, query: str, params, call):
+        start = perf_counter()
+        try:
+            value = call()
+        except Exception:
+            self._observe(op, query, params, "error", perf_counter() - start)
+            raise
+        self._observe(op, query, params, "ok", perf_counter() - start)
+        return value
+
+    def _identify(self, query: str) -> tuple:
+        known = self._fingerprints.get(query)
+        if known is not None:
+            return known
+        text = fingerprint(query)
+        qid = query_id(text)
+        with self._lock:
+            if qid not in self._texts and len(self._texts) >= self.max_fingerprints:
+                # Bounded label cardinality: later unseen queries report as "other"
+                qid, text = "other", "other"
+            self._texts.setdefault(qid, text)
+            if len(self._fingerprints) < self.max_fingerprints * 4:
+                self._fingerprints[query] = (qid, text)
+        return qid, text
+
+    def _observe(self, op: str, query: str, params, result: str, elapsed: float) -> None:
+        qid, text = self._identify(query)
+        slot = bisect.bisect_left(LATENCY_BUCKETS, elapsed)
+        slow = elapsed >= self.slow_threshold
+        with self._lock:
+            stats = self._stats.get((qid, op))
+            if stats is None:
+                stats = self._stats[(qid, op)] = _QueryStats(self.samples)
+            stats.results[result] = stats.results.get(result, 0) + 1
+            stats.buckets[slot] += 1
+            stats.total += elapsed
+            stats.samples.append(elapsed)
+            if slow:
+                stats.slow += 1
+                entry = {
+                    "query_id": qid,
+                    "op": op,
+                    "fingerprint": text,
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "params": param_shapes(params),
+                    "result": result,
+                    "at": time.time(),
+                }
+                self._slow_log.append(entry)
+                want_plan = (self.explain and qid not in self._plans and qid != "other"
+                             and query.lstrip()[:6].upper() == "SELECT")
+                if want_plan:
+                    self._plans[qid] = None  # claimed: capture once
+        if slow:
+            logger.warning("slow query %.1fms %s [%s] params=%s", elapsed * 1000, op, text, entry["params"])
+            if want_plan:
+                threading.Thread(target=self._capture_plan, args=(qid, query, params),
+                                 name="explain", daemon=True).start()
+
+    def _capture_plan(self, qid: str, query: str, params) -> None:
+        try:
+            plan = self.inner.fetch_all(f"EXPLAIN {query}", params)
+        except Exception as e:
+            plan = {"error": f"{type(e).__name__}: {e}"}
+        with self._lock:
+            self._plans[qid] = plan
+
+    def _snapshot(self) -> Dict[tuple, tuple]:
+        with self._lock:
+            return {key: (dict(s.results), list(s.buckets), s.total, s.slow)
+                    for key, s in self._stats.items()}
+
+
+class _DatabaseCollector:
+    """One Prometheus collector per registry, summing every live InstrumentedDatabase"""
+
+    def __init__(self):
+        self.databases = weakref.WeakSet()
+
+    def describe(self):
+        return [CounterMetricFamily('db_queries', 'Database calls by query fingerprint, operation and result',
+                                    labels=['query_id', 'op', 'result']),
+                HistogramMetricFamily('db_query_duration_seconds', 'Database call latency by query fingerprint',
+                                      labels=['query_id', 'op']),
+                CounterMetricFamily('db_slow_queries', 'Database calls over the slow-query threshold',
+                                    labels=['query_id', 'op'])]
+
+    def collect(self):
+        queries, latency, slow = self.describe()
+        merged: Dict[tuple, list] = {}
+        for database in list(self.databases):
+            for key, (results, buckets, total, slow_count) in database._snapshot().items():
+                entry = merged.setdefault(key, [{}, [0] * len(buckets), 0.0, 0])
+                for result, value in results.items():
+                    entry[0][result] = entry[0].get(result, 0) + value
+                entry[1] = [a + b for a, b in zip(entry[1], buckets)]
+                entry[2] += total
+                entry[3] += slow_count
+        for (qid, op), (results, buckets, total, slow_count) in sorted(merged.items()):
+            for result, value in sorted(results.items()):
+                queries.add_metric([qid, op, result], value)
+            slow.add_metric([qid, op], slow_count)
+            latency.add_metric([qid, op], cumulative_buckets(LATENCY_BUCKETS, buckets), total)
+        yield queries
+        yield latency
+        yield slow
+
+
+class _InstrumentedTransaction:
+    """Times each statement run inside InstrumentedDatabase.transaction()"""
+
+    def __init__(self, db: InstrumentedDatabase, tx):
+        self._db = db
+        self._tx = tx
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        return self._db._timed("tx_execute", query, params, lambda: self._tx.execute(query, params))
+
+    def insert(self, query: str, params: tuple = None) -> int:
+        return self._db._timed("tx_insert", query, params, lambda: self._tx.insert(query, params))
+
+    def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        return self._db._timed("tx_fetch_one", query, params, lambda: self._tx.fetch_one(query, params))
+
+    def __getattr__(self, name):
+        return getattr(self._tx, name)
+
+
+def _percentile_ms(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(q * len(sorted_samples)))
+    return round(sorted_samples[index] * 1000, 3)
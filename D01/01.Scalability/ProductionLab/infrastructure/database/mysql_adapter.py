@@ -1,27 +1,74 @@
 """
 MySQL Adapter - Implementation of DatabasePort for MySQL
+
+Connections come from a ConnectionPool: a burst beyond `pool_size` opens up
+to `max_overflow` extra connections, then waits up to `pool_timeout` for
+one to be returned (PoolTimeout after that) instead of failing at once.
+Connections run in autocommit mode so a pooled connection never holds an
+open read snapshot; transaction() starts an explicit transaction.
+
+insert_many/execute_many send chunk_size rows per statement (see bulk.py)
+on one connection, in one transaction or one per chunk. fetch_iter streams
+large results instead of building a list.
 """
 import mysql.connector
-from mysql.connector import pooling
-from typing import Optional, List, Dict, Any
+from mysql.connector import errors
+from prometheus_client import REGISTRY
+from dataclasses import replace
+from typing import Optional, List, Dict, Any, Iterator, Sequence
 from contextlib import contextmanager
-from core.interfaces.database_port import DatabasePort
+from core.interfaces.database_port import DatabasePort, BulkResult, BulkWriteError, DuplicateKeyError
+from .bulk import chunked, flatten, multi_row_query
+from .connection_pool import ConnectionPool, PoolTimeout
+
+
+def _is_disconnect(exc: Exception) -> bool:
+    """Errors after which the connection must not go back to the pool"""
+    return isinstance(exc, (errors.InterfaceError, errors.OperationalError))
+
+
+def _validate(conn) -> bool:
+    return conn.is_connected()  # one lightweight COM_PING
+
+
+ER_DUP_ENTRY = 1062
+
+
+@contextmanager
+def _duplicate_key_errors():
+    """Raise ER_DUP_ENTRY as DuplicateKeyError; other errors pass through"""
+    try:
+        yield
+    except errors.IntegrityError as e:
+        if e.errno == ER_DUP_ENTRY:
+            raise DuplicateKeyError(str(e)) from e
+        raise
 
 
 class MySQLAdapter(DatabasePort):
-    def __init__(self, host: str, port: int, user: str, password: str, database: str, pool_size: int = 5):
-        self.pool = pooling.MySQLConnectionPool(
-            pool_name="mypool",
-            pool_size=pool_size,
-            host=host,
-            port=port,
-            user=user,
-            password=password,
-            database=database
+    def __init__(self, host: str, port: int, user: str, password: str, database: str,
+                 pool_size: int = 5, max_overflow: int = 10, pool_timeout: float = 5.0,
+                 max_lifetime: Optional[float] = 1800.0, idle_timeout: Optional[float] = 300.0,
+                 validate_after: Optional[float] = 30.0, connect_timeout: int = 5,
+                 pool_name: str = "primary", registry=REGISTRY):
+        config = dict(host=host, port=port, user=user, password=password, database=database,
+                      autocommit=True, connection_timeout=connect_timeout)
+        self.pool = ConnectionPool(
+            lambda: mysql.connector.connect(**config),
+            size=pool_size,
+            max_overflow=max_overflow,
+            timeout=pool_timeout,
+            max_lifetime=max_lifetime,
+            idle_timeout=idle_timeout,
+            validate_after=validate_after,
+            validate=_validate,
+            is_disconnect=_is_disconnect,
+            name=pool_name,
+            registry=registry
         )
     
-    def _get_connection(self):
-        return self.pool.get_connection()
+    def _connection(self):
+        return self.pool.connection()
     
     @contextmanager
     def transaction(self):
@@ -34,68 +81,164 @@ class MySQLAdapter(DatabasePort):
             # Auto-commit nếu không có exception
             # Auto-rollback nếu có exception
         """
-        conn = self._get_connection()
-        cursor = conn.cursor(dictionary=True)
-        tx = TransactionContext(conn, cursor)
-        try:
-            yield tx
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        finally:
-            cursor.close()
-            conn.close()
+        with self._connection() as conn:
+            conn.start_transaction()
+            cursor = conn.cursor(dictionary=True)
+            tx = TransactionContext(conn, cursor)
+            try:
+                yield tx
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
     
     def execute(self, query: str, params: tuple = None) -> None:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(query, params or ())
-            conn.commit()
-        finally:
-            cursor.close()
-            conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            try:
+                with _duplicate_key_errors():
+                    cursor.execute(query, params or ())
+            finally:
+                cursor.close()
     
-    def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor(dictionary=True)
-        try:
-            cursor.execute(query, params or ())
-            return cursor.fetchone()
-        finally:
-            cursor.close()
-            conn.close()
+    def fetch_one(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> Optional[Dict[str, Any]]:
+        with self._connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(query, params or ())
+                return cursor.fetchone()
+            finally:
+                cursor.close()
     
-    def fetch_all(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
-        conn = self._get_connection()
-        cursor = conn.cursor(dictionary=True)
-        try:
+    def fetch_all(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> List[Dict[str, Any]]:
+        with self._connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                cursor.execute(query, params or ())
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+    
+    def fetch_iter(self, query: str, params: tuple = None, batch_size: int = 1000,
+                   as_tuples: bool = False, read_only: bool = False) -> Iterator[Any]:
+        """
+        Stream rows with an unbuffered cursor: the server sends the result
+        as it is read, and only batch_size rows are in Python memory at a
+        time. The pooled connection is held until the iterator is exhausted
+        or closed; a half-read connection is discarded, not reused.
+        """
+        with self._connection() as conn:
+            cursor = conn.cursor(buffered=False, dictionary=not as_tuples)
             cursor.execute(query, params or ())
-            return cursor.fetchall()
-        finally:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
             cursor.close()
-            conn.close()
     
     def insert(self, query: str, params: tuple = None) -> int:
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(query, params or ())
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            cursor.close()
-            conn.close()
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            try:
+                with _duplicate_key_errors():
+                    cursor.execute(query, params or ())
+                return cursor.lastrowid
+            finally:
+                cursor.close()
     
     def ping(self) -> bool:
         try:
-            conn = self._get_connection()
-            conn.ping(reconnect=True)
-            conn.close()
+            with self._connection() as conn:
+                conn.ping(reconnect=True)
             return True
         except Exception:
             return False
+    
+    def insert_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000,
+                    transaction_per_chunk: bool = False) -> BulkResult:
+        """
+        One multi-row INSERT per chunk. first_id is the id of the first row;
+        later ids are not guaranteed consecutive (innodb_autoinc_lock_mode=2).
+        """
+        def insert_chunk(cursor, chunk):
+            cursor.execute(multi_row_query(query, len(chunk)), flatten(chunk))
+            return cursor.rowcount, cursor.lastrowid
+        return self._run_chunks("insert_many", rows, chunk_size, transaction_per_chunk, insert_chunk)
+    
+    def execute_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000,
+                     transaction_per_chunk: bool = False) -> int:
+        """executemany per chunk (UPDATE/DELETE: one statement per row, one commit per chunk)"""
+        def execute_chunk(cursor, chunk):
+            cursor.executemany(query, chunk)
+            return cursor.rowcount, None
+        return self._run_chunks("execute_many", rows, chunk_size, transaction_per_chunk,
+                                execute_chunk).rowcount
+    
+    def _run_chunks(self, name: str, rows: Sequence[tuple], chunk_size: int,
+                    transaction_per_chunk: bool, run_chunk) -> BulkResult:
+        result, committed = BulkResult(), BulkResult()
+        if not rows:
+            return result
+        try:
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    if not transaction_per_chunk:
+                        conn.start_transaction()
+                    for chunk in chunked(rows, chunk_size):
+                        if transaction_per_chunk:
+                            conn.start_transaction()
+                        rowcount, last_id = run_chunk(cursor, chunk)
+                        result.rowcount += max(rowcount, 0)
+                        result.chunks += 1
+                        if result.first_id is None and last_id:
+                            result.first_id = last_id
+                        if transaction_per_chunk:
+                            conn.commit()
+                            committed = replace(result)
+                    if not transaction_per_chunk:
+                        conn.commit()
+                except Exception:
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        pass  # the original error decides whether the connection is kept
+                    raise
+                finally:
+                    cursor.close()
+        except PoolTimeout:
+            raise
+        except Exception as e:
+            raise BulkWriteError(
+                f"{name} failed after {committed.rowcount} committed rows: {e}", committed
+            ) from e
+        return result
+    
+    def replication_lag(self) -> Optional[float]:
+        """Seconds_Behind_Source of this server; None if replication is stopped"""
+        with self._connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                try:
+                    cursor.execute("SHOW REPLICA STATUS")
+                except errors.ProgrammingError:  # MySQL < 8.0.22
+                    cursor.execute("SHOW SLAVE STATUS")
+                status = cursor.fetchone()
+            finally:
+                cursor.close()
+        if not status:
+            return 0.0  # not a replica
+        lag = status.get("Seconds_Behind_Source", status.get("Seconds_Behind_Master"))
+        return float(lag) if lag is not None else None
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """In use / idle / waiters and lifecycle counts of the connection pool"""
+        return self.pool.stats()
 
 
 class TransactionContext:
@@ -107,13 +250,33 @@ class TransactionContext:
         self.last_insert_id = None
     
     def execute(self, query: str, params: tuple = None) -> None:
-        self.cursor.execute(query, params or ())
+        with _duplicate_key_errors():
+            self.cursor.execute(query, params or ())
     
     def insert(self, query: str, params: tuple = None) -> int:
-        self.cursor.execute(query, params or ())
+        with _duplicate_key_errors():
+            self.cursor.execute(query, params or ())
         self.last_insert_id = self.cursor.lastrowid
         return self.last_insert_id
     
+    def insert_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000) -> BulkResult:
+        """Multi-row INSERT per chunk, inside the surrounding transaction"""
+        result = BulkResult()
+        for chunk in chunked(rows, chunk_size):
+            self.cursor.execute(multi_row_query(query, len(chunk)), flatten(chunk))
+            result.rowcount += self.cursor.rowcount
+            result.chunks += 1
+            if result.first_id is None:
+                result.first_id = self.cursor.lastrowid
+        return result
+    
+    def execute_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000) -> int:
+        rowcount = 0
+        for chunk in chunked(rows, chunk_size):
+            self.cursor.executemany(query, chunk)
+            rowcount += self.cursor.rowcount
+        return rowcount
+    
     def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
         self.cursor.execute(query, params or ())
         return self.cursor.fetchone()
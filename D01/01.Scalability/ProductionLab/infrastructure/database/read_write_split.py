@@ -0,0 +1,218 @@
+"""
+Read/Write Split Adapter - Send read-only queries to replicas
+
+Writes (execute, insert, the bulk variants, transaction) always go to the
+primary. Reads marked read_only=True go to a replica picked at random,
+weighted by 1 / (1 + replication lag). Replicas that fail, stop replicating or trail
+by more than `max_lag` seconds are skipped until a later lag check.
+With no usable replica, reads go to the primary.
+
+Read-your-writes: after a write, reads in the same request scope go to
+the primary for `pin_window` seconds. The scope is a contextvar, so the
+web layer can carry the pin from one request to the next (see
+infrastructure/web/middleware/read_your_writes.py).
+"""
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, List, Dict, Any, Iterator, Sequence
+from core.interfaces.database_port import DatabasePort, BulkResult
+
+# Per-request scope: {"pinned_until": float, "wrote": bool}, None outside a request
+_scope: ContextVar[Optional[Dict[str, Any]]] = ContextVar("db_read_scope", default=None)
+
+
+def begin_scope(pinned_until: float = 0.0):
+    """Start a request scope, carrying a pin from an earlier write (epoch seconds)"""
+    return _scope.set({"pinned_until": pinned_until, "wrote": False})
+
+
+def end_scope(token) -> Optional[float]:
+    """Close the scope; returns the new pin expiry if this scope wrote, else None"""
+    scope = _scope.get()
+    _scope.reset(token)
+    if scope and scope["wrote"]:
+        return scope["pinned_until"]
+    return None
+
+
+class ReadWriteSplitAdapter(DatabasePort):
+    def __init__(self, primary: DatabasePort, replicas: Dict[str, DatabasePort],
+                 max_lag: float = 2.0, pin_window: float = 5.0):
+        self.primary = primary
+        self.replicas = dict(replicas)
+        self.max_lag = max_lag
+        self.pin_window = pin_window
+        # Replaced as a whole after each lag check: (names, weights)
+        self._targets = (list(self.replicas), [1.0] * len(self.replicas))
+        self._lag: Dict[str, Optional[float]] = {name: None for name in self.replicas}
+        self._reasons: Dict[str, str] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._checker: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # --- Reads ---
+
+    def fetch_one(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> Optional[Dict[str, Any]]:
+        return self._read(lambda db: db.fetch_one(query, params), read_only)
+
+    def fetch_all(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> List[Dict[str, Any]]:
+        return self._read(lambda db: db.fetch_all(query, params), read_only)
+
+    def fetch_iter(self, query: str, params: tuple = None, batch_size: int = 1000,
+                   as_tuples: bool = False, read_only: bool = False) -> Iterator[Any]:
+        """Streams from one database; a replica failing mid-stream is not retried"""
+        db = self._read(lambda db: db, read_only)
+        return db.fetch_iter(query, params, batch_size, as_tuples)
+
+    # --- Writes: primary only ---
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        self._mark_write()
+        self.primary.execute(query, params)
+
+    def insert(self, query: str, params: tuple = None) -> int:
+        self._mark_write()
+        return self.primary.insert(query, params)
+
+    def insert_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000,
+                    transaction_per_chunk: bool = False) -> BulkResult:
+        self._mark_write()
+        return self.primary.insert_many(query, rows, chunk_size, transaction_per_chunk)
+
+    def execute_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000,
+                     transaction_per_chunk: bool = False) -> int:
+        self._mark_write()
+        return self.primary.execute_many(query, rows, chunk_size, transaction_per_chunk)
+
+    @contextmanager
+    def transaction(self):
+        self._mark_write()
+        with self.primary.transaction() as tx:
+            yield tx
+
+    def ping(self) -> bool:
+        return self.primary.ping()
+
+    def stats(self) -> Dict[str, Any]:
+        names, weights = self._targets
+        active = dict(zip(names, weights))
+        with self._lock:
+            counts = dict(self._counts)
+            lag = dict(self._lag)
+            reasons = dict(self._reasons)
+        return {
+            "max_lag": self.max_lag,
+            "pin_window": self.pin_window,
+            "replicas": {
+                name: {
+                    "healthy": name in active,
+                    "lag": lag[name],
+                    "weight": round(active.get(name, 0.0), 4),
+                    "reads": counts.get(f"replica:{name}", 0),
+                    "skipped_reason": reasons.get(name),
+                }
+                for name in self.replicas
+            },
+            "primary_reads": counts.get("primary", 0),
+            "pinned_reads": counts.get("pinned", 0),
+            "replica_failures": counts.get("failures", 0),
+        }
+
+    # --- Replica health ---
+
+    def check_replicas(self) -> Dict[str, Optional[float]]:
+        """Measure every replica's lag and rebuild the weighted target list"""
+        names, weights, lags, reasons = [], [], {}, {}
+        for name, replica in self.replicas.items():
+            try:
+                lag = replica.replication_lag()
+            except Exception as e:
+                lag, reasons[name] = None, f"{type(e).__name__}: {e}"
+            lags[name] = lag
+            if lag is None:
+                reasons.setdefault(name, "replication stopped or unknown")
+            elif lag > self.max_lag:
+                reasons[name] = f"lag {lag:.1f}s > {self.max_lag:.1f}s"
+            else:
+                names.append(name)
+                weights.append(1.0 / (1.0 + lag))
+        with self._lock:
+            self._lag = lags
+            self._reasons = reasons
+        self._targets = (names, weights)
+        return lags
+
+    def start_lag_checks(self, interval: float = 1.0) -> None:
+        """Daemon thread running check_replicas() every `interval` seconds"""
+        if self._checker is not None:
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self.check_replicas()
+
+        self._checker = threading.Thread(target=run, name="replica-lag", daemon=True)
+        self._checker.start()
+
+    def stop_lag_checks(self) -> None:
+        if self._checker is not None:
+            self._stop.set()
+            self._checker.join()
+            self._checker = None
+
+    # --- Internal helpers ---
+
+    def _read(self, fn, read_only: bool):
+        if not read_only or not self.replicas:
+            return fn(self.primary)
+        scope = _scope.get()
+        if scope is not None and scope["pinned_until"] > time.time():
+            self._count("pinned")
+            return fn(self.primary)
+        name = self._pick()
+        if name is None:
+            self._count("primary")
+            return fn(self.primary)
+        try:
+            result = fn(self.replicas[name])
+        except Exception as e:
+            self._skip(name, f"{type(e).__name__}: {e}")
+            self._count("failures")
+            return fn(self.primary)
+        self._count(f"replica:{name}")
+        return result
+
+    def _pick(self) -> Optional[str]:
+        names, weights = self._targets
+        if not names:
+            return None
+        if len(names) == 1:
+            return names[0]
+        return random.choices(names, weights)[0]
+
+    def _skip(self, name: str, reason: str) -> None:
+        """Drop a failing replica until the next lag check"""
+        with self._lock:
+            names, weights = self._targets
+            if name in names:
+                index = names.index(name)
+                self._targets = (names[:index] + names[index + 1:],
+                                 weights[:index] + weights[index + 1:])
+            self._reasons[name] = reason
+
+    def _mark_write(self) -> None:
+        scope = _scope.get()
+        if scope is not None:
+            scope["pinned_until"] = time.time() + self.pin_window
+            scope["wrote"] = True
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] = self._counts.get(name, 0) + 1
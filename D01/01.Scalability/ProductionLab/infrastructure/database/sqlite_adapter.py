@@ -0,0 +1,307 @@
+"""
+SQLite Adapter - Embedded DatabasePort for local runs and load tests
+
+Lets the full app (register, login, addresses) run on a laptop or CI box
+without a MySQL server. Not meant for production.
+
+- Queries keep the MySQL %s placeholder style; they are rewritten to ?
+  once per distinct query text.
+- init.sql is translated (AUTO_INCREMENT, inline INDEX clauses, table
+  options) and loaded when the database file has no tables yet.
+- WAL journal: readers do not block the writer or each other. Writers
+  still take turns; busy_timeout makes them wait instead of failing.
+- One connection per thread (sqlite3 connections must not be shared
+  between threads), in autocommit mode like the MySQL adapter.
+"""
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Optional, List, Dict, Any, Iterator, Sequence
+from core.interfaces.database_port import DatabasePort, BulkResult, BulkWriteError, DuplicateKeyError
+from .bulk import chunked
+
+_TABLE = re.compile(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?\s*\((.*)\)([^)]*)$",
+                    re.IGNORECASE | re.DOTALL)
+_INDEX = re.compile(r"(UNIQUE\s+)?(?:INDEX|KEY)\s+`?(\w+)`?\s*\((.*)\)$", re.IGNORECASE | re.DOTALL)
+_AUTO_INCREMENT = re.compile(r"\bINT(?:EGER)?\s+(?:NOT\s+NULL\s+)?AUTO_INCREMENT\s+PRIMARY\s+KEY\b",
+                             re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"%s|%%")
+
+
+def _split_top_level(text: str, sep: str) -> List[str]:
+    """Split on `sep` outside parentheses and quotes"""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _strip_comments(script: str) -> str:
+    return "\n".join(line for line in script.splitlines() if not line.strip().startswith("--"))
+
+
+def mysql_to_sqlite(script: str) -> List[str]:
+    """
+    Translate a MySQL schema/seed script (like init.sql) into SQLite statements.
+    Covers what this repo's schema uses: AUTO_INCREMENT primary keys, INDEX /
+    KEY clauses inside CREATE TABLE (moved to CREATE INDEX) and trailing
+    table options (ENGINE=..., CHARSET=...). Other statements pass through.
+    """
+    statements = []
+    for statement in _split_top_level(_strip_comments(script), ";"):
+        statement = statement.strip()
+        if not statement:
+            continue
+        match = _TABLE.match(statement)
+        if not match:
+            statements.append(statement)
+            continue
+        table, body, _options = match.groups()
+        columns, indexes = [], []
+        for item in _split_top_level(body, ","):
+            item = item.strip()
+            index = _INDEX.match(item)
+            if index:
+                unique, name, cols = index.groups()
+                indexes.append(f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS "
+                               f"{name} ON {table} ({cols})")
+            elif item:
+                columns.append(_AUTO_INCREMENT.sub("INTEGER PRIMARY KEY AUTOINCREMENT", item))
+        statements.append(f"CREATE TABLE IF NOT EXISTS {table} (\n    "
+                          + ",\n    ".join(columns) + "\n)")
+        statements.extend(indexes)
+    return statements
+
+
+@lru_cache(maxsize=1024)
+def _translate(query: str) -> str:
+    """%s -> ?, %% -> %; EXPLAIN (as sent by InstrumentedDatabase) -> EXPLAIN QUERY PLAN"""
+    query = _PLACEHOLDER.sub(lambda m: "?" if m.group() == "%s" else "%", query)
+    if query.lstrip()[:8].upper() == "EXPLAIN " and "QUERY PLAN" not in query.upper():
+        query = "EXPLAIN QUERY PLAN " + query.lstrip()[8:]
+    return query
+
+
+@contextmanager
+def _duplicate_key_errors():
+    """Raise UNIQUE / PRIMARY KEY violations as DuplicateKeyError"""
+    try:
+        yield
+    except sqlite3.IntegrityError as e:
+        if str(e).startswith("UNIQUE constraint failed"):
+            raise DuplicateKeyError(str(e)) from e
+        raise
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteAdapter(DatabasePort):
+    def __init__(self, path: str, init_script: Optional[str] = None, busy_timeout: float = 5.0):
+        if path == ":memory:" or path.startswith("file::memory:"):
+            # Every thread would open its own empty database
+            raise ValueError("SQLiteAdapter needs a database file, not :memory:")
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        conn = self._conn()
+        # Persistent in the file: set once, every later connection uses it
+        self.journal_mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()["journal_mode"]
+        if init_script:
+            self._load_schema(conn, init_script)
+
+    def _conn(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.row_factory = _dict_row
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL: fsync at checkpoints, not every commit
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _load_schema(self, conn: sqlite3.Connection, init_script: str) -> None:
+        """Run init_script on a database with no tables (once, even with several workers)"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' LIMIT 1").fetchone() is None:
+                for statement in mysql_to_sqlite(init_script):
+                    conn.execute(statement)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def transaction(self):
+        """
+        BEGIN IMMEDIATE takes the write lock up front, so a transaction that
+        reads then writes cannot fail halfway on a lock upgrade.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.cursor()
+        tx = SQLiteTransaction(cursor)
+        try:
+            yield tx
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            cursor.close()
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        with _duplicate_key_errors():
+            self._conn().execute(_translate(query), params or ())
+
+    def fetch_one(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> Optional[Dict[str, Any]]:
+        return self._conn().execute(_translate(query), params or ()).fetchone()
+
+    def fetch_all(self, query: str, params: tuple = None,
+                  read_only: bool = False) -> List[Dict[str, Any]]:
+        return self._conn().execute(_translate(query), params or ()).fetchall()
+
+    def fetch_iter(self, query: str, params: tuple = None, batch_size: int = 1000,
+                   as_tuples: bool = False, read_only: bool = False) -> Iterator[Any]:
+        """SQLite steps through the result as rows are fetched; nothing is buffered"""
+        cursor = self._conn().cursor()
+        if as_tuples:
+            cursor.row_factory = None
+        try:
+            cursor.execute(_translate(query), params or ())
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+    def insert(self, query: str, params: tuple = None) -> int:
+        with _duplicate_key_errors():
+            return self._conn().execute(_translate(query), params or ()).lastrowid
+
+    def ping(self) -> bool:
+        try:
+            self._conn().execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    def insert_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000,
+                    transaction_per_chunk: bool = False) -> BulkResult:
+        """executemany per chunk: no network round trips, so one statement per row is cheap"""
+        return self._run_chunks("insert_many", query, rows, chunk_size, transaction_per_chunk)
+
+    def execute_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000,
+                     transaction_per_chunk: bool = False) -> int:
+        return self._run_chunks("execute_many", query, rows, chunk_size,
+                                transaction_per_chunk).rowcount
+
+    def _run_chunks(self, name: str, query: str, rows: Sequence[tuple], chunk_size: int,
+                    transaction_per_chunk: bool) -> BulkResult:
+        result, committed = BulkResult(), BulkResult()
+        if not rows:
+            return result
+        conn = self._conn()
+        try:
+            if not transaction_per_chunk:
+                conn.execute("BEGIN IMMEDIATE")
+            for chunk in chunked(rows, chunk_size):
+                if transaction_per_chunk:
+                    conn.execute("BEGIN IMMEDIATE")
+                _run_chunk(conn.cursor(), query, chunk, result)
+                if transaction_per_chunk:
+                    conn.execute("COMMIT")
+                    committed = BulkResult(result.rowcount, result.first_id, result.chunks)
+            if not transaction_per_chunk:
+                conn.execute("COMMIT")
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise BulkWriteError(
+                f"{name} failed after {committed.rowcount} committed rows: {e}", committed
+            ) from e
+        return result
+
+    def close(self) -> None:
+        """Close every thread's connection (call at shutdown)"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+
+def _run_chunk(cursor: sqlite3.Cursor, query: str, chunk: Sequence[tuple], result: BulkResult) -> None:
+    """First row alone for its id (rowids after it are consecutive), the rest via executemany"""
+    query = _translate(query)
+    try:
+        cursor.execute(query, chunk[0])
+        if result.first_id is None:
+            result.first_id = cursor.lastrowid
+        rowcount = cursor.rowcount
+        if len(chunk) > 1:
+            cursor.executemany(query, chunk[1:])
+            rowcount += cursor.rowcount
+    finally:
+        cursor.close()
+    result.rowcount += max(rowcount, 0)
+    result.chunks += 1
+
+
+class SQLiteTransaction:
+    """Same operations as the MySQL TransactionContext, on this thread's connection"""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self.cursor = cursor
+        self.last_insert_id = None
+
+    def execute(self, query: str, params: tuple = None) -> None:
+        with _duplicate_key_errors():
+            self.cursor.execute(_translate(query), params or ())
+
+    def insert(self, query: str, params: tuple = None) -> int:
+        with _duplicate_key_errors():
+            self.cursor.execute(_translate(query), params or ())
+        self.last_insert_id = self.cursor.lastrowid
+        return self.last_insert_id
+
+    def insert_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000) -> BulkResult:
+        result = BulkResult()
+        for chunk in chunked(rows, chunk_size):
+            _run_chunk(self.cursor.connection.cursor(), query, chunk, result)
+        return result
+
+    def execute_many(self, query: str, rows: Sequence[tuple], chunk_size: int = 1000) -> int:
+        self.cursor.executemany(_translate(query), rows)
+        return self.cursor.rowcount
+
+    def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        self.cursor.execute(_translate(query), params or ())
+        return self.cursor.fetchone()
@@ -0,0 +1,100 @@
+"""
+Threaded Async Database - AsyncDatabasePort over a sync DatabasePort
+
+For backends without an asyncio driver (SQLite): each call runs on a
+bounded thread pool, so the event loop never blocks on the database.
+A transaction runs entirely on one of `transaction_workers` dedicated
+threads, because sync adapters bind a transaction (and SQLite a
+connection) to the thread that opened it; further transactions queue
+on the event loop until one of those threads is free.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Optional, List, Dict, Any
+from core.interfaces.async_database_port import AsyncDatabasePort, AsyncTransaction
+from core.interfaces.database_port import DatabasePort
+
+
+class ThreadedAsyncDatabase(AsyncDatabasePort):
+    def __init__(self, db: DatabasePort, max_workers: int = 8, transaction_workers: int = 2):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+        self._transaction_threads = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-transaction")
+            for _ in range(max(1, transaction_workers))
+        ]
+        self._free_threads: Optional[asyncio.Queue] = None  # created on the running loop
+
+    async def _run(self, method, *args, executor=None, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(
+            executor or self._executor, partial(method, *args, **kwargs)
+        )
+
+    async def execute(self, query: str, params: tuple = None) -> None:
+        await self._run(self.db.execute, query, params)
+
+    async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        return await self._run(self.db.fetch_one, query, params)
+
+    async def fetch_all(self, query: str, params: tuple = None) -> List[Dict[str, Any]]:
+        return await self._run(self.db.fetch_all, query, params)
+
+    async def insert(self, query: str, params: tuple = None) -> int:
+        return await self._run(self.db.insert, query, params)
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Async context manager for a transaction.
+        Usage:
+            async with db.transaction() as tx:
+                await tx.insert(...)
+        Commits when the block exits normally, rolls back if it raises.
+        """
+        if self._free_threads is None:
+            self._free_threads = asyncio.Queue()
+            for thread in self._transaction_threads:
+                self._free_threads.put_nowait(thread)
+        thread = await self._free_threads.get()
+        try:
+            context = self.db.transaction()
+            tx = await self._run(context.__enter__, executor=thread)
+            try:
+                yield ThreadedTransaction(tx, partial(self._run, executor=thread))
+            except BaseException as e:
+                if not await self._run(context.__exit__, type(e), e, e.__traceback__, executor=thread):
+                    raise
+            else:
+                await self._run(context.__exit__, None, None, None, executor=thread)
+        finally:
+            self._free_threads.put_nowait(thread)
+
+    async def ping(self) -> bool:
+        try:
+            return await self._run(self.db.ping)
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        for thread in self._transaction_threads:
+            thread.shutdown(wait=False)
+
+
+class ThreadedTransaction(AsyncTransaction):
+    """Operations of a sync transaction, each run on the transaction's thread"""
+
+    def __init__(self, tx, run):
+        self.tx = tx
+        self._run = run
+
+    async def execute(self, query: str, params: tuple = None) -> None:
+        await self._run(self.tx.execute, query, params)
+
+    async def insert(self, query: str, params: tuple = None) -> int:
+        return await self._run(self.tx.insert, query, params)
+
+    async def fetch_one(self, query: str, params: tuple = None) -> Optional[Dict[str, Any]]:
+        return await self._run(self.tx.fetch_one, query, params)
@@ -0,0 +1,37 @@
+"""
+Metrics helpers shared by the instrumented components
+
+Each instrumented component (cache, database, connection pool, hasher)
+registers one custom collector per Prometheus registry, which reports
+every live instance of it. Histograms are kept as per-bucket counts and
+exposed cumulatively, as HistogramMetricFamily expects.
+"""
+import threading
+import weakref
+from typing import Callable, Dict, List, Sequence, Tuple, TypeVar
+
+C = TypeVar("C")
+
+# registry -> {collector factory: collector}
+_collectors: "weakref.WeakKeyDictionary[object, Dict[Callable, object]]" = weakref.WeakKeyDictionary()
+_collectors_lock = threading.Lock()
+
+
+def collector_for(registry, factory: Callable[[], C]) -> C:
+    """The collector `factory` made for `registry`, created and registered on first use"""
+    with _collectors_lock:
+        collectors = _collectors.setdefault(registry, {})
+        collector = collectors.get(factory)
+        if collector is None:
+            collector = collectors[factory] = factory()
+            registry.register(collector)
+        return collector
+
+
+def cumulative_buckets(bounds: Sequence[float], counts: Sequence[int]) -> List[Tuple[str, int]]:
+    """(le, cumulative count) pairs from per-bucket counts; the last count is the +Inf bucket"""
+    cumulative, running = [], 0
+    for bound, count in zip(tuple(bounds) + (float("inf"),), counts):
+        running += count
+        cumulative.append((str(bound) if bound != float("inf") else "+Inf", running))
+    return cumulative
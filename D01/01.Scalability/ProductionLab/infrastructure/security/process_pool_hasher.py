@@ -0,0 +1,250 @@
+"""
+Process Pool Hasher - bcrypt in worker processes behind a bounded queue
+
+bcrypt costs 100+ ms of CPU per call. Run inline, a login burst holds
+every request thread of every gunicorn worker and cheap requests
+(/health, /addresses) queue behind it. Here at most `workers` hashes run at
+once (one per process, sized to the cores) and at most `max_queue` more
+wait. Callers beyond that get HasherBusy at once (the app answers 503 +
+Retry-After), so their request thread is freed instead of parked.
+
+Workers are forked together on first use in each process, so create the
+hasher early in create_app(), before background threads start. A worker
+that dies breaks the pool; the next call gets HasherBusy and the pool is
+re-created.
+
+Prometheus (one collector per registry sums every live hasher):
+    password_hash_queue_wait_seconds{op}   submit -> start in a worker
+    password_hash_seconds{op}              bcrypt time inside the worker
+    password_hash_rejected_total{op,reason} queue_full | timeout | broken
+    password_hash_pending                  running + queued calls
+    password_hash_cost                     bcrypt cost of new hashes
+"""
+import bisect
+import multiprocessing
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, List, Tuple
+import bcrypt
+from prometheus_client import REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+from core.interfaces.password_hasher_port import PasswordHasherPort, HasherBusy, DEFAULT_BCRYPT_COST
+from infrastructure.metrics import collector_for, cumulative_buckets
+
+# Waits are ~0 when a worker is free and grow by one hash time per queued call
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# bcrypt at cost 10-13 on current CPUs
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.5)
+
+OPS = ("hash", "verify")
+
+
+# --- Run in the worker processes ---
+
+def _hash(password: bytes, rounds: int) -> Tuple[str, float, float]:
+    """(hash, wall-clock start, seconds spent)"""
+    started, start = time.time(), time.perf_counter()
+    result = bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode("utf-8")
+    return result, started, time.perf_counter() - start
+
+
+def _verify(password: bytes, password_hash: bytes) -> Tuple[bool, float, float]:
+    started, start = time.time(), time.perf_counter()
+    result = bcrypt.checkpw(password, password_hash)
+    return result, started, time.perf_counter() - start
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+class _Histogram:
+    __slots__ = ("bounds", "buckets", "total")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.buckets: List[int] = [0] * (len(bounds) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        """Caller holds the lock"""
+        self.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def family_values(self):
+        return cumulative_buckets(self.bounds, self.buckets), self.total
+
+
+class ProcessPoolHasher(PasswordHasherPort):
+    def __init__(self, workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 queue_timeout: float = 0.0, result_timeout: float = 10.0,
+                 rounds: int = DEFAULT_BCRYPT_COST, registry=REGISTRY):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = 2 * self.workers if max_queue is None else max_queue
+        self.queue_timeout = queue_timeout    # wait this long for a queue slot (0 = reject at once)
+        self.result_timeout = result_timeout  # give up on a queued/running call after this long
+        self.rounds = rounds                  # may be changed later (startup calibration)
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pid = None
+        self._pending = 0
+        self._completed: Dict[str, int] = {op: 0 for op in OPS}
+        self._rejected: Dict[Tuple[str, str], int] = {}
+        self._wait = {op: _Histogram(WAIT_BUCKETS) for op in OPS}
+        self._time = {op: _Histogram(HASH_BUCKETS) for op in OPS}
+        if registry is not None:
+            collector_for(registry, _HasherCollector).hashers.add(self)
+
+    def hash(self, password: str) -> str:
+        return self._run("hash", _hash, password.encode("utf-8"), self.rounds)
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        return self._run("verify", _verify, password.encode("utf-8"), password_hash.encode("utf-8"))
+
+    def start(self) -> None:
+        """Fork the workers now instead of on the first call"""
+        self._pool()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "rounds": self.rounds,
+                "pending": self._pending,
+                "completed": dict(self._completed),
+                "rejected": {f"{op}:{reason}": count for (op, reason), count in sorted(self._rejected.items())},
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # --- Internal helpers ---
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """This process's executor; re-created after a fork (gunicorn --preload) or a crash"""
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    self.workers, mp_context=multiprocessing.get_context("fork")
+                )
+                self._pid = os.getpid()
+                # With fork, the first submit launches every worker at once
+                self._executor.submit(_ready).result()
+            return self._executor
+
+    def _run(self, op: str, fn, *args):
+        acquired = (self._slots.acquire(timeout=self.queue_timeout) if self.queue_timeout > 0
+                    else self._slots.acquire(blocking=False))
+        if not acquired:
+            self._reject(op, "queue_full")
+            raise HasherBusy(f"password hashing busy ({self.workers} running, {self.max_queue} queued)")
+        submitted = time.time()
+        executor = None
+        try:
+            executor = self._pool()
+            future = executor.submit(fn, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            self._slots.release()
+            self._broken(executor)
+            self._reject(op, "broken")
+            raise HasherBusy(f"password hashing pool unavailable: {e}") from e
+        with self._lock:
+            self._pending += 1
+        # The slot is freed when the work ends, even if this caller gave up on it
+        future.add_done_callback(self._finished)
+        try:
+            result, started, seconds = future.result(timeout=self.result_timeout)
+        except FutureTimeout:
+            future.cancel()
+            self._reject(op, "timeout")
+            raise HasherBusy(f"password hashing took over {self.result_timeout}s")
+        except BrokenProcessPool as e:
+            self._broken(executor)
+            self._reject(op, "broken")
+            raise HasherBusy(f"password hashing worker died: {e}") from e
+        with self._lock:
+            self._completed[op] += 1
+            self._wait[op].observe(max(0.0, started - submitted))
+            self._time[op].observe(seconds)
+        return result
+
+    def _finished(self, future) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _broken(self, executor: Optional[ProcessPoolExecutor]) -> None:
+        """Drop a broken executor so the next call starts a fresh one"""
+        with self._lock:
+            if executor is not None and self._executor is executor:
+                self._executor = None
+            else:
+                executor = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _reject(self, op: str, reason: str) -> None:
+        with self._lock:
+            self._rejected[(op, reason)] = self._rejected.get((op, reason), 0) + 1
+
+    def _snapshot(self):
+        with self._lock:
+            return ({op: (list(self._wait[op].buckets), self._wait[op].total) for op in OPS},
+                    {op: (list(self._time[op].buckets), self._time[op].total) for op in OPS},
+                    dict(self._rejected), self._pending, self.rounds)
+
+
+class _HasherCollector:
+    """One Prometheus collector per registry, summing every live ProcessPoolHasher"""
+
+    def __init__(self):
+        self.hashers = weakref.WeakSet()
+
+    def describe(self):
+        return [HistogramMetricFamily('password_hash_queue_wait_seconds',
+                                      'Time a password hash waited for a worker process', labels=['op']),
+                HistogramMetricFamily('password_hash_seconds', 'bcrypt time inside the worker process',
+                                      labels=['op']),
+                CounterMetricFamily('password_hash_rejected', 'Password hash calls turned away',
+                                    labels=['op', 'reason']),
+                GaugeMetricFamily('password_hash_pending', 'Password hash calls running or queued'),
+                GaugeMetricFamily('password_hash_cost', 'bcrypt cost factor of new password hashes')]
+
+    def collect(self):
+        wait, hash_time, rejected, pending, cost = self.describe()
+        waits = {op: _Histogram(WAIT_BUCKETS) for op in OPS}
+        times = {op: _Histogram(HASH_BUCKETS) for op in OPS}
+        rejections: Dict[Tuple[str, str], int] = {}
+        pending_total, rounds = 0, []
+        for hasher in list(self.hashers):
+            hasher_waits, hasher_times, hasher_rejected, hasher_pending, hasher_rounds = hasher._snapshot()
+            for merged, source in ((waits, hasher_waits), (times, hasher_times)):
+                for op, (buckets, total) in source.items():
+                    merged[op].buckets = [a + b for a, b in zip(merged[op].buckets, buckets)]
+                    merged[op].total += total
+            for key, count in hasher_rejected.items():
+                rejections[key] = rejections.get(key, 0) + count
+            pending_total += hasher_pending
+            rounds.append(hasher_rounds)
+        for op in OPS:
+            wait.add_metric([op], *waits[op].family_values())
+            hash_time.add_metric([op], *times[op].family_values())
+        for (op, reason), count in sorted(rejections.items()):
+            rejected.add_metric([op, reason], count)
+        pending.add_metric([], pending_total)
+        if rounds:
+            cost.add_metric([], max(rounds))
+        yield wait
+        yield hash_time
+        yield rejected
+        yield pending
+        yield cost
@@ -0,0 +1,373 @@
+"""
+ASGI App - The Flask routes on Starlette, served by the async services
+
+Same paths, JSON bodies, status codes and cookies as the blueprints in
+routes/ and middleware/; only the handlers live here. The services are
+built by `build` at lifespan startup (aiomysql and redis.asyncio pools
+belong to the running event loop), kept on app.state, and released by
+`close` at shutdown. Auth and address routes answer 404 when their
+service is not configured, as when main.py skips their blueprints.
+"""
+import asyncio
+import contextlib
+import json
+from typing import Any, Awaitable, Callable, Dict, Optional
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+from core.interfaces.database_port import PoolTimeout
+from core.interfaces.password_hasher_port import HasherBusy
+from core.services.session_codec import decode_auth_session
+from core.services.session_token import is_session_token
+
+SESSION_COOKIE_MAX_AGE = 3600
+
+# Everything a handler may use; build() returns a subset, the rest stay None
+COMPONENTS = ("app_service", "auth_service", "address_service", "cache", "tokens",
+              "revocations", "database", "password_hasher")
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+def create_asgi_app(build: Callable[[], Awaitable[Dict[str, Any]]],
+                    close: Optional[Callable[[Any], Awaitable[None]]] = None) -> Starlette:
+    """Starlette app whose components (see COMPONENTS) come from `build` at startup"""
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette):
+        components = await build()
+        for name in COMPONENTS:
+            setattr(app.state, name, components.get(name))
+        try:
+            yield
+        finally:
+            if close is not None:
+                await close(app.state)
+
+    return Starlette(routes=ROUTES, lifespan=lifespan, exception_handlers={
+        400: _http_error,
+        404: _http_error,
+        405: _http_error,
+        PoolTimeout: _pool_timeout,
+        HasherBusy: _hasher_busy,
+        Exception: _server_error,
+    })
+
+
+# --- Errors (main.py error handlers) ---
+
+async def _http_error(request: Request, exc: HTTPException) -> Response:
+    return JSONResponse({"error": exc.detail}, exc.status_code)
+
+
+async def _pool_timeout(request: Request, exc: PoolTimeout) -> Response:
+    # Every DB connection stayed busy for MYSQL_POOL_TIMEOUT: shed load
+    return JSONResponse({"error": "Database busy, please retry"}, 503, headers={"Retry-After": "1"})
+
+
+async def _hasher_busy(request: Request, exc: HasherBusy) -> Response:
+    # Every hashing worker busy and the queue full: reject fast
+    return JSONResponse({"error": "Server busy, please retry"}, 503,
+                        headers={"Retry-After": str(exc.retry_after)})
+
+
+async def _server_error(request: Request, exc: Exception) -> Response:
+    # Logged by Starlette's ServerErrorMiddleware, which re-raises it to the server
+    return JSONResponse({"error": "Internal server error"}, 500)
+
+
+async def _json(request: Request) -> Dict[str, Any]:
+    """JSON object of the body, {} if there is none"""
+    body = await request.body()
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise HTTPException(400, "Invalid JSON body") from None
+    return data if isinstance(data, dict) else {}
+
+
+def _requires(name: str) -> Callable[[Handler], Handler]:
+    """404 unless the app.state component `name` is configured"""
+    def wrap(handler: Handler) -> Handler:
+        async def checked(request: Request) -> Response:
+            if getattr(request.app.state, name) is None:
+                raise HTTPException(404, "Not Found")
+            return await handler(request)
+        return checked
+    return wrap
+
+
+# --- Health, API, metrics (routes/health.py, routes/api.py, routes/metrics.py) ---
+
+async def health(request: Request) -> Response:
+    health_status = await request.app.state.app_service.check_health()
+    return JSONResponse({
+        "status": health_status.status,
+        "message": health_status.message,
+        "timestamp": health_status.timestamp
+    }, 200 if health_status.status == "healthy" else 503)
+
+
+async def info(request: Request) -> Response:
+    return JSONResponse(request.app.state.app_service.get_server_info())
+
+
+async def cache_stats(request: Request) -> Response:
+    return JSONResponse(request.app.state.app_service.get_cache_stats())
+
+
+async def index(request: Request) -> Response:
+    session_id = request.cookies.get("session_id")
+    result = await request.app.state.app_service.handle_request(session_id)
+    response = JSONResponse(result)
+    if result["session_id"] != session_id:
+        response.set_cookie("session_id", result["session_id"], max_age=SESSION_COOKIE_MAX_AGE)
+    return response
+
+
+async def metrics(request: Request) -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+# --- Auth (routes/auth.py, middleware/auth_middleware.py) ---
+
+def login_required(handler: Handler) -> Handler:
+    """Sets request.state.user ({user_id, username, session_id}) or answers 401/503"""
+    async def decorated(request: Request) -> Response:
+        user = await _authenticate(request.app.state, request.cookies.get("session_id"))
+        if isinstance(user, Response):
+            return user
+        request.state.user = user
+        return await handler(request)
+    return decorated
+
+
+async def _authenticate(state, session_id: Optional[str]):
+    if not session_id:
+        return JSONResponse({"success": False, "error": "Authentication required"}, 401)
+
+    if state.tokens is not None and is_session_token(session_id):
+        claims = state.tokens.verify(session_id)
+        if claims is not None and state.revocations is not None:
+            # The filter is in memory; only its hits cost a (sync) cache lookup
+            hits = state.revocations.filter_hits(claims)
+            if any(hits) and await _in_executor(state.revocations.confirm, claims, hits):
+                claims = None
+        if claims is None:
+            return JSONResponse({"success": False, "error": "Session expired or invalid"}, 401)
+        return {"user_id": claims["user_id"], "username": claims["username"], "session_id": session_id}
+
+    if not state.cache:
+        return JSONResponse({"success": False, "error": "Session service unavailable"}, 503)
+
+    session_data = await state.cache.get(f"auth_session:{session_id}")
+    if not session_data:
+        return JSONResponse({"success": False, "error": "Session expired or invalid"}, 401)
+    try:
+        session = decode_auth_session(session_data)
+    except Exception:
+        return JSONResponse({"success": False, "error": "Invalid session data"}, 401)
+    return {"user_id": session.get("user_id"), "username": session.get("username"),
+            "session_id": session_id}
+
+
+@_requires("auth_service")
+async def register(request: Request) -> Response:
+    data = await _json(request)
+    username = data.get("username")
+    password = data.get("password")
+    if not username or not password:
+        return JSONResponse({"success": False, "error": "Username and password are required"}, 400)
+
+    result = await request.app.state.auth_service.register(
+        username=username,
+        password=password,
+        full_name=data.get("full_name"),
+        email=data.get("email"),
+        address_id=data.get("address_id"),
+        address_detail=data.get("address_detail")
+    )
+    return JSONResponse(result, 201 if result["success"] else 400)
+
+
+@_requires("auth_service")
+async def login(request: Request) -> Response:
+    data = await _json(request)
+    username = data.get("username")
+    password = data.get("password")
+    if not username or not password:
+        return JSONResponse({"success": False, "error": "Username and password are required"}, 400)
+
+    result = await request.app.state.auth_service.login(username, password)
+    if not result["success"]:
+        return JSONResponse(result, 401)
+    response = JSONResponse(result)
+    response.set_cookie("session_id", result["session_id"], max_age=SESSION_COOKIE_MAX_AGE,
+                        httponly=True, samesite="lax")
+    return response
+
+
+@_requires("auth_service")
+async def logout(request: Request) -> Response:
+    session_id = request.cookies.get("session_id")
+    if session_id:
+        result = await request.app.state.auth_service.logout(session_id)
+    else:
+        result = {"success": True, "message": "No active session"}
+    return _logout_response(result)
+
+
+@_requires("auth_service")
+@login_required
+async def logout_all(request: Request) -> Response:
+    return _logout_response(await request.app.state.auth_service.logout_all(request.state.user["user_id"]))
+
+
+def _logout_response(result: Dict[str, Any]) -> Response:
+    """Clear the cookie only once logged out; keep it so a failed logout can be retried"""
+    if not result["success"]:
+        return JSONResponse(result, 503)
+    response = JSONResponse(result)
+    response.delete_cookie("session_id")
+    return response
+
+
+@_requires("auth_service")
+@login_required
+async def get_profile(request: Request) -> Response:
+    profile = await request.app.state.auth_service.get_profile(request.state.user["user_id"])
+    if not profile:
+        return JSONResponse({"success": False, "error": "User not found"}, 404)
+    return JSONResponse({"success": True, "profile": profile})
+
+
+@_requires("auth_service")
+@login_required
+async def update_profile(request: Request) -> Response:
+    result = await request.app.state.auth_service.update_profile(request.state.user["user_id"],
+                                                                 await _json(request))
+    return JSONResponse(result, 200 if result["success"] else 400)
+
+
+# --- Addresses (routes/address.py) ---
+
+def _json_body(body: bytes) -> Response:
+    """Response from JSON bytes the address index serialized in advance"""
+    return Response(body, media_type="application/json")
+
+
+@_requires("address_service")
+async def get_countries(request: Request) -> Response:
+    addresses = request.app.state.address_service
+    body = addresses.countries_json()
+    if body is not None:
+        return _json_body(body)
+    return JSONResponse({"countries": await addresses.get_countries()})
+
+
+@_requires("address_service")
+async def get_provinces(request: Request) -> Response:
+    country = request.query_params.get("country")
+    if not country:
+        return JSONResponse({"error": "country parameter is required"}, 400)
+    addresses = request.app.state.address_service
+    body = addresses.provinces_json(country)
+    if body is not None:
+        return _json_body(body)
+    return JSONResponse({"provinces": await addresses.get_provinces(country)})
+
+
+@_requires("address_service")
+async def get_districts(request: Request) -> Response:
+    country = request.query_params.get("country")
+    province = request.query_params.get("province")
+    if not country or not province:
+        return JSONResponse({"error": "country and province parameters are required"}, 400)
+    addresses = request.app.state.address_service
+    body = addresses.districts_json(country, province)
+    if body is not None:
+        return _json_body(body)
+    return JSONResponse({"districts": await addresses.get_districts(country, province)})
+
+
+@_requires("address_service")
+async def address_cache_stats(request: Request) -> Response:
+    return JSONResponse(request.app.state.address_service.get_cache_stats())
+
+
+@_requires("address_service")
+async def export_addresses(request: Request) -> Response:
+    try:
+        batch_size = min(max(int(request.query_params.get("batch_size", 1000)), 1), 10000)
+    except ValueError:
+        return JSONResponse({"error": "batch_size must be an integer"}, 400)
+    return StreamingResponse(request.app.state.address_service.export_addresses(batch_size),
+                             media_type="application/x-ndjson",
+                             headers={"Content-Disposition": "attachment; filename=addresses.ndjson"})
+
+
+# --- Debug (routes/debug.py) ---
+
+async def debug_queries(request: Request) -> Response:
+    database = request.app.state.database
+    if database is None:
+        return JSONResponse({"error": "Query instrumentation disabled"}, 404)
+    try:
+        limit = int(request.query_params.get("limit", 20))
+    except ValueError:
+        return JSONResponse({"error": "limit must be an integer"}, 400)
+    return JSONResponse(database.query_report(limit))
+
+
+async def debug_hashing(request: Request) -> Response:
+    state = request.app.state
+    if state.auth_service is None:
+        return JSONResponse({"error": "Auth service unavailable"}, 404)
+    report = state.auth_service.get_hashing_stats()
+    if hasattr(state.password_hasher, "stats"):
+        report["pool"] = state.password_hasher.stats()
+    return JSONResponse(report)
+
+
+async def debug_profiles(request: Request) -> Response:
+    if request.app.state.auth_service is None:
+        return JSONResponse({"error": "Auth service unavailable"}, 404)
+    return JSONResponse(request.app.state.auth_service.get_profile_cache_stats())
+
+
+async def debug_sessions(request: Request) -> Response:
+    if request.app.state.auth_service is None:
+        return JSONResponse({"error": "Auth service unavailable"}, 404)
+    return JSONResponse(request.app.state.auth_service.get_session_stats())
+
+
+async def _in_executor(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+ROUTES = [
+    Route("/health", health),
+    Route("/info", info),
+    Route("/cache/stats", cache_stats),
+    Route("/", index),
+    Route("/metrics", metrics),
+    Route("/register", register, methods=["POST"]),
+    Route("/login", login, methods=["POST"]),
+    Route("/logout", logout, methods=["POST"]),
+    Route("/logout-all", logout_all, methods=["POST"]),
+    Route("/profile", get_profile, methods=["GET"]),
+    Route("/profile", update_profile, methods=["PUT"]),
+    Route("/addresses/countries", get_countries),
+    Route("/addresses/provinces", get_provinces),
+    Route("/addresses/districts", get_districts),
+    Route("/addresses/cache/stats", address_cache_stats),
+    Route("/addresses/export", export_addresses),
+    Route("/debug/queries", debug_queries),
+    Route("/debug/hashing", debug_hashing),
+    Route("/debug/profiles", debug_profiles),
+    Route("/debug/sessions", debug_sessions),
+]
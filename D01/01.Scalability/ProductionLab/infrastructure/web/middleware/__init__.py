@@ -2,5 +2,6 @@
 Middleware Package - Authentication and authorization middlewares
 """
 from .auth_middleware import login_required, init_auth_middleware
+from .read_your_writes import init_read_your_writes
 
-__all__ = ['login_required', 'init_auth_middleware']
+__all__ = ['login_required', 'init_auth_middleware', 'init_read_your_writes']
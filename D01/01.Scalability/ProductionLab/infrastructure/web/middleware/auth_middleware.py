@@ -3,27 +3,35 @@ Auth Middleware - Authentication decorators for protected routes
 """
 from functools import wraps
 from flask import request, g
-import json
+from core.services.session_codec import decode_auth_session
+from core.services.session_token import is_session_token
 
 # Dependencies will be injected via init_auth_middleware
 _cache = None
 _web_adapter = None
+_tokens = None
+_revocations = None
 
 
-def init_auth_middleware(cache, web_adapter):
+def init_auth_middleware(cache, web_adapter, tokens=None, revocations=None):
     """
     Initialize middleware with dependencies.
     Must be called before using @login_required decorator.
+    With `tokens` (SessionTokenSigner), signed session tokens are verified
+    locally and checked against `revocations` (TokenRevocationList).
     """
-    global _cache, _web_adapter
+    global _cache, _web_adapter, _tokens, _revocations
     _cache = cache
     _web_adapter = web_adapter
+    _tokens = tokens
+    _revocations = revocations
 
 
 def login_required(f):
     """
     Decorator to protect routes that require authentication.
-    Validates session cookie against Redis cache.
+    Validates session cookie against Redis cache, or a signed session token
+    locally (no cache call unless the revocation filter matches it).
     Sets g.user_id, g.username, g.session_id if authenticated.
     
     Usage:
@@ -47,6 +55,18 @@ def login_required(f):
                 401
             )
         
+        if _tokens is not None and is_session_token(session_id):
+            claims = _tokens.verify(session_id)
+            if claims is None or (_revocations is not None and _revocations.is_revoked(claims)):
+                return _web_adapter.create_response(
+                    {"success": False, "error": "Session expired or invalid"},
+                    401
+                )
+            g.user_id = claims['user_id']
+            g.username = claims['username']
+            g.session_id = session_id
+            return f(*args, **kwargs)
+        
         if not _cache:
             return _web_adapter.create_response(
                 {"success": False, "error": "Session service unavailable"},
@@ -62,9 +82,9 @@ def login_required(f):
                 401
             )
         
-        # Parse session and set user info in Flask's g object
+        # Parse session (any codec's format) and set user info in Flask's g object
         try:
-            session = json.loads(session_data)
+            session = decode_auth_session(session_data)
             g.user_id = session.get('user_id')
             g.username = session.get('username')
             g.session_id = session_id
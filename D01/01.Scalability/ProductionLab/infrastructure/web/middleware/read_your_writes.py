@@ -0,0 +1,42 @@
+"""
+Read-Your-Writes Middleware - Keep a client's reads on the primary after it writes
+
+Every request runs in a read scope (see infrastructure/database/read_write_split.py).
+When a request writes to the database, the response carries a short-lived
+cookie with the pin expiry; the client's next requests (on any worker or
+server) bring it back, and their read-only queries go to the primary until
+it expires instead of to a replica that may not have the write yet.
+The cookie is client input: a pin beyond pin_window from now is cut back
+to it, so a forged value cannot keep a client on the primary for good.
+"""
+import math
+import time
+from flask import Flask, g, request
+from infrastructure.database.read_write_split import begin_scope, end_scope
+
+PIN_COOKIE = "db_pin"
+
+
+def init_read_your_writes(app: Flask, pin_window: float = 5.0) -> None:
+    """Register the before/after request hooks on the app (pin_window: ReadWriteSplitAdapter's)"""
+
+    @app.before_request
+    def _begin_read_scope():
+        try:
+            pinned_until = float(request.cookies.get(PIN_COOKIE, 0))
+        except ValueError:
+            pinned_until = 0.0
+        if not math.isfinite(pinned_until):
+            pinned_until = 0.0
+        pinned_until = min(pinned_until, time.time() + pin_window)
+        g.db_read_scope = begin_scope(pinned_until)
+
+    @app.after_request
+    def _carry_pin(response):
+        token = g.pop("db_read_scope", None)
+        if token is not None:
+            pinned_until = end_scope(token)
+            if pinned_until is not None:
+                response.set_cookie(PIN_COOKIE, f"{pinned_until:.3f}", expires=pinned_until,
+                                    httponly=True, samesite="Lax")
+        return response
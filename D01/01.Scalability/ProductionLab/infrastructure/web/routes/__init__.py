@@ -7,6 +7,8 @@ from .health import health_bp
 from .api import api_bp
 from .auth import auth_bp
 from .address import address_bp
+from .metrics import metrics_bp
+from .debug import debug_bp
 
 
 def register_routes(app: Flask) -> None:
@@ -15,4 +17,6 @@ def register_routes(app: Flask) -> None:
     app.register_blueprint(api_bp)
     app.register_blueprint(auth_bp)
     app.register_blueprint(address_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(debug_bp)
 
@@ -1,7 +1,7 @@
 """
 Address Routes - Address lookup endpoints for cascading dropdowns
 """
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
 
 address_bp = Blueprint('address', __name__, url_prefix='/addresses')
 
@@ -17,9 +17,17 @@ def init_address_routes(address_service, web_adapter):
     _web_adapter = web_adapter
 
 
+def _json_body(body: bytes) -> Response:
+    """Response from JSON bytes the address index serialized in advance"""
+    return Response(body, mimetype='application/json')
+
+
 @address_bp.route('/countries', methods=['GET'])
 def get_countries():
     """Get list of all countries"""
+    body = _address_service.countries_json()
+    if body is not None:
+        return _json_body(body)
     countries = _address_service.get_countries()
     return _web_adapter.create_response({"countries": countries})
 
@@ -34,6 +42,9 @@ def get_provinces():
             {"error": "country parameter is required"}, 400
         )
     
+    body = _address_service.provinces_json(country)
+    if body is not None:
+        return _json_body(body)
     provinces = _address_service.get_provinces(country)
     return _web_adapter.create_response({"provinces": provinces})
 
@@ -49,5 +60,27 @@ def get_districts():
             {"error": "country and province parameters are required"}, 400
         )
     
+    body = _address_service.districts_json(country, province)
+    if body is not None:
+        return _json_body(body)
     districts = _address_service.get_districts(country, province)
     return _web_adapter.create_response({"districts": districts})
+
+
+@address_bp.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Read-through cache counters (hit ratio, coalesced misses) and index version"""
+    return _web_adapter.create_response(_address_service.get_cache_stats())
+
+
+@address_bp.route('/export', methods=['GET'])
+def export_addresses():
+    """Stream the whole address table as NDJSON (one JSON object per line)"""
+    try:
+        batch_size = min(max(int(request.args.get('batch_size', 1000)), 1), 10000)
+    except ValueError:
+        return _web_adapter.create_response({"error": "batch_size must be an integer"}, 400)
+    
+    lines = _address_service.export_addresses(batch_size)
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson',
+                    headers={'Content-Disposition': 'attachment; filename=addresses.ndjson'})
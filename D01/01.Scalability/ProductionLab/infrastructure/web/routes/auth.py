@@ -88,6 +88,22 @@ def logout():
     else:
         result = {"success": True, "message": "No active session"}
     
+    return _logout_response(result)
+
+
+@auth_bp.route('/logout-all', methods=['POST'])
+@login_required
+def logout_all():
+    """Logout current user from every device and clear session cookie"""
+    result = _auth_service.logout_all(g.user_id)
+    
+    return _logout_response(result)
+
+
+def _logout_response(result):
+    """Clear the cookie only once logged out; keep it so a failed logout can be retried"""
+    if not result['success']:
+        return _web_adapter.create_response(result, 503)
     response = _web_adapter.create_response(result, 200)
     response.delete_cookie('session_id')
     return response
@@ -115,3 +131,14 @@ def get_profile():
     })
 
 
+@auth_bp.route('/profile', methods=['PUT'])
+@login_required
+def update_profile():
+    """Update full_name / email / address_id / address_detail (only the fields sent)"""
+    data = request.get_json() or {}
+    
+    result = _auth_service.update_profile(g.user_id, data)
+    
+    return _web_adapter.create_response(result, 200 if result['success'] else 400)
+
+
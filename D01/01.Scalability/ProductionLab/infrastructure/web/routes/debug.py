@@ -0,0 +1,61 @@
+"""
+Debug Routes - Query fingerprint statistics, slow-query log, password hashing, profile cache,
+session tokens
+"""
+from flask import Blueprint, request
+
+debug_bp = Blueprint('debug', __name__, url_prefix='/debug')
+
+# Dependencies will be injected via init_debug_routes
+_database = None
+_web_adapter = None
+_auth_service = None
+_password_hasher = None
+
+
+def init_debug_routes(database, web_adapter, auth_service=None, password_hasher=None):
+    """Initialize routes with dependencies (database: an InstrumentedDatabase)"""
+    global _database, _web_adapter, _auth_service, _password_hasher
+    _database = database
+    _web_adapter = web_adapter
+    _auth_service = auth_service
+    _password_hasher = password_hasher
+
+
+@debug_bp.route('/queries', methods=['GET'])
+def queries():
+    """Top query fingerprints by total DB time (p50/p99, slow count, EXPLAIN)"""
+    if _database is None:
+        return _web_adapter.create_response({"error": "Query instrumentation disabled"}, 404)
+    try:
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return _web_adapter.create_response({"error": "limit must be an integer"}, 400)
+    return _web_adapter.create_response(_database.query_report(limit))
+
+
+@debug_bp.route('/hashing', methods=['GET'])
+def hashing():
+    """bcrypt cost in use, startup calibration, rehash-on-login counts and pool stats"""
+    if _auth_service is None:
+        return _web_adapter.create_response({"error": "Auth service unavailable"}, 404)
+    report = _auth_service.get_hashing_stats()
+    if hasattr(_password_hasher, 'stats'):
+        report["pool"] = _password_hasher.stats()
+    return _web_adapter.create_response(report)
+
+
+@debug_bp.route('/profiles', methods=['GET'])
+def profiles():
+    """Profile cache hits (found / not found), misses, write-throughs and invalidations"""
+    if _auth_service is None:
+        return _web_adapter.create_response({"error": "Auth service unavailable"}, 404)
+    return _web_adapter.create_response(_auth_service.get_profile_cache_stats())
+
+
+@debug_bp.route('/sessions', methods=['GET'])
+def sessions():
+    """Session mode (cache | token) and token revocation filter counters"""
+    if _auth_service is None:
+        return _web_adapter.create_response({"error": "Auth service unavailable"}, 404)
+    return _web_adapter.create_response(_auth_service.get_session_stats())
@@ -33,3 +33,9 @@ def health():
 def info():
     """Server information endpoint"""
     return _web_adapter.create_response(_app_service.get_server_info())
+
+
+@health_bp.route('/cache/stats')
+def cache_stats():
+    """Cache statistics endpoint - used to size the fallback cache"""
+    return _web_adapter.create_response(_app_service.get_cache_stats())
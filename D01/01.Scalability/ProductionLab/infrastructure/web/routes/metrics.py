@@ -0,0 +1,13 @@
+"""
+Metrics Routes - Prometheus scrape endpoint
+"""
+from flask import Blueprint
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics endpoint"""
+    return generate_latest(), 200, {'Content-Type': CONTENT_TYPE_LATEST}
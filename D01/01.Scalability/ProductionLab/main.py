@@ -2,6 +2,7 @@
 Main Application - Composition Root
 Wires together core and infrastructure components
 """
+import json
 import os
 import signal
 import sys
@@ -9,23 +10,134 @@ from flask import Flask
 
 # Core imports
 from core.services.app_service import AppService
-from core.services.auth_service import AuthService
+from core.services.auth_service import AuthService, InlinePasswordHasher, calibrate_bcrypt_cost
 from core.services.address_service import AddressService
+from core.services.session_codec import create_session_codec
+from core.services.session_token import SessionTokenSigner
+from core.services.token_revocation import TokenRevocationList
 
 # Infrastructure imports
 from infrastructure.cache.redis_adapter import RedisAdapter
 from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.cache.sharded_memory_adapter import ShardedMemoryAdapter
+from infrastructure.cache.shared_memory_adapter import SharedMemoryAdapter
+from infrastructure.cache.sharded_cache_adapter import ShardedCacheAdapter
+from infrastructure.cache.near_cache_adapter import NearCacheAdapter
+from infrastructure.cache.invalidation_bus import RedisInvalidationBus
+from infrastructure.cache.instrumented_cache import InstrumentedCache
 from infrastructure.database.mysql_adapter import MySQLAdapter
+from infrastructure.database.sqlite_adapter import SQLiteAdapter
+from infrastructure.database.connection_pool import PoolTimeout
+from infrastructure.database.read_write_split import ReadWriteSplitAdapter
+from infrastructure.database.instrumented_database import InstrumentedDatabase
+from infrastructure.security.process_pool_hasher import ProcessPoolHasher
+from core.interfaces.password_hasher_port import HasherBusy
 from infrastructure.web.flask_adapter import FlaskAdapter
 from infrastructure.web.routes import register_routes
 from infrastructure.web.routes.health import init_health_routes
 from infrastructure.web.routes.api import init_api_routes
 from infrastructure.web.routes.auth import init_auth_routes
 from infrastructure.web.routes.address import init_address_routes
+from infrastructure.web.routes.debug import init_debug_routes
 
 # Configuration
 REDIS_HOST = os.getenv('REDIS_HOST', 'localhost')
+REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
+REDIS_SOCKET = os.getenv('REDIS_SOCKET')  # Unix socket path, overrides host/port
+# Redis connection pool: bounded, blocking, with timeouts instead of OS TCP defaults
+REDIS_POOL_MAX_CONNECTIONS = int(os.getenv('REDIS_POOL_MAX_CONNECTIONS', '20'))
+REDIS_POOL_TIMEOUT = float(os.getenv('REDIS_POOL_TIMEOUT', '0.5'))
+REDIS_CONNECT_TIMEOUT = float(os.getenv('REDIS_CONNECT_TIMEOUT', '0.5'))
+REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', '0.5'))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', '30'))
 USE_REDIS = os.getenv('USE_REDIS', 'true').lower() == 'true'
+# Several Redis nodes ("host:port,host:port"): keys spread by consistent hashing,
+# unhealthy nodes ejected and their keys served by the next node on the ring
+REDIS_NODES = [node.strip() for node in os.getenv('REDIS_NODES', '').split(',') if node.strip()]
+CACHE_RING_VNODES = int(os.getenv('CACHE_RING_VNODES', '160'))
+CACHE_HEALTH_CHECK_INTERVAL = float(os.getenv('CACHE_HEALTH_CHECK_INTERVAL', '2'))
+# Consecutive connection errors/timeouts (calls or pings) before a node is ejected
+CACHE_NODE_FAILURE_THRESHOLD = int(os.getenv('CACHE_NODE_FAILURE_THRESHOLD', '3'))
+
+# Near cache: per-worker L1 for auth sessions in front of Redis
+NEAR_CACHE_ENABLED = os.getenv('NEAR_CACHE_ENABLED', 'false').lower() == 'true'
+NEAR_CACHE_TTL = int(os.getenv('NEAR_CACHE_TTL', '5'))  # max staleness if pub/sub drops
+NEAR_CACHE_MAX_ENTRIES = int(os.getenv('NEAR_CACHE_MAX_ENTRIES', '10000'))
+
+# Per-key-prefix cache hit/miss/error/latency metrics at /metrics
+CACHE_METRICS_ENABLED = os.getenv('CACHE_METRICS_ENABLED', 'true').lower() == 'true'
+
+# In-memory fallback cache budget (0 = unbounded)
+MEMORY_CACHE_MAX_ENTRIES = int(os.getenv('MEMORY_CACHE_MAX_ENTRIES', '50000'))
+MEMORY_CACHE_MAX_BYTES = int(os.getenv('MEMORY_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+MEMORY_CACHE_POLICY = os.getenv('MEMORY_CACHE_POLICY', 'lru')
+# Lock striping for threaded workers (1 = single MemoryAdapter)
+MEMORY_CACHE_SHARDS = int(os.getenv('MEMORY_CACHE_SHARDS', '16'))
+# Fallback shared by all workers on the host (e.g. /dev/shm/productionlab.cache);
+# unset = per-worker memory cache
+SHARED_CACHE_PATH = os.getenv('SHARED_CACHE_PATH')
+SHARED_CACHE_SLOTS = int(os.getenv('SHARED_CACHE_SLOTS', '65536'))
+SHARED_CACHE_SLOT_BYTES = int(os.getenv('SHARED_CACHE_SLOT_BYTES', '512'))
+
+# Session encoding for new writes: json | compact | msgpack (reads accept all)
+SESSION_CODEC = os.getenv('SESSION_CODEC', 'json')
+
+# Visit sessions: "hash" bumps a counter in place (HINCRBY, 1 round trip),
+# "blob" reads and rewrites the whole encoded session (2 round trips)
+SESSION_STORE = os.getenv('SESSION_STORE', 'hash')
+# Hash sessions: refresh the TTL only once this fraction of it has elapsed
+SESSION_TTL_REFRESH_FRACTION = float(os.getenv('SESSION_TTL_REFRESH_FRACTION', '0.5'))
+
+# Auth sessions: "cache" stores them under auth_session:<id> (one cache GET per
+# protected request), "token" issues HMAC-signed tokens checked locally; logouts
+# are synced from the cache into a per-worker Bloom filter every
+# TOKEN_REVOCATION_SYNC_INTERVAL seconds. Cached sessions keep working in token mode
+SESSION_MODE = os.getenv('SESSION_MODE', 'cache')
+SESSION_TOKEN_SECRET = os.getenv('SESSION_TOKEN_SECRET', '')  # same on every worker, >= 16 bytes
+SESSION_TOKEN_TTL = int(os.getenv('SESSION_TOKEN_TTL', '3600'))
+TOKEN_REVOCATION_SYNC_INTERVAL = float(os.getenv('TOKEN_REVOCATION_SYNC_INTERVAL', '1'))
+TOKEN_REVOCATION_CAPACITY = int(os.getenv('TOKEN_REVOCATION_CAPACITY', '100000'))
+TOKEN_REVOCATION_ERROR_RATE = float(os.getenv('TOKEN_REVOCATION_ERROR_RATE', '0.01'))
+
+# Read-through cache for address dropdowns (0 = disabled); empty lists kept shorter
+ADDRESS_CACHE_TTL = int(os.getenv('ADDRESS_CACHE_TTL', '3600'))
+ADDRESS_EMPTY_CACHE_TTL = int(os.getenv('ADDRESS_EMPTY_CACHE_TTL', '60'))
+# Read-through cache for GET /profile (0 = disabled); "user not found" kept shorter
+PROFILE_CACHE_TTL = int(os.getenv('PROFILE_CACHE_TTL', '300'))
+PROFILE_MISSING_TTL = int(os.getenv('PROFILE_MISSING_TTL', '30'))
+# Whole address tree in memory per worker (dropdowns never reach cache or DB);
+# checked for changes every ADDRESS_INDEX_REFRESH_INTERVAL seconds
+ADDRESS_INDEX_ENABLED = os.getenv('ADDRESS_INDEX_ENABLED', 'true').lower() == 'true'
+ADDRESS_INDEX_REFRESH_INTERVAL = float(os.getenv('ADDRESS_INDEX_REFRESH_INTERVAL', '30'))
+
+# bcrypt in a process pool: at most PASSWORD_HASH_WORKERS hashes at once per app
+# process (default: cores / gunicorn workers), PASSWORD_HASH_MAX_QUEUE more waiting,
+# beyond that /register and /login answer 503 at once instead of holding a thread
+PASSWORD_HASH_POOL_ENABLED = os.getenv('PASSWORD_HASH_POOL_ENABLED', 'true').lower() == 'true'
+PASSWORD_HASH_WORKERS = int(os.getenv(
+    'PASSWORD_HASH_WORKERS', str(max(1, (os.cpu_count() or 1) // int(os.getenv('WEB_CONCURRENCY', '1'))))
+))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv('PASSWORD_HASH_MAX_QUEUE', str(2 * PASSWORD_HASH_WORKERS)))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', '0'))
+# bcrypt cost: PASSWORD_HASH_COST pins it; unset = calibrated at startup to the
+# highest cost (within MIN..MAX) whose hash takes <= PASSWORD_HASH_TARGET_MS here.
+# Hashes with another cost are redone after the next successful login
+PASSWORD_HASH_COST = os.getenv('PASSWORD_HASH_COST')
+PASSWORD_HASH_TARGET_MS = float(os.getenv('PASSWORD_HASH_TARGET_MS', '250'))
+PASSWORD_HASH_MIN_COST = int(os.getenv('PASSWORD_HASH_MIN_COST', '10'))
+PASSWORD_HASH_MAX_COST = int(os.getenv('PASSWORD_HASH_MAX_COST', '15'))
+PASSWORD_REHASH_ON_LOGIN = os.getenv('PASSWORD_REHASH_ON_LOGIN', 'true').lower() == 'true'
+# Calibration result shared through the cache, so every worker picks the same cost
+PASSWORD_HASH_COST_KEY = "config:bcrypt_cost"
+PASSWORD_HASH_COST_TTL = 24 * 3600
+
+# Database backend: "mysql", or "sqlite" to run the whole app locally
+# (load tests, CI) on an embedded file loaded from init.sql
+DB_BACKEND = os.getenv('DB_BACKEND', 'mysql')
+SQLITE_PATH = os.getenv('SQLITE_PATH', 'productionlab.sqlite3')
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '5'))
+INIT_SQL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'infrastructure', 'database', 'init.sql')
 
 # MySQL Configuration
 MYSQL_HOST = os.getenv('MYSQL_HOST', 'localhost')
@@ -33,73 +145,325 @@ MYSQL_PORT = int(os.getenv('MYSQL_PORT', '3306'))
 MYSQL_USER = os.getenv('MYSQL_USER', 'app_user')
 MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', 'app_password')
 MYSQL_DATABASE = os.getenv('MYSQL_DATABASE', 'app_db')
+# Connection pool: a burst beyond the pool size opens overflow connections,
+# then waits MYSQL_POOL_TIMEOUT seconds for a free one before answering 503
+MYSQL_POOL_SIZE = int(os.getenv('MYSQL_POOL_SIZE', '5'))
+MYSQL_POOL_MAX_OVERFLOW = int(os.getenv('MYSQL_POOL_MAX_OVERFLOW', '10'))
+MYSQL_POOL_TIMEOUT = float(os.getenv('MYSQL_POOL_TIMEOUT', '5'))
+MYSQL_POOL_MAX_LIFETIME = float(os.getenv('MYSQL_POOL_MAX_LIFETIME', '1800'))
+MYSQL_POOL_IDLE_TIMEOUT = float(os.getenv('MYSQL_POOL_IDLE_TIMEOUT', '300'))
+# Ping connections on borrow only if they sat idle at least this long
+MYSQL_POOL_VALIDATE_AFTER = float(os.getenv('MYSQL_POOL_VALIDATE_AFTER', '30'))
+# Read replicas ("host:port,host:port") for read-only queries; writes stay on MYSQL_HOST
+MYSQL_REPLICAS = [node.strip() for node in os.getenv('MYSQL_REPLICAS', '').split(',') if node.strip()]
+MYSQL_REPLICA_MAX_LAG = float(os.getenv('MYSQL_REPLICA_MAX_LAG', '2'))
+MYSQL_REPLICA_CHECK_INTERVAL = float(os.getenv('MYSQL_REPLICA_CHECK_INTERVAL', '1'))
+# Read-your-writes: a client's reads stay on the primary this long after it writes
+DB_READ_PIN_WINDOW = float(os.getenv('DB_READ_PIN_WINDOW', '5'))
+# Per-query-fingerprint counts/latency at /metrics and /debug/queries;
+# calls slower than DB_SLOW_QUERY_MS go to the slow_query log
+DB_QUERY_METRICS_ENABLED = os.getenv('DB_QUERY_METRICS_ENABLED', 'true').lower() == 'true'
+DB_SLOW_QUERY_MS = float(os.getenv('DB_SLOW_QUERY_MS', '100'))
+DB_EXPLAIN_SLOW = os.getenv('DB_EXPLAIN_SLOW', 'false').lower() == 'true'
 
 
 # Dependency Injection
 def create_cache_adapter():
-    if USE_REDIS:
+    cache = _create_cache_backend()
+    if CACHE_METRICS_ENABLED:
+        return InstrumentedCache(cache)
+    return cache
+
+
+def _create_redis_adapter(host=REDIS_HOST, port=REDIS_PORT, unix_socket_path=REDIS_SOCKET,
+                          raise_on_error=CACHE_METRICS_ENABLED):
+    return RedisAdapter(
+        host=host,
+        port=port,
+        pooled=True,
+        max_connections=REDIS_POOL_MAX_CONNECTIONS,
+        pool_timeout=REDIS_POOL_TIMEOUT,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_keepalive=True,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        # Let InstrumentedCache count outages as errors, not misses
+        raise_on_error=raise_on_error,
+        unix_socket_path=unix_socket_path
+    )
+
+
+def _create_redis_ring():
+    # Nodes must raise on failure so the ring can eject them and fall through
+    nodes = {}
+    for node in REDIS_NODES:
+        host, _, port = node.rpartition(':')
+        nodes[node] = _create_redis_adapter(host, int(port), None, raise_on_error=True)
+    cache = ShardedCacheAdapter(nodes, vnodes=CACHE_RING_VNODES,
+                                failure_threshold=CACHE_NODE_FAILURE_THRESHOLD)
+    if not any(cache.check_health().values()):
+        raise ConnectionError("no Redis node reachable")
+    cache.start_health_checks(CACHE_HEALTH_CHECK_INTERVAL)
+    return cache
+
+
+def _create_cache_backend():
+    if USE_REDIS and REDIS_NODES:
+        try:
+            return _create_redis_ring()
+        except Exception:
+            print("Redis nodes unavailable, falling back to memory cache")
+    elif USE_REDIS:
         try:
-            cache = RedisAdapter(host=REDIS_HOST)
-            cache.ping()  # Test connection
+            cache = _create_redis_adapter()
+            if not cache.ping():  # Test connection
+                raise ConnectionError(cache.stats()["last_error"])
+            if NEAR_CACHE_ENABLED:
+                return NearCacheAdapter(
+                    cache,
+                    bus=RedisInvalidationBus(cache.client),
+                    max_entries=NEAR_CACHE_MAX_ENTRIES,
+                    local_ttl=NEAR_CACHE_TTL,
+                    local_prefixes=("auth_session:",)
+                )
             return cache
         except Exception:
             print("Redis unavailable, falling back to memory cache")
     
-    return MemoryAdapter()
+    if SHARED_CACHE_PATH:
+        return SharedMemoryAdapter(
+            SHARED_CACHE_PATH,
+            capacity=SHARED_CACHE_SLOTS,
+            slot_size=SHARED_CACHE_SLOT_BYTES
+        )
+    
+    if MEMORY_CACHE_SHARDS > 1:
+        cache = ShardedMemoryAdapter(
+            shards=MEMORY_CACHE_SHARDS,
+            max_entries=MEMORY_CACHE_MAX_ENTRIES or None,
+            max_bytes=MEMORY_CACHE_MAX_BYTES or None,
+            policy=MEMORY_CACHE_POLICY
+        )
+        cache.start_expirer()
+        return cache
+    
+    return MemoryAdapter(
+        max_entries=MEMORY_CACHE_MAX_ENTRIES or None,
+        max_bytes=MEMORY_CACHE_MAX_BYTES or None,
+        policy=MEMORY_CACHE_POLICY
+    )
+
+
+def _create_mysql_adapter(host=MYSQL_HOST, port=MYSQL_PORT, pool_name="primary"):
+    db = MySQLAdapter(
+        host=host,
+        port=port,
+        user=MYSQL_USER,
+        password=MYSQL_PASSWORD,
+        database=MYSQL_DATABASE,
+        pool_size=MYSQL_POOL_SIZE,
+        max_overflow=MYSQL_POOL_MAX_OVERFLOW,
+        pool_timeout=MYSQL_POOL_TIMEOUT,
+        max_lifetime=MYSQL_POOL_MAX_LIFETIME,
+        idle_timeout=MYSQL_POOL_IDLE_TIMEOUT,
+        validate_after=MYSQL_POOL_VALIDATE_AFTER,
+        pool_name=pool_name
+    )
+    # The pool connects lazily, so check one connection up front
+    with db.pool.connection() as conn:
+        conn.ping()
+    return db
 
 
 def create_database_adapter():
+    db = _create_database_backend()
+    if db is not None and DB_QUERY_METRICS_ENABLED:
+        return InstrumentedDatabase(db, slow_threshold=DB_SLOW_QUERY_MS / 1000, explain=DB_EXPLAIN_SLOW)
+    return db
+
+
+def _create_sqlite_adapter():
+    with open(INIT_SQL_PATH) as f:
+        init_script = f.read()
+    return SQLiteAdapter(SQLITE_PATH, init_script, busy_timeout=SQLITE_BUSY_TIMEOUT)
+
+
+def _create_database_backend():
+    if DB_BACKEND == 'sqlite':
+        return _create_sqlite_adapter()
+    
     try:
-        db = MySQLAdapter(
-            host=MYSQL_HOST,
-            port=MYSQL_PORT,
-            user=MYSQL_USER,
-            password=MYSQL_PASSWORD,
-            database=MYSQL_DATABASE
-        )
-        db.ping()  # Test connection
-        return db
+        db = _create_mysql_adapter()
     except Exception as e:
         print(f"MySQL connection failed: {e}")
         return None
+    
+    if not MYSQL_REPLICAS:
+        return db
+    replicas = {}
+    for node in MYSQL_REPLICAS:
+        host, _, port = node.rpartition(':')
+        try:
+            replicas[node] = _create_mysql_adapter(host, int(port), pool_name=f"replica:{node}")
+        except Exception as e:
+            print(f"MySQL replica {node} unavailable: {e}")
+    if not replicas:
+        return db
+    db = ReadWriteSplitAdapter(db, replicas, max_lag=MYSQL_REPLICA_MAX_LAG,
+                               pin_window=DB_READ_PIN_WINDOW)
+    db.check_replicas()
+    db.start_lag_checks(MYSQL_REPLICA_CHECK_INTERVAL)
+    return db
+
+
+def create_password_hasher():
+    if not PASSWORD_HASH_POOL_ENABLED:
+        return InlinePasswordHasher()
+    hasher = ProcessPoolHasher(
+        workers=PASSWORD_HASH_WORKERS,
+        max_queue=PASSWORD_HASH_MAX_QUEUE,
+        queue_timeout=PASSWORD_HASH_QUEUE_TIMEOUT
+    )
+    # Fork the workers before any background thread exists
+    hasher.start()
+    return hasher
+
+
+def create_session_tokens(cache):
+    """(signer, revocation list) in token mode, (None, None) in cache mode"""
+    if SESSION_MODE == 'cache':
+        return None, None
+    if SESSION_MODE != 'token':
+        raise RuntimeError(f"Unknown SESSION_MODE: {SESSION_MODE} (expected cache or token)")
+    if not SESSION_TOKEN_SECRET:
+        raise RuntimeError("SESSION_MODE=token requires SESSION_TOKEN_SECRET")
+    tokens = SessionTokenSigner(SESSION_TOKEN_SECRET.encode('utf-8'), ttl=SESSION_TOKEN_TTL)
+    revocations = TokenRevocationList(
+        cache, ttl=SESSION_TOKEN_TTL,
+        capacity=TOKEN_REVOCATION_CAPACITY, error_rate=TOKEN_REVOCATION_ERROR_RATE
+    )
+    try:
+        revocations.sync(full=True)
+    except Exception as e:
+        print(f"Token revocations not loaded, retrying in the background: {e}")
+    revocations.start_sync(TOKEN_REVOCATION_SYNC_INTERVAL)
+    return tokens, revocations
+
+
+def configure_password_cost(hasher, cache):
+    """Set the cost of new hashes; returns the calibration result (None if pinned)"""
+    if PASSWORD_HASH_COST:
+        hasher.rounds = int(PASSWORD_HASH_COST)
+        return None
+    try:
+        calibration = json.loads(cache.get(PASSWORD_HASH_COST_KEY) or 'null')
+    except Exception:
+        calibration = None
+    if (not calibration or calibration.get("target_seconds") != PASSWORD_HASH_TARGET_MS / 1000
+            or not PASSWORD_HASH_MIN_COST <= calibration.get("cost", 0) <= PASSWORD_HASH_MAX_COST):
+        # Workers starting together may each calibrate once; later starts reuse the result
+        calibration = calibrate_bcrypt_cost(PASSWORD_HASH_TARGET_MS / 1000,
+                                            PASSWORD_HASH_MIN_COST, PASSWORD_HASH_MAX_COST)
+        try:
+            cache.set(PASSWORD_HASH_COST_KEY, json.dumps(calibration), ttl=PASSWORD_HASH_COST_TTL)
+        except Exception:
+            pass
+    hasher.rounds = calibration["cost"]
+    print(f"bcrypt cost {calibration['cost']} ({calibration['hash_seconds'] * 1000:.0f} ms per hash, "
+          f"target {PASSWORD_HASH_TARGET_MS:.0f} ms)")
+    return calibration
 
 
 def create_app():
     """Application factory - creates and configures Flask app"""
     app = Flask(__name__)
     
+    password_hasher = create_password_hasher()
     # Initialize dependencies
     cache = create_cache_adapter()
     db = create_database_adapter()
+    hash_calibration = configure_password_cost(password_hasher, cache)
     
-    app_service = AppService(cache)
+    session_codec = create_session_codec(SESSION_CODEC)
+    app_service = AppService(
+        cache, session_codec,
+        hash_sessions=SESSION_STORE == 'hash',
+        ttl_refresh_fraction=SESSION_TTL_REFRESH_FRACTION
+    )
     web_adapter = FlaskAdapter()
+    session_tokens, token_revocations = create_session_tokens(cache)
     
     # Initialize middleware (must be before routes that use them)
-    from infrastructure.web.middleware import init_auth_middleware
-    init_auth_middleware(cache, web_adapter)
+    from infrastructure.web.middleware import init_auth_middleware, init_read_your_writes
+    init_auth_middleware(cache, web_adapter, session_tokens, token_revocations)
+    init_read_your_writes(app, pin_window=DB_READ_PIN_WINDOW)
     
     # Inject dependencies into routes
     init_health_routes(app_service, web_adapter)
     init_api_routes(app_service, web_adapter)
     
     # Initialize auth routes if database is available
+    auth_service = None
     if db:
         # Create services with cache for session management
-        auth_service = AuthService(db, cache)
-        address_service = AddressService(db)
+        auth_service = AuthService(
+            db, cache, session_codec, hasher=password_hasher,
+            rehash_on_login=PASSWORD_REHASH_ON_LOGIN, hash_calibration=hash_calibration,
+            profile_cache_ttl=PROFILE_CACHE_TTL, profile_missing_ttl=PROFILE_MISSING_TTL,
+            tokens=session_tokens, revocations=token_revocations
+        )
+        address_service = AddressService(
+            db, cache if ADDRESS_CACHE_TTL > 0 else None, cache_ttl=ADDRESS_CACHE_TTL,
+            empty_ttl=ADDRESS_EMPTY_CACHE_TTL,
+            # Cached profiles embed address names
+            on_change=auth_service.invalidate_address_profiles
+        )
+        if ADDRESS_INDEX_ENABLED:
+            try:
+                address_service.refresh_index(force=True)
+                address_service.start_index_refresh(ADDRESS_INDEX_REFRESH_INTERVAL)
+            except Exception as e:
+                print(f"Address index not loaded, using SQL lookups: {e}")
         
         init_auth_routes(auth_service, web_adapter)
         init_address_routes(address_service, web_adapter)
     
+    init_debug_routes(db if isinstance(db, InstrumentedDatabase) else None, web_adapter,
+                      auth_service, password_hasher)
+    
     # Register all blueprints
     register_routes(app)
     
+    @app.errorhandler(PoolTimeout)
+    def db_pool_timeout(error):
+        # Every DB connection stayed busy for MYSQL_POOL_TIMEOUT: shed load
+        response = web_adapter.create_response({"error": "Database busy, please retry"}, 503)
+        response.headers["Retry-After"] = "1"
+        return response
+    
+    @app.errorhandler(HasherBusy)
+    def password_hasher_busy(error):
+        # Every hashing worker busy and the queue full: reject fast
+        response = web_adapter.create_response({"error": "Server busy, please retry"}, 503)
+        response.headers["Retry-After"] = str(error.retry_after)
+        return response
+    
     return app
 
 
-# Create app instance
-flask_app = create_app()
+# Create app instance on first access (gunicorn main:flask_app), so asgi.py
+# can import this module's configuration and factories without building it
+_flask_app = None
+
+
+def __getattr__(name):
+    global _flask_app
+    if name == 'flask_app':
+        if _flask_app is None:
+            _flask_app = create_app()
+        return _flask_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Graceful shutdown
 def signal_handler(sig, frame):
@@ -110,5 +474,5 @@ signal.signal(signal.SIGTERM, signal_handler)
 signal.signal(signal.SIGINT, signal_handler)
 
 if __name__ == '__main__':
-    flask_app.run(host='0.0.0.0', port=5000, debug=False)
+    create_app().run(host='0.0.0.0', port=5000, debug=False)
 
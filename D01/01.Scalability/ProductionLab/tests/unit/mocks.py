@@ -1,4 +1,4 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, Iterable
 from core.interfaces.cache_port import CachePort
 from core.interfaces.web_port import WebPort
 
@@ -28,6 +28,28 @@ class MockCacheAdapter(CachePort):
             return False
         return key in self._store
     
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[str]]:
+        if self._should_fail:
+            raise Exception("Cache error")
+        return {key: self._store.get(key) for key in keys}
+    
+    def flush(self) -> bool:
+        if self._should_fail:
+            return False
+        self._store.clear()
+        return True
+    
+    def set_many(self, mapping: Dict[str, str], ttl: Optional[int] = None) -> bool:
+        if self._should_fail:
+            return False
+        self._store.update(mapping)
+        return True
+    
+    def delete_many(self, keys: Iterable[str]) -> int:
+        if self._should_fail:
+            return 0
+        return sum(1 for key in keys if self._store.pop(key, None) is not None)
+    
     def ping(self) -> bool:
         return not self._should_fail
 
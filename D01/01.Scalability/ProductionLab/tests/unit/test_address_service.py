@@ -0,0 +1,248 @@
+import json
+import unittest
+import threading
+import time
+from core.services.address_service import (
+    AddressService, SQL_ADDRESS_VERSION, districts_key, provinces_key
+)
+from core.services.singleflight import SingleFlight
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from tests.unit.mocks import MockCacheAdapter
+
+
+class SlowAddressDB:
+    """Answers the dropdown queries after a delay and counts them"""
+    
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.queries = 0
+        self._lock = threading.Lock()
+    
+    def fetch_all(self, query, params=None, read_only=False):
+        with self._lock:
+            self.queries += 1
+        time.sleep(self.delay)
+        if "country, province" in query:
+            return [{"country": "VN", "province": "HCM"}, {"country": "VN", "province": "HN"}]
+        if "DISTINCT country" in query:
+            return [{"country": "VN"}]
+        if "DISTINCT province" in query:
+            return [{"province": "HCM"}, {"province": "HN"}]
+        return [{"id": 1, "district": "D1"}]
+
+
+class TestAddressReadThrough(unittest.TestCase):
+    def setUp(self):
+        self.db = SlowAddressDB()
+        self.cache = MemoryAdapter()
+        self.service = AddressService(self.db, self.cache)
+    
+    def test_second_call_served_from_cache(self):
+        first = self.service.get_provinces("VN")
+        second = self.service.get_provinces("VN")
+        
+        self.assertEqual(first, ["HCM", "HN"])
+        self.assertEqual(second, first)
+        self.assertEqual(self.db.queries, 1)
+        stats = self.service.get_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+    
+    def test_districts_keep_ids(self):
+        self.service.get_districts("VN", "HCM")
+        
+        self.assertEqual(self.service.get_districts("VN", "HCM"), [{"id": 1, "district": "D1"}])
+    
+    def test_invalidate_forces_reload(self):
+        self.service.get_countries()
+        self.service.get_districts("VN", "HN")
+        
+        removed = self.service.invalidate()
+        self.service.get_countries()
+        
+        self.assertEqual(removed, 2)
+        self.assertEqual(self.db.queries, 4)  # 2 loads + enumeration + reload
+    
+    def test_concurrent_misses_share_one_query(self):
+        self.db.delay = 0.2
+        threads = [threading.Thread(target=self.service.get_countries) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        stats = self.service.get_cache_stats()
+        self.assertEqual(self.db.queries, 1)
+        self.assertEqual(stats["db_loads"], 1)
+        self.assertEqual(stats["hits"] + stats["coalesced"], 9)
+    
+    def test_keys_keep_parameters_apart(self):
+        self.assertNotEqual(districts_key("a:b", "c"), districts_key("a", "b:c"))
+        self.assertEqual(provinces_key("Vietnam"), provinces_key("vietnam"))
+        self.assertLess(len(provinces_key("x" * 10000)), 64)
+    
+    def test_empty_lists_cached_briefly(self):
+        self.db.fetch_all = lambda query, params=None, read_only=False: []
+        self.service.get_provinces("Atlantis")
+        self.service.get_districts("VN", "HCM")
+        
+        now = time.time()
+        for key in (provinces_key("Atlantis"), districts_key("VN", "HCM")):
+            expiry = self.cache._store[key][1]
+            self.assertLessEqual(expiry - now, AddressService.EMPTY_CACHE_TTL)
+        self.assertEqual(self.service.get_provinces("Atlantis"), [])
+    
+    def test_cache_failure_falls_back_to_db(self):
+        service = AddressService(self.db, MockCacheAdapter(should_fail=True))
+        
+        self.assertEqual(service.get_countries(), ["VN"])
+    
+    def test_without_cache(self):
+        service = AddressService(self.db)
+        service.get_countries()
+        service.get_countries()
+        
+        self.assertEqual(self.db.queries, 2)
+        self.assertFalse(service.get_cache_stats()["enabled"])
+
+
+class AddressTableDB:
+    """master_address as a list of (id, country, province, district)"""
+    
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.full_reads = 0
+        self.fetch_one_calls = []
+    
+    def fetch_iter(self, query, params=None, batch_size=1000, as_tuples=False, read_only=False):
+        self.full_reads += 1
+        return iter(sorted(self.rows))
+    
+    def fetch_one(self, query, params=None, read_only=False):
+        self.fetch_one_calls.append(query)
+        if query == SQL_ADDRESS_VERSION:
+            return {"row_count": len(self.rows), "max_id": max(r[0] for r in self.rows)}
+        return {"id": params[0], "country": "from-db"}
+
+
+class TestAddressIndex(unittest.TestCase):
+    def setUp(self):
+        self.db = AddressTableDB([
+            (1, "Vietnam", "Ha Noi", "Hoan Kiem"),
+            (2, "Vietnam", "Ha Noi", "Ba Dinh"),
+            (3, "Vietnam", "Da Nang", "Hai Chau"),
+            (4, "Japan", "Tokyo", "Shibuya"),
+        ])
+        self.cache = MockCacheAdapter()
+        self.service = AddressService(self.db, self.cache)
+        self.assertTrue(self.service.refresh_index(force=True))
+    
+    def test_lookups_served_from_memory(self):
+        self.assertEqual(self.service.get_countries(), ["Japan", "Vietnam"])
+        self.assertEqual(self.service.get_provinces("Vietnam"), ["Da Nang", "Ha Noi"])
+        self.assertEqual(self.service.get_districts("Vietnam", "Ha Noi"),
+                         [{"id": 2, "district": "Ba Dinh"}, {"id": 1, "district": "Hoan Kiem"}])
+        self.assertEqual(self.service.get_provinces("Nowhere"), [])
+        self.assertEqual(self.service.get_address_by_id(4)["province"], "Tokyo")
+        
+        self.assertEqual(self.db.full_reads, 1)
+        self.assertEqual(self.db.fetch_one_calls, [])
+        self.assertEqual(self.cache._store, {})
+    
+    def test_pre_serialized_bodies(self):
+        self.assertEqual(json.loads(self.service.countries_json()), {"countries": ["Japan", "Vietnam"]})
+        self.assertEqual(json.loads(self.service.districts_json("Japan", "Tokyo")),
+                         {"districts": [{"id": 4, "district": "Shibuya"}]})
+        self.assertEqual(json.loads(self.service.provinces_json("Nowhere")), {"provinces": []})
+        self.assertIsNone(AddressService(self.db).countries_json())
+    
+    def test_lookups_ignore_case_like_the_database(self):
+        self.db.rows.append((5, "vietnam", "HA NOI", "Tay Ho"))
+        self.assertTrue(self.service.refresh_index())
+        
+        self.assertEqual(self.service.get_countries(), ["Japan", "Vietnam"])
+        self.assertEqual(self.service.get_provinces("vietnam"), ["Da Nang", "Ha Noi"])
+        self.assertEqual([d["id"] for d in self.service.get_districts("VIETNAM", "ha noi")], [2, 1, 5])
+        self.assertEqual(json.loads(self.service.provinces_json("japan")), {"provinces": ["Tokyo"]})
+        self.assertEqual(json.loads(self.service.districts_json("japan", "tokyo")),
+                         {"districts": [{"id": 4, "district": "Shibuya"}]})
+    
+    def test_unknown_id_falls_back_to_db(self):
+        self.assertEqual(self.service.get_address_by_id(99), {"id": 99, "country": "from-db"})
+    
+    def test_reload_only_when_version_changes(self):
+        old = self.service.countries_json()
+        self.assertFalse(self.service.refresh_index())
+        self.assertEqual(self.db.full_reads, 1)
+        
+        self.db.rows.append((5, "Laos", "Vientiane", "Chanthabouly"))
+        self.assertTrue(self.service.refresh_index())
+        self.assertEqual(self.service.get_countries(), ["Japan", "Laos", "Vietnam"])
+        self.assertNotEqual(self.service.countries_json(), old)
+        self.assertEqual(self.service.get_cache_stats()["index"]["reloads"], 2)
+    
+    def test_forced_reload_catches_updates_and_skips_identical(self):
+        self.assertFalse(self.service.refresh_index(force=True))  # same checksum
+        
+        self.db.rows[0] = (1, "Vietnam", "Ha Noi", "Hoàn Kiếm")
+        self.assertFalse(self.service.refresh_index())  # count and MAX(id) unchanged
+        self.service.invalidate()
+        self.assertIn({"id": 1, "district": "Hoàn Kiếm"}, self.service.get_districts("Vietnam", "Ha Noi"))
+    
+    def test_updated_and_deleted_rows_reported(self):
+        changes = []
+        self.service.on_change = changes.append
+        
+        self.db.rows[0] = (1, "Vietnam", "Ha Noi", "Hoàn Kiếm")
+        del self.db.rows[3]
+        self.db.rows.append((5, "Laos", "Vientiane", "Chanthabouly"))  # new: affects nobody
+        self.assertTrue(self.service.refresh_index(force=True))
+        self.assertFalse(self.service.refresh_index(force=True))
+        self.service.invalidate([2])
+        
+        self.assertEqual(changes, [[1, 4], [2]])
+        self.assertEqual(AddressService(self.db, on_change=changes.append).invalidate([7]), 0)
+        self.assertEqual(changes[-1], [7])
+    
+    def test_background_refresh(self):
+        self.service.start_index_refresh(interval=0.01)
+        self.db.rows.append((5, "Laos", "Vientiane", "Chanthabouly"))
+        deadline = time.time() + 2
+        while "Laos" not in self.service.get_countries() and time.time() < deadline:
+            time.sleep(0.01)
+        self.service.stop_index_refresh()
+        
+        self.assertIn("Laos", self.service.get_countries())
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_error_reaches_every_waiter(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        errors = []
+        
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError("db down")
+        
+        def call(fn):
+            try:
+                flight.do("k", fn)
+            except ValueError as e:
+                errors.append(e)
+        
+        leader = threading.Thread(target=call, args=(fail,))
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call, args=(lambda: "unused",))
+        follower.start()
+        leader.join()
+        follower.join()
+        
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(flight.in_flight(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
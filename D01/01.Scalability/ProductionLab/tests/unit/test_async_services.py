@@ -0,0 +1,270 @@
+import os
+import shutil
+import tempfile
+import unittest
+import asyncio
+import json
+from unittest import mock
+from starlette.testclient import TestClient
+from core.interfaces.database_port import DuplicateKeyError, PoolTimeout
+from core.services.address_service import SQL_ADDRESS_BY_ID
+from core.services.app_service import session_hash_key
+from core.services.async_app_service import AsyncAppService
+from core.services.async_auth_service import AsyncAuthService
+from core.services.async_address_service import AsyncAddressService
+from core.services.auth_service import SQL_INSERT_USER, InlinePasswordHasher, profile_key
+from core.services.session_token import SessionTokenSigner, is_session_token
+from core.services.token_revocation import TokenRevocationList
+from infrastructure.cache.async_memory_adapter import AsyncMemoryAdapter
+from infrastructure.database.sqlite_adapter import SQLiteAdapter
+from infrastructure.database.threaded_async_database import ThreadedAsyncDatabase
+from infrastructure.web.asgi_app import create_asgi_app
+from tests.unit.test_sqlite_adapter import read_init_sql
+
+SECRET = b"0123456789abcdef0123456789abcdef"
+
+
+class TestAsyncAppService(unittest.TestCase):
+    def setUp(self):
+        self.cache = AsyncMemoryAdapter()
+        self.app_service = AsyncAppService(self.cache)
+    
+    def test_new_session_then_visit_count_increments(self):
+        first = asyncio.run(self.app_service.handle_request(None))
+        second = asyncio.run(self.app_service.handle_request(first["session_id"]))
+        
+        self.assertEqual(second["session_id"], first["session_id"])
+        self.assertEqual(second["visits"], first["visits"] + 1)
+    
+    def test_health(self):
+        status = asyncio.run(self.app_service.check_health())
+        
+        self.assertEqual(status.status, "healthy")
+
+
+class TestAsyncLogoutAll(unittest.TestCase):
+    def test_removes_every_tracked_session(self):
+        cache = AsyncMemoryAdapter()
+        cache.inner.set_many({"auth_session:s1": "{}", "auth_session:s2": "{}"})
+        cache.inner.hash_set("user_session_index:7", {"s1": "1.0"})
+        cache.inner.set("user_sessions:7", json.dumps(["s1", "s2"]))
+        
+        result = asyncio.run(AsyncAuthService(db=None, cache=cache).logout_all(7))
+        
+        self.assertEqual(result["sessions_removed"], 2)
+        self.assertIsNone(cache.inner.get("auth_session:s1"))
+        self.assertEqual(cache.inner.hash_get_all("user_session_index:7"), {})
+    
+    def test_logout_removes_its_index_field(self):
+        cache = AsyncMemoryAdapter()
+        service = AsyncAuthService(db=None, cache=cache)
+        cache.inner.hash_set("user_session_index:7", {"expired": "1.0"})
+        
+        async def scenario():
+            first = await service._create_cached_session({"id": 7, "username": "alice"})
+            second = await service._create_cached_session({"id": 7, "username": "alice"})
+            await service.logout(first)
+            return second
+        
+        second = asyncio.run(scenario())
+        self.assertEqual(list(cache.inner.hash_get_all("user_session_index:7")), [second])
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class SQLiteCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.sync_db = SQLiteAdapter(os.path.join(self.tmp, "app.sqlite3"), read_init_sql())
+        self.db = ThreadedAsyncDatabase(self.sync_db, max_workers=4)
+    
+    def tearDown(self):
+        run(self.db.close())
+        self.sync_db.close()
+        shutil.rmtree(self.tmp)
+
+
+class TestAsyncHashSessions(unittest.TestCase):
+    def test_visits_kept_in_a_hash(self):
+        cache = AsyncMemoryAdapter()
+        service = AsyncAppService(cache, hash_sessions=True)
+        
+        first = run(service.handle_request(None))
+        second = run(service.handle_request(first["session_id"]))
+        
+        self.assertEqual(second["visits"], first["visits"] + 1)
+        stored = cache.inner.hash_get_all(session_hash_key(first["session_id"]))
+        self.assertEqual(int(stored["visits"]), second["visits"])
+
+
+class TestThreadedAsyncDatabase(SQLiteCase):
+    def test_transaction_rolls_back_on_error(self):
+        async def register_twice():
+            async with self.db.transaction() as tx:
+                await tx.execute(SQL_INSERT_USER, ("alice", "x"))
+                await tx.execute(SQL_INSERT_USER, ("alice", "y"))
+        
+        with self.assertRaises(DuplicateKeyError):
+            run(register_twice())
+        self.assertEqual(self.sync_db.fetch_one("SELECT COUNT(*) AS n FROM auth_user")["n"], 0)
+    
+    def test_concurrent_reads(self):
+        async def read_all():
+            return await asyncio.gather(*(self.db.fetch_one(SQL_ADDRESS_BY_ID, (1,)) for _ in range(20)))
+        
+        rows = run(read_all())
+        self.assertEqual({row["district"] for row in rows}, {"Ba Dinh"})
+
+
+class TestAsyncAuthService(SQLiteCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = AsyncMemoryAdapter()
+        self.service = AsyncAuthService(self.db, self.cache, hasher=InlinePasswordHasher(rounds=4))
+        self.user_id = run(self.service.register("alice", "pw", full_name="Alice", address_id=1))["user_id"]
+    
+    def test_profile_is_cached_and_written_through(self):
+        async def scenario():
+            await self.service.get_profile(self.user_id)
+            await self.service.update_profile(self.user_id, {"email": "a@x.io"})
+            return await self.service.get_profile(self.user_id)
+        
+        profile = run(scenario())
+        self.assertEqual((profile["full_name"], profile["email"]), ("Alice", "a@x.io"))
+        self.assertIsNotNone(self.cache.inner.get(profile_key(self.user_id)))
+        stats = self.service.get_profile_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["writes"]), (1, 1, 1))
+    
+    def test_weaker_hash_upgraded_on_login(self):
+        service = AsyncAuthService(self.db, self.cache, hasher=InlinePasswordHasher(rounds=5))
+        
+        async def scenario():
+            result = await service.login("alice", "pw")
+            await service.wait_for_rehashes()
+            return result
+        
+        self.assertTrue(run(scenario())["success"])
+        row = self.sync_db.fetch_one("SELECT password_hash FROM auth_user WHERE id = %s", (self.user_id,))
+        self.assertFalse(service.hasher.needs_rehash(row["password_hash"]))
+        self.assertEqual(service.get_hashing_stats()["rehashed"], 1)
+    
+    def test_token_mode(self):
+        revocations = TokenRevocationList(self.cache.inner, capacity=1000)
+        service = AsyncAuthService(self.db, self.cache, hasher=InlinePasswordHasher(rounds=4),
+                                   tokens=SessionTokenSigner(SECRET, ttl=60), revocations=revocations)
+        
+        token = run(service.login("alice", "pw"))["session_id"]
+        self.assertTrue(is_session_token(token))
+        self.assertIsNone(self.cache.inner.get(f"auth_session:{token}"))
+        run(service.logout(token))
+        self.assertTrue(revocations.is_revoked(service.tokens.verify(token)))
+    
+    def test_address_reload_drops_profiles_living_there(self):
+        addresses = AsyncAddressService(self.db, on_change=self.service.invalidate_address_profiles)
+        
+        async def scenario():
+            await addresses.refresh_index(force=True)
+            await self.service.get_profile(self.user_id)
+            await self.db.execute("UPDATE master_address SET district = %s WHERE id = %s", ("Renamed", 1))
+            await addresses.refresh_index(force=True)
+            return await self.service.get_profile(self.user_id)
+        
+        self.assertEqual(run(scenario())["address"]["district"], "Renamed")
+        self.assertEqual(self.service.get_profile_cache_stats()["invalidations"], 1)
+
+
+class TestAsyncAddressService(SQLiteCase):
+    def test_concurrent_misses_share_one_query(self):
+        cache = AsyncMemoryAdapter()
+        service = AsyncAddressService(self.db, cache)
+        
+        async def lookups():
+            return await asyncio.gather(*(service.get_provinces("Vietnam") for _ in range(10)))
+        
+        results = run(lookups())
+        self.assertEqual(len({tuple(r) for r in results}), 1)
+        stats = service.get_cache_stats()
+        self.assertEqual((stats["db_loads"], stats["coalesced"]), (1, 9))
+        self.assertEqual(run(service.get_provinces("Vietnam")), results[0])
+        self.assertEqual(service.get_cache_stats()["hits"], 1)
+    
+    def test_index_serves_lookups(self):
+        service = AsyncAddressService(self.db)
+        self.assertTrue(run(service.refresh_index(force=True)))
+        self.assertFalse(run(service.refresh_index()))
+        
+        with mock.patch.object(self.db, "fetch_all", wraps=self.db.fetch_all) as fetch_all:
+            districts = run(service.get_districts("Vietnam", "Ha Noi"))
+        fetch_all.assert_not_called()
+        self.assertIn("Ba Dinh", [d["district"] for d in districts])
+        self.assertIsNotNone(service.provinces_json("Vietnam"))
+    
+    def test_export_pages_by_id(self):
+        service = AsyncAddressService(self.db)
+        
+        async def export():
+            return [json.loads(line) async for line in service.export_addresses(batch_size=2)]
+        
+        rows = run(export())
+        total = self.sync_db.fetch_one("SELECT COUNT(*) AS n FROM master_address")["n"]
+        self.assertEqual(len(rows), total)
+        self.assertEqual([r["id"] for r in rows], sorted(r["id"] for r in rows))
+
+
+class TestAsgiApp(SQLiteCase):
+    def setUp(self):
+        super().setUp()
+        cache = AsyncMemoryAdapter()
+        self.auth_service = AsyncAuthService(self.db, cache, hasher=InlinePasswordHasher(rounds=4))
+        
+        async def build():
+            return {"app_service": AsyncAppService(cache), "auth_service": self.auth_service,
+                    "address_service": AsyncAddressService(self.db), "cache": cache}
+        self.client = TestClient(create_asgi_app(build))
+        self.client.__enter__()  # lifespan: one event loop for the whole test
+    
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+        super().tearDown()
+    
+    def test_login_profile_logout(self):
+        response = self.client.post("/register", json={"username": "alice", "password": "pw"})
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post("/login", json={"username": "alice", "password": "pw"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("httponly", response.headers["set-cookie"].lower())
+        session_id = response.json()["session_id"]
+        
+        response = self.client.get("/profile")
+        self.assertEqual((response.status_code, response.json()["profile"]["username"]), (200, "alice"))
+        self.assertEqual(self.client.post("/logout").status_code, 200)
+        self.client.cookies.set("session_id", session_id)
+        self.assertEqual(self.client.get("/profile").status_code, 401)
+    
+    def test_errors(self):
+        responses = [self.client.post("/login", content=b"{not json"),
+                     self.client.get("/nope"),
+                     self.client.delete("/health"),
+                     self.client.get("/addresses/provinces")]
+        
+        self.assertEqual([r.status_code for r in responses], [400, 404, 405, 400])
+        self.assertEqual(responses[1].json(), {"error": "Not Found"})
+    
+    def test_pool_timeout_is_503(self):
+        with mock.patch.object(self.auth_service, "register", side_effect=PoolTimeout("exhausted")):
+            response = self.client.post("/register", json={"username": "a", "password": "pw"})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers["retry-after"], "1")
+    
+    def test_export_streams_ndjson(self):
+        response = self.client.get("/addresses/export?batch_size=2")
+        
+        self.assertEqual(response.headers["content-type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([r["id"] for r in rows][:3], [1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,306 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import json
+from unittest import mock
+from flask import Flask
+from core.interfaces.database_port import PoolTimeout
+from core.interfaces.password_hasher_port import HasherBusy
+from core.services.address_service import AddressService
+from core.services.auth_service import (
+    AuthService, InlinePasswordHasher, RehashTracker, profile_key, profile_update, merge_session_index,
+    read_cached_profile, profile_cache_entry
+)
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.database.sqlite_adapter import SQLiteAdapter
+from infrastructure.web.flask_adapter import FlaskAdapter
+from infrastructure.web.middleware import init_auth_middleware
+from infrastructure.web.routes.auth import auth_bp, init_auth_routes
+from tests.unit.mocks import MockCacheAdapter
+from tests.unit.test_sqlite_adapter import read_init_sql
+
+
+class TestLogoutAll(unittest.TestCase):
+    def setUp(self):
+        self.cache = MemoryAdapter()
+        self.auth_service = AuthService(db=None, cache=self.cache)
+    
+    def test_login_adds_to_session_index(self):
+        first = self.auth_service._create_cached_session({"id": 7, "username": "alice"})
+        second = self.auth_service._create_cached_session({"id": 7, "username": "alice"})
+        
+        self.assertEqual(set(self.cache.hash_get_all("user_session_index:7")), {first, second})
+        result = self.auth_service.logout_all(7)
+        
+        self.assertEqual(result["sessions_removed"], 2)
+        self.assertIsNone(self.cache.get(f"auth_session:{first}"))
+        self.assertEqual(self.cache.hash_get_all("user_session_index:7"), {})
+    
+    def test_login_writes_session_and_index_together(self):
+        with mock.patch.object(self.cache, "set_with_hash", wraps=self.cache.set_with_hash) as write, \
+                mock.patch.object(self.cache, "set", wraps=self.cache.set) as single_set:
+            session_id = self.auth_service._create_cached_session({"id": 7, "username": "alice"})
+        
+        write.assert_called_once()
+        single_set.assert_called_once()  # inside set_with_hash, not a call of its own
+        self.assertIsNotNone(self.cache.get(f"auth_session:{session_id}"))
+        self.assertEqual(list(self.cache.hash_get_all("user_session_index:7")), [session_id])
+    
+    def test_expired_sessions_pruned_from_index(self):
+        stale = time.time() - AuthService.SESSION_TTL - 1
+        self.cache.hash_set("user_session_index:7", {"gone": repr(stale)})
+        
+        session_id = self.auth_service._create_cached_session({"id": 7, "username": "alice"})
+        self.assertEqual(list(self.cache.hash_get_all("user_session_index:7")), [session_id])
+    
+    def test_logout_removes_index_field(self):
+        first = self.auth_service._create_cached_session({"id": 7, "username": "alice"})
+        second = self.auth_service._create_cached_session({"id": 7, "username": "alice"})
+        
+        self.assertTrue(self.auth_service.logout(first)["success"])
+        self.assertEqual(list(self.cache.hash_get_all("user_session_index:7")), [second])
+        self.assertTrue(self.auth_service.logout("unknown")["success"])
+        self.assertEqual(self.auth_service.logout_all(7)["sessions_removed"], 1)
+    
+    def test_concurrent_logins_are_all_indexed(self):
+        threads = [threading.Thread(target=self.auth_service._create_cached_session,
+                                    args=({"id": 7, "username": "alice"},)) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        self.assertEqual(len(self.cache.hash_get_all("user_session_index:7")), 20)
+        self.assertEqual(self.auth_service.logout_all(7)["sessions_removed"], 20)
+    
+    def test_removes_sessions_of_legacy_index(self):
+        session_ids = ["s1", "s2", "s3"]
+        self.cache.set_many({f"auth_session:{sid}": "{}" for sid in session_ids})
+        self.cache.set("auth_session:other_user", "{}")
+        self.cache.set("user_sessions:7", json.dumps(session_ids))
+        
+        result = self.auth_service.logout_all(7)
+        
+        self.assertEqual(result["sessions_removed"], 3)
+        self.assertIsNone(self.cache.get("auth_session:s1"))
+        self.assertIsNone(self.cache.get("user_sessions:7"))
+        self.assertEqual(self.cache.get("auth_session:other_user"), "{}")
+    
+    def test_no_sessions(self):
+        result = self.auth_service.logout_all(42)
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["sessions_removed"], 0)
+    
+    def test_works_with_mock_cache(self):
+        cache = MockCacheAdapter()
+        cache.set("auth_session:s1", "{}")
+        cache.set("user_sessions:1", json.dumps(["s1", "expired"]))
+        
+        result = AuthService(db=None, cache=cache).logout_all(1)
+        
+        self.assertEqual(result["sessions_removed"], 1)
+
+
+
+class TestQueriesPerCall(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = SQLiteAdapter(os.path.join(self.tmp, "app.sqlite3"), read_init_sql())
+        self.service = AuthService(self.db, MemoryAdapter(), hasher=InlinePasswordHasher(rounds=4))
+    
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp)
+    
+    def test_register_has_no_existence_check(self):
+        with mock.patch.object(self.db, "fetch_one", wraps=self.db.fetch_one) as fetch_one:
+            result = self.service.register("alice", "pw", full_name="Alice", address_id=1)
+        
+        self.assertTrue(result["success"])
+        fetch_one.assert_not_called()
+    
+    def test_taken_username(self):
+        self.service.register("alice", "pw")
+        
+        result = self.service.register("alice", "other")
+        self.assertEqual(result, {"success": False, "error": "Username already exists"})
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM auth_user")["n"], 1)
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM user_profile")["n"], 1)
+    
+    def test_login_is_one_query(self):
+        self.service.register("alice", "pw", full_name="Alice", address_id=1, address_detail="12 Main St")
+        self.service.register("bob", "pw")
+        self.db.execute("DELETE FROM user_profile WHERE full_name IS NULL")  # bob: no profile row
+        
+        with mock.patch.object(self.db, "fetch_one", wraps=self.db.fetch_one) as fetch_one:
+            alice = self.service.login("alice", "pw")
+            bob = self.service.login("bob", "pw")
+            wrong = self.service.login("alice", "nope")
+        
+        self.assertEqual(fetch_one.call_count, 3)
+        self.assertFalse(wrong["success"])
+        self.assertEqual(alice["user"]["full_name"], "Alice")
+        self.assertEqual(alice["user"]["address"], {"country": "Vietnam", "province": "Ha Noi",
+                                                    "district": "Ba Dinh", "detail": "12 Main St"})
+        self.assertEqual(alice["user"], {"id": alice["user"]["id"], "username": "alice",
+                                         **self.service._get_user_profile(alice["user"]["id"])})
+        self.assertEqual(bob["user"]["address"], None)
+        self.assertIsNone(bob["user"]["full_name"])
+
+
+
+class TestProfileCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = SQLiteAdapter(os.path.join(self.tmp, "app.sqlite3"), read_init_sql())
+        self.cache = MemoryAdapter()
+        self.service = AuthService(self.db, self.cache, hasher=InlinePasswordHasher(rounds=4))
+        self.user_id = self.service.register("alice", "pw", full_name="Alice", address_id=1)["user_id"]
+    
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmp)
+    
+    def queries(self):
+        return mock.patch.object(self.db, "fetch_one", wraps=self.db.fetch_one)
+    
+    def test_second_read_is_served_from_cache(self):
+        with self.queries() as fetch_one:
+            first = self.service.get_profile(self.user_id)
+            second = self.service.get_profile(self.user_id)
+        
+        self.assertEqual(fetch_one.call_count, 2)  # user row + profile row, once
+        self.assertEqual(first, second)
+        self.assertEqual(second["address"]["district"], "Ba Dinh")
+        self.assertIsNotNone(self.cache.get(profile_key(self.user_id)))
+        stats = self.service.get_profile_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_ratio"]), (1, 1, 0.5))
+    
+    def test_not_found_is_cached_until_registered(self):
+        next_id = self.user_id + 1
+        with self.queries() as fetch_one:
+            self.assertIsNone(self.service.get_profile(next_id))
+            self.assertIsNone(self.service.get_profile(next_id))
+        self.assertEqual(fetch_one.call_count, 1)
+        self.assertEqual(self.service.get_profile_cache_stats()["missing_hits"], 1)
+        
+        self.assertEqual(self.service.register("bob", "pw")["user_id"], next_id)
+        self.assertEqual(self.service.get_profile(next_id)["username"], "bob")
+    
+    def test_update_writes_through(self):
+        self.service.get_profile(self.user_id)
+        
+        result = self.service.update_profile(self.user_id, {"email": "a@x.io", "address_id": 4,
+                                                            "username": "ignored"})
+        self.assertTrue(result["success"])
+        with self.queries() as fetch_one:
+            profile = self.service.get_profile(self.user_id)
+        fetch_one.assert_not_called()
+        self.assertEqual((profile["full_name"], profile["email"]), ("Alice", "a@x.io"))
+        self.assertEqual(profile["address"]["district"], "Hai Chau")
+        self.assertEqual(self.service.get_profile_cache_stats()["writes"], 1)
+        self.assertFalse(self.service.update_profile(self.user_id, {"username": "x"})["success"])
+    
+    def test_address_change_drops_profiles_living_there(self):
+        self.service.get_profile(self.user_id)
+        self.db.execute("UPDATE master_address SET district = %s WHERE id = %s", ("Ba Dinh 2", 1))
+        
+        self.assertEqual(self.service.invalidate_address_profiles([1, 2]), 1)
+        self.assertEqual(self.service.get_profile(self.user_id)["address"]["district"], "Ba Dinh 2")
+    
+    def test_address_reload_drops_profiles_in_one_query(self):
+        addresses = AddressService(self.db, on_change=self.service.invalidate_address_profiles)
+        addresses.refresh_index(force=True)
+        self.service.get_profile(self.user_id)
+        self.db.execute("UPDATE master_address SET district = %s WHERE id IN (%s, %s)", ("Renamed", 1, 2))
+        
+        with mock.patch.object(self.db, "fetch_all", wraps=self.db.fetch_all) as fetch_all:
+            addresses.invalidate()
+        fetch_all.assert_called_once()
+        self.assertIn("IN (%s, %s)", fetch_all.call_args[0][0])
+        self.assertEqual(self.service.get_profile(self.user_id)["address"]["district"], "Renamed")
+    
+    def test_disabled(self):
+        service = AuthService(self.db, self.cache, profile_cache_ttl=0)
+        with self.queries() as fetch_one:
+            service.get_profile(self.user_id)
+            service.get_profile(self.user_id)
+        self.assertEqual(fetch_one.call_count, 4)
+        self.assertIsNone(self.cache.get(profile_key(self.user_id)))
+    
+    def test_profile_routes(self):
+        app = Flask(__name__)
+        app.register_blueprint(auth_bp)
+        init_auth_middleware(self.cache, FlaskAdapter())
+        init_auth_routes(self.service, FlaskAdapter())
+        client = app.test_client()
+        client.set_cookie('session_id', self.service.login("alice", "pw")["session_id"])
+        
+        response = client.put('/profile', json={"full_name": "Alice B"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.get('/profile').get_json()["profile"]["full_name"], "Alice B")
+        self.assertEqual(client.put('/profile', json={}).status_code, 400)
+
+
+class TestPoolTimeout(unittest.TestCase):
+    def setUp(self):
+        self.db = mock.Mock()
+        self.db.transaction.side_effect = PoolTimeout("pool 'primary' exhausted")
+        self.db.execute.side_effect = PoolTimeout("pool 'primary' exhausted")
+        self.service = AuthService(self.db, MockCacheAdapter(), hasher=InlinePasswordHasher(rounds=4))
+    
+    def test_propagates_instead_of_failing_the_request(self):
+        with self.assertRaises(PoolTimeout):
+            self.service.register("alice", "pw")
+        with self.assertRaises(PoolTimeout):
+            self.service.update_profile(1, {"full_name": "Alice"})
+    
+    def test_other_errors_still_reported(self):
+        self.db.execute.side_effect = RuntimeError("boom")
+        
+        self.assertEqual(self.service.update_profile(1, {"full_name": "Alice"}),
+                         {"success": False, "error": "Update failed: boom"})
+
+
+class TestSharedHelpers(unittest.TestCase):
+    """Decision logic shared by AuthService and AsyncAuthService"""
+    
+    def test_profile_update_only_known_fields(self):
+        self.assertIsNone(profile_update(1, {"username": "x"}))
+        sql, params = profile_update(7, {"email": "a@b", "full_name": "A", "username": "x"})
+        self.assertEqual(sql, "UPDATE user_profile SET full_name = %s, email = %s WHERE user_id = %s")
+        self.assertEqual(params, ("A", "a@b", 7))
+    
+    def test_merge_session_index(self):
+        self.assertEqual(merge_session_index({}, None), ([], 0))
+        self.assertEqual(merge_session_index({"a": "1", "b": "2"}, json.dumps(["b", "c"])),
+                         (["a", "b", "c"], 2))
+        self.assertEqual(merge_session_index({}, "not json"), ([], 0))
+    
+    def test_profile_cache_round_trip(self):
+        self.assertEqual(read_cached_profile(None), ("misses", None))
+        value, ttl = profile_cache_entry(None, 300, 30)
+        self.assertEqual((read_cached_profile(value), ttl), (("missing_hits", None), 30))
+        value, ttl = profile_cache_entry({"id": 1}, 300, 30)
+        self.assertEqual((read_cached_profile(value), ttl), (("hits", {"id": 1}), 300))
+    
+    def test_rehash_tracker(self):
+        tracker = RehashTracker()
+        self.assertTrue(tracker.start(1))
+        self.assertFalse(tracker.start(1))
+        self.assertTrue(tracker.start(2))
+        self.assertEqual(tracker.stats()["rehash_pending"], 2)
+        tracker.finish(1)
+        tracker.finish(2, HasherBusy("no capacity"))
+        with self.assertLogs("core.services.auth_service", "ERROR"):
+            self.assertTrue(tracker.start(1))
+            tracker.finish(1, RuntimeError("db down"))
+        self.assertEqual(tracker.stats(), {"rehash_pending": 0, "rehashed": 1, "busy": 1, "failed": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
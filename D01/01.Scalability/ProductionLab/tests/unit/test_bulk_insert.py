@@ -0,0 +1,257 @@
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+from mysql.connector import errors
+from prometheus_client import CollectorRegistry
+from core.interfaces.database_port import BulkWriteError, DatabasePort, DuplicateKeyError
+from core.services.address_service import AddressService, SQL_INSERT_ADDRESS
+from infrastructure.database.bulk import multi_row_query, split_values
+from infrastructure.database.mysql_adapter import MySQLAdapter
+from tests.unit.mocks import MockCacheAdapter
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+        self.lastrowid = None
+    
+    def execute(self, query, params=()):
+        if self.conn.fail_on is not None and len(self.conn.statements) == self.conn.fail_on:
+            raise RuntimeError("duplicate entry")
+        rows = len(params) // 3 if params else 1
+        self.conn.statements.append((query, list(params)))
+        self.lastrowid = self.conn.next_id
+        self.conn.next_id += rows
+        self.rowcount = rows
+    
+    def executemany(self, query, seq):
+        for params in seq:
+            self.conn.statements.append((query, list(params)))
+        self.rowcount = len(seq)
+    
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, fail_on=None):
+        self.statements = []
+        self.events = []
+        self.next_id = 1
+        self.fail_on = fail_on
+    
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+    
+    def start_transaction(self):
+        self.events.append("begin")
+    
+    def commit(self):
+        self.events.append("commit")
+    
+    def rollback(self):
+        self.events.append("rollback")
+    
+    def is_connected(self):
+        return True
+    
+    def close(self):
+        pass
+
+
+class TestMultiRowQuery(unittest.TestCase):
+    def test_repeats_values_group(self):
+        self.assertEqual(multi_row_query(SQL_INSERT_ADDRESS, 3),
+                         "INSERT INTO master_address (country, province, district) "
+                         "VALUES (%s, %s, %s), (%s, %s, %s), (%s, %s, %s)")
+    
+    def test_keeps_nested_calls_and_tail(self):
+        query = "INSERT INTO t (a, b) values (%s, NOW()) ON DUPLICATE KEY UPDATE b = VALUES(b)"
+        head, group, tail = split_values(query)
+        self.assertEqual(group, "(%s, NOW())")
+        self.assertEqual(tail, " ON DUPLICATE KEY UPDATE b = VALUES(b)")
+        self.assertTrue(multi_row_query(query, 2).endswith("(%s, NOW()), (%s, NOW()) ON DUPLICATE KEY UPDATE b = VALUES(b)"))
+    
+    def test_rejects_non_insert(self):
+        with self.assertRaises(ValueError):
+            multi_row_query("UPDATE t SET a = %s", 2)
+
+
+class TestMySQLBulk(unittest.TestCase):
+    def make_db(self, conn):
+        patcher = mock.patch("mysql.connector.connect", return_value=conn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return MySQLAdapter("h", 3306, "u", "p", "d", registry=CollectorRegistry())
+    
+    def rows(self, n):
+        return [("Vietnam", f"P{i}", f"D{i}") for i in range(n)]
+    
+    def test_insert_many_chunks_in_one_transaction(self):
+        conn = FakeConnection()
+        db = self.make_db(conn)
+        
+        result = db.insert_many(SQL_INSERT_ADDRESS, self.rows(2500), chunk_size=1000)
+        
+        self.assertEqual((result.rowcount, result.first_id, result.chunks), (2500, 1, 3))
+        self.assertEqual([len(params) // 3 for _, params in conn.statements], [1000, 1000, 500])
+        self.assertEqual(conn.events, ["begin", "commit"])
+    
+    def test_atomic_failure_rolls_back_everything(self):
+        conn = FakeConnection(fail_on=1)
+        db = self.make_db(conn)
+        
+        with self.assertRaises(BulkWriteError) as caught:
+            db.insert_many(SQL_INSERT_ADDRESS, self.rows(30), chunk_size=10)
+        self.assertEqual(caught.exception.committed.rowcount, 0)
+        self.assertEqual(conn.events, ["begin", "rollback"])
+    
+    def test_transaction_per_chunk_keeps_committed_chunks(self):
+        conn = FakeConnection(fail_on=2)
+        db = self.make_db(conn)
+        
+        with self.assertRaises(BulkWriteError) as caught:
+            db.insert_many(SQL_INSERT_ADDRESS, self.rows(30), chunk_size=10, transaction_per_chunk=True)
+        self.assertEqual(caught.exception.committed.rowcount, 20)
+        self.assertEqual(caught.exception.committed.first_id, 1)
+        self.assertEqual(conn.events, ["begin", "commit", "begin", "commit", "begin", "rollback"])
+    
+    def test_execute_many_counts_rows(self):
+        conn = FakeConnection()
+        db = self.make_db(conn)
+        
+        affected = db.execute_many("UPDATE user_profile SET email = %s WHERE user_id = %s",
+                                   [("a@x", 1), ("b@x", 2), ("c@x", 3)], chunk_size=2)
+        self.assertEqual(affected, 3)
+        self.assertEqual(len(conn.statements), 3)
+    
+    def test_transaction_context_insert_many(self):
+        conn = FakeConnection()
+        db = self.make_db(conn)
+        
+        with db.transaction() as tx:
+            result = tx.insert_many(SQL_INSERT_ADDRESS, self.rows(5), chunk_size=2)
+        self.assertEqual((result.rowcount, result.chunks), (5, 3))
+        self.assertEqual(conn.events, ["begin", "commit"])
+    
+    def test_duplicate_entry_is_duplicate_key_error(self):
+        conn = FakeConnection()
+        db = self.make_db(conn)
+        duplicate = errors.IntegrityError(msg="Duplicate entry 'alice' for key 'username'", errno=1062)
+        foreign_key = errors.IntegrityError(msg="Cannot add or update a child row", errno=1452)
+        
+        with mock.patch.object(FakeCursor, "execute", side_effect=duplicate):
+            with self.assertRaises(DuplicateKeyError):
+                with db.transaction() as tx:
+                    tx.insert("INSERT INTO auth_user (username, password_hash) VALUES (%s, %s)", ("alice", "h"))
+            with self.assertRaises(DuplicateKeyError):
+                db.insert("INSERT INTO auth_user (username, password_hash) VALUES (%s, %s)", ("alice", "h"))
+        with mock.patch.object(FakeCursor, "execute", side_effect=foreign_key):
+            with self.assertRaises(errors.IntegrityError) as caught:
+                db.execute("UPDATE user_profile SET address_id = %s", (999,))
+            self.assertNotIsInstance(caught.exception, DuplicateKeyError)
+        self.assertEqual(conn.events, ["begin", "rollback"])
+    
+    def test_empty_rows(self):
+        db = self.make_db(FakeConnection())
+        self.assertEqual(db.insert_many(SQL_INSERT_ADDRESS, []).rowcount, 0)
+
+
+class ListDatabase(DatabasePort):
+    """Port defaults only: rows land in `committed` when a transaction commits"""
+    
+    def __init__(self, fail_on_row=None):
+        self.fail_on_row = fail_on_row
+        self.committed = []
+        self.events = []
+    
+    @contextmanager
+    def transaction(self):
+        staged = []
+        tx = mock.Mock()
+        
+        def insert(query, params):
+            if params == self.fail_on_row:
+                raise RuntimeError("constraint failed")
+            staged.append(params)
+            return len(self.committed) + len(staged)
+        
+        tx.insert.side_effect = insert
+        tx.execute.side_effect = insert
+        self.events.append("begin")
+        try:
+            yield tx
+        except Exception:
+            self.events.append("rollback")
+            raise
+        self.committed.extend(staged)
+        self.events.append("commit")
+    
+    def execute(self, query, params=None):
+        raise AssertionError("bulk defaults must not autocommit row by row")
+    
+    insert = execute
+    
+    def fetch_one(self, query, params=None, read_only=False):
+        return None
+    
+    def fetch_all(self, query, params=None, read_only=False):
+        return []
+    
+    def ping(self):
+        return True
+
+
+class TestDefaultBulk(unittest.TestCase):
+    rows = [(f"c{i}", "p", "d") for i in range(5)]
+    
+    def test_all_rows_in_one_transaction(self):
+        db = ListDatabase()
+        result = db.insert_many(SQL_INSERT_ADDRESS, self.rows, chunk_size=2)
+        
+        self.assertEqual((result.rowcount, result.first_id), (5, 1))
+        self.assertEqual(db.events, ["begin", "commit"])
+    
+    def test_failure_commits_nothing(self):
+        db = ListDatabase(fail_on_row=self.rows[3])
+        
+        with self.assertRaises(BulkWriteError) as caught:
+            db.insert_many(SQL_INSERT_ADDRESS, self.rows, chunk_size=2)
+        self.assertEqual((caught.exception.committed.rowcount, db.committed), (0, []))
+        self.assertEqual(db.events, ["begin", "rollback"])
+    
+    def test_transaction_per_chunk_keeps_committed_chunks(self):
+        db = ListDatabase(fail_on_row=self.rows[3])
+        
+        with self.assertRaises(BulkWriteError) as caught:
+            db.execute_many("UPDATE ...", self.rows, chunk_size=2, transaction_per_chunk=True)
+        self.assertEqual(caught.exception.committed.rowcount, 2)
+        self.assertEqual(db.committed, self.rows[:2])
+        self.assertEqual(db.events, ["begin", "commit", "begin", "rollback"])
+    
+    def test_adapters_must_implement_transaction(self):
+        # The bulk defaults depend on it: an adapter without one fails at construction
+        class NoTransactions(ListDatabase):
+            transaction = DatabasePort.transaction
+        
+        with self.assertRaises(TypeError):
+            NoTransactions()
+
+
+class TestImportAddresses(unittest.TestCase):
+    def test_import_invalidates_cached_lists(self):
+        db = mock.Mock()
+        db.fetch_all.return_value = [{"country": "Vietnam", "province": "Ha Noi"}]
+        cache = MockCacheAdapter()
+        cache.set("address:countries", "[]")
+        
+        AddressService(db, cache).import_addresses([("Vietnam", "Ha Noi", "Ba Dinh")])
+        
+        db.insert_many.assert_called_once_with(SQL_INSERT_ADDRESS, [("Vietnam", "Ha Noi", "Ba Dinh")],
+                                               chunk_size=1000)
+        self.assertIsNone(cache.get("address:countries"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import threading
+import time
+import unittest
+from prometheus_client import CollectorRegistry
+from infrastructure.database.connection_pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.alive = True
+        self.pings = 0
+    
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+        self.registry = CollectorRegistry()
+    
+    def factory(self):
+        conn = FakeConnection(len(self.created))
+        self.created.append(conn)
+        return conn
+    
+    def validate(self, conn):
+        conn.pings += 1
+        return conn.alive
+    
+    def make_pool(self, **options):
+        options.setdefault("size", 2)
+        options.setdefault("max_overflow", 1)
+        options.setdefault("timeout", 0.2)
+        return ConnectionPool(self.factory, validate=self.validate, registry=self.registry, **options)
+    
+    def test_connections_are_reused(self):
+        pool = self.make_pool()
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(len(self.created), 1)
+    
+    def test_overflow_then_timeout(self):
+        pool = self.make_pool()
+        with pool.connection(), pool.connection(), pool.connection():
+            self.assertEqual(pool.stats()["in_use"], 3)
+            start = time.monotonic()
+            with self.assertRaises(PoolTimeout):
+                with pool.connection(timeout=0.05):
+                    pass
+            self.assertGreaterEqual(time.monotonic() - start, 0.05)
+        stats = pool.stats()
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["overflow"], 1)
+        # The overflow connection is closed on return, the base size kept
+        self.assertEqual(stats["idle"], 2)
+        self.assertEqual(sum(conn.closed for conn in self.created), 1)
+    
+    def test_waiter_gets_released_connection(self):
+        pool = self.make_pool(size=1, max_overflow=0, timeout=2)
+        borrowed = []
+        with pool.connection() as held:
+            waiter = threading.Thread(target=lambda: borrowed.append(pool.connection().__enter__()))
+            waiter.start()
+            time.sleep(0.05)
+            self.assertEqual(pool.stats()["waiters"], 1)
+        waiter.join()
+        self.assertIs(borrowed[0], held)
+    
+    def test_max_lifetime_recycles(self):
+        pool = self.make_pool(max_lifetime=0.05)
+        with pool.connection() as first:
+            pass
+        time.sleep(0.06)
+        with pool.connection() as second:
+            pass
+        self.assertIsNot(first, second)
+        self.assertTrue(first.closed)
+    
+    def test_idle_timeout_closes_unused(self):
+        pool = self.make_pool(idle_timeout=0.05)
+        with pool.connection(), pool.connection():
+            pass
+        time.sleep(0.06)
+        with pool.connection():
+            pass
+        self.assertEqual(pool.stats()["idle_closed"], 2)
+        self.assertEqual(pool.stats()["open"], 1)
+    
+    def test_validates_only_after_idle(self):
+        pool = self.make_pool(validate_after=0.05)
+        with pool.connection() as conn:
+            pass
+        with pool.connection():
+            pass
+        self.assertEqual(conn.pings, 0)
+        
+        time.sleep(0.06)
+        conn.alive = False
+        with pool.connection() as replacement:
+            pass
+        self.assertEqual(conn.pings, 1)
+        self.assertIsNot(replacement, conn)
+        self.assertEqual(pool.stats()["invalidated"], 1)
+    
+    def test_disconnect_error_discards_connection(self):
+        pool = ConnectionPool(self.factory, size=1, registry=self.registry,
+                              is_disconnect=lambda e: isinstance(e, ConnectionError))
+        with self.assertRaises(ValueError):
+            with pool.connection():
+                raise ValueError("query error")
+        self.assertEqual(pool.stats()["idle"], 1)
+        with self.assertRaises(ConnectionError):
+            with pool.connection():
+                raise ConnectionError("gone away")
+        self.assertEqual(pool.stats()["idle"], 0)
+        self.assertTrue(self.created[0].closed)
+    
+    def test_factory_failure_frees_slot(self):
+        def broken():
+            raise ConnectionError("refused")
+        pool = ConnectionPool(broken, size=1, max_overflow=0, registry=self.registry)
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                with pool.connection():
+                    pass
+        self.assertEqual(pool.stats()["open"], 0)
+    
+    def test_prometheus_metrics(self):
+        pool = self.make_pool()
+        pool.name = "primary"
+        with pool.connection():
+            labels = {"pool": "primary", "state": "in_use"}
+            self.assertEqual(self.registry.get_sample_value("db_pool_connections", labels), 1)
+        self.assertEqual(self.registry.get_sample_value(
+            "db_pool_connections", {"pool": "primary", "state": "idle"}), 1)
+        self.assertEqual(self.registry.get_sample_value("db_pool_waiters", {"pool": "primary"}), 0)
+        self.assertEqual(self.registry.get_sample_value(
+            "db_pool_borrow_wait_seconds_count", {"pool": "primary"}), 1)
+        self.assertEqual(self.registry.get_sample_value(
+            "db_pool_events_total", {"pool": "primary", "event": "created"}), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
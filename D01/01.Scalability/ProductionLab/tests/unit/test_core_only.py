@@ -43,5 +43,49 @@ class TestCoreLogic(unittest.TestCase):
         
         self.assertEqual(health.status, "unhealthy")
 
+
+class TestHashSessions(unittest.TestCase):
+    def setUp(self):
+        self.cache = MemoryAdapter()
+        self.app_service = AppService(self.cache, hash_sessions=True)
+        self.web = MockWebAdapter()
+    
+    def test_visits_counted_in_place(self):
+        self.app_service.handle_request(self.web)
+        self.app_service.handle_request(self.web)
+        result = self.app_service.handle_request(self.web)
+        
+        self.assertEqual(result["visits"], 3)
+        fields = self.cache.hash_get_all(f"session_hash:{self.web._session_id}")
+        self.assertEqual(fields["visits"], "3")
+        self.assertIn("created_at", fields)
+    
+    def test_blob_session_migrated(self):
+        AppService(self.cache).handle_request(self.web)
+        AppService(self.cache).handle_request(self.web)
+        
+        result = self.app_service.handle_request(self.web)
+        
+        self.assertEqual(result["visits"], 3)
+        self.assertIsNone(self.cache.get(f"session:{self.web._session_id}"))
+        self.assertEqual(self.app_service.handle_request(self.web)["visits"], 4)
+    
+    def test_concurrent_requests_do_not_lose_visits(self):
+        import threading
+        self.app_service.handle_request(self.web)
+        
+        def hit():
+            for _ in range(50):
+                self.app_service.handle_request(self.web)
+        
+        threads = [threading.Thread(target=hit) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        self.assertEqual(self.app_service.handle_request(self.web)["visits"], 202)
+
+
 if __name__ == '__main__':
     unittest.main()
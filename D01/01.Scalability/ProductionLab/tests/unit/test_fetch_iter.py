@@ -0,0 +1,114 @@
+import json
+import unittest
+from unittest import mock
+from flask import Flask
+from prometheus_client import CollectorRegistry
+from core.services.address_service import AddressService
+from infrastructure.database.mysql_adapter import MySQLAdapter
+from infrastructure.web.routes.address import address_bp, init_address_routes
+from tests.unit.mocks import MockWebAdapter
+
+ROWS = [(i, "Vietnam", f"P{i % 3}", f"D{i}") for i in range(1, 26)]
+COLUMNS = ("id", "country", "province", "district")
+
+
+class StreamingCursor:
+    """Unbuffered cursor stand-in: hands out rows only through fetchmany"""
+    
+    def __init__(self, conn, dictionary):
+        self.conn = conn
+        self.dictionary = dictionary
+        self.position = 0
+    
+    def execute(self, query, params=()):
+        self.conn.queries.append(query)
+    
+    def fetchmany(self, size):
+        batch = ROWS[self.position:self.position + size]
+        self.position += len(batch)
+        self.conn.batches.append(len(batch))
+        return [dict(zip(COLUMNS, row)) for row in batch] if self.dictionary else list(batch)
+    
+    def close(self):
+        pass
+
+
+class StreamingConnection:
+    def __init__(self):
+        self.queries = []
+        self.batches = []
+        self.closed = False
+        self.cursor_options = None
+    
+    def cursor(self, buffered=False, dictionary=False):
+        self.cursor_options = {"buffered": buffered, "dictionary": dictionary}
+        return StreamingCursor(self, dictionary)
+    
+    def is_connected(self):
+        return True
+    
+    def close(self):
+        self.closed = True
+
+
+class TestMySQLFetchIter(unittest.TestCase):
+    def setUp(self):
+        self.conn = StreamingConnection()
+        patcher = mock.patch("mysql.connector.connect", return_value=self.conn)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.db = MySQLAdapter("h", 3306, "u", "p", "d", registry=CollectorRegistry())
+    
+    def test_streams_in_batches(self):
+        rows = self.db.fetch_iter("SELECT ...", batch_size=10)
+        self.assertEqual(self.conn.queries, [])  # nothing runs until iterated
+        
+        first = next(rows)
+        self.assertEqual(first["district"], "D1")
+        self.assertEqual(self.db.pool.stats()["in_use"], 1)
+        self.assertEqual(len(list(rows)), 24)
+        
+        self.assertEqual(self.conn.batches, [10, 10, 5, 0])
+        self.assertEqual(self.conn.cursor_options, {"buffered": False, "dictionary": True})
+        stats = self.db.pool.stats()
+        self.assertEqual((stats["in_use"], stats["idle"]), (0, 1))
+    
+    def test_tuples(self):
+        rows = list(self.db.fetch_iter("SELECT ...", as_tuples=True))
+        self.assertEqual(rows, ROWS)
+        self.assertFalse(self.conn.cursor_options["dictionary"])
+    
+    def test_abandoned_stream_discards_connection(self):
+        rows = self.db.fetch_iter("SELECT ...", batch_size=5)
+        next(rows)
+        rows.close()
+        
+        stats = self.db.pool.stats()
+        self.assertEqual((stats["open"], stats["in_use"]), (0, 0))
+        self.assertTrue(self.conn.closed)
+
+
+class TestAddressExport(unittest.TestCase):
+    def setUp(self):
+        db = mock.Mock()
+        db.fetch_iter.side_effect = lambda *args, **kwargs: iter(ROWS)
+        self.db = db
+        app = Flask(__name__)
+        app.register_blueprint(address_bp)
+        init_address_routes(AddressService(db), MockWebAdapter())
+        self.client = app.test_client()
+    
+    def test_ndjson_stream(self):
+        response = self.client.get('/addresses/export?batch_size=500')
+        
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = response.data.decode().splitlines()
+        self.assertEqual(len(lines), 25)
+        self.assertEqual(json.loads(lines[0]),
+                         {"id": 1, "country": "Vietnam", "province": "P1", "district": "D1"})
+        _, kwargs = self.db.fetch_iter.call_args
+        self.assertEqual(kwargs, {"batch_size": 500, "as_tuples": True, "read_only": True})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import threading
+import unittest
+from prometheus_client import CollectorRegistry
+from infrastructure.cache.instrumented_cache import InstrumentedCache
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.cache.redis_adapter import RedisAdapter
+from tests.unit.mocks import MockCacheAdapter
+
+
+class TestInstrumentedCache(unittest.TestCase):
+    def setUp(self):
+        self.registry = CollectorRegistry()
+        self.cache = InstrumentedCache(MemoryAdapter(), registry=self.registry)
+    
+    def count(self, prefix, op, result, registry=None):
+        return (registry or self.registry).get_sample_value(
+            'cache_requests_total', {'prefix': prefix, 'op': op, 'result': result}
+        ) or 0
+    
+    def test_hits_and_misses_per_prefix(self):
+        self.cache.set("session:1", "a")
+        self.cache.get("session:1")
+        self.cache.get("session:2")
+        self.cache.get("auth_session:x")
+        
+        self.assertEqual(self.count("session:", "get", "hit"), 1)
+        self.assertEqual(self.count("session:", "get", "miss"), 1)
+        self.assertEqual(self.count("auth_session:", "get", "miss"), 1)
+        self.assertEqual(self.registry.get_sample_value(
+            'cache_latency_seconds_count', {'prefix': 'session:', 'op': 'get'}), 2)
+    
+    def test_errors_are_not_misses(self):
+        registry = CollectorRegistry()
+        cache = InstrumentedCache(MockCacheAdapter(should_fail=True), registry=registry)
+        
+        self.assertIsNone(cache.get("session:1"))
+        
+        self.assertEqual(self.count("session:", "get", "error", registry), 1)
+        self.assertEqual(self.count("session:", "get", "miss", registry), 0)
+    
+    def test_redis_outage_counted_as_error(self):
+        redis_cache = RedisAdapter(port=1, socket_connect_timeout=0.2, raise_on_error=True)
+        registry = CollectorRegistry()
+        cache = InstrumentedCache(redis_cache, registry=registry)
+        
+        self.assertIsNone(cache.get("auth_session:x"))
+        self.assertFalse(cache.ping())
+        
+        self.assertEqual(self.count("auth_session:", "get", "error", registry), 1)
+        self.assertEqual(redis_cache.stats()["errors"], 2)
+    
+    def test_batch_counts_each_key(self):
+        self.cache.set_many({"session:1": "a", "auth_session:1": "b"})
+        self.cache.get_many(["session:1", "session:2"])
+        
+        self.assertEqual(self.count("mixed", "set_many", "ok"), 1)
+        self.assertEqual(self.count("session:", "get_many", "hit"), 1)
+        self.assertEqual(self.count("session:", "get_many", "miss"), 1)
+    
+    def test_prefix_cardinality_is_bounded(self):
+        registry = CollectorRegistry()
+        cache = InstrumentedCache(MemoryAdapter(), registry=registry, max_prefixes=2)
+        for i in range(5):
+            cache.get(f"p{i}:key")
+        
+        self.assertEqual(self.count("other", "get", "miss", registry), 3)
+    
+    def test_prefix_bound_holds_under_threads(self):
+        cache = InstrumentedCache(MemoryAdapter(), registry=None, max_prefixes=4)
+        
+        def worker(n):
+            for i in range(200):
+                cache.get(f"t{n}p{i}:key")
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(1 for prefix in cache._prefixes.values() if prefix != "other"), 4)
+    
+    def test_caches_sharing_a_registry_are_summed(self):
+        other = InstrumentedCache(MemoryAdapter(), registry=self.registry)
+        self.cache.get("session:1")
+        other.get("session:2")
+        
+        self.assertEqual(self.count("session:", "get", "miss"), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import time
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+from flask import Flask
+from prometheus_client import CollectorRegistry
+from core.interfaces.database_port import DatabasePort
+from core.services.address_service import SQL_DISTRICTS
+from infrastructure.database.instrumented_database import (
+    InstrumentedDatabase, fingerprint, query_id, param_shapes
+)
+from infrastructure.web.routes.debug import debug_bp, init_debug_routes
+from infrastructure.web.flask_adapter import FlaskAdapter
+
+
+class SlowDB(DatabasePort):
+    """Sleeps `delay` per call; EXPLAIN returns a fake plan"""
+    
+    def __init__(self):
+        self.delay = 0.0
+        self.fail = False
+        self.explained = []
+    
+    def _call(self):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("deadlock")
+    
+    def execute(self, query, params=None):
+        self._call()
+    
+    def fetch_one(self, query, params=None, read_only=False):
+        self._call()
+        return {"id": 1}
+    
+    def fetch_all(self, query, params=None, read_only=False):
+        if query.startswith("EXPLAIN"):
+            self.explained.append((query, params))
+            return [{"type": "ref", "key": "idx_country_province"}]
+        self._call()
+        return [{"id": 1}, {"id": 2}]
+    
+    def insert(self, query, params=None):
+        self._call()
+        return 7
+    
+    @contextmanager
+    def transaction(self):
+        yield self
+    
+    def ping(self):
+        return True
+
+
+class TestFingerprint(unittest.TestCase):
+    def test_normalizes_values_and_whitespace(self):
+        self.assertEqual(fingerprint(SQL_DISTRICTS),
+                         "SELECT id, district FROM master_address WHERE country = ? AND province = ? ORDER BY district")
+        self.assertEqual(fingerprint("SELECT * FROM t WHERE a = 'it''s' AND b IN (1, 2, 3) LIMIT 10"),
+                         "SELECT * FROM t WHERE a = ? AND b IN (?+) LIMIT ?")
+    
+    def test_multi_row_insert_collapses(self):
+        self.assertEqual(fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)"),
+                         fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)"))
+    
+    def test_param_shapes_hide_values(self):
+        self.assertEqual(param_shapes(("Vietnam", 3, None, b"\x00\x01")),
+                         ["str(7)", "int", "NoneType", "bytes(2)"])
+
+
+class TestInstrumentedDatabase(unittest.TestCase):
+    def setUp(self):
+        self.inner = SlowDB()
+        self.registry = CollectorRegistry()
+        self.db = InstrumentedDatabase(self.inner, slow_threshold=0.02, registry=self.registry)
+    
+    def report_for(self, op):
+        return next(q for q in self.db.query_report()["queries"] if q["op"] == op)
+    
+    def test_counts_and_percentiles_per_fingerprint(self):
+        for country in ("VN", "US", "JP"):
+            self.db.fetch_all(SQL_DISTRICTS, (country, "X"))
+        
+        entry = self.report_for("fetch_all")
+        self.assertEqual(entry["count"], 3)
+        self.assertEqual(entry["fingerprint"], fingerprint(SQL_DISTRICTS))
+        self.assertEqual(entry["query_id"], query_id(fingerprint(SQL_DISTRICTS)))
+        self.assertLessEqual(entry["p50_ms"], entry["p99_ms"])
+        self.assertEqual(entry["slow"], 0)
+    
+    def test_slow_query_logged_with_shapes(self):
+        self.inner.delay = 0.03
+        with self.assertLogs("slow_query", level="WARNING") as logs:
+            self.db.fetch_one("SELECT * FROM auth_user WHERE username = %s", ("secret-name",))
+        
+        self.assertNotIn("secret-name", logs.output[0])
+        slow = self.db.query_report()["slow_queries"]
+        self.assertEqual(len(slow), 1)
+        self.assertEqual(slow[0]["params"], ["str(11)"])
+        self.assertGreaterEqual(slow[0]["duration_ms"], 30)
+        self.assertEqual(self.report_for("fetch_one")["slow"], 1)
+    
+    def test_explain_captured_once_for_slow_select(self):
+        db = InstrumentedDatabase(self.inner, slow_threshold=0.0, explain=True, registry=None)
+        with self.assertLogs("slow_query"):
+            db.fetch_all(SQL_DISTRICTS, ("VN", "HN"))
+            db.fetch_all(SQL_DISTRICTS, ("VN", "HCM"))
+            db.insert("INSERT INTO t (a) VALUES (%s)", (1,))
+        
+        deadline = time.time() + 2
+        while time.time() < deadline and not self.inner.explained:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        self.assertEqual(len(self.inner.explained), 1)
+        self.assertEqual(self.inner.explained[0], (f"EXPLAIN {SQL_DISTRICTS}", ("VN", "HN")))
+        plan = next(q for q in db.query_report()["queries"] if q["op"] == "fetch_all")["explain"]
+        self.assertEqual(plan[0]["key"], "idx_country_province")
+    
+    def test_errors_counted_and_raised(self):
+        self.inner.fail = True
+        with self.assertRaises(RuntimeError):
+            self.db.execute("UPDATE t SET a = 1")
+        self.assertEqual(self.report_for("execute")["errors"], 1)
+    
+    def test_transaction_statements_timed(self):
+        with self.db.transaction() as tx:
+            tx.insert("INSERT INTO auth_user (username) VALUES (%s)", ("a",))
+        self.assertEqual(self.report_for("tx_insert")["count"], 1)
+    
+    def test_fetch_iter_timed_until_exhausted(self):
+        rows = list(self.db.fetch_iter("SELECT id FROM t"))
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(self.report_for("fetch_iter")["count"], 1)
+    
+    def test_unbounded_query_texts_fold_into_other(self):
+        db = InstrumentedDatabase(self.inner, max_fingerprints=2, registry=None)
+        for table in ("a", "b", "c", "d"):
+            db.fetch_one(f"SELECT * FROM {table}")
+        ids = {q["query_id"] for q in db.query_report()["queries"]}
+        self.assertEqual(len(ids), 3)
+        self.assertIn("other", ids)
+    
+    def test_prometheus_metrics(self):
+        self.db.fetch_all(SQL_DISTRICTS, ("VN", "HN"))
+        qid = query_id(fingerprint(SQL_DISTRICTS))
+        self.assertEqual(self.registry.get_sample_value(
+            "db_queries_total", {"query_id": qid, "op": "fetch_all", "result": "ok"}), 1)
+        self.assertEqual(self.registry.get_sample_value(
+            "db_query_duration_seconds_count", {"query_id": qid, "op": "fetch_all"}), 1)
+        self.assertEqual(self.registry.get_sample_value(
+            "db_slow_queries_total", {"query_id": qid, "op": "fetch_all"}), 0)
+    
+    def test_databases_sharing_a_registry_are_summed(self):
+        other = InstrumentedDatabase(self.inner, registry=self.registry)
+        self.db.fetch_all(SQL_DISTRICTS, ("VN", "HN"))
+        other.fetch_all(SQL_DISTRICTS, ("VN", "HCM"))
+        qid = query_id(fingerprint(SQL_DISTRICTS))
+        self.assertEqual(self.registry.get_sample_value(
+            "db_queries_total", {"query_id": qid, "op": "fetch_all", "result": "ok"}), 2)
+    
+    def test_extras_pass_through(self):
+        self.inner.pool_stats = mock.Mock(return_value={"in_use": 0})
+        self.assertEqual(self.db.pool_stats(), {"in_use": 0})
+
+
+class TestDebugRoute(unittest.TestCase):
+    def setUp(self):
+        app = Flask(__name__)
+        app.register_blueprint(debug_bp)
+        self.client = app.test_client()
+    
+    def test_report(self):
+        db = InstrumentedDatabase(SlowDB(), registry=None)
+        db.fetch_all(SQL_DISTRICTS, ("VN", "HN"))
+        init_debug_routes(db, FlaskAdapter())
+        
+        response = self.client.get('/debug/queries?limit=5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["queries"][0]["count"], 1)
+        self.assertEqual(self.client.get('/debug/queries?limit=x').status_code, 400)
+    
+    def test_disabled(self):
+        init_debug_routes(None, FlaskAdapter())
+        self.assertEqual(self.client.get('/debug/queries').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,11 @@
+import random
 import unittest
+import threading
 import time
 from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.cache.eviction import LRUPolicy, TinyLFUPolicy, create_eviction_policy
+from infrastructure.cache.timing_wheel import TimingWheel
+from infrastructure.cache.sharded_memory_adapter import ShardedMemoryAdapter
 
 class TestMemoryAdapter(unittest.TestCase):
     def setUp(self):
@@ -37,5 +42,344 @@ class TestMemoryAdapter(unittest.TestCase):
     def test_ping(self):
         self.assertTrue(self.adapter.ping())
 
+class TestBatchOperations(unittest.TestCase):
+    def _check_adapter(self, adapter):
+        self.assertTrue(adapter.set_many({"a": "1", "b": "2", "c": "3"}, ttl=60))
+        self.assertEqual(adapter.get_many(["c", "a", "missing"]),
+                         {"c": "3", "a": "1", "missing": None})
+        self.assertEqual(adapter.delete_many(["a", "b", "missing"]), 2)
+        self.assertEqual(adapter.get_many(["a", "b", "c"]), {"a": None, "b": None, "c": "3"})
+    
+    def test_memory_adapter(self):
+        self._check_adapter(MemoryAdapter())
+    
+    def test_sharded_memory_adapter(self):
+        self._check_adapter(ShardedMemoryAdapter(shards=4))
+    
+    def test_empty_batches(self):
+        adapter = MemoryAdapter()
+        self.assertEqual(adapter.get_many([]), {})
+        self.assertTrue(adapter.set_many({}))
+        self.assertEqual(adapter.delete_many([]), 0)
+
+
+class TestMemoryAdapterBudget(unittest.TestCase):
+    def test_max_entries_evicts_lru(self):
+        adapter = MemoryAdapter(max_entries=2)
+        adapter.set("a", "1")
+        adapter.set("b", "2")
+        adapter.get("a")  # "b" becomes least recently used
+        adapter.set("c", "3")
+        
+        self.assertIsNone(adapter.get("b"))
+        self.assertEqual(adapter.get("a"), "1")
+        self.assertEqual(adapter.get("c"), "3")
+        self.assertEqual(adapter.stats()["evictions"], 1)
+    
+    def test_max_bytes_budget(self):
+        adapter = MemoryAdapter(max_bytes=2000)
+        for i in range(100):
+            adapter.set(f"key{i}", "x" * 50)
+        
+        stats = adapter.stats()
+        self.assertLessEqual(stats["bytes"], 2000)
+        self.assertGreater(stats["evictions"], 0)
+        self.assertEqual(adapter.get("key99"), "x" * 50)
+    
+    def test_oversized_value_rejected(self):
+        adapter = MemoryAdapter(max_bytes=200)
+        self.assertFalse(adapter.set("big", "x" * 1000))
+        self.assertEqual(adapter.stats()["rejections"], 1)
+    
+    def test_overwrite_keeps_byte_count(self):
+        adapter = MemoryAdapter()
+        adapter.set("k", "x" * 10)
+        adapter.set("k", "x" * 10)
+        adapter.delete("k")
+        self.assertEqual(adapter.stats()["bytes"], 0)
+    
+    def test_stats_counters(self):
+        adapter = MemoryAdapter()
+        adapter.set("k", "v", ttl=1)
+        adapter.get("k")
+        adapter.get("missing")
+        
+        stats = adapter.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.5)
+    
+    def test_expiration_counted(self):
+        adapter = MemoryAdapter()
+        adapter.set("k", "v", ttl=1)
+        adapter._store["k"] = ("v", time.time() - 1, adapter._store["k"][2])
+        
+        self.assertIsNone(adapter.get("k"))
+        self.assertEqual(adapter.stats()["expirations"], 1)
+
+
+class TestEvictionPolicies(unittest.TestCase):
+    def test_create_by_name(self):
+        self.assertIsInstance(create_eviction_policy("lru"), LRUPolicy)
+        self.assertIsInstance(create_eviction_policy("TinyLFU"), TinyLFUPolicy)
+        with self.assertRaises(ValueError):
+            create_eviction_policy("fifo")
+    
+    def test_tinylfu_keeps_hot_keys_under_scan(self):
+        adapter = MemoryAdapter(max_entries=100, policy="tinylfu")
+        hot = [f"hot{i}" for i in range(50)]
+        for _ in range(5):
+            for key in hot:
+                if adapter.get(key) is None:
+                    adapter.set(key, "v")
+        
+        # One-hit-wonder scan much larger than the cache
+        for i in range(1000):
+            adapter.set(f"scan{i}", "v")
+        
+        survivors = sum(1 for key in hot if adapter.get(key) is not None)
+        self.assertGreaterEqual(survivors, 45)
+    
+    def test_lru_flushed_by_scan(self):
+        adapter = MemoryAdapter(max_entries=100, policy="lru")
+        for i in range(50):
+            adapter.set(f"hot{i}", "v")
+        for i in range(1000):
+            adapter.set(f"scan{i}", "v")
+        
+        self.assertIsNone(adapter.get("hot0"))
+
+
+class TestTimingWheel(unittest.TestCase):
+    def test_fires_after_expiry(self):
+        wheel = TimingWheel(now=1000)
+        wheel.schedule("a", 1005)
+        
+        self.assertEqual(wheel.advance(1004), [])
+        self.assertEqual(wheel.advance(1005), ["a"])
+        self.assertEqual(len(wheel), 0)
+    
+    def test_cascades_from_coarse_levels(self):
+        wheel = TimingWheel(now=0)
+        wheel.schedule("hour", 3600)
+        wheel.schedule("day", 86400)
+        
+        self.assertEqual(wheel.advance(3599), [])
+        self.assertEqual(wheel.advance(3600), ["hour"])
+        self.assertEqual(wheel.advance(86399), [])
+        self.assertEqual(wheel.advance(86400), ["day"])
+    
+    def test_reschedule_and_cancel(self):
+        wheel = TimingWheel(now=0)
+        wheel.schedule("a", 10)
+        wheel.schedule("a", 100)
+        wheel.schedule("b", 10)
+        wheel.cancel("b")
+        
+        self.assertEqual(wheel.advance(50), [])
+        self.assertEqual(wheel.advance(100), ["a"])
+    
+    def test_max_ticks_bounds_work(self):
+        wheel = TimingWheel(now=0)
+        wheel.schedule("a", 5)
+        wheel.schedule("b", 7)
+        
+        self.assertEqual(wheel.advance(10, max_ticks=1), ["a"])
+        self.assertEqual(wheel.advance(10), ["b"])
+    
+    def test_idle_gap_is_skipped(self):
+        wheel = TimingWheel(now=0)
+        wheel.schedule("a", 60 * 86400)
+        steps = []
+        cascade = wheel._cascade
+        wheel._cascade = lambda due: (steps.append(wheel.current_tick), cascade(due))
+        
+        self.assertEqual(wheel.advance(30 * 86400), [])
+        self.assertEqual(wheel.advance(60 * 86400), ["a"])
+        self.assertLess(len(steps), 20)
+    
+    def test_skipping_matches_tick_by_tick(self):
+        rng = random.Random(7)
+        wheel = TimingWheel(now=0)
+        expiries = {f"k{i}": rng.randrange(1, 400000) for i in range(300)}
+        for key, expiry in expiries.items():
+            wheel.schedule(key, expiry)
+        
+        fired, before, now = {}, {}, 0
+        while now < 400000:
+            previous, now = now, now + rng.choice((1, 63, 4096, 50000))
+            for key in wheel.advance(now):
+                fired[key], before[key] = now, previous
+        # Each key fires on the first advance that reaches its expiry
+        for key, expiry in expiries.items():
+            self.assertTrue(before[key] < expiry <= fired[key], key)
+
+
+class TestProactiveExpiry(unittest.TestCase):
+    def test_unread_keys_reclaimed_on_write(self):
+        adapter = MemoryAdapter()
+        now = time.time()
+        for i in range(10):
+            adapter.set(f"session:{i}", "v", ttl=5)
+        adapter.set("keep", "v", ttl=3600)
+        
+        reclaimed = adapter.expire_tick(now + 10)
+        
+        self.assertEqual(reclaimed, 10)
+        stats = adapter.stats()
+        self.assertEqual(stats["entries"], 1)
+        self.assertEqual(stats["expirations"], 10)
+        self.assertEqual(stats["last_tick_reclaimed"], 10)
+    
+    def test_rewritten_key_not_reclaimed_early(self):
+        adapter = MemoryAdapter()
+        now = time.time()
+        adapter.set("k", "v", ttl=5)
+        adapter.set("k", "v2", ttl=3600)
+        
+        self.assertEqual(adapter.expire_tick(now + 10), 0)
+        self.assertEqual(adapter.get("k"), "v2")
+    
+    def test_expire_batch_limits_tick(self):
+        adapter = MemoryAdapter(expire_batch=3)
+        now = time.time()
+        for i in range(5):
+            adapter.set(f"k{i}", "v", ttl=1)
+        
+        self.assertEqual(adapter.expire_tick(now + 5), 3)
+        self.assertEqual(adapter.expire_tick(now + 5), 2)
+
+
+class TestShardedMemoryAdapter(unittest.TestCase):
+    def setUp(self):
+        self.adapter = ShardedMemoryAdapter(shards=4, max_entries=400)
+    
+    def test_basic_operations(self):
+        self.assertTrue(self.adapter.set("k", "v", ttl=60))
+        self.assertEqual(self.adapter.get("k"), "v")
+        self.assertTrue(self.adapter.exists("k"))
+        self.assertTrue(self.adapter.delete("k"))
+        self.assertIsNone(self.adapter.get("k"))
+    
+    def test_budget_split_across_shards(self):
+        for i in range(1000):
+            self.adapter.set(f"key{i}", "v")
+        
+        stats = self.adapter.stats()
+        self.assertEqual(stats["max_entries"], 400)
+        self.assertLessEqual(stats["entries"], 400)
+        self.assertTrue(all(n <= 100 for n in stats["entries_per_shard"]))
+    
+    def test_budget_remainder_spread_over_shards(self):
+        adapter = ShardedMemoryAdapter(shards=4, max_entries=10, max_bytes=4097)
+        
+        self.assertEqual([shard.max_entries for shard in adapter._shards], [3, 3, 2, 2])
+        self.assertEqual(sum(shard.max_bytes for shard in adapter._shards), 4097)
+    
+    def test_budget_smaller_than_shards_rejected(self):
+        with self.assertRaises(ValueError):
+            ShardedMemoryAdapter(shards=16, max_entries=10)
+        with self.assertRaises(ValueError):
+            ShardedMemoryAdapter(shards=16, max_bytes=8)
+    
+    def test_expire_tick_covers_all_shards(self):
+        for i in range(20):
+            self.adapter.set(f"key{i}", "v", ttl=1)
+        
+        self.assertEqual(self.adapter.expire_tick(time.time() + 5), 20)
+        self.assertEqual(self.adapter.stats()["entries"], 0)
+    
+    def test_concurrent_writers_and_deleters(self):
+        errors = []
+        
+        def worker(n):
+            try:
+                for i in range(2000):
+                    key = f"key{i % 50}"
+                    self.adapter.set(key, str(n), ttl=60)
+                    self.adapter.get(key)
+                    self.adapter.delete(key)
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        self.assertEqual(errors, [])
+        stats = self.adapter.stats()
+        self.assertGreaterEqual(stats["bytes"], 0)
+        self.assertEqual(stats["entries"], sum(stats["entries_per_shard"]))
+    
+    def test_background_expirer(self):
+        self.adapter.set("short", "v", ttl=1)
+        self.adapter.set("long", "v", ttl=60)
+        self.adapter.start_expirer(interval=0.05)
+        try:
+            self.adapter.start_expirer(interval=0.05)  # idempotent
+            deadline = time.time() + 3
+            while self.adapter.stats()["expirations"] == 0 and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            self.adapter.stop_expirer()
+        
+        # Reclaimed by the thread: no read touched the key
+        stats = self.adapter.stats()
+        self.assertEqual((stats["expirations"], stats["entries"]), (1, 1))
+        self.assertIsNone(self.adapter.get("short"))
+        self.assertEqual(self.adapter.get("long"), "v")
+
+
+
+class TestMemoryHashOps(unittest.TestCase):
+    def test_incr_keeps_expiry_until_refresh_due(self):
+        cache = MemoryAdapter()
+        cache.hash_set("h", {"visits": 1, "created_at": 5}, ttl=100)
+        expiry = cache._store["h"][1]
+        
+        self.assertEqual(cache.hash_incr("h", "visits", ttl=100, refresh_below=50), 2)
+        self.assertEqual(cache._store["h"][1], expiry)
+        self.assertEqual(cache.hash_get_all("h"), {"visits": "2", "created_at": "5"})
+    
+    def test_incr_refreshes_when_little_ttl_left(self):
+        cache = MemoryAdapter()
+        cache.hash_set("h", {"visits": 1}, ttl=10)
+        
+        cache.hash_incr("h", "visits", ttl=100, refresh_below=50)
+        
+        self.assertGreater(cache._store["h"][1] - time.time(), 90)
+    
+    def test_prune_and_delete_fields_keep_expiry(self):
+        cache = MemoryAdapter()
+        cache.hash_set("h", {"old": 10, "label": "x"}, ttl=100)
+        expiry = cache._store["h"][1]
+        
+        cache.hash_set("h", {"new": 30}, prune_below=20)
+        self.assertEqual(cache.hash_get_all("h"), {"label": "x", "new": "30"})
+        self.assertEqual(cache.hash_delete("h", ["new", "missing"]), 1)
+        self.assertEqual(cache._store["h"][1], expiry)
+        self.assertEqual(cache.hash_delete("h", ["label"]), 1)
+        self.assertFalse(cache.exists("h"))
+    
+    def test_set_with_hash(self):
+        cache = MemoryAdapter()
+        cache.hash_set("index", {"a": 1})
+        
+        self.assertTrue(cache.set_with_hash("record", "v", "index", {"b": 5}, ttl=100, prune_below=2))
+        self.assertEqual((cache.get("record"), cache.hash_get_all("index")), ("v", {"b": "5"}))
+        self.assertGreater(cache._store["index"][1] - time.time(), 90)
+    
+    def test_sharded_forwards_hash_ops(self):
+        cache = ShardedMemoryAdapter(shards=4)
+        
+        self.assertEqual(cache.hash_incr("h", "n", 5), 5)
+        self.assertEqual(cache.hash_get_all("h"), {"n": "5"})
+        cache.hash_set("h", {"m": 9}, prune_below=6)
+        self.assertEqual(cache.hash_delete("h", ["m"]), 1)
+        self.assertEqual(cache.hash_get_all("h"), {})
+
+
 if __name__ == '__main__':
     unittest.main()
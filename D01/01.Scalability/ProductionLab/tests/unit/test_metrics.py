@@ -0,0 +1,30 @@
+import unittest
+from prometheus_client import CollectorRegistry
+from infrastructure.metrics import collector_for, cumulative_buckets
+
+
+class _Collector:
+    def collect(self):
+        return []
+
+
+class _OtherCollector(_Collector):
+    pass
+
+
+class TestMetricsHelpers(unittest.TestCase):
+    def test_one_collector_per_registry_and_factory(self):
+        first, second = CollectorRegistry(), CollectorRegistry()
+        
+        collector = collector_for(first, _Collector)
+        self.assertIs(collector_for(first, _Collector), collector)
+        self.assertIsNot(collector_for(second, _Collector), collector)
+        self.assertIsNot(collector_for(first, _OtherCollector), collector)
+    
+    def test_cumulative_buckets_end_with_inf(self):
+        self.assertEqual(cumulative_buckets((0.1, 1.0), [2, 0, 3]),
+                         [("0.1", 2), ("1.0", 2), ("+Inf", 5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
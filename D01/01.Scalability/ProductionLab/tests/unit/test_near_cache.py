@@ -0,0 +1,155 @@
+import unittest
+import time
+from unittest import mock
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.cache.near_cache_adapter import NearCacheAdapter
+from infrastructure.cache.invalidation_bus import LocalInvalidationBus, RedisInvalidationBus
+from infrastructure.cache.redis_adapter import RedisAdapter
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class CountingCache(MemoryAdapter):
+    """Shared backing cache that counts backing reads"""
+    def __init__(self):
+        super().__init__()
+        self.reads = 0
+    
+    def get(self, key):
+        self.reads += 1
+        return super().get(key)
+
+
+class TestNearCacheAdapter(unittest.TestCase):
+    def setUp(self):
+        self.backing = CountingCache()
+        hub = LocalInvalidationBus()
+        self.worker1 = NearCacheAdapter(self.backing, bus=hub.connect(), local_ttl=5)
+        self.worker2 = NearCacheAdapter(self.backing, bus=hub.connect(), local_ttl=5)
+    
+    def test_repeated_reads_served_locally(self):
+        self.backing.set("auth_session:abc", "data")
+        for _ in range(10):
+            self.assertEqual(self.worker1.get("auth_session:abc"), "data")
+        
+        self.assertEqual(self.backing.reads, 1)
+        self.assertEqual(self.worker1.stats()["local_hits"], 9)
+    
+    def test_delete_invalidates_other_workers(self):
+        self.worker1.set("auth_session:abc", "data", ttl=3600)
+        self.assertEqual(self.worker2.get("auth_session:abc"), "data")
+        
+        # Logout handled by worker 1
+        self.worker1.delete("auth_session:abc")
+        
+        self.assertIsNone(self.worker2.get("auth_session:abc"))
+        self.assertEqual(self.worker2.stats()["invalidations_received"], 2)
+    
+    def test_set_invalidates_other_workers(self):
+        self.worker1.set("k", "v1")
+        self.assertEqual(self.worker2.get("k"), "v1")
+        
+        self.worker1.set("k", "v2")
+        
+        self.assertEqual(self.worker2.get("k"), "v2")
+    
+    def test_local_ttl_bounds_staleness_without_bus(self):
+        near = NearCacheAdapter(self.backing, bus=None, local_ttl=1)
+        self.backing.set("k", "v1")
+        self.assertEqual(near.get("k"), "v1")
+        
+        self.backing.set("k", "v2")  # change behind the near cache's back
+        self.assertEqual(near.get("k"), "v1")
+        time.sleep(1.1)
+        self.assertEqual(near.get("k"), "v2")
+    
+    def test_local_prefixes(self):
+        near = NearCacheAdapter(self.backing, local_prefixes=("auth_session:",))
+        self.backing.set("session:1", "v")
+        near.get("session:1")
+        near.get("session:1")
+        
+        self.assertEqual(self.backing.reads, 2)
+    
+    def test_get_many_mixes_local_and_backing(self):
+        self.backing.set_many({"a": "1", "b": "2"})
+        self.worker1.get("a")
+        
+        result = self.worker1.get_many(["a", "b", "c"])
+        
+        self.assertEqual(result, {"a": "1", "b": "2", "c": None})
+    
+    def test_bus_failure_disables_local_cache(self):
+        self.backing.set("k", "v")
+        self.worker1.get("k")
+        
+        self.worker1._on_invalidation(None)
+        self.worker1.get("k")
+        
+        self.assertEqual(self.backing.reads, 2)
+        self.assertFalse(self.worker1.stats()["bus_healthy"])
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis not installed")
+class TestNearCacheWithRedisBus(unittest.TestCase):
+    def setUp(self):
+        server = fakeredis.FakeServer()
+        self.clients = [fakeredis.FakeRedis(server=server, decode_responses=True) for _ in range(3)]
+        self.redis = RedisAdapter()
+        self.redis.client = self.clients[0]
+        self.worker1 = NearCacheAdapter(self.redis, bus=RedisInvalidationBus(self.clients[1]))
+        self.worker2 = NearCacheAdapter(self.redis, bus=RedisInvalidationBus(self.clients[2]))
+    
+    def tearDown(self):
+        self.worker1.close()
+        self.worker2.close()
+    
+    def test_logout_propagates_via_pubsub(self):
+        self.worker1.set("auth_session:abc", '{"user_id": 1}', ttl=3600)
+        self.assertIsNotNone(self.worker2.get("auth_session:abc"))
+        received = self.worker2.stats()["invalidations_received"]
+        
+        self.worker1.delete("auth_session:abc")
+        
+        deadline = time.time() + 2
+        while self.worker2.stats()["invalidations_received"] == received and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertIsNone(self.worker2.get("auth_session:abc"))
+    
+    def test_resubscribes_after_connection_loss(self):
+        bus = RedisInvalidationBus(self.clients[2], retry_min=0.01)
+        worker = NearCacheAdapter(self.redis, bus=bus)
+        self.addCleanup(worker.close)
+        pubsub, real_pubsub = bus._pubsub, self.clients[2].pubsub
+        attempts = []
+        
+        def flaky_pubsub(**kwargs):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("still down")
+            return real_pubsub(**kwargs)
+        
+        self.clients[2].pubsub = flaky_pubsub
+        pubsub.get_message = mock.Mock(side_effect=ConnectionError("connection reset"))
+        deadline = time.time() + 2
+        while bus.resubscribes == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        
+        self.assertEqual((bus.resubscribes, len(attempts)), (1, 2))
+        self.assertTrue(worker.stats()["bus_healthy"])
+        self.assertEqual(worker.stats()["bus_recoveries"], 1)
+        
+        self.worker1.set("auth_session:abc", "old")
+        worker.get("auth_session:abc")
+        received = worker.stats()["invalidations_received"]
+        self.worker1.delete("auth_session:abc")
+        while worker.stats()["invalidations_received"] == received and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertIsNone(worker.get("auth_session:abc"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,225 @@
+import os
+import signal
+import threading
+import time
+import unittest
+from unittest import mock
+import bcrypt
+from flask import Flask
+from prometheus_client import CollectorRegistry
+from core.interfaces.password_hasher_port import HasherBusy, bcrypt_cost
+from core.services.auth_service import (
+    AuthService, InlinePasswordHasher, SQL_UPDATE_PASSWORD_HASH, calibrate_bcrypt_cost
+)
+from infrastructure.security.process_pool_hasher import ProcessPoolHasher
+from infrastructure.web.flask_adapter import FlaskAdapter
+from infrastructure.web.routes.debug import debug_bp, init_debug_routes
+from tests.unit.mocks import MockCacheAdapter
+
+
+class TestProcessPoolHasher(unittest.TestCase):
+    def setUp(self):
+        self.registry = CollectorRegistry()
+        self.hasher = ProcessPoolHasher(workers=1, max_queue=0, rounds=4, registry=self.registry)
+    
+    def tearDown(self):
+        self.hasher.close()
+    
+    def test_hash_and_verify_in_worker(self):
+        password_hash = self.hasher.hash("s3cret")
+        
+        self.assertTrue(password_hash.startswith("$2b$04$"))
+        self.assertTrue(bcrypt.checkpw(b"s3cret", password_hash.encode()))
+        self.assertTrue(self.hasher.verify("s3cret", password_hash))
+        self.assertFalse(self.hasher.verify("wrong", password_hash))
+        self.assertEqual(self.hasher.stats()["completed"], {"hash": 1, "verify": 2})
+        self.assertEqual(self.registry.get_sample_value("password_hash_seconds_count", {"op": "verify"}), 2)
+        self.assertEqual(self.registry.get_sample_value(
+            "password_hash_queue_wait_seconds_count", {"op": "hash"}), 1)
+    
+    def test_rejects_when_workers_and_queue_are_full(self):
+        slow = bcrypt.hashpw(b"x", bcrypt.gensalt(12)).decode()
+        self.hasher.start()
+        busy = threading.Thread(target=self.hasher.verify, args=("x", slow))
+        busy.start()
+        time.sleep(0.05)
+        
+        started = time.perf_counter()
+        with self.assertRaises(HasherBusy):
+            self.hasher.hash("other")
+        self.assertLess(time.perf_counter() - started, 0.05)  # rejected, not queued
+        busy.join()
+        
+        self.assertEqual(self.hasher.stats()["rejected"], {"hash:queue_full": 1})
+        self.assertEqual(self.registry.get_sample_value(
+            "password_hash_rejected_total", {"op": "hash", "reason": "queue_full"}), 1)
+        self.assertEqual(self.registry.get_sample_value("password_hash_pending"), 0)
+        self.hasher.hash("after")  # the slot was released
+    
+    def test_cost_gauge_follows_rounds(self):
+        self.assertEqual(self.registry.get_sample_value("password_hash_cost"), 4)
+        self.hasher.rounds = 5
+        
+        self.assertEqual(self.registry.get_sample_value("password_hash_cost"), 5)
+        self.assertTrue(self.hasher.hash("pw").startswith("$2b$05$"))
+    
+    def test_hashers_sharing_a_registry_are_summed(self):
+        other = ProcessPoolHasher(workers=1, max_queue=0, rounds=4, registry=self.registry)
+        try:
+            self.hasher.hash("a")
+            other.hash("b")
+            self.assertEqual(self.registry.get_sample_value("password_hash_seconds_count", {"op": "hash"}), 2)
+        finally:
+            other.close()
+    
+    def test_queue_holds_extra_calls(self):
+        hasher = ProcessPoolHasher(workers=1, max_queue=3, rounds=4, registry=None)
+        results, errors = [], []
+        
+        def call():
+            try:
+                results.append(hasher.hash("pw"))
+            except HasherBusy as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        hasher.close()
+        
+        self.assertEqual((len(results), len(errors)), (4, 0))
+    
+    def test_recovers_after_worker_dies(self):
+        self.hasher.start()
+        for pid in list(self.hasher._executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        time.sleep(0.2)
+        
+        with self.assertRaises(HasherBusy):
+            self.hasher.hash("pw")
+        self.assertTrue(self.hasher.verify("pw", self.hasher.hash("pw")))
+
+
+class BusyHasher:
+    def hash(self, password):
+        raise HasherBusy("busy")
+    
+    def verify(self, password, password_hash):
+        raise HasherBusy("busy")
+
+
+class TestAuthServiceHasher(unittest.TestCase):
+    def test_busy_hasher_propagates(self):
+        db = mock.Mock()
+        db.fetch_one.return_value = {"id": 1, "username": "a", "password_hash": "$2b$"}
+        service = AuthService(db, MockCacheAdapter(), hasher=BusyHasher())
+        
+        with self.assertRaises(HasherBusy):
+            service.register("a", "pw")
+        with self.assertRaises(HasherBusy):
+            service.login("a", "pw")
+        db.transaction.assert_not_called()
+
+
+
+class TestBcryptCost(unittest.TestCase):
+    def test_cost_from_hash(self):
+        self.assertEqual(bcrypt_cost(bcrypt.hashpw(b"pw", bcrypt.gensalt(5)).decode()), 5)
+        self.assertIsNone(bcrypt_cost("not-a-hash"))
+    
+    def test_needs_rehash(self):
+        hasher = InlinePasswordHasher(rounds=5)
+        
+        self.assertFalse(hasher.needs_rehash(hasher.hash("pw")))
+        self.assertTrue(hasher.needs_rehash(bcrypt.hashpw(b"pw", bcrypt.gensalt(4)).decode()))
+    
+    def test_calibration_stays_within_bounds(self):
+        fast = calibrate_bcrypt_cost(0.0001, min_cost=4, max_cost=6)  # unreachable target
+        self.assertEqual(fast["cost"], 4)
+        
+        slow = calibrate_bcrypt_cost(60, min_cost=4, max_cost=6)
+        self.assertEqual(slow["cost"], 6)
+        self.assertGreater(slow["hash_seconds"], 0)
+
+
+class TestRehashOnLogin(unittest.TestCase):
+    def setUp(self):
+        self.old_hash = bcrypt.hashpw(b"pw", bcrypt.gensalt(4)).decode()
+        self.db = mock.Mock()
+        self.db.fetch_one.return_value = {"id": 7, "username": "a", "password_hash": self.old_hash}
+    
+    def login(self, service, times=1):
+        for _ in range(times):
+            self.assertTrue(service.login("a", "pw")["success"])
+        if service._rehash_executor is not None:
+            service._rehash_executor.shutdown(wait=True)
+    
+    def test_rehashes_with_current_cost(self):
+        service = AuthService(self.db, MockCacheAdapter(), hasher=InlinePasswordHasher(rounds=5))
+        self.login(service)
+        
+        query, (new_hash, user_id, old_hash) = self.db.execute.call_args[0]
+        self.assertEqual(query, SQL_UPDATE_PASSWORD_HASH)
+        self.assertEqual((user_id, old_hash), (7, self.old_hash))
+        self.assertEqual(bcrypt_cost(new_hash), 5)
+        self.assertTrue(bcrypt.checkpw(b"pw", new_hash.encode()))
+        self.assertEqual(service.get_hashing_stats()["rehashed"], 1)
+    
+    def test_current_cost_is_left_alone(self):
+        service = AuthService(self.db, MockCacheAdapter(), hasher=InlinePasswordHasher(rounds=4))
+        self.login(service)
+        
+        self.db.execute.assert_not_called()
+        self.assertIsNone(service._rehash_executor)
+    
+    def test_disabled(self):
+        service = AuthService(self.db, MockCacheAdapter(), hasher=InlinePasswordHasher(rounds=5),
+                              rehash_on_login=False)
+        self.login(service)
+        
+        self.db.execute.assert_not_called()
+    
+    def test_one_rehash_per_user_at_a_time(self):
+        hasher = InlinePasswordHasher(rounds=5)
+        release = threading.Event()
+        real_hash = hasher.hash
+        hasher.hash = lambda password: release.wait(5) and real_hash(password)
+        service = AuthService(self.db, MockCacheAdapter(), hasher=hasher)
+        for _ in range(3):
+            service.login("a", "pw")
+        
+        self.assertEqual(service.get_hashing_stats()["rehash_pending"], 1)
+        release.set()
+        self.login(service, times=0)
+        self.assertEqual(self.db.execute.call_count, 1)
+    
+    def test_busy_pool_is_counted_not_raised(self):
+        hasher = InlinePasswordHasher(rounds=5)
+        hasher.hash = mock.Mock(side_effect=HasherBusy("busy"))
+        service = AuthService(self.db, MockCacheAdapter(), hasher=hasher)
+        self.login(service)
+        
+        stats = service.get_hashing_stats()
+        self.assertEqual((stats["busy"], stats["rehashed"], stats["rehash_pending"]), (1, 0, 0))
+        self.db.execute.assert_not_called()
+
+    
+    def test_debug_route(self):
+        hasher = ProcessPoolHasher(workers=1, max_queue=0, rounds=5, registry=None)
+        service = AuthService(self.db, MockCacheAdapter(), hasher=hasher,
+                              hash_calibration={"cost": 5, "hash_seconds": 0.002})
+        app = Flask(__name__)
+        app.register_blueprint(debug_bp)
+        init_debug_routes(None, FlaskAdapter(), service, hasher)
+        
+        report = app.test_client().get('/debug/hashing').get_json()
+        self.assertEqual((report["cost"], report["calibration"]["cost"]), (5, 5))
+        self.assertEqual(report["pool"]["rounds"], 5)
+        init_debug_routes(None, FlaskAdapter())
+        self.assertEqual(app.test_client().get('/debug/hashing').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+import random
+import time
+import unittest
+from contextlib import contextmanager
+from unittest import mock
+from flask import Flask
+from core.interfaces.database_port import DatabasePort
+from infrastructure.database.read_write_split import ReadWriteSplitAdapter, begin_scope, end_scope
+from infrastructure.web.middleware.read_your_writes import init_read_your_writes, PIN_COOKIE
+
+
+class StandInDB(DatabasePort):
+    """Answers every read with its own name and records what it served"""
+    
+    def __init__(self, name, lag=0.0):
+        self.name = name
+        self.lag = lag
+        self.fail = False
+        self.calls = []
+    
+    def _call(self, op):
+        if self.fail:
+            raise ConnectionError(f"{self.name} down")
+        self.calls.append(op)
+        return {"served_by": self.name}
+    
+    def execute(self, query, params=None):
+        self._call("execute")
+    
+    def fetch_one(self, query, params=None, read_only=False):
+        return self._call("fetch_one")
+    
+    def fetch_all(self, query, params=None, read_only=False):
+        return [self._call("fetch_all")]
+    
+    def insert(self, query, params=None):
+        self._call("insert")
+        return 1
+    
+    @contextmanager
+    def transaction(self):
+        self._call("transaction")
+        yield self
+    
+    def ping(self):
+        return not self.fail
+    
+    def replication_lag(self):
+        if self.fail:
+            raise ConnectionError(f"{self.name} down")
+        return self.lag
+
+
+class TestReadWriteSplit(unittest.TestCase):
+    def setUp(self):
+        self.primary = StandInDB("primary")
+        self.replica = StandInDB("replica", lag=0.1)
+        self.db = ReadWriteSplitAdapter(self.primary, {"r1": self.replica}, max_lag=2.0, pin_window=0.2)
+        self.db.check_replicas()
+    
+    def served_by(self, **kwargs):
+        return self.db.fetch_one("SELECT 1", **kwargs)["served_by"]
+    
+    def test_read_only_goes_to_replica_writes_to_primary(self):
+        self.assertEqual(self.served_by(read_only=True), "replica")
+        self.assertEqual(self.served_by(), "primary")
+        self.db.insert("INSERT ...")
+        self.db.execute("UPDATE ...")
+        with self.db.transaction():
+            pass
+        self.assertEqual(self.replica.calls, ["fetch_one"])
+        self.assertEqual(self.primary.calls, ["fetch_one", "insert", "execute", "transaction"])
+    
+    def test_lagging_or_stopped_replica_is_skipped(self):
+        self.replica.lag = 5.0
+        self.db.check_replicas()
+        self.assertEqual(self.served_by(read_only=True), "primary")
+        self.assertIn("lag", self.db.stats()["replicas"]["r1"]["skipped_reason"])
+        
+        self.replica.lag = None
+        self.db.check_replicas()
+        self.assertEqual(self.served_by(read_only=True), "primary")
+        
+        self.replica.lag = 0.5
+        self.db.check_replicas()
+        self.assertEqual(self.served_by(read_only=True), "replica")
+    
+    def test_failing_replica_falls_back_to_primary(self):
+        self.replica.fail = True
+        self.assertEqual(self.served_by(read_only=True), "primary")
+        stats = self.db.stats()
+        self.assertFalse(stats["replicas"]["r1"]["healthy"])
+        self.assertEqual(stats["replica_failures"], 1)
+    
+    def test_weighted_by_lag(self):
+        fast, slow = StandInDB("fast", lag=0.0), StandInDB("slow", lag=1.5)
+        db = ReadWriteSplitAdapter(self.primary, {"fast": fast, "slow": slow})
+        db.check_replicas()
+        random.seed(7)
+        for _ in range(1000):
+            db.fetch_all("SELECT 1", read_only=True)
+        # Weights 1/(1+0) vs 1/(1+1.5): ~71% vs ~29%
+        self.assertGreater(len(fast.calls), 2 * len(slow.calls))
+        self.assertGreater(len(slow.calls), 0)
+    
+    def test_read_your_writes_pin(self):
+        token = begin_scope()
+        try:
+            self.assertEqual(self.served_by(read_only=True), "replica")
+            self.db.insert("INSERT ...")
+            self.assertEqual(self.served_by(read_only=True), "primary")
+            time.sleep(0.25)
+            self.assertEqual(self.served_by(read_only=True), "replica")
+        finally:
+            pinned_until = end_scope(token)
+        self.assertIsNotNone(pinned_until)
+        self.assertEqual(self.db.stats()["pinned_reads"], 1)
+    
+    def test_pin_carried_into_next_scope(self):
+        token = begin_scope(pinned_until=time.time() + 60)
+        try:
+            self.assertEqual(self.served_by(read_only=True), "primary")
+        finally:
+            # No write in this scope: nothing new to carry forward
+            self.assertIsNone(end_scope(token))
+
+
+class TestReadYourWritesMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.primary = StandInDB("primary")
+        self.db = ReadWriteSplitAdapter(self.primary, {"r1": StandInDB("replica")}, pin_window=30)
+        app = Flask(__name__)
+        init_read_your_writes(app, pin_window=30)
+        
+        @app.route('/write', methods=['POST'])
+        def write():
+            self.db.insert("INSERT ...")
+            return "ok"
+        
+        @app.route('/read')
+        def read():
+            return self.db.fetch_one("SELECT 1", read_only=True)["served_by"]
+        
+        self.client = app.test_client()
+    
+    def test_cookie_pins_next_request_to_primary(self):
+        self.assertEqual(self.client.get('/read').data, b"replica")
+        response = self.client.post('/write')
+        self.assertIn(PIN_COOKIE, response.headers.get("Set-Cookie", ""))
+        # The test client sends the cookie back
+        self.assertEqual(self.client.get('/read').data, b"primary")
+        
+        other_client = self.client.application.test_client()
+        self.assertEqual(other_client.get('/read').data, b"replica")
+    
+    def test_forged_pin_is_bounded(self):
+        for forged in ("inf", "nan", "-inf"):
+            self.client.set_cookie(PIN_COOKIE, forged)
+            self.assertEqual(self.client.get('/read').data, b"replica")
+        
+        self.client.set_cookie(PIN_COOKIE, repr(time.time() + 10 ** 9))
+        self.assertEqual(self.client.get('/read').data, b"primary")
+        # Cut back to pin_window: over once the adapter's clock passes it
+        later = mock.Mock(time=lambda: time.time() + 31)
+        with mock.patch("infrastructure.database.read_write_split.time", later):
+            self.assertEqual(self.client.get('/read').data, b"replica")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import unittest
+from infrastructure.cache.redis_adapter import RedisAdapter
+from infrastructure.cache.redis_pool import InstrumentedBlockingConnectionPool
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+
+class TestRedisAdapterErrors(unittest.TestCase):
+    def test_unreachable_redis_counts_errors(self):
+        # Nothing listens on port 1: fails fast thanks to the connect timeout
+        adapter = RedisAdapter(port=1, pooled=True, max_connections=2,
+                               socket_connect_timeout=0.2, socket_timeout=0.2)
+        
+        self.assertIsNone(adapter.get("k"))
+        self.assertFalse(adapter.ping())
+        
+        stats = adapter.stats()
+        self.assertEqual(stats["errors"], 2)
+        self.assertIn("ConnectionError", stats["last_error"])
+        self.assertEqual(stats["pool"]["in_use"], 0)
+    
+    def test_raising_view_shares_pool_and_counts(self):
+        adapter = RedisAdapter(port=1, pooled=True, max_connections=2,
+                               socket_connect_timeout=0.2, socket_timeout=0.2)
+        strict = adapter.raising()
+        
+        self.assertIs(strict.pool, adapter.pool)
+        self.assertIs(strict.raising(), strict)
+        with self.assertRaises(Exception):
+            strict.exists("k")
+        self.assertFalse(adapter.exists("k"))
+        self.assertEqual(adapter.stats()["errors"], 2)
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis not installed")
+class TestInstrumentedPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = InstrumentedBlockingConnectionPool(
+            max_connections=1, timeout=0.05,
+            connection_class=getattr(fakeredis, 'FakeRedisConnection', None) or fakeredis.FakeConnection,
+            server=fakeredis.FakeServer()
+        )
+    
+    def test_exhausted_pool_waits_then_times_out(self):
+        conn = self.pool.get_connection("GET")
+        self.assertEqual(self.pool.stats()["in_use"], 1)
+        
+        with self.assertRaises(Exception):
+            self.pool.get_connection("GET")
+        
+        self.pool.release(conn)
+        stats = self.pool.stats()
+        self.assertEqual(stats["waits"], 1)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertEqual(stats["idle"], 1)
+        self.assertEqual(stats["in_use"], 0)
+        self.assertGreater(stats["wait_seconds_total"], 0)
+    
+    def test_adapter_uses_pool(self):
+        adapter = RedisAdapter(pooled=True)
+        adapter.pool = self.pool
+        adapter.client = fakeredis.FakeRedis(connection_pool=self.pool)
+        
+        self.assertTrue(adapter.set("k", "v", ttl=60))
+        self.assertEqual(adapter.stats()["pool"]["checkouts"], 1)
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis not installed")
+class TestRedisHashOps(unittest.TestCase):
+    def setUp(self):
+        self.adapter = RedisAdapter()
+        self.adapter.client = fakeredis.FakeRedis(decode_responses=True)
+        self.adapter._hash_incr = self.adapter.client.register_script(
+            self.adapter._hash_incr.script
+        )
+        self.adapter._hash_set = self.adapter.client.register_script(self.adapter._hash_set.script)
+    
+    def test_incr_creates_field_and_sets_ttl(self):
+        self.assertEqual(self.adapter.hash_incr("h", "visits", ttl=100, refresh_below=50), 1)
+        self.assertEqual(self.adapter.hash_incr("h", "visits", ttl=100, refresh_below=50), 2)
+        
+        self.assertEqual(self.adapter.hash_get_all("h"), {"visits": "2"})
+        self.assertGreater(self.adapter.client.ttl("h"), 90)
+    
+    def test_ttl_refreshed_only_below_threshold(self):
+        self.adapter.hash_set("h", {"visits": 1}, ttl=100)
+        self.adapter.client.expire("h", 70)
+        
+        self.adapter.hash_incr("h", "visits", ttl=100, refresh_below=50)
+        self.assertLessEqual(self.adapter.client.ttl("h"), 70)
+        
+        self.adapter.client.expire("h", 40)
+        self.adapter.hash_incr("h", "visits", ttl=100, refresh_below=50)
+        self.assertGreater(self.adapter.client.ttl("h"), 90)
+
+    
+    def test_set_with_hash_prunes_old_fields(self):
+        self.adapter.hash_set("index", {"old": "100.5", "label": "x"})
+        
+        self.assertTrue(self.adapter.set_with_hash("record", "v", "index", {"new": "300.25"},
+                                                  ttl=100, prune_below=200))
+        self.assertEqual(self.adapter.get("record"), "v")
+        self.assertEqual(self.adapter.hash_get_all("index"), {"new": "300.25", "label": "x"})
+        self.assertGreater(self.adapter.client.ttl("record"), 90)
+        self.assertGreater(self.adapter.client.ttl("index"), 90)
+    
+    def test_hash_set_prune_and_delete(self):
+        self.adapter.hash_set("h", {"a": 1, "b": 5}, ttl=100, prune_below=3)
+        self.assertEqual(self.adapter.hash_get_all("h"), {"b": "5"})
+        self.assertEqual(self.adapter.hash_delete("h", ["b", "missing"]), 1)
+        self.assertEqual(self.adapter.hash_delete("h", []), 0)
+        self.assertFalse(self.adapter.exists("h"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import json
+from core.domain import SessionData
+from core.services.session_codec import (
+    JsonSessionCodec, CompactSessionCodec, MsgpackSessionCodec, create_session_codec,
+    decode_session, decode_auth_session, msgpack
+)
+from core.services.app_service import AppService
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from tests.unit.mocks import MockWebAdapter
+
+
+class TestSessionCodecs(unittest.TestCase):
+    def codecs(self):
+        codecs = [JsonSessionCodec(), CompactSessionCodec()]
+        if msgpack is not None:
+            codecs.append(MsgpackSessionCodec())
+        return codecs
+    
+    def test_round_trip_every_codec(self):
+        session = SessionData.create({"visits": 42})
+        for codec in self.codecs():
+            with self.subTest(codec=codec.name):
+                self.assertEqual(decode_session(codec.encode_session(session)), session)
+                auth = decode_auth_session(codec.encode_auth(7, "tuấn"))
+                self.assertEqual(auth, {"user_id": 7, "username": "tuấn"})
+    
+    def test_reads_legacy_json_sessions(self):
+        legacy = json.dumps({"session_id": "abc", "user_data": {"visits": 3}, "created_at": 1.5})
+        
+        self.assertEqual(decode_session(legacy).user_data["visits"], 3)
+        self.assertEqual(decode_auth_session('{"user_id": 1, "username": "a"}')["user_id"], 1)
+    
+    def test_compact_is_smaller_than_json(self):
+        session = SessionData.create({"visits": 1})
+        
+        compact = CompactSessionCodec().encode_session(session)
+        
+        self.assertTrue(compact.startswith("~"))
+        self.assertLess(len(compact), len(JsonSessionCodec().encode_session(session)) / 2)
+    
+    def test_compact_falls_back_to_json_for_other_shapes(self):
+        session = SessionData("not-a-uuid", {"visits": 1, "cart": [1, 2]}, 1.0)
+        
+        encoded = CompactSessionCodec().encode_session(session)
+        
+        self.assertTrue(encoded.startswith("{"))
+        self.assertEqual(decode_session(encoded), session)
+    
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            create_session_codec("xml")
+
+
+class TestAppServiceCodecSwitch(unittest.TestCase):
+    def test_json_session_survives_switch_to_compact(self):
+        cache = MemoryAdapter()
+        web = MockWebAdapter()
+        AppService(cache).handle_request(web)
+        
+        result = AppService(cache, CompactSessionCodec()).handle_request(web)
+        
+        self.assertEqual(result["visits"], 2)
+        self.assertTrue(cache.get(f"session:{web.get_session_id()}").startswith("~"))
+
+
+if __name__ == '__main__':
+    unittest.main()
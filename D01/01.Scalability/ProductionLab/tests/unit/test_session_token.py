@@ -0,0 +1,258 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from flask import Flask
+from core.services.auth_service import AuthService, InlinePasswordHasher
+from core.services.session_token import SessionTokenSigner, is_session_token
+from core.services.token_revocation import BloomFilter, TokenRevocationList, revoked_token_key
+from infrastructure.cache.instrumented_cache import InstrumentedCache
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.database.sqlite_adapter import SQLiteAdapter
+from infrastructure.web.flask_adapter import FlaskAdapter
+from infrastructure.web.middleware import init_auth_middleware
+from infrastructure.web.routes.auth import auth_bp, init_auth_routes
+from tests.unit.test_sqlite_adapter import read_init_sql
+
+SECRET = b"0123456789abcdef0123456789abcdef"
+
+
+class CountingCache(MemoryAdapter):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+    
+    def get(self, key):
+        self.calls += 1
+        return super().get(key)
+    
+    def exists(self, key):
+        self.calls += 1
+        return super().exists(key)
+
+
+class FlakyCache(MemoryAdapter):
+    """Raises like RedisAdapter(raise_on_error=True) while down"""
+    def __init__(self):
+        super().__init__()
+        self.down = False
+    
+    def _check(self):
+        if self.down:
+            raise ConnectionError("cache down")
+    
+    def get(self, key):
+        self._check()
+        return super().get(key)
+    
+    def set(self, key, value, ttl=None):
+        self._check()
+        return super().set(key, value, ttl)
+    
+    def exists(self, key):
+        self._check()
+        return super().exists(key)
+
+
+class TestSessionTokenSigner(unittest.TestCase):
+    def setUp(self):
+        self.signer = SessionTokenSigner(SECRET, ttl=60)
+    
+    def test_round_trip(self):
+        token = self.signer.issue(42, "zoë", now=1000.0)
+        claims = self.signer.verify(token, now=1059.0)
+        
+        self.assertTrue(is_session_token(token))
+        self.assertEqual((claims["user_id"], claims["username"]), (42, "zoë"))
+        self.assertEqual((claims["issued_at"], claims["expires_at"]), (1000.0, 1060))
+        self.assertNotEqual(claims["token_id"], self.signer.verify(self.signer.issue(42, "zoë"))["token_id"])
+    
+    def test_rejects_expired_tampered_and_foreign(self):
+        token = self.signer.issue(42, "alice", now=1000.0)
+        body, signature = token.split(".")
+        forged = self.signer.issue(1, "admin", now=1000.0).split(".")[0]
+        
+        self.assertIsNone(self.signer.verify(token, now=1060.0))
+        self.assertIsNone(self.signer.verify(f"{forged}.{signature}", now=1001.0))
+        self.assertIsNone(self.signer.verify(f"{body}.{signature[:-2]}AA", now=1001.0))
+        self.assertIsNone(SessionTokenSigner(b"another secret, 16+ bytes").verify(token, now=1001.0))
+        for garbage in ("", ".", "a.b.c", "!!.??", "3f2a9c1e-uuid"):
+            self.assertIsNone(self.signer.verify(garbage))
+    
+    def test_short_secret_refused(self):
+        with self.assertRaises(ValueError):
+            SessionTokenSigner(b"short")
+
+
+class TestTokenRevocationList(unittest.TestCase):
+    def setUp(self):
+        self.cache = CountingCache()
+        self.signer = SessionTokenSigner(SECRET)
+        self.worker_a = TokenRevocationList(self.cache, capacity=1000)
+        self.worker_b = TokenRevocationList(self.cache, capacity=1000)
+        self.worker_a.sync()
+        self.worker_b.sync()
+    
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f"t:{i}")
+        
+        self.assertTrue(all(f"t:{i}" in bloom for i in range(1000)))
+        false_positives = sum(f"other:{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+    
+    def test_unrevoked_check_needs_no_cache_call(self):
+        claims = self.signer.verify(self.signer.issue(1, "alice"))
+        self.cache.calls = 0
+        
+        self.assertFalse(self.worker_a.is_revoked(claims))
+        self.assertEqual(self.cache.calls, 0)
+    
+    def test_revocation_reaches_other_worker_on_sync(self):
+        claims = self.signer.verify(self.signer.issue(1, "alice"))
+        other = self.signer.verify(self.signer.issue(1, "alice"))
+        self.worker_a.revoke_token(claims)
+        
+        self.assertTrue(self.worker_a.is_revoked(claims))
+        self.assertFalse(self.worker_b.is_revoked(claims))
+        self.worker_b.sync()
+        self.assertTrue(self.worker_b.is_revoked(claims))
+        self.assertFalse(self.worker_b.is_revoked(other))
+        self.assertTrue(self.worker_b.sync(full=True) >= 1)
+        self.assertTrue(self.worker_b.is_revoked(claims))
+    
+    def test_filter_hit_confirmed_in_cache(self):
+        claims = self.signer.verify(self.signer.issue(1, "alice"))
+        self.worker_a.revoke_token(claims)
+        self.cache.delete(revoked_token_key(claims["token_id"]))  # expired record
+        
+        self.assertFalse(self.worker_a.is_revoked(claims))
+        self.assertEqual(self.worker_a.stats()["false_positives"], 1)
+    
+    def test_revoke_user_covers_earlier_tokens_only(self):
+        before = self.signer.verify(self.signer.issue(7, "bob", now=time.time() - 5))
+        self.worker_a.revoke_user(7)
+        after = self.signer.verify(self.signer.issue(7, "bob", now=time.time() + 1))
+        self.worker_b.sync()
+        
+        self.assertTrue(self.worker_b.is_revoked(before))
+        self.assertFalse(self.worker_b.is_revoked(after))
+    
+    def test_cache_error_fails_closed(self):
+        claims = self.signer.verify(self.signer.issue(1, "alice"))
+        self.worker_a.revoke_token(claims)
+        self.cache.exists = None  # calling it raises TypeError
+        
+        self.assertTrue(self.worker_a.is_revoked(claims))
+        self.assertEqual(self.worker_a.stats()["errors"], 1)
+    
+    def test_outage_behind_instrumented_cache_fails_closed(self):
+        # InstrumentedCache turns errors into misses; the list must still see them
+        backend = FlakyCache()
+        revocations = TokenRevocationList(InstrumentedCache(backend, registry=None), capacity=1000)
+        claims = self.signer.verify(self.signer.issue(1, "alice"))
+        self.assertTrue(revocations.revoke_token(claims))
+        
+        backend.down = True
+        self.assertTrue(revocations.is_revoked(claims))
+        stats = revocations.stats()
+        self.assertEqual((stats["errors"], stats["false_positives"]), (1, 0))
+    
+    def test_unrecorded_revocation_reported(self):
+        backend = FlakyCache()
+        revocations = TokenRevocationList(InstrumentedCache(backend, registry=None), capacity=1000)
+        claims = self.signer.verify(self.signer.issue(1, "alice"))
+        
+        backend.down = True
+        self.assertFalse(revocations.revoke_token(claims))
+        self.assertFalse(revocations.revoke_user(1))
+        self.assertEqual(revocations.stats()["revoke_errors"], 2)
+        
+        backend.down = False
+        self.assertFalse(revocations.is_revoked(claims))
+
+
+class TestTokenSessions(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.db = SQLiteAdapter(os.path.join(self.tmp, "app.sqlite3"), read_init_sql())
+        self.cache = CountingCache()
+        self.tokens = SessionTokenSigner(SECRET)
+        self.revocations = TokenRevocationList(self.cache, capacity=1000)
+        self.service = AuthService(self.db, self.cache, hasher=InlinePasswordHasher(rounds=4),
+                                   tokens=self.tokens, revocations=self.revocations)
+        self.service.register("alice", "pw", full_name="Alice")
+        
+        app = Flask(__name__)
+        app.register_blueprint(auth_bp)
+        init_auth_middleware(self.cache, FlaskAdapter(), self.tokens, self.revocations)
+        init_auth_routes(self.service, FlaskAdapter())
+        self.client = app.test_client()
+    
+    def tearDown(self):
+        init_auth_middleware(None, None)
+        self.db.close()
+        shutil.rmtree(self.tmp)
+    
+    def login(self):
+        response = self.client.post('/login', json={"username": "alice", "password": "pw"})
+        return response.get_json()["session_id"]
+    
+    def test_login_writes_nothing_to_cache(self):
+        token = self.login()
+        
+        self.assertTrue(is_session_token(token))
+        self.assertIsNone(self.cache.get("auth_session:" + token))
+        self.assertEqual(self.cache.hash_get_all("user_session_index:1"), {})
+    
+    def test_protected_route_checks_token_locally(self):
+        self.login()
+        self.cache.calls = 0
+        
+        response = self.client.get('/profile')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["profile"]["full_name"], "Alice")
+        self.assertEqual(self.cache.calls, 1)  # the profile lookup, not the session
+    
+    def test_logout_revokes_token(self):
+        token = self.login()
+        self.client.post('/logout')
+        self.client.set_cookie('session_id', token)
+        
+        self.assertEqual(self.client.get('/profile').status_code, 401)
+        self.assertEqual(self.service.get_session_stats()["revocations"]["revoked"], 1)
+    
+    def test_logout_all_revokes_every_token(self):
+        first = self.login()
+        second = self.login()
+        self.assertEqual(self.client.post('/logout-all').status_code, 200)
+        
+        for token in (first, second):
+            self.client.set_cookie('session_id', token)
+            self.assertEqual(self.client.get('/profile').status_code, 401)
+    
+    def test_failed_logout_keeps_cookie(self):
+        token = self.login()
+        with mock.patch.object(self.revocations, "revoke_token", return_value=False):
+            response = self.client.post('/logout')
+        
+        self.assertEqual(response.status_code, 503)
+        self.assertNotIn('Set-Cookie', response.headers)
+        self.client.set_cookie('session_id', token)
+        self.assertEqual(self.client.post('/logout').status_code, 200)
+        self.assertEqual(self.client.get('/profile').status_code, 401)
+    
+    def test_cached_sessions_still_accepted(self):
+        legacy = AuthService(self.db, self.cache, hasher=InlinePasswordHasher(rounds=4))
+        self.client.set_cookie('session_id', legacy.login("alice", "pw")["session_id"])
+        self.assertEqual(self.client.get('/profile').status_code, 200)
+        
+        self.client.set_cookie('session_id', self.tokens.issue(1, "alice")[:-3] + "xyz")
+        self.assertEqual(self.client.get('/profile').status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
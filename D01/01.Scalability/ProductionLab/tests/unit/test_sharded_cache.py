@@ -0,0 +1,256 @@
+import unittest
+from redis.exceptions import ResponseError
+from infrastructure.cache.hash_ring import HashRing
+from infrastructure.cache.memory_adapter import MemoryAdapter
+from infrastructure.cache.sharded_cache_adapter import ShardedCacheAdapter
+from tests.unit.mocks import MockCacheAdapter
+
+
+class RaisingCache(MockCacheAdapter):
+    """MockCacheAdapter that raises while down (like RedisAdapter(raise_on_error=True))"""
+    
+    def __init__(self):
+        super().__init__()
+        self.down = False
+    
+    def _check(self):
+        if self.down:
+            raise ConnectionError("node down")
+    
+    def get(self, key):
+        self._check()
+        return super().get(key)
+    
+    def set(self, key, value, ttl=None):
+        self._check()
+        return super().set(key, value, ttl)
+    
+    def get_many(self, keys):
+        self._check()
+        return super().get_many(keys)
+    
+    def delete_many(self, keys):
+        self._check()
+        return super().delete_many(keys)
+    
+    def ping(self):
+        return not self.down
+
+
+class TestHashRing(unittest.TestCase):
+    def test_lookup_is_stable(self):
+        ring = HashRing(["a", "b", "c"])
+        self.assertEqual([ring.get_node(f"k{i}") for i in range(100)],
+                         [HashRing(["c", "a", "b"]).get_node(f"k{i}") for i in range(100)])
+    
+    def test_adding_node_moves_only_its_share(self):
+        keys = [f"session:{i}" for i in range(10000)]
+        ring = HashRing(["a", "b", "c", "d"])
+        before = {key: ring.get_node(key) for key in keys}
+        ring.add_node("e")
+        moved = [key for key in keys if ring.get_node(key) != before[key]]
+        
+        # ~1/5 of the keys move, and only onto the new node
+        self.assertLess(len(moved) / len(keys), 0.3)
+        self.assertTrue(all(ring.get_node(key) == "e" for key in moved))
+    
+    def test_iter_nodes_visits_each_node_once(self):
+        ring = HashRing(["a", "b", "c"], vnodes=8)
+        order = list(ring.iter_nodes("k"))
+        self.assertEqual(sorted(order), ["a", "b", "c"])
+        self.assertEqual(order[0], ring.get_node("k"))
+    
+    def test_empty_ring(self):
+        self.assertIsNone(HashRing().get_node("k"))
+
+
+class TestShardedCacheAdapter(unittest.TestCase):
+    def setUp(self):
+        self.nodes = {name: RaisingCache() for name in ("a", "b", "c")}
+        # Eject on the first failure; the threshold has its own tests below
+        self.cache = ShardedCacheAdapter(self.nodes, vnodes=32, failure_threshold=1)
+    
+    def test_keys_live_on_their_ring_node(self):
+        for i in range(50):
+            self.cache.set(f"k{i}", str(i))
+        for i in range(50):
+            owner = self.cache.node_for(f"k{i}")
+            self.assertEqual(self.nodes[owner].get(f"k{i}"), str(i))
+            self.assertEqual(self.cache.get(f"k{i}"), str(i))
+    
+    def test_failing_node_is_ejected_and_keys_fall_through(self):
+        owner = self.cache.node_for("session:1")
+        self.nodes[owner].down = True
+        
+        self.assertTrue(self.cache.set("session:1", "v"))
+        self.assertEqual(self.cache.get("session:1"), "v")
+        self.assertNotEqual(self.cache.node_for("session:1"), owner)
+        stats = self.cache.stats()
+        self.assertFalse(stats["nodes"][owner]["healthy"])
+        self.assertEqual(stats["ejections"], 1)
+        self.assertEqual(stats["fallthroughs"], 1)
+    
+    def test_health_check_restores_node(self):
+        owner = self.cache.node_for("k")
+        self.nodes[owner].down = True
+        self.cache.check_health()
+        self.assertNotEqual(self.cache.node_for("k"), owner)
+        
+        self.nodes[owner].down = False
+        self.assertEqual(self.cache.check_health(), {"a": True, "b": True, "c": True})
+        self.assertEqual(self.cache.node_for("k"), owner)
+    
+    def test_batch_ops_group_by_node(self):
+        mapping = {f"k{i}": str(i) for i in range(30)}
+        self.assertTrue(self.cache.set_many(mapping))
+        self.assertEqual(self.cache.get_many(list(mapping) + ["missing"]),
+                         dict(mapping, missing=None))
+        self.assertEqual(self.cache.delete_many(list(mapping)), 30)
+    
+    def test_batch_falls_through_when_node_fails(self):
+        mapping = {f"k{i}": str(i) for i in range(30)}
+        self.cache.set_many(mapping)
+        self.nodes["a"].down = True
+        
+        values = self.cache.get_many(list(mapping))
+        # Keys that lived on "a" are now misses on the next node, not errors
+        for key, value in values.items():
+            self.assertIn(value, (mapping[key], None))
+        self.assertFalse(self.cache.stats()["nodes"]["a"]["healthy"])
+    
+    def test_all_nodes_down_degrades_to_miss(self):
+        for node in self.nodes.values():
+            node.down = True
+        self.assertIsNone(self.cache.get("k"))
+        self.assertFalse(self.cache.set("k", "v"))
+        self.assertFalse(self.cache.ping())
+    
+    def test_nodes_must_support_flush(self):
+        class NoFlush(MockCacheAdapter):
+            flush = None
+        
+        with self.assertRaises(TypeError):
+            ShardedCacheAdapter({"a": MemoryAdapter(), "b": NoFlush()})
+        with self.assertRaises(TypeError):
+            self.cache.add_node("d", NoFlush())
+        self.assertNotIn("d", self.cache.stats()["nodes"])
+    
+    def test_hash_ops_forward(self):
+        cache = ShardedCacheAdapter({"a": MemoryAdapter(), "b": MemoryAdapter()})
+        self.assertEqual(cache.hash_incr("session_hash:1", "visits", ttl=60), 1)
+        self.assertEqual(cache.hash_incr("session_hash:1", "visits", ttl=60), 2)
+        self.assertEqual(cache.hash_get_all("session_hash:1"), {"visits": "2"})
+    
+    def test_restored_node_does_not_resurrect_deleted_keys(self):
+        nodes = {"a": MemoryAdapter(), "b": MemoryAdapter()}
+        cache = ShardedCacheAdapter(nodes)
+        cache.set("auth_session:X", "alice")
+        owner = cache.node_for("auth_session:X")
+        
+        cache._eject(owner, "test")
+        cache.delete("auth_session:X")  # logout while the owner is out
+        self.assertEqual(cache.check_health(), {"a": True, "b": True})
+        self.assertEqual(cache.node_for("auth_session:X"), owner)
+        self.assertIsNone(cache.get("auth_session:X"))
+    
+    def test_delete_reaches_fallthrough_copy(self):
+        nodes = {"a": MemoryAdapter(), "b": MemoryAdapter()}
+        cache = ShardedCacheAdapter(nodes)
+        owner = cache.node_for("auth_session:Y")
+        cache._eject(owner, "test")
+        cache.set("auth_session:Y", "alice")  # lands on the other node
+        cache.check_health()
+        
+        cache.delete("auth_session:Y")
+        cache._eject(owner, "test")
+        self.assertIsNone(cache.get("auth_session:Y"))
+    
+    def test_node_stays_out_if_cleanup_fails(self):
+        owner = self.cache.node_for("k")
+        self.nodes[owner].down = True
+        self.cache.check_health()
+        self.cache.set("k", "v")  # written elsewhere: stale on the owner
+        self.nodes[owner].down = False
+        self.nodes[owner].delete_many = lambda keys: (_ for _ in ()).throw(ConnectionError("reset"))
+        
+        self.assertFalse(self.cache.check_health()[owner])
+        self.assertNotEqual(self.cache.node_for("k"), owner)
+        self.assertIn("cleanup failed", self.cache.stats()["nodes"][owner]["ejected_reason"])
+        
+        del self.nodes[owner].delete_many
+        self.assertTrue(self.cache.check_health()[owner])
+        self.assertEqual(self.cache.node_for("k"), owner)
+    
+    def test_batch_with_every_node_down_degrades_to_miss(self):
+        self.cache.set_many({"k1": "1", "k2": "2"})
+        for node in self.nodes.values():
+            node.down = True
+        self.assertEqual(self.cache.get_many(["k1", "k2"]), {"k1": None, "k2": None})
+
+
+
+class TestNodeFailures(unittest.TestCase):
+    def setUp(self):
+        self.nodes = {"a": RaisingCache(), "b": RaisingCache()}
+        self.cache = ShardedCacheAdapter(self.nodes, vnodes=32, failure_threshold=3)
+        self.owner = self.cache.node_for("k")
+    
+    def test_ejected_only_after_consecutive_failures(self):
+        self.cache.set("k", "v")
+        self.nodes[self.owner].down = True
+        
+        self.assertIsNone(self.cache.get("k"))
+        self.assertIsNone(self.cache.get("k"))
+        self.assertEqual(self.cache.node_for("k"), self.owner)
+        self.nodes[self.owner].down = False
+        self.assertEqual(self.cache.get("k"), "v")  # success resets the count
+        
+        self.nodes[self.owner].down = True
+        self.cache.get("k")
+        self.cache.check_health()
+        self.assertEqual(self.cache.stats()["nodes"][self.owner]["failures"], 2)
+        self.assertIsNone(self.cache.get("k"))  # third failure: ejected, falls through
+        self.assertNotEqual(self.cache.node_for("k"), self.owner)
+    
+    def test_command_error_does_not_eject(self):
+        self.cache.set("k", "v")
+        self.nodes[self.owner].hash_get_all = lambda key: (_ for _ in ()).throw(
+            ResponseError("WRONGTYPE Operation against a key holding the wrong kind of value"))
+        
+        for _ in range(5):
+            self.assertEqual(self.cache.hash_get_all("k"), {})
+        self.assertEqual(self.cache.node_for("k"), self.owner)
+        self.assertEqual(self.cache.get("k"), "v")
+        stats = self.cache.stats()
+        self.assertEqual((stats["ejections"], stats["command_errors"]), (0, 5))
+    
+    def test_rejoin_keeps_keys_not_written_meanwhile(self):
+        owned = [f"k{i}" for i in range(40) if self.cache.node_for(f"k{i}") == self.owner]
+        self.cache.set_many({key: "old" for key in owned})
+        self.cache._eject(self.owner, "test")
+        self.cache.set(owned[0], "new")
+        self.cache.delete(owned[1])
+        self.assertEqual(self.cache.stats()["nodes"][self.owner]["dirty_keys"], 2)
+        
+        self.assertTrue(self.cache.check_health()[self.owner])
+        self.assertIsNone(self.cache.get(owned[0]))  # stale copy and fall-through copy both gone
+        self.assertIsNone(self.cache.get(owned[1]))
+        self.assertEqual(self.cache.get_many(owned[2:]), {key: "old" for key in owned[2:]})
+        other = next(name for name in self.nodes if name != self.owner)
+        self.assertIsNone(self.nodes[other].get(owned[0]))
+    
+    def test_too_many_dirty_keys_flushes(self):
+        cache = ShardedCacheAdapter(self.nodes, vnodes=32, max_dirty_keys=2)
+        cache.set("k", "old")
+        keep = next(f"x{i}" for i in range(100) if cache.node_for(f"x{i}") == self.owner)
+        cache.set(keep, "v")
+        cache._eject(self.owner, "test")
+        cache.set_many({f"k{i}": "new" for i in range(20)})
+        self.assertIsNone(cache.stats()["nodes"][self.owner]["dirty_keys"])
+        
+        self.assertTrue(cache.check_health()[self.owner])
+        self.assertIsNone(self.nodes[self.owner].get(keep))
+
+
+if __name__ == '__main__':
+    unittest.main()
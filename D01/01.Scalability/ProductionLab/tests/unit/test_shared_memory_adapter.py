@@ -0,0 +1,100 @@
+import unittest
+import multiprocessing
+import os
+import tempfile
+import time
+from infrastructure.cache.shared_memory_adapter import SharedMemoryAdapter
+
+
+def _increment(path, n):
+    cache = SharedMemoryAdapter(path, capacity=256, slot_size=128, stripes=16)
+    for _ in range(n):
+        cache.hash_incr("session_hash:shared", "visits")
+    cache.close()
+
+
+class TestSharedMemoryAdapter(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "cache.shm")
+        self.cache = SharedMemoryAdapter(self.path, capacity=256, slot_size=128, stripes=16)
+    
+    def tearDown(self):
+        self.cache.close()
+        self.dir.cleanup()
+    
+    def test_set_get_delete(self):
+        self.assertTrue(self.cache.set("session:1", "tuấn"))
+        self.assertEqual(self.cache.get("session:1"), "tuấn")
+        self.assertTrue(self.cache.delete("session:1"))
+        self.assertIsNone(self.cache.get("session:1"))
+    
+    def test_overwrite_and_ttl(self):
+        self.cache.set("k", "old")
+        self.cache.set("k", "new", ttl=1)
+        self.assertEqual(self.cache.get("k"), "new")
+        
+        time.sleep(1.05)
+        self.assertIsNone(self.cache.get("k"))
+    
+    def test_hash_prune_and_delete(self):
+        self.cache.hash_set("h", {"old": 1, "new": 9}, ttl=60, prune_below=5)
+        self.assertEqual(self.cache.hash_get_all("h"), {"new": "9"})
+        self.assertEqual(self.cache.hash_delete("h", ["new", "missing"]), 1)
+        self.assertEqual(self.cache.hash_get_all("h"), {})
+        self.assertEqual(self.cache.hash_delete("absent", ["x"]), 0)
+        self.assertFalse(self.cache.exists("absent"))
+    
+    def test_visible_to_another_instance(self):
+        self.cache.set("auth_session:x", "{}")
+        
+        other = SharedMemoryAdapter(self.path, capacity=256, slot_size=128, stripes=16)
+        try:
+            self.assertEqual(other.get("auth_session:x"), "{}")
+        finally:
+            other.close()
+    
+    def test_geometry_mismatch_rejected(self):
+        with self.assertRaises(ValueError):
+            SharedMemoryAdapter(self.path, capacity=512, slot_size=128, stripes=16)
+    
+    def test_oversized_entry_rejected(self):
+        self.assertFalse(self.cache.set("big", "x" * 200))
+        self.assertEqual(self.cache.stats()["rejections"], 1)
+    
+    def test_full_stripe_evicts(self):
+        for i in range(1000):
+            self.cache.set(f"k{i}", "v")
+        
+        stats = self.cache.stats()
+        self.assertEqual(stats["entries"], 256)
+        self.assertEqual(stats["evictions"], 1000 - 256)
+        self.assertEqual(self.cache.get("k999"), "v")
+    
+    def test_tombstones_are_reclaimed(self):
+        cache = SharedMemoryAdapter(os.path.join(self.dir.name, "small.shm"),
+                                    capacity=8, slot_size=128, stripes=1)
+        self.addCleanup(cache.close)
+        keys = [f"k{i}" for i in range(6)]
+        for key in keys:
+            cache.set(key, "v")
+        for key in keys[1::2]:
+            cache.delete(key)
+        
+        self.assertEqual([cache.get(key) for key in keys[::2]], ["v"] * 3)
+        for key in keys[::2]:
+            cache.delete(key)
+        self.assertEqual((cache.stats()["entries"], cache.stats()["tombstones"]), (0, 0))
+    
+    def test_hash_incr_atomic_across_processes(self):
+        workers = [multiprocessing.Process(target=_increment, args=(self.path, 200)) for _ in range(4)]
+        for w in workers:
+            w.start()
+        for w in workers:
+            w.join()
+        
+        self.assertEqual(self.cache.hash_get_all("session_hash:shared")["visits"], "800")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from core.interfaces.database_port import BulkWriteError, DuplicateKeyError
+from core.services.address_service import SQL_DISTRICTS, SQL_INSERT_ADDRESS
+from core.services.auth_service import SQL_INSERT_USER, SQL_INSERT_PROFILE, SQL_LOGIN_BY_USERNAME
+from infrastructure.database.sqlite_adapter import SQLiteAdapter, mysql_to_sqlite
+
+INIT_SQL = os.path.join(os.path.dirname(__file__), '..', '..',
+                        'infrastructure', 'database', 'init.sql')
+
+
+def read_init_sql():
+    with open(INIT_SQL) as f:
+        return f.read()
+
+
+class TestTranslation(unittest.TestCase):
+    def test_inline_indexes_and_auto_increment(self):
+        statements = mysql_to_sqlite("""
+            CREATE TABLE t (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                name VARCHAR(10),
+                UNIQUE KEY uq_name (name),
+                INDEX idx_both (id, name)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+            -- comment; with a semicolon
+            INSERT INTO t (name) VALUES ('a;b');
+        """)
+        self.assertEqual(len(statements), 4)
+        self.assertIn("id INTEGER PRIMARY KEY AUTOINCREMENT", statements[0])
+        self.assertNotIn("INDEX", statements[0])
+        self.assertNotIn("ENGINE", statements[0])
+        self.assertEqual(statements[1], "CREATE UNIQUE INDEX IF NOT EXISTS uq_name ON t (name)")
+        self.assertEqual(statements[2], "CREATE INDEX IF NOT EXISTS idx_both ON t (id, name)")
+        self.assertEqual(statements[3], "INSERT INTO t (name) VALUES ('a;b')")
+
+
+class TestSQLiteAdapter(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "app.sqlite3")
+        self.db = SQLiteAdapter(self.path, read_init_sql())
+    
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.dir)
+    
+    def test_schema_loaded_once_in_wal_mode(self):
+        self.assertEqual(self.db.journal_mode, "wal")
+        again = SQLiteAdapter(self.path, read_init_sql())
+        self.assertEqual(again.fetch_one("SELECT COUNT(*) AS n FROM master_address")["n"], 9)
+        again.close()
+    
+    def test_mysql_placeholders(self):
+        rows = self.db.fetch_all(SQL_DISTRICTS, ("Vietnam", "Ha Noi"))
+        self.assertEqual([row["district"] for row in rows], ["Ba Dinh", "Cau Giay", "Hoan Kiem"])
+        self.assertEqual(self.db.fetch_one("SELECT 'a%%b' AS v WHERE 1 = %s", (1,))["v"], "a%b")
+    
+    def test_transaction_commit_and_rollback(self):
+        with self.db.transaction() as tx:
+            user_id = tx.insert(SQL_INSERT_USER, ("alice", "hash"))
+            tx.insert(SQL_INSERT_PROFILE, (user_id, "Alice", None, 1, None))
+        row = self.db.fetch_one(SQL_LOGIN_BY_USERNAME, ("alice",))
+        self.assertEqual((row["full_name"], row["district"]), ("Alice", "Ba Dinh"))
+        
+        with self.assertRaises(DuplicateKeyError):
+            with self.db.transaction() as tx:
+                tx.insert(SQL_INSERT_USER, ("bob", "hash"))
+                tx.insert(SQL_INSERT_USER, ("alice", "hash"))  # UNIQUE username
+        self.assertIsNone(self.db.fetch_one(SQL_LOGIN_BY_USERNAME, ("bob",)))
+        with self.assertRaises(DuplicateKeyError):
+            self.db.insert(SQL_INSERT_USER, ("alice", "hash"))
+    
+    def test_connection_per_thread(self):
+        errors = []
+        
+        def register(n):
+            try:
+                for i in range(20):
+                    with self.db.transaction() as tx:
+                        tx.insert(SQL_INSERT_USER, (f"user-{n}-{i}", "hash"))
+            except Exception as e:
+                errors.append(e)
+        
+        threads = [threading.Thread(target=register, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(self.db.fetch_one("SELECT COUNT(*) AS n FROM auth_user")["n"], 80)
+        self.assertEqual(len(self.db._connections), 5)
+    
+    def test_insert_many_and_failure(self):
+        rows = [("Japan", "Tokyo", f"D{i}") for i in range(25)]
+        result = self.db.insert_many(SQL_INSERT_ADDRESS, rows, chunk_size=10)
+        self.assertEqual((result.rowcount, result.first_id, result.chunks), (25, 10, 3))
+        
+        bad = [("Japan", "Osaka", "D1")] * 10 + [("Japan", None, "D2")]
+        with self.assertRaises(BulkWriteError) as ctx:
+            self.db.insert_many(SQL_INSERT_ADDRESS, bad, chunk_size=5, transaction_per_chunk=True)
+        self.assertEqual(ctx.exception.committed.rowcount, 10)
+        self.assertEqual(len(self.db.fetch_all("SELECT id FROM master_address WHERE province = %s",
+                                               ("Osaka",))), 10)
+    
+    def test_fetch_iter_tuples(self):
+        rows = list(self.db.fetch_iter("SELECT id, district FROM master_address ORDER BY id",
+                                       batch_size=4, as_tuples=True))
+        self.assertEqual(len(rows), 9)
+        self.assertEqual(rows[0], (1, "Ba Dinh"))
+    
+    def test_memory_database_rejected(self):
+        with self.assertRaises(ValueError):
+            SQLiteAdapter(":memory:")
+
+
+if __name__ == '__main__':
+    unittest.main()